@@ -2,12 +2,68 @@ package org.example.project_dw.shared.models
 
 import kotlinx.serialization.Serializable
 import kotlinx.serialization.SerialName
+import kotlinx.serialization.json.JsonElement
 
 @Serializable
 data class TimeSeriesRequest(
   val series: List<SeriesData>,
   @SerialName("target_index")
-  val targetIndex: Int? = null
+  val targetIndex: Int? = null,
+  @SerialName("output_policy")
+  val outputPolicy: String? = null,  // "none" | "summary" | "full" | "downsampled"
+  @SerialName("output_max_points")
+  val outputMaxPoints: Int? = null,
+  @SerialName("irf_horizon")
+  val irfHorizon: Int? = null,
+  @SerialName("irf_replications")
+  val irfReplications: Int? = null,
+  val workers: Int? = null,  // 0 = all cores
+  val seed: Int? = null,
+  val causality: Boolean? = null,
+  @SerialName("bootstrap_ci")
+  val bootstrapCi: String? = null,  // "none" | "moving" | "stationary"
+  @SerialName("bootstrap_replications")
+  val bootstrapReplications: Int? = null,
+  @SerialName("bootstrap_block_length")
+  val bootstrapBlockLength: Int? = null,
+  @SerialName("forecast_horizon")
+  val forecastHorizon: Int? = null,  // 0 = no forecast
+  @SerialName("forecast_simulations")
+  val forecastSimulations: Int? = null,
+  @SerialName("forecast_exog")
+  val forecastExog: Map<String, List<Double>>? = null,  // future predictor levels by name
+  @SerialName("break_method")
+  val breakMethod: String? = null,  // "zivot_andrews" | "bai_perron"
+  @SerialName("max_breaks")
+  val maxBreaks: Int? = null,
+  val stability: Boolean? = null,
+  val diagnostics: Boolean? = null,
+  val targets: JsonElement? = null,  // "all" or a list of series indices
+  @SerialName("subset_search")
+  val subsetSearch: String? = null,  // "none" | "aic" | "bic" | "adj_r2"
+  @SerialName("subset_top")
+  val subsetTop: Int? = null,
+  @SerialName("subset_max_size")
+  val subsetMaxSize: Int? = null,
+  @SerialName("lag_selection")
+  val lagSelection: String? = null,  // "aic" | "ridge" | "lasso" | "elastic_net"
+  @SerialName("l1_ratio")
+  val l1Ratio: Double? = null,  // elastic_net only, in (0, 1]
+  @SerialName("cv_folds")
+  val cvFolds: Int? = null,
+  @SerialName("hac_kernel")
+  val hacKernel: String? = null,  // "bartlett" | "parzen" | "quadratic_spectral"
+  @SerialName("hac_bandwidth")
+  val hacBandwidth: String? = null,  // "fixed" | "andrews" | "newey_west"
+  @SerialName("critical_values")
+  val criticalValues: String? = null,  // "asymptotic" | "finite_sample"
+  @SerialName("compare_models")
+  val compareModels: Boolean? = null,
+  val backtest: String? = null,  // "none" | "expanding" | "sliding"
+  @SerialName("backtest_horizon")
+  val backtestHorizon: Int? = null,
+  @SerialName("backtest_folds")
+  val backtestFolds: Int? = null
 )
 
 @Serializable
@@ -25,6 +25,9 @@ data class TimeSeriesAnalysisResult(
   
   @SerialName("structural_breaks")
   val structuralBreaks: List<StructuralBreak>? = null,
+
+  @SerialName("bai_perron")
+  val baiPerron: BaiPerronResult? = null,
   
   @SerialName("series_orders")
   val seriesOrders: List<SeriesOrder>,
@@ -35,6 +38,24 @@ data class TimeSeriesAnalysisResult(
   val modelResults: ModelResults? = null
 )
 
+// ===============================
+// multi-target response ("targets" request), one analysis per target
+
+@Serializable
+data class MultiTargetResult(
+  @SerialName("series_count")
+  val seriesCount: Int,
+
+  @SerialName("variable_names")
+  val variableNames: List<String>,
+
+  @SerialName("series_orders")
+  val seriesOrders: List<SeriesOrder>,
+
+  val targets: List<String>,
+  val results: List<TimeSeriesAnalysisResult>
+)
+
 // ===============================
 // structural breaks
 
@@ -45,6 +66,27 @@ data class StructuralBreak(
   val seriesIndex: Int
 )
 
+@Serializable
+data class BaiPerronResult(
+  @SerialName("n_breaks")
+  val nBreaks: Int,
+
+  @SerialName("break_indices")
+  val breakIndices: List<Int>,
+
+  @SerialName("min_segment")
+  val minSegment: Int,
+
+  val trimming: Double,
+
+  // indexed by number of breaks, sup_f starts at one break
+  val ssr: List<Double>,
+  val bic: List<Double>,
+
+  @SerialName("sup_f")
+  val supF: List<Double>
+)
+
 // ===============================
 // series analysis
 
@@ -72,7 +114,47 @@ data class SeriesOrder(
   val trendStrength: Double,
   
   @SerialName("seasonal_strength")
-  val seasonalStrength: Double
+  val seasonalStrength: Double,
+
+  @SerialName("seasonal_period")
+  val seasonalPeriod: Int? = null,
+
+  @SerialName("stl_components")
+  val stlComponents: StlComponents? = null
+)
+
+// ===============================
+// stl components (output_policy != "none")
+
+@Serializable
+data class StlComponents(
+  val policy: String,  // "summary" | "full" | "downsampled"
+  val trend: ComponentOutput,
+  val seasonal: ComponentOutput,
+  val residual: ComponentOutput
+)
+
+@Serializable
+data class ComponentOutput(
+  val summary: ComponentSummary,
+  val values: EncodedArray? = null
+)
+
+@Serializable
+data class ComponentSummary(
+  val mean: Double,
+  val std: Double,
+  val min: Double,
+  val max: Double
+)
+
+@Serializable
+data class EncodedArray(
+  val encoding: String,  // "base64"
+  val dtype: String,  // "<f8" | "<f4"
+  val length: Int,
+  val data: String,
+  val indices: String? = null  // base64 "<u4", only for downsampled arrays
 )
 
 // ===============================
@@ -185,6 +267,20 @@ data class TransformationInfo(
 data class ModelResults(
   val cointegration: CointegrationResult? = null,
   val regression: RegressionResult? = null,
+
+  @SerialName("impulse_responses")
+  val impulseResponses: ImpulseResponseResult? = null,
+
+  val causality: CausalityResult? = null,
+
+  val forecast: ForecastResult? = null,
+
+  @SerialName("subset_search")
+  val subsetSearch: SubsetSearchResult? = null,
+
+  val comparison: ModelComparison? = null,
+
+  val backtest: BacktestResult? = null,
   
   @SerialName("error_message")
   val errorMessage: String? = null,
@@ -201,6 +297,251 @@ data class ModelResults(
   val periodResults: List<PeriodModelResult>? = null
 )
 
+// ===============================
+// impulse responses
+
+@Serializable
+data class ImpulseResponseResult(
+  @SerialName("variable_names")
+  val variableNames: List<String>,
+
+  val horizon: Int,
+
+  // [step][response][impulse]
+  val orthogonalized: List<List<List<Double>>>,
+  val fevd: List<List<List<Double>>>,
+
+  val replications: Int = 0,
+
+  @SerialName("confidence_level")
+  val confidenceLevel: Double? = null,
+
+  @SerialName("irf_lower")
+  val irfLower: List<List<List<Double>>>? = null,
+
+  @SerialName("irf_upper")
+  val irfUpper: List<List<List<Double>>>? = null,
+
+  @SerialName("fevd_lower")
+  val fevdLower: List<List<List<Double>>>? = null,
+
+  @SerialName("fevd_upper")
+  val fevdUpper: List<List<List<Double>>>? = null
+)
+
+// ===============================
+// predictor subset search
+
+@Serializable
+data class SubsetSpecification(
+  val predictors: List<String>,
+
+  @SerialName("criterion_value")
+  val criterionValue: Double,
+
+  val aic: Double,
+  val bic: Double,
+
+  @SerialName("adj_r_squared")
+  val adjRSquared: Double,
+
+  val regression: RegressionResult
+)
+
+@Serializable
+data class SubsetSearchResult(
+  val criterion: String,  // "aic" | "bic" | "adj_r2"
+
+  @SerialName("n_candidates")
+  val nCandidates: Int,
+
+  @SerialName("max_size")
+  val maxSize: Int,
+
+  val evaluated: Int,
+
+  // best first
+  val specifications: List<SubsetSpecification>
+)
+
+// ===============================
+// model comparison
+
+@Serializable
+data class CandidateModel(
+  val specification: String,  // "ols_levels" | "mixed_differences" | "ecm" | "vecm" | "var_differences"
+  val selected: Boolean,
+
+  @SerialName("model_kind")
+  val modelKind: String? = null,
+
+  @SerialName("n_obs")
+  val nObs: Int? = null,
+
+  @SerialName("n_params")
+  val nParams: Int? = null,
+
+  @SerialName("log_likelihood")
+  val logLikelihood: Double? = null,
+
+  // per observation
+  val aic: Double? = null,
+  val bic: Double? = null,
+
+  @SerialName("holdout_rmse")
+  val holdoutRmse: Double? = null,
+
+  @SerialName("holdout_mae")
+  val holdoutMae: Double? = null,
+
+  @SerialName("aic_rank")
+  val aicRank: Int? = null,
+
+  @SerialName("bic_rank")
+  val bicRank: Int? = null,
+
+  @SerialName("holdout_rank")
+  val holdoutRank: Int? = null,
+
+  val regression: RegressionResult? = null,
+
+  @SerialName("error_message")
+  val errorMessage: String? = null
+)
+
+@Serializable
+data class ModelComparison(
+  @SerialName("holdout_size")
+  val holdoutSize: Int,
+
+  @SerialName("best_by_aic")
+  val bestByAic: String? = null,
+
+  @SerialName("best_by_bic")
+  val bestByBic: String? = null,
+
+  @SerialName("best_by_holdout")
+  val bestByHoldout: String? = null,
+
+  // by holdout error, then aic; failures last
+  val candidates: List<CandidateModel>
+)
+
+// ===============================
+// backtest
+
+@Serializable
+data class BacktestFold(
+  val origin: Int,
+
+  @SerialName("train_start")
+  val trainStart: Int,
+
+  @SerialName("train_size")
+  val trainSize: Int,
+
+  val rmse: Double,
+  val mae: Double,
+  val mase: Double? = null,
+
+  // actual - forecast of the target level, steps 1..horizon
+  val errors: List<Double>
+)
+
+@Serializable
+data class BacktestResult(
+  val method: String,  // "expanding" | "sliding"
+
+  @SerialName("model_kind")
+  val modelKind: String,
+
+  val horizon: Int,
+
+  @SerialName("exog_assumption")
+  val exogAssumption: String,  // "realized" | "endogenous"
+
+  val rmse: Double,
+  val mae: Double,
+  val mase: Double? = null,
+
+  @SerialName("rmse_by_step")
+  val rmseByStep: List<Double>,
+
+  val folds: List<BacktestFold>
+)
+
+// ===============================
+// forecast
+
+@Serializable
+data class ForecastResult(
+  val horizon: Int,
+
+  @SerialName("model_kind")
+  val modelKind: String,
+
+  @SerialName("exog_assumption")
+  val exogAssumption: String,  // "provided" | "last_value" | "endogenous"
+
+  val mean: List<Double>,
+  val lower: List<Double>,
+  val upper: List<Double>,
+
+  val simulations: Int,
+
+  @SerialName("confidence_level")
+  val confidenceLevel: Double
+)
+
+// ===============================
+// causality
+
+@Serializable
+data class CausalityTest(
+  val cause: String,
+  val effect: String,
+  val statistic: Double,  // F for granger, chi2 for toda-yamamoto
+
+  @SerialName("p_value")
+  val pValue: Double,
+
+  val df: List<Int>,
+
+  @SerialName("is_significant")
+  val isSignificant: Boolean
+)
+
+@Serializable
+data class BlockCausalityTest(
+  val causes: List<String>,
+  val effect: String,
+  val statistic: Double,
+
+  @SerialName("p_value")
+  val pValue: Double,
+
+  val df: List<Int>,
+
+  @SerialName("is_significant")
+  val isSignificant: Boolean
+)
+
+@Serializable
+data class CausalityResult(
+  val method: String,  // "granger" | "toda_yamamoto"
+
+  @SerialName("lag_order")
+  val lagOrder: Int,
+
+  val augmentation: Int,
+
+  @SerialName("n_obs")
+  val nObs: Int,
+
+  val pairwise: List<CausalityTest>,
+  val block: List<BlockCausalityTest>
+)
+
 // ===============================
 // cointegration
 
@@ -223,6 +564,18 @@ data class CointegrationResult(
   
   @SerialName("johansen_trace_stats")
   val johannsenTraceStats: List<Double>? = null,
+
+  @SerialName("johansen_max_eig_stats")
+  val johansenMaxEigStats: List<Double>? = null,
+
+  @SerialName("johansen_trace_pvalues")
+  val johansenTracePvalues: List<Double>? = null,
+
+  @SerialName("johansen_max_eig_pvalues")
+  val johansenMaxEigPvalues: List<Double>? = null,
+
+  @SerialName("johansen_lag_order")
+  val johansenLagOrder: Int? = null,
   
   @SerialName("n_cointegration_relations")
   val nCointegrationRelations: Int? = null
@@ -266,7 +619,21 @@ data class CoefficientInfo(
   @SerialName("p_value")
   val pValue: Double,
   @SerialName("is_significant")
-  val isSignificant: Boolean
+  val isSignificant: Boolean,
+  @SerialName("ci_lower")
+  val ciLower: Double? = null,
+  @SerialName("ci_upper")
+  val ciUpper: Double? = null
+)
+
+@Serializable
+data class BootstrapInfo(
+  val method: String,  // "moving" | "stationary"
+  val replications: Int,
+  @SerialName("block_length")
+  val blockLength: Int,
+  @SerialName("confidence_level")
+  val confidenceLevel: Double
 )
 
 @Serializable
@@ -295,7 +662,168 @@ data class RegressionResult(
   val hasLags: Boolean = false,
   
   @SerialName("uses_newey_west")
-  val usesNeweyWest: Boolean = false
+  val usesNeweyWest: Boolean = false,
+
+  val bootstrap: BootstrapInfo? = null,
+
+  val stability: StabilityResult? = null,
+
+  val regularization: RegularizationInfo? = null,
+
+  val diagnostics: DiagnosticsResult? = null,
+
+  val hac: HacInfo? = null,
+
+  val vecm: VecmInfo? = null
+)
+
+@Serializable
+data class HacInfo(
+  val kernel: String,
+
+  @SerialName("bandwidth_method")
+  val bandwidthMethod: String,
+
+  val bandwidth: Double
+)
+
+@Serializable
+data class VecmInfo(
+  val rank: Int,
+
+  @SerialName("lag_order")
+  val lagOrder: Int,
+
+  val beta: List<List<Double>>,
+  val alpha: List<List<Double>>,
+
+  @SerialName("series_names")
+  val seriesNames: List<String>
+)
+
+@Serializable
+data class DiagnosticTest(
+  val name: String,
+  val statistic: Double,
+
+  @SerialName("p_value")
+  val pValue: Double,
+
+  val df: Int,
+  val rejects: Boolean,
+  val lag: Int? = null
+)
+
+@Serializable
+data class VarianceInflation(
+  val name: String,
+  val vif: Double
+)
+
+@Serializable
+data class DiagnosticsResult(
+  val significance: Double,
+
+  @SerialName("breusch_godfrey")
+  val breuschGodfrey: List<DiagnosticTest>,
+
+  @SerialName("ljung_box")
+  val ljungBox: List<DiagnosticTest>,
+
+  @SerialName("breusch_pagan")
+  val breuschPagan: DiagnosticTest,
+
+  @SerialName("jarque_bera")
+  val jarqueBera: DiagnosticTest,
+
+  val white: DiagnosticTest? = null,
+  val vif: List<VarianceInflation>,
+
+  @SerialName("max_leverage")
+  val maxLeverage: Double,
+
+  @SerialName("max_cooks_distance")
+  val maxCooksDistance: Double,
+
+  @SerialName("high_leverage")
+  val highLeverage: List<Int>,
+
+  val influential: List<Int>,
+  val autocorrelated: Boolean,
+  val heteroskedastic: Boolean,
+
+  @SerialName("non_normal")
+  val nonNormal: Boolean,
+
+  // per row, with an array output policy
+  val leverage: List<Double>? = null,
+
+  @SerialName("cooks_distance")
+  val cooksDistance: List<Double>? = null
+)
+
+@Serializable
+data class RegularizationInfo(
+  val method: String,  // "ridge" | "lasso" | "elastic_net"
+  val alpha: Double,
+
+  @SerialName("l1_ratio")
+  val l1Ratio: Double,
+
+  @SerialName("max_lags")
+  val maxLags: Int,
+
+  @SerialName("n_candidates")
+  val nCandidates: Int,
+
+  @SerialName("n_nonzero")
+  val nNonzero: Int,
+
+  @SerialName("effective_df")
+  val effectiveDf: Double,
+
+  @SerialName("cv_folds")
+  val cvFolds: Int,
+
+  val alphas: List<Double>,
+
+  @SerialName("cv_mse")
+  val cvMse: List<Double>
+)
+
+@Serializable
+data class StabilityResult(
+  val significance: Double,
+
+  @SerialName("n_recursive")
+  val nRecursive: Int,
+
+  @SerialName("start_index")
+  val startIndex: Int,
+
+  @SerialName("cusum_critical")
+  val cusumCritical: Double,
+
+  @SerialName("cusum_squares_critical")
+  val cusumSquaresCritical: Double,
+
+  @SerialName("cusum_stable")
+  val cusumStable: Boolean,
+
+  @SerialName("cusum_squares_stable")
+  val cusumSquaresStable: Boolean,
+
+  @SerialName("first_cusum_crossing")
+  val firstCusumCrossing: Int? = null,
+
+  @SerialName("first_cusum_squares_crossing")
+  val firstCusumSquaresCrossing: Int? = null,
+
+  // present when the output policy keeps arrays
+  val cusum: List<Double>? = null,
+
+  @SerialName("cusum_squares")
+  val cusumSquares: List<Double>? = null
 )
 
 @Serializable
@@ -349,6 +877,9 @@ data class PeriodModelResult(
   
   val cointegration: CointegrationResult? = null,
   val regression: RegressionResult? = null,
+
+  @SerialName("impulse_responses")
+  val impulseResponses: ImpulseResponseResult? = null,
   
   @SerialName("error_message")
   val errorMessage: String? = null
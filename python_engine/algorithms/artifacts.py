@@ -0,0 +1,235 @@
+from dataclasses import dataclass, field
+from typing import Callable, Hashable, Optional
+import numpy as np
+
+# columns below this R^2 margin are treated as perfectly colinear,
+# same threshold as statsmodels coint
+COLLINEAR_TOL = 100 * np.sqrt(np.finfo(float).eps)
+FITTED_MODEL_KEY = "fitted_model"
+
+
+@dataclass
+class CointegratingFit:
+  params: np.ndarray # [const, (trend), x1, x2, ...]
+  resid: np.ndarray
+  rsquared: float
+  regression: str
+
+  @property
+  def is_collinear(self) -> bool:
+    return self.rsquared >= 1 - COLLINEAR_TOL
+
+
+# final specification of a model builder: the exact response and design
+# it was estimated on, for stages that work from the fit (bootstrap, ...)
+@dataclass
+class FittedModel:
+  kind: str # "ols" | "ols_lags" | "ols_penalized" | "ols_newey_west" | "ecm" | "mixed" | "mixed_lags" | "mixed_penalized" | "mixed_newey_west" | "var" | "vecm"
+  y: np.ndarray
+  X: np.ndarray # includes the constant column
+  names: list[str]
+  params: np.ndarray
+  resid: np.ndarray
+  lags: int = 0
+  spec: dict = field(default_factory = dict) # builder settings, e.g. integration orders
+
+
+def fitted_from_results(
+  results,
+  kind: str,
+  names: list[str],
+  lags: int = 0,
+  spec: Optional[dict] = None
+) -> FittedModel:
+  return FittedModel(
+    kind = kind,
+    y = np.asarray(results.model.endog, dtype = float),
+    X = np.asarray(results.model.exog, dtype = float),
+    names = names,
+    params = np.asarray(results.params, dtype = float),
+    resid = np.asarray(results.resid, dtype = float),
+    lags = lags,
+    spec = spec or {}
+  )
+
+
+# per-request cache of intermediates shared by the analysis stages.
+# artifacts are keyed by series index into the request's series list, so
+# every stage that asks for e.g. the first difference of series 2 or the
+# cointegrating regression of series 0 on 1..k gets the same array back.
+# a window store covers rows [offset, offset + n) of its parent, so
+# segment statistics can be answered from full-sample indexes. a permuted
+# store holds its parent's series in another order (series i is the
+# parent's columns[i]), so the targets of one request share one set of
+# differences, segment indexes and system fits
+class ArtifactStore:
+
+  def __init__(
+    self,
+    series_list: list[np.ndarray],
+    parent: Optional["ArtifactStore"] = None,
+    offset: int = 0,
+    columns: Optional[tuple[int, ...]] = None
+  ):
+    self.series = [np.asarray(s, dtype = float) for s in series_list]
+    self.parent = parent
+    self.offset = offset
+    self.columns = columns
+    self._cache: dict[Hashable, object] = {}
+    self.hits = 0
+    self.misses = 0
+
+  def __len__(self) -> int:
+    return len(self.series)
+
+  def memo(self, key: Hashable, compute: Callable[[], object]):
+    if key in self._cache:
+      self.hits = self.hits + 1
+      return self._cache[key]
+
+    self.misses = self.misses + 1
+    value = compute()
+    self._cache[key] = value
+    return value
+
+  def has(self, key: Hashable) -> bool:
+    return key in self._cache
+
+  # system artifacts (johansen, VAR, ...) built by build(store); a permuted
+  # store takes its parent's and reorders them with permute(value, columns)
+  def shared(
+    self,
+    key: Hashable,
+    build: Callable[["ArtifactStore"], object],
+    permute: Callable[[object, tuple[int, ...]], object]
+  ):
+    if self.columns is None:
+      return self.memo(key, lambda: build(self))
+    return self.memo(key, lambda: permute(self.parent.shared(key, build, permute), self.columns))
+
+  def window(self, start: int, end: int) -> "ArtifactStore":
+    if self.columns is not None:
+      # one window of the parent serves all of its permutations
+      base = self.parent.memo(("window", start, end), lambda: self.parent.window(start, end))
+      return base.permuted(self.columns)
+    return ArtifactStore([s[start:end] for s in self.series], parent = self, offset = start)
+
+  def permuted(self, columns: list[int]) -> "ArtifactStore":
+    columns = tuple(columns)
+    return ArtifactStore([self.series[c] for c in columns], parent = self, columns = columns)
+
+  # outermost store and this store's row offset into it
+  def root(self) -> tuple["ArtifactStore", int]:
+    store = self
+    offset = 0
+    while store.parent is not None:
+      offset = offset + store.offset
+      store = store.parent
+    return store, offset
+
+  # index in the outermost store of this store's series `index`
+  def root_index(self, index: int) -> int:
+    store = self
+    while store.parent is not None:
+      if store.columns is not None:
+        index = store.columns[index]
+      store = store.parent
+    return index
+
+  # true for stores over fewer rows than the outermost store
+  @property
+  def is_window(self) -> bool:
+    root, _ = self.root()
+    return len(self.series[0]) < len(root.series[0])
+
+  # the last recorded fit is the one a builder returned
+  def record_fit(self, model: FittedModel):
+    self._cache[FITTED_MODEL_KEY] = model
+
+  @property
+  def fitted_model(self) -> Optional[FittedModel]:
+    return self._cache.get(FITTED_MODEL_KEY)
+
+  # difference pyramid: order d is built from the cached order d-1
+  def diff(self, index: int, order: int = 1) -> np.ndarray:
+    if self.columns is not None:
+      return self.parent.diff(self.columns[index], order)
+    if order <= 0:
+      return self.series[index]
+    return self.memo(
+      ("diff", index, order),
+      lambda: np.diff(self.diff(index, order - 1))
+    )
+
+  def diff_matrix(self, indices: Optional[tuple[int, ...]] = None, order: int = 1) -> np.ndarray:
+    indices = self._indices(indices)
+    return self.memo(
+      ("diff_matrix", indices, order),
+      lambda: np.column_stack([self.diff(i, order) for i in indices])
+    )
+
+  def level_matrix(self, indices: Optional[tuple[int, ...]] = None) -> np.ndarray:
+    indices = self._indices(indices)
+    return self.memo(
+      ("level_matrix", indices),
+      lambda: np.column_stack([self.series[i] for i in indices])
+    )
+
+  # long-run regression of indices[0] on [const, (trend), indices[1:]];
+  # shared by the engle-granger test and the ECM long-run equation
+  def cointegrating_regression(
+    self,
+    regression: str = "c",
+    indices: Optional[tuple[int, ...]] = None
+  ) -> CointegratingFit:
+    indices = self._indices(indices)
+    return self.memo(
+      ("coint_regression", indices, regression),
+      lambda: _fit_cointegrating(self.series, indices, regression)
+    )
+
+  def _indices(self, indices: Optional[tuple[int, ...]]) -> tuple[int, ...]:
+    if indices is None:
+      return tuple(range(len(self.series)))
+    return tuple(indices)
+
+
+def permuted_list(values: list, columns: tuple[int, ...]) -> list:
+  return [values[c] for c in columns]
+
+
+def _fit_cointegrating(
+  series: list[np.ndarray],
+  indices: tuple[int, ...],
+  regression: str
+) -> CointegratingFit:
+  y = series[indices[0]]
+  n = len(y)
+
+  columns = []
+  if regression != "n":
+    columns.append(np.ones(n))
+  if regression in ("ct", "ctt"):
+    columns.append(np.arange(1, n + 1, dtype = float))
+  if regression == "ctt":
+    columns.append(np.arange(1, n + 1, dtype = float) ** 2)
+  for i in indices[1:]:
+    columns.append(series[i])
+
+  X = np.column_stack(columns)
+  params, _, _, _ = np.linalg.lstsq(X, y, rcond = None)
+  resid = y - X @ params
+
+  ss_res = float(resid @ resid)
+  if regression == "n":
+    ss_tot = float(y @ y)
+  else:
+    ss_tot = float(np.sum((y - np.mean(y)) ** 2))
+  rsquared = 1.0 - ss_res / ss_tot if ss_tot > 0 else 1.0
+
+  return CointegratingFit(
+    params = params,
+    resid = resid,
+    rsquared = rsquared,
+    regression = regression
+  )
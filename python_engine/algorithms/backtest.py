@@ -0,0 +1,228 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Optional
+import numpy as np
+from algorithms.integration import log
+from algorithms.artifacts import ArtifactStore, FittedModel
+from algorithms.parallel import resolve_workers
+from algorithms.vecm import fitted_vecm
+from models.responses import BacktestMethod, BacktestFold, BacktestResult
+
+# rows the first training window must hold beyond the regressors
+MIN_TRAIN_MARGIN = 10
+
+
+# a fitted model as a linear system in the builder's transformed scale:
+# responses Y (n, m), column 0 the target, on design X. the dynamic
+# columns are the ones an h-step forecast cannot take from the data: a
+# lag of a response (column, equation, lag), or for the ECM and VECM the
+# lagged error-correction terms, which move with the responses' levels
+# by the weights of the cointegrating vectors
+@dataclass
+class DynamicSystem:
+  Y: np.ndarray
+  X: np.ndarray
+  columns: np.ndarray
+  equations: np.ndarray
+  lags: np.ndarray
+  cumulative: np.ndarray
+  weights: np.ndarray
+  target_order: int # differencing of the target response
+
+
+# rolling-origin backtest of the model a builder recorded in the store.
+# every fold forecasts the next `horizon` rows of the target from an
+# expanding or fixed-length sliding window ending at its origin; origins
+# are `horizon` apart and the last test window ends at the last
+# observation. fold estimates come from the cross-products X'X and X'Y,
+# carried from one fold to the next by adding the rows the window gains
+# (and, sliding, removing the rows it drops), so no fold refits from the
+# data. forecasts run the recorded design with the dynamic columns fed by
+# the fold's own predictions: predictors other than the target follow
+# their realized values, except in the VAR and VECM where every series is
+# forecast. errors are in target levels; MASE scales by the fold's
+# in-sample naive (random walk) MAE. penalized fits are refitted by least
+# squares on their selected columns, the ECM and VECM keep their
+# full-sample long-run relations
+def backtest_model(
+  artifacts: ArtifactStore,
+  method: BacktestMethod = BacktestMethod.EXPANDING,
+  horizon: int = 1,
+  folds: int = 5,
+  workers: Optional[int] = 1
+) -> BacktestResult:
+  model = artifacts.fitted_model
+  if model is None:
+    raise ValueError("no fitted model to backtest")
+
+  system = dynamic_system(model, artifacts)
+  n, k = system.X.shape
+  origins = [n - horizon * (folds - f) for f in range(folds)]
+  first_window = k + MIN_TRAIN_MARGIN
+  origins = [origin for origin in origins if origin >= first_window]
+  if not origins:
+    raise ValueError(f"{n} rows are too few for a {horizon}-step backtest of {k} regressors")
+  if len(origins) < folds:
+    log(f"backtest: {folds - len(origins)} of {folds} folds dropped for too short a window")
+
+  window = origins[0]
+  starts = [0 if method == BacktestMethod.EXPANDING else origin - window for origin in origins]
+  moments = _window_moments(system, origins, starts)
+
+  run = partial(_run_fold, system = system, horizon = horizon)
+  workers = min(resolve_workers(workers), len(origins))
+  if workers <= 1:
+    deviations = [run(origin, gram, cross) for origin, (gram, cross) in zip(origins, moments)]
+  else:
+    with ProcessPoolExecutor(max_workers = workers) as pool:
+      deviations = list(pool.map(run, origins, *zip(*moments)))
+
+  # row i of the system is observation offset + i of the target
+  levels = artifacts.series[0]
+  offset = len(levels) - n
+  fold_results = []
+  for origin, start, deviation in zip(origins, starts, deviations):
+    errors = -_integrate(deviation, system.target_order)
+    naive_scale = float(np.mean(np.abs(np.diff(levels[offset + start:offset + origin]))))
+    fold_results.append(BacktestFold(
+      origin = offset + origin,
+      train_start = offset + start,
+      train_size = origin - start,
+      rmse = float(np.sqrt(np.mean(errors ** 2))),
+      mae = float(np.mean(np.abs(errors))),
+      mase = float(np.mean(np.abs(errors)) / naive_scale) if naive_scale > 0 else float("nan"),
+      errors = errors.tolist()
+    ))
+
+  errors = np.array([fold.errors for fold in fold_results])
+  result = BacktestResult(
+    method = method,
+    model_kind = model.kind,
+    horizon = horizon,
+    exog_assumption = "endogenous" if model.kind in ("var", "vecm") else "realized",
+    rmse = float(np.sqrt(np.mean(errors ** 2))),
+    mae = float(np.mean(np.abs(errors))),
+    mase = float(np.mean([fold.mase for fold in fold_results])),
+    rmse_by_step = np.sqrt(np.mean(errors ** 2, axis = 0)).tolist(),
+    folds = fold_results
+  )
+  log(f"backtest ({method.value}, {model.kind}): {len(origins)} folds, h={horizon}, rmse={result.rmse:.4f}")
+  return result
+
+
+def dynamic_system(model: FittedModel, artifacts: ArtifactStore) -> DynamicSystem:
+  links = []
+
+  if model.kind == "var":
+    Y = artifacts.diff_matrix()[model.lags:]
+    X = model.X
+    neqs = Y.shape[1]
+    for lag in range(1, model.lags + 1):
+      for j in range(neqs):
+        links.append((1 + neqs * (lag - 1) + j, j, lag, False, 1.0))
+    target_order = 1
+
+  elif model.kind == "vecm":
+    # [const, ect_1..r, lag blocks]; ect_i = beta_i' x~, so every
+    # series' level deviation enters it by its beta weight
+    vecm = fitted_vecm(artifacts, model.spec.get("regression", "c"), model.spec.get("rank", 1))
+    Y = artifacts.diff_matrix()[-len(model.y):]
+    X = model.X
+    neqs, rank = vecm.beta.shape
+    offset = 1 if model.names[0] == "const" else 0
+    for i in range(rank):
+      for j in range(neqs):
+        links.append((offset + i, j, 1, True, vecm.beta[j, i]))
+    for lag in range(1, model.lags + 1):
+      for j in range(neqs):
+        links.append((offset + rank + neqs * (lag - 1) + j, j, lag, False, 1.0))
+    target_order = 1
+
+  elif model.kind == "ecm":
+    Y = model.y[:, None]
+    X = model.X
+    links.append((1, 0, 1, True, 1.0))
+    target_order = 1
+
+  else:
+    # [const, x_t, y lags 1..p, x lags ...]; penalized fits keep their
+    # selected columns
+    Y = model.y[:, None]
+    offset = 1 if model.names[0] == "const" else 0
+    y_lags = offset + len(artifacts) - 1
+    active = np.flatnonzero(model.params != 0)
+    position = {column: i for i, column in enumerate(active)}
+    for lag in range(1, model.lags + 1):
+      column = y_lags + lag - 1
+      if column in position:
+        links.append((position[column], 0, lag, False, 1.0))
+    X = model.X[:, active]
+    target_order = model.spec.get("orders", [0])[0]
+
+  links = np.array(links, dtype = float).reshape(-1, 5)
+  return DynamicSystem(
+    Y = Y,
+    X = X,
+    columns = links[:, 0].astype(int),
+    equations = links[:, 1].astype(int),
+    lags = links[:, 2].astype(int),
+    cumulative = links[:, 3].astype(bool),
+    weights = links[:, 4],
+    target_order = target_order
+  )
+
+
+# ===== HELPER METHODS =====
+
+# X'X and X'Y over rows [start, origin) of every fold, each from the
+# previous fold's by the rows entering and leaving the window
+def _window_moments(system: DynamicSystem, origins: list[int], starts: list[int]) -> list[tuple[np.ndarray, np.ndarray]]:
+  X, Y = system.X, system.Y
+
+  def block(lo: int, hi: int) -> tuple[np.ndarray, np.ndarray]:
+    rows = X[lo:hi]
+    return rows.T @ rows, rows.T @ Y[lo:hi]
+
+  gram, cross = block(starts[0], origins[0])
+  moments = [(gram.copy(), cross.copy())]
+  for f in range(1, len(origins)):
+    gained_gram, gained_cross = block(origins[f - 1], origins[f])
+    gram += gained_gram
+    cross += gained_cross
+    if starts[f] > starts[f - 1]:
+      dropped_gram, dropped_cross = block(starts[f - 1], starts[f])
+      gram -= dropped_gram
+      cross -= dropped_cross
+    moments.append((gram.copy(), cross.copy()))
+  return moments
+
+
+# forecast deviations (forecast - actual) of every response over rows
+# origin..origin + horizon - 1, in the transformed scale
+def _run_fold(origin: int, gram: np.ndarray, cross: np.ndarray, system: DynamicSystem, horizon: int) -> np.ndarray:
+  try:
+    params = np.linalg.solve(gram, cross)
+  except np.linalg.LinAlgError:
+    params = np.linalg.lstsq(gram, cross, rcond = None)[0]
+
+  deviation = np.zeros((horizon, system.Y.shape[1]))
+  for step in range(horizon):
+    row = system.X[origin + step].copy()
+    for column, equation, lag, cumulative, weight in zip(
+      system.columns, system.equations, system.lags, system.cumulative, system.weights
+    ):
+      if cumulative:
+        row[column] += weight * deviation[:max(step - lag + 1, 0), equation].sum()
+      elif step >= lag:
+        row[column] += weight * deviation[step - lag, equation]
+    deviation[step] = row @ params - system.Y[origin + step]
+  return deviation[:, 0]
+
+
+# deviation of the target level from that of its order-d difference;
+# levels before the origin are observed
+def _integrate(deviation: np.ndarray, order: int) -> np.ndarray:
+  for _ in range(order):
+    deviation = np.cumsum(deviation)
+  return deviation
@@ -0,0 +1,95 @@
+from functools import partial
+from typing import Optional
+import numpy as np
+from algorithms.integration import log
+from algorithms.artifacts import FittedModel
+from algorithms.parallel import run_replications
+from models.responses import BootstrapMethod
+
+
+def default_block_length(n: int) -> int:
+  return max(1, int(np.ceil(n ** (1 / 3))))
+
+
+# percentile confidence intervals for the coefficients of a fitted model
+# from a block bootstrap of its (y, X) rows. rows keep their lagged
+# columns, so blocks only have to preserve the residual dependence
+def block_bootstrap_ci(
+  model: FittedModel,
+  method: BootstrapMethod = BootstrapMethod.MOVING,
+  replications: int = 999,
+  block_length: Optional[int] = None,
+  confidence_level: float = 0.95,
+  seed: Optional[int] = None,
+  workers: Optional[int] = 1
+) -> tuple[np.ndarray, np.ndarray, int]:
+  n = len(model.y)
+  if block_length is None:
+    block_length = default_block_length(n)
+  block_length = min(block_length, n)
+
+  log(f"{method.value} block bootstrap: {replications} replications, block length {block_length}")
+
+  task = partial(
+    _bootstrap_chunk,
+    y = model.y,
+    X = model.X,
+    method = method,
+    block_length = block_length
+  )
+  draws = run_replications(task, replications, seed = seed, workers = workers)
+
+  tail = 100 * (1 - confidence_level) / 2
+  lower, upper = np.nanpercentile(draws, [tail, 100 - tail], axis = 0)
+  return lower, upper, block_length
+
+
+# (count, n) row indices; moving blocks start uniformly in [0, n - l],
+# stationary blocks have geometric lengths with mean l and wrap around
+def block_indices(
+  rng: np.random.Generator,
+  count: int,
+  n: int,
+  method: BootstrapMethod,
+  block_length: int
+) -> np.ndarray:
+  steps = np.arange(n)
+
+  if method == BootstrapMethod.MOVING:
+    n_blocks = -(-n // block_length)
+    starts = rng.integers(0, n - block_length + 1, size = (count, n_blocks))
+    indices = starts[:, :, None] + np.arange(block_length)
+    return indices.reshape(count, -1)[:, :n]
+
+  new_block = rng.random((count, n)) < 1.0 / block_length
+  new_block[:, 0] = True
+  block_start = np.maximum.accumulate(np.where(new_block, steps, 0), axis = 1)
+  origins = np.take_along_axis(rng.integers(0, n, size = (count, n)), block_start, axis = 1)
+  return (origins + steps - block_start) % n
+
+
+# ===== HELPER METHODS =====
+
+def _bootstrap_chunk(
+  count: int,
+  seed: np.random.SeedSequence,
+  y: np.ndarray,
+  X: np.ndarray,
+  method: BootstrapMethod,
+  block_length: int
+) -> np.ndarray:
+  rng = np.random.default_rng(seed)
+  indices = block_indices(rng, count, len(y), method, block_length)
+
+  X_boot = X[indices]
+  y_boot = y[indices]
+  gram = np.swapaxes(X_boot, 1, 2) @ X_boot
+  cross = np.einsum("rnk,rn->rk", X_boot, y_boot)
+
+  # resamples that repeat too few rows can be singular; drop those draws
+  params = np.full((count, X.shape[1]), np.nan)
+  full_rank = np.linalg.matrix_rank(gram) == X.shape[1]
+  if np.any(full_rank):
+    params[full_rank] = np.linalg.solve(gram[full_rank], cross[full_rank][..., None])[..., 0]
+
+  return params
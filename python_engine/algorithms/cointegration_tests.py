@@ -1,29 +1,53 @@
-import statsmodels.api as sm
-from statsmodels.tsa.stattools import coint
-from statsmodels.tsa.vector_ar.var_model import VAR
-from statsmodels.tsa.vector_ar.vecm import (
-  coint_johansen,
-  JohansenTestResult
-)
+import warnings
+from typing import Optional
+from statsmodels.tools.sm_exceptions import CollinearityWarning
+from statsmodels.tsa.stattools import adfuller
 from models.responses import (
   AegTestResult,
   AegCritValues
 )
+from models.domain import JohansenEstimate
 from algorithms.integration import log
+from algorithms.artifacts import ArtifactStore
+from algorithms.johansen import johansen_native, permuted_johansen
+from algorithms.pvalues import mackinnon_pvalues, mackinnon_critical_values
 import numpy as np
 
-# augmented engle-granger test
-def aeg_test(data: list[np.ndarray], regression: str = "c") -> AegTestResult:
+# augmented engle-granger test: adf (no deterministics) on the residuals of
+# the cointegrating regression, which is cached for the ECM long-run equation
+def aeg_test(
+  data: list[np.ndarray],
+  regression: str = "c",
+  artifacts: Optional[ArtifactStore] = None
+) -> AegTestResult:
 
   if len(data) != 2:
     raise TypeError("data must consists of two series for aeg test")
 
-  coint_t, pvalue, crit_values = coint(
-    data[0],
-    data[1],
-    trend = regression,
-    method = "aeg"
-  )
+  if artifacts is None:
+    artifacts = ArtifactStore(data)
+
+  long_run = artifacts.cointegrating_regression(regression, (0, 1))
+
+  if long_run.is_collinear:
+    warnings.warn(
+      "y0 and y1 are (almost) perfectly colinear."
+      "Cointegration test is not reliable in this case.",
+      CollinearityWarning,
+      stacklevel = 2
+    )
+    coint_t = -np.inf
+  else:
+    coint_t = adfuller(
+      long_run.resid,
+      regression = "n",
+      autolag = "aic",
+      result_object = False
+    )[0]
+
+  nobs = len(long_run.resid)
+  pvalue = float(mackinnon_pvalues(coint_t, regression, n_series = 2))
+  crit_values = mackinnon_critical_values(regression, n_series = 2, nobs = nobs - 1)
 
   log(f"RESULTS: {coint_t}, {pvalue}, {crit_values}")
 
@@ -41,12 +65,11 @@ def johansen_test(
     series_list: list[np.ndarray],
     regression: str = "c", #nc, c, ct
     max_lags: int = 10,
-    auto_select_lags: bool = True
-) -> JohansenTestResult:
-  n_series = len(series_list)
-  n = len(series_list[0])
-
-  ts_matrix = np.column_stack(series_list)
+    auto_select_lags: bool = True,
+    artifacts: Optional[ArtifactStore] = None
+) -> JohansenEstimate:
+  if artifacts is None:
+    artifacts = ArtifactStore(series_list)
 
   det_order_map = {
     "nc": -1,
@@ -54,44 +77,19 @@ def johansen_test(
     "ct": 1
   }
   det_order = det_order_map.get(regression, 0)
-  #select optimal lags
-  if auto_select_lags:
-    k_ar_diff = _select_optimal_lags_johansen(ts_matrix, max_lags)
-  else:
+
+  k_ar_diff = None
+  if not auto_select_lags:
     k_ar_diff = 1
     log(f"using default k_ar_diff = {k_ar_diff}")
 
-  result = coint_johansen(
-    ts_matrix,
-    det_order = det_order,
-    k_ar_diff = k_ar_diff
+  return artifacts.shared(
+    ("johansen", det_order, k_ar_diff, max_lags),
+    lambda store: johansen_native(
+      store.level_matrix(),
+      det_order = det_order,
+      k_ar_diff = k_ar_diff,
+      max_lags = max_lags
+    ),
+    permuted_johansen
   )
-
-  log(f"johansen test result: eig = {result.eig}, trace = {result.lr1}")
-
-  return result
-
-def _select_optimal_lags_johansen(
-    ts_matrix: np.ndarray,
-    max_lags: int
-) -> int:
-  if len(ts_matrix) <= max_lags + 10:
-    log(f"insufficient data for lag selection, using lag=1")
-    return 1
-
-  try:
-    var_model = VAR(ts_matrix)
-    lag_order = var_model.select_order(maxlags = max_lags)
-
-    optimal_lag = lag_order.aic
-
-    log(f"VAR lag selection: {optimal_lag} (AIC)")
-
-    if optimal_lag < 1:
-      optimal_lag = 1
-
-    return optimal_lag
-
-  except Exception as e:
-    log(f"VAR lag selection error: {e}, using lag = 1")
-    return 1
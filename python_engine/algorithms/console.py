@@ -0,0 +1,6 @@
+import sys
+
+
+# progress messages go to stderr: stdout carries the JSON result
+def log(msg):
+  print(msg, file = sys.stderr)
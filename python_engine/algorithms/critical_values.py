@@ -0,0 +1,418 @@
+import os
+import tempfile
+from dataclasses import replace
+from functools import lru_cache, partial
+from typing import Optional, Union
+import numpy as np
+from algorithms.console import log
+from algorithms.design_matrix import lagged_design
+from algorithms.johansen import rank_zero_statistics
+from algorithms.parallel import run_replications
+from models.domain import JohansenEstimate
+
+# finite-sample null distributions of the unit-root and cointegration
+# statistics, simulated per (test, deterministic terms, sample size, lags,
+# dimension) and kept as quantile tables in a local cache directory. a
+# p-value reads the statistic's position in the tables of the two grid
+# sizes around n and interpolates linearly in 1/n; sizes outside the grid
+# take the nearest table
+
+SIZE_GRID = (25, 50, 75, 100, 150, 200, 300, 500)
+PROBABILITIES = np.linspace(0.0, 1.0, 1001)
+
+TABLE_VERSION = 1
+TABLE_SEED = 20240
+CACHE_ENV = "DW_CRITICAL_VALUES_DIR"
+CHUNK_SIZE = 250
+MIN_DOF = 10
+ZA_TRIM = 0.15
+
+REPLICATIONS = {
+  "adf": 20000,
+  "kpss": 20000,
+  "za": 5000,
+  "johansen": 5000
+}
+
+# tests rejecting for small statistics; the others reject for large ones
+LOWER_TAIL = {"adf", "za"}
+
+VARIANTS = {
+  "adf": ("n", "c", "ct"),
+  "kpss": ("c", "ct"),
+  "za": ("c", "t", "ct"),
+  "johansen": ("nc", "c", "ct")
+}
+
+JOHANSEN_VARIANTS = {-1: "nc", 0: "c", 1: "ct"}
+
+
+def cache_directory() -> str:
+  override = os.environ.get(CACHE_ENV)
+  if override:
+    return override
+  base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+  return os.path.join(base, "project_dw", "critical_values")
+
+
+# null draws (replications, n_statistics) of one table key: random walks
+# for adf / za / johansen (the johansen columns are the rank-0 trace and
+# max-eigenvalue statistics of a dim-variate walk), white noise for kpss.
+# chunking and child seeds depend only on the key, so a table is the same
+# on every machine and for any worker count; tables are one-off work, so
+# all cores by default
+def simulate_statistics(
+  test: str,
+  variant: str,
+  size: int,
+  lags: int = 0,
+  dim: int = 1,
+  replications: Optional[int] = None,
+  seed: int = TABLE_SEED,
+  workers: Optional[int] = None
+) -> np.ndarray:
+  _check_key(test, variant, size, lags, dim)
+  if replications is None:
+    replications = REPLICATIONS[test]
+
+  task = partial(_simulate_chunk, test, variant, size, lags, dim)
+  return run_replications(task, replications, seed = seed, workers = workers, chunk_size = CHUNK_SIZE)
+
+
+# quantiles (n_statistics, len(PROBABILITIES)) of a table key, from the
+# cache directory when present, otherwise simulated and written there
+def critical_value_table(
+  test: str,
+  variant: str,
+  size: int,
+  lags: int = 0,
+  dim: int = 1,
+  replications: Optional[int] = None,
+  workers: Optional[int] = None
+) -> np.ndarray:
+  path = os.path.join(cache_directory(), _table_name(test, variant, size, lags, dim))
+  return _table(path, test, variant, size, lags, dim, replications, workers)
+
+
+# finite-sample p-value(s) of statistic(s) of a test on n observations
+def finite_sample_pvalue(
+  test: str,
+  variant: str,
+  n: int,
+  statistic: Union[float, np.ndarray],
+  lags: int = 0,
+  dim: int = 1,
+  column: int = 0
+) -> Union[float, np.ndarray]:
+  cdf = 0.0
+  for size, weight in _bracket(test, variant, n, lags, dim):
+    quantiles = critical_value_table(test, variant, size, lags, dim)[column]
+    cdf = cdf + weight * np.interp(statistic, quantiles, PROBABILITIES)
+  return cdf if test in LOWER_TAIL else 1.0 - cdf
+
+
+# finite-sample critical values at the given significance levels
+def finite_sample_critical_values(
+  test: str,
+  variant: str,
+  n: int,
+  lags: int = 0,
+  dim: int = 1,
+  levels: tuple[float, ...] = (0.01, 0.05, 0.10),
+  column: int = 0
+) -> np.ndarray:
+  levels = np.asarray(levels, dtype = float)
+  probabilities = levels if test in LOWER_TAIL else 1.0 - levels
+  critical = np.zeros(len(levels))
+  for size, weight in _bracket(test, variant, n, lags, dim):
+    quantiles = critical_value_table(test, variant, size, lags, dim)[column]
+    critical = critical + weight * np.interp(probabilities, PROBABILITIES, quantiles)
+  return critical
+
+
+# (p-value, critical values) of a univariate test, or None when no table
+# covers its lag order and the caller keeps the asymptotic values
+def finite_sample_lookup(
+  test: str,
+  variant: str,
+  n: int,
+  statistic: float,
+  lags: int,
+  levels: tuple[float, ...] = (0.01, 0.05, 0.10)
+) -> Optional[tuple[float, np.ndarray]]:
+  try:
+    return (
+      float(finite_sample_pvalue(test, variant, n, statistic, lags)),
+      finite_sample_critical_values(test, variant, n, lags, levels = levels)
+    )
+  except ValueError as e:
+    log(f"[WARNING] {e}: keeping asymptotic critical values")
+    return None
+
+
+# a johansen estimate on n_obs levels with its critical values (90, 95,
+# 99%) and p-values read from the finite-sample tables; the rank-r
+# hypothesis leaves a (neqs - r)-variate walk. the walks have no drift,
+# matching "c" being chosen only for series without a trend (the
+# asymptotic det_order 0 tables assume a drift)
+def johansen_finite_sample(estimate: JohansenEstimate, n_obs: int) -> JohansenEstimate:
+  variant = JOHANSEN_VARIANTS[estimate.det_order]
+  neqs = len(estimate.lr1)
+  k = estimate.k_ar_diff
+  levels = (0.10, 0.05, 0.01)
+
+  cvt = np.zeros((neqs, 3))
+  cvm = np.zeros((neqs, 3))
+  trace_pvalues = np.zeros(neqs)
+  max_eig_pvalues = np.zeros(neqs)
+  try:
+    for i in range(neqs):
+      dim = neqs - i
+      cvt[i] = finite_sample_critical_values("johansen", variant, n_obs, k, dim, levels, column = 0)
+      cvm[i] = finite_sample_critical_values("johansen", variant, n_obs, k, dim, levels, column = 1)
+      trace_pvalues[i] = finite_sample_pvalue("johansen", variant, n_obs, estimate.lr1[i], k, dim, column = 0)
+      max_eig_pvalues[i] = finite_sample_pvalue("johansen", variant, n_obs, estimate.lr2[i], k, dim, column = 1)
+  except ValueError as e:
+    log(f"[WARNING] {e}: keeping asymptotic critical values")
+    return estimate
+
+  return replace(
+    estimate,
+    cvt = cvt,
+    cvm = cvm,
+    trace_pvalues = trace_pvalues,
+    max_eig_pvalues = max_eig_pvalues
+  )
+
+
+# simulates every feasible table of a test up front, e.g. while packaging
+def warm_cache(
+  tests: tuple[str, ...] = ("adf", "kpss", "za"),
+  max_lags: int = 4,
+  dims: tuple[int, ...] = (1, 2, 3),
+  workers: Optional[int] = None
+) -> int:
+  count = 0
+  for test in tests:
+    for variant in VARIANTS[test]:
+      for lags in range(max_lags + 1):
+        for dim in (dims if test == "johansen" else (1,)):
+          for size in _feasible_sizes(test, variant, lags, dim):
+            critical_value_table(test, variant, size, lags, dim, workers = workers)
+            count = count + 1
+  return count
+
+
+# ===== HELPER METHODS =====
+
+@lru_cache(maxsize = None)
+def _table(
+  path: str,
+  test: str,
+  variant: str,
+  size: int,
+  lags: int,
+  dim: int,
+  replications: Optional[int],
+  workers: Optional[int]
+) -> np.ndarray:
+  if os.path.exists(path):
+    try:
+      with np.load(path) as stored:
+        return stored["quantiles"]
+    except (OSError, ValueError, KeyError) as e:
+      log(f"[WARNING] unreadable critical value table {path}: {e}")
+
+  log(f"simulating {test} ({variant}) critical values: n = {size}, lags = {lags}, dim = {dim}")
+  draws = simulate_statistics(test, variant, size, lags, dim, replications, workers = workers)
+  quantiles = np.quantile(draws, PROBABILITIES, axis = 0).T
+  try:
+    _write_table(path, quantiles, len(draws))
+  except OSError as e:
+    log(f"[WARNING] critical value table not cached: {e}")
+  return quantiles
+
+
+# written to a temporary file and renamed, so concurrent engines never
+# read a partial table
+def _write_table(path: str, quantiles: np.ndarray, replications: int):
+  directory = os.path.dirname(path)
+  os.makedirs(directory, exist_ok = True)
+  handle, temporary = tempfile.mkstemp(dir = directory, suffix = ".tmp")
+  try:
+    with os.fdopen(handle, "wb") as f:
+      np.savez(f, quantiles = quantiles, probabilities = PROBABILITIES, replications = replications)
+    os.replace(temporary, path)
+  except BaseException:
+    os.unlink(temporary)
+    raise
+
+
+def _table_name(test: str, variant: str, size: int, lags: int, dim: int) -> str:
+  return f"v{TABLE_VERSION}_{test}_{variant}_n{size}_p{lags}_d{dim}.npz"
+
+
+def _check_key(test: str, variant: str, size: int, lags: int, dim: int):
+  if test not in VARIANTS or variant not in VARIANTS[test]:
+    raise ValueError(f"no critical value tables for {test} ({variant})")
+  if not _feasible(test, variant, size, lags, dim):
+    raise ValueError(f"{test} with {lags} lags and dimension {dim} is not identified at n = {size}")
+
+
+# rows left after the lags against regressors, plus room for the za breaks
+def _feasible(test: str, variant: str, size: int, lags: int, dim: int) -> bool:
+  if test == "adf":
+    rows = size - 1 - lags
+    width = 1 + lags + {"n": 0, "c": 1, "ct": 2}[variant]
+  elif test == "kpss":
+    rows = size
+    width = lags + {"c": 1, "ct": 2}[variant]
+  elif test == "za":
+    if int(size * ZA_TRIM) <= lags + 2:
+      return False
+    rows = size - 1 - lags
+    width = lags + {"c": 4, "t": 4, "ct": 5}[variant]
+  else:
+    rows = size - 1 - lags
+    width = 1 + dim * (lags + 2)
+  return rows - width >= MIN_DOF
+
+
+def _feasible_sizes(test: str, variant: str, lags: int, dim: int) -> list[int]:
+  return [size for size in SIZE_GRID if _feasible(test, variant, size, lags, dim)]
+
+
+# (grid size, weight) pairs around n, linear in 1/n
+def _bracket(test: str, variant: str, n: int, lags: int, dim: int) -> list[tuple[int, float]]:
+  sizes = _feasible_sizes(test, variant, lags, dim)
+  if not sizes:
+    raise ValueError(f"no finite-sample table for {test} with {lags} lags and dimension {dim}")
+  if n <= sizes[0]:
+    return [(sizes[0], 1.0)]
+  if n >= sizes[-1]:
+    return [(sizes[-1], 1.0)]
+
+  upper = next(i for i, size in enumerate(sizes) if size >= n)
+  lo, hi = sizes[upper - 1], sizes[upper]
+  weight = (1.0 / lo - 1.0 / n) / (1.0 / lo - 1.0 / hi)
+  return [(lo, 1.0 - weight), (hi, weight)]
+
+
+def _simulate_chunk(
+  test: str,
+  variant: str,
+  size: int,
+  lags: int,
+  dim: int,
+  count: int,
+  seed: np.random.SeedSequence
+) -> np.ndarray:
+  rng = np.random.default_rng(seed)
+  if test == "johansen":
+    walks = np.cumsum(rng.standard_normal((count, size, dim)), axis = 1)
+    return rank_zero_statistics(walks, {"nc": -1, "c": 0, "ct": 1}[variant], lags)
+
+  shocks = rng.standard_normal((count, size))
+  if test == "kpss":
+    return kpss_statistics(shocks, variant, lags)[:, None]
+  walks = np.cumsum(shocks, axis = 1)
+  if test == "adf":
+    return adf_statistics(walks, variant, lags)[:, None]
+  return za_statistics(walks, variant, lags)[:, None]
+
+
+# adf t-statistics of (m, n) series at a fixed lag order: dy_t on
+# [const, y_{t-1}, trend, dy lags], as statsmodels adfuller
+def adf_statistics(series: np.ndarray, variant: str, lags: int) -> np.ndarray:
+  m, n = series.shape
+  diffs = np.diff(series, axis = 1)
+  current = [series[:, :-1, None]]
+  if variant == "ct":
+    current.append(np.broadcast_to(np.arange(1.0, n)[:, None], (m, n - 1, 1)))
+  X = lagged_design(diffs[..., None], lags, current = current, constant = variant != "n")
+  return _tvalues(diffs[:, lags:], X, int(variant != "n"))
+
+
+# kpss statistics of (m, n) series with a bartlett long-run variance of
+# fixed lags, as statsmodels kpss
+def kpss_statistics(series: np.ndarray, variant: str, lags: int) -> np.ndarray:
+  m, n = series.shape
+  if variant == "c":
+    resid = series - series.mean(axis = 1, keepdims = True)
+  else:
+    X = np.column_stack([np.ones(n), np.arange(1.0, n + 1)])
+    resid = series - series @ np.linalg.pinv(X).T @ X.T
+
+  eta = np.sum(np.cumsum(resid, axis = 1) ** 2, axis = 1) / n ** 2
+  long_run = np.sum(resid ** 2, axis = 1)
+  for i in range(1, lags + 1):
+    long_run = long_run + 2.0 * (1.0 - i / (lags + 1)) * np.sum(resid[:, i:] * resid[:, :-i], axis = 1)
+  return eta / (long_run / n)
+
+
+# zivot-andrews statistics of (m, n) series at a fixed lag order: the
+# smallest t on y_{t-1} over the trimmed break dates, with the regressors
+# of statsmodels zivot_andrews ([const, trend, y_{t-1}, dy lags] and an
+# intercept step, a trend hinge, or both). only the break columns move
+# with the date, so every date's normal equations are the fixed block
+# plus cross products with the break columns, solved in one batch
+def za_statistics(series: np.ndarray, variant: str, lags: int) -> np.ndarray:
+  m, n = series.shape
+  diffs = np.diff(series, axis = 1)
+  rows = n - 1 - lags
+  y = diffs[:, lags:]
+  trend = np.broadcast_to(np.arange(1.0, n)[:, None], (m, n - 1, 1))
+  F = lagged_design(diffs[..., None], lags, current = [series[:, :-1, None], trend])
+
+  # statsmodels' break period bp puts the first shifted row at bp - lags - 1
+  trim = int(n * ZA_TRIM)
+  cutoffs = np.arange(trim + 1, n - trim + 1) - (lags + 1)
+  r = np.arange(rows, dtype = float)
+  if variant == "c":
+    D = (r[None, :] >= cutoffs[:, None])[..., None].astype(float)
+  elif variant == "t":
+    D = np.maximum(r[None, :] - (cutoffs[:, None] - 2), 0.0)[..., None]
+  else:
+    step = (r[None, :] >= cutoffs[:, None]).astype(float)
+    D = np.stack([step, step * (r[None, :] - cutoffs[:, None])], axis = -1)
+  n_cuts, _, q = D.shape
+  D_flat = np.swapaxes(D, 1, 2).reshape(n_cuts * q, rows)
+
+  k_fixed = F.shape[-1]
+  k = k_fixed + q
+  FF = np.swapaxes(F, 1, 2) @ F
+  DF = (D_flat @ F).reshape(m, n_cuts, q, k_fixed)
+  DD = np.einsum("crq,crs->cqs", D, D)
+  Fy = (np.swapaxes(F, 1, 2) @ y[..., None])[..., 0]
+  Dy = (D_flat @ y[..., None])[..., 0].reshape(m, n_cuts, q)
+
+  gram = np.empty((m, n_cuts, k, k))
+  gram[..., :k_fixed, :k_fixed] = FF[:, None]
+  gram[..., k_fixed:, :k_fixed] = DF
+  gram[..., :k_fixed, k_fixed:] = np.swapaxes(DF, -1, -2)
+  gram[..., k_fixed:, k_fixed:] = DD[None]
+  xy = np.concatenate([np.broadcast_to(Fy[:, None], (m, n_cuts, k_fixed)), Dy], axis = -1)
+
+  # solve for the coefficients and the y_{t-1} column of the inverse at once
+  rhs = np.zeros((m, n_cuts, k, 2))
+  rhs[..., 0] = xy
+  rhs[..., 1, 1] = 1.0
+  solved = np.linalg.solve(gram, rhs)
+  beta = solved[..., 0]
+  ssr = np.sum(y ** 2, axis = 1)[:, None] - np.sum(beta * xy, axis = -1)
+  sigma2 = ssr / (rows - k)
+  tvalues = beta[..., 1] / np.sqrt(sigma2 * solved[..., 1, 1])
+  return tvalues.min(axis = 1)
+
+
+# ols t-statistic of one column for a batch of regressions
+def _tvalues(y: np.ndarray, X: np.ndarray, column: int) -> np.ndarray:
+  rows, k = X.shape[-2:]
+  gram = np.swapaxes(X, -1, -2) @ X
+  rhs = np.zeros(gram.shape[:-1] + (2,))
+  rhs[..., 0] = (np.swapaxes(X, -1, -2) @ y[..., None])[..., 0]
+  rhs[..., column, 1] = 1.0
+  solved = np.linalg.solve(gram, rhs)
+  resid = y - (X @ solved[..., :1])[..., 0]
+  sigma2 = np.sum(resid ** 2, axis = -1) / (rows - k)
+  return solved[..., column, 0] / np.sqrt(sigma2 * solved[..., column, 1])
@@ -0,0 +1,101 @@
+from typing import Optional, Sequence, Union
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# a (..., n_obs, m) block of columns, or a sequence of (n_obs,) series
+# and (n_obs, m) blocks
+Columns = Union[np.ndarray, Sequence[np.ndarray]]
+
+
+# regression design [const, current columns, lags 1..p of the lagged
+# series], written once into a preallocated matrix whose (rows, width)
+# slices are Fortran-ordered, the layout LAPACK factorizes in place.
+# lag blocks are strided sliding_window_view views of the source, so a
+# series is never copied per lag. columns of the lag block run lag-major
+# ([x_{t-1}, y_{t-1}, x_{t-2}, ...], VAR) or series-major ([y_{t-1}, y_{t-2},
+# ..., x_{t-1}, ...], the single-equation builders). rows start at t = lags;
+# with trim=False every row is kept and lags before the sample are zero.
+# leading axes of the blocks (e.g. bootstrap replications) are kept
+def lagged_design(
+  lagged: Optional[Columns] = None,
+  lags: int = 0,
+  current: Optional[Columns] = None,
+  constant: bool = True,
+  by_lag: bool = True,
+  trim: bool = True
+) -> np.ndarray:
+  lagged_blocks = _blocks(lagged)
+  current_blocks = _blocks(current)
+  blocks = lagged_blocks + current_blocks
+  if not blocks:
+    raise ValueError("a design needs at least one block of columns")
+
+  *batch, n_obs, _ = blocks[0].shape
+  start = lags if trim else 0
+  rows = n_obs - start
+  if rows <= 0:
+    raise ValueError(f"{n_obs} observations leave no rows for {lags} lags")
+
+  n_lagged = sum(block.shape[-1] for block in lagged_blocks)
+  width = int(constant) + sum(block.shape[-1] for block in current_blocks) + n_lagged * lags
+
+  # (..., width, rows) in C order, returned transposed
+  buffer = np.empty((*batch, width, rows))
+  column = 0
+  if constant:
+    buffer[..., 0, :] = 1.0
+    column = 1
+
+  for block in current_blocks:
+    m = block.shape[-1]
+    buffer[..., column:column + m, :] = np.swapaxes(block[..., start:, :], -1, -2)
+    column = column + m
+
+  if lags > 0 and n_lagged > 0:
+    if by_lag:
+      if len(lagged_blocks) != 1:
+        raise ValueError("a lag-major design takes one block of lagged series")
+      target = buffer[..., column:, :].reshape(*batch, lags, n_lagged, rows)
+      _write_lags(target, lagged_blocks[0], lags, start, by_lag = True)
+    else:
+      for block in lagged_blocks:
+        m = block.shape[-1]
+        target = buffer[..., column:column + m * lags, :].reshape(*batch, m, lags, rows)
+        _write_lags(target, block, lags, start, by_lag = False)
+        column = column + m * lags
+
+  return np.swapaxes(buffer, -1, -2)
+
+
+# ===== HELPER METHODS =====
+
+def _blocks(columns: Optional[Columns]) -> list[np.ndarray]:
+  if columns is None:
+    return []
+  if isinstance(columns, np.ndarray):
+    columns = [columns]
+  blocks = []
+  for block in columns:
+    block = np.asarray(block, dtype = float)
+    blocks.append(block[:, None] if block.ndim == 1 else block)
+  return blocks
+
+
+# target is (..., lags, m, rows) lag-major or (..., m, lags, rows)
+# series-major; row r holds t = r + start
+def _write_lags(target: np.ndarray, block: np.ndarray, lags: int, start: int, by_lag: bool):
+  n_obs = block.shape[-2]
+  lag_axis, series_axis = (-3, -2) if by_lag else (-2, -3)
+
+  # windows[..., i, v, w] = block[..., i + w, v]; reversed, the last axis
+  # runs over lags 1..p for t = i + lags
+  windows = sliding_window_view(block, lags, axis = -2)[..., :n_obs - lags, :, ::-1]
+  target[..., lags - start:] = np.moveaxis(windows, (-1, -2, -3), (lag_axis, series_axis, -1))
+
+  # rows before t = lags, untrimmed: lag j is observed from t = j on
+  if start < lags:
+    head = np.moveaxis(block, -1, -2)
+    head_target = np.moveaxis(target, lag_axis, -3)
+    head_target[..., :lags - start] = 0.0
+    for lag in range(1, lags):
+      head_target[..., lag - 1, :, lag:lags] = head[..., :lags - lag]
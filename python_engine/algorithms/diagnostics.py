@@ -0,0 +1,144 @@
+from typing import Optional
+import numpy as np
+from scipy import stats
+from scipy.linalg import solve_triangular
+from algorithms.integration import log
+from algorithms.artifacts import FittedModel
+from algorithms.design_matrix import lagged_design
+from models.responses import DiagnosticsResult, DiagnosticTest, VarianceInflation
+
+BREUSCH_GODFREY_ORDERS = (1, 2, 4)
+LJUNG_BOX_LAGS = (5, 10)
+
+
+# residual diagnostics of a builder's final fit, from its recorded design
+# and residuals without refitting. one householder QR of [X, e lags 1..p]
+# serves every linear statistic: its leading k columns span X (leverage,
+# breusch-pagan, the gram inverse for VIFs) and its nested leading blocks
+# give the breusch-godfrey auxiliary regressions of every order
+def residual_diagnostics(
+  model: FittedModel,
+  significance: float = 0.05,
+  keep_influence: bool = False
+) -> DiagnosticsResult:
+  X = model.X
+  e = model.resid
+  n, k = X.shape
+
+  orders = [p for p in BREUSCH_GODFREY_ORDERS if k + p < n]
+  max_order = max(orders, default = 0)
+  design = lagged_design(e, max_order, current = X, constant = False, by_lag = False, trim = False)
+
+  Q, R = np.linalg.qr(design)
+  projected = Q.T @ e
+  e_ss = float(e @ e)
+  e_tss = float(np.sum((e - e.mean()) ** 2))
+
+  # breusch-godfrey LM = n R^2 of e on [X, e lags 1..p], lags zero-filled
+  explained = np.cumsum(projected ** 2)
+  breusch_godfrey = []
+  for p in orders:
+    r_squared = 1 - (e_ss - explained[k + p - 1]) / e_tss
+    breusch_godfrey.append(_chi2_test("breusch_godfrey", n * r_squared, p, significance, lag = p))
+
+  log(f"diagnostics: breusch-godfrey up to order {max_order}, {n} residuals")
+
+  ljung_box = _ljung_box(e, [m for m in LJUNG_BOX_LAGS if m < n], significance)
+
+  # koenker's studentized breusch-pagan: n R^2 of e^2 on X
+  Q_x = Q[:, :k]
+  squared = e ** 2
+  fitted_ss = float(np.sum((Q_x.T @ squared) ** 2))
+  squared_tss = float(np.sum((squared - squared.mean()) ** 2))
+  bp_r_squared = 1 - (float(squared @ squared) - fitted_ss) / squared_tss
+  breusch_pagan = _chi2_test("breusch_pagan", n * bp_r_squared, k - 1, significance)
+
+  white = _white(X, squared, significance)
+
+  skewness = stats.skew(e)
+  kurtosis = stats.kurtosis(e, fisher = False)
+  jb = n / 6 * (skewness ** 2 + (kurtosis - 3) ** 2 / 4)
+  jarque_bera = _chi2_test("jarque_bera", jb, 2, significance)
+
+  # diag((X'X)^-1) from the row norms of R^-1; VIF_j = [(X'X)^-1]_jj * TSS_j
+  R_inv = solve_triangular(R[:k, :k], np.eye(k))
+  gram_inv_diag = np.sum(R_inv ** 2, axis = 1)
+  column_tss = np.sum((X - X.mean(axis = 0)) ** 2, axis = 0)
+  vif = []
+  for j in range(k):
+    if column_tss[j] > 0:
+      vif.append(VarianceInflation(
+        name = model.names[j] if j < len(model.names) else f"coef_{j}",
+        vif = float(gram_inv_diag[j] * column_tss[j])
+      ))
+
+  leverage = np.sum(Q_x ** 2, axis = 1)
+  s2 = e_ss / (n - k)
+  cooks = squared / (k * s2) * leverage / (1 - leverage) ** 2
+  high_leverage = np.flatnonzero(leverage > 2 * k / n)
+  influential = np.flatnonzero(cooks > 4 / n)
+
+  return DiagnosticsResult(
+    significance = significance,
+    breusch_godfrey = breusch_godfrey,
+    ljung_box = ljung_box,
+    breusch_pagan = breusch_pagan,
+    jarque_bera = jarque_bera,
+    white = white,
+    vif = vif,
+    max_leverage = float(leverage.max()),
+    max_cooks_distance = float(cooks.max()),
+    high_leverage = high_leverage.tolist(),
+    influential = influential.tolist(),
+    autocorrelated = any(test.rejects for test in breusch_godfrey),
+    heteroskedastic = breusch_pagan.rejects,
+    non_normal = jarque_bera.rejects,
+    leverage = leverage.tolist() if keep_influence else None,
+    cooks_distance = cooks.tolist() if keep_influence else None
+  )
+
+
+# ===== HELPER METHODS =====
+
+def _chi2_test(name: str, statistic: float, df: int, significance: float, lag: Optional[int] = None) -> DiagnosticTest:
+  p_value = float(stats.chi2.sf(statistic, df))
+  return DiagnosticTest(
+    name = name,
+    statistic = float(statistic),
+    p_value = p_value,
+    df = int(df),
+    rejects = p_value < significance,
+    lag = lag
+  )
+
+
+# Q(m) = n (n + 2) sum_{j <= m} r_j^2 / (n - j) for every m from one
+# cumulative sum over the FFT autocovariances
+def _ljung_box(e: np.ndarray, lags: list[int], significance: float) -> list[DiagnosticTest]:
+  if not lags:
+    return []
+  n = len(e)
+  centered = e - e.mean()
+  size = 1 << int(np.ceil(np.log2(2 * n)))
+  spectrum = np.fft.rfft(centered, size)
+  acov = np.fft.irfft(spectrum * np.conj(spectrum), size)[:max(lags) + 1]
+  acf = acov[1:] / acov[0]
+
+  j = np.arange(1, max(lags) + 1)
+  q = n * (n + 2) * np.cumsum(acf ** 2 / (n - j))
+  return [_chi2_test("ljung_box", q[m - 1], m, significance, lag = m) for m in lags]
+
+
+# n R^2 of e^2 on every product x_i x_j (i <= j); skipped when the
+# auxiliary design has as many columns as rows
+def _white(X: np.ndarray, squared: np.ndarray, significance: float) -> Optional[DiagnosticTest]:
+  n, k = X.shape
+  i0, i1 = np.triu_indices(k)
+  if len(i0) >= n:
+    return None
+
+  products = X[:, i0] * X[:, i1]
+  coef, _, rank, _ = np.linalg.lstsq(products, squared, rcond = None)
+  resid = squared - products @ coef
+  r_squared = 1 - float(resid @ resid) / float(np.sum((squared - squared.mean()) ** 2))
+  return _chi2_test("white", n * r_squared, rank - 1, significance)
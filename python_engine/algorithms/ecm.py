@@ -1,5 +1,8 @@
+from typing import Optional
 import numpy as np
 from algorithms.integration import log
+from algorithms.artifacts import ArtifactStore, fitted_from_results
+from algorithms.design_matrix import lagged_design
 from models.responses import RegressionResult, DurbinWatsonResult, CoefficientInfo
 from statsmodels.regression.linear_model import OLS
 from statsmodels.stats.stattools import durbin_watson
@@ -8,7 +11,8 @@ from statsmodels.stats.stattools import durbin_watson
 def build_ecm_model(
     series_list: list[np.ndarray],
     regression: str = "c",
-    variable_names: list[str] = None
+    variable_names: list[str] = None,
+    artifacts: Optional[ArtifactStore] = None
 ) -> RegressionResult:
   log("building ecm model")
 
@@ -19,38 +23,19 @@ def build_ecm_model(
     target_name = variable_names[0]
     predictor_names = variable_names[1:]
 
-  y = series_list[0]
-  n = len(y)
+  if artifacts is None:
+    artifacts = ArtifactStore(series_list)
 
-  X_columns = []
-  i = 1
-  while i < len(series_list):
-    X_columns.append(series_list[i])
-    i += 1
+  long_run = artifacts.cointegrating_regression(regression)
+  log(f"long-run equation: R^2 = {long_run.rsquared:.4f}")
 
-  X = np.column_stack(X_columns)
+  ect = long_run.resid
 
-  if regression == "ct":
-    trend = np.arange(n)
-    constant = np.ones(n)
-    X_long = np.column_stack([constant, trend, X])
-  else:
-    constant = np.ones(n)
-    X_long = np.column_stack([constant, X])
-
-  model_long = OLS(y, X_long)
-  result_long = model_long.fit()
-  log(f"long-run equation: R^2 = {result_long.rsquared:.4f}")
-
-  ect = result_long.resid
-
-  dy = np.diff(y)
-  dX = np.diff(X, axis = 0)
+  dy = artifacts.diff(0)
+  dX = artifacts.diff_matrix(tuple(range(1, len(series_list))))
   ect_lagged = ect[:-1]
-  n_short = len(dy)
 
-  constant_short = np.ones(n_short)
-  X_short = np.column_stack([constant_short, ect_lagged, dX])
+  X_short = lagged_design(current = [ect_lagged, dX])
 
   model_short = OLS(dy, X_short)
   result_short = model_short.fit()
@@ -72,6 +57,8 @@ def build_ecm_model(
   for pname in predictor_names:
     names.append(f"Δ{pname}")
 
+  artifacts.record_fit(fitted_from_results(result_short, "ecm", names, spec = {"regression": regression}))
+
   coeffs = []
   for i in range(len(result_short.params)):
     name = names[i] if i < len(names) else f"coef_{i}"
@@ -0,0 +1,262 @@
+from typing import Optional
+import numpy as np
+from algorithms.integration import log
+from algorithms.artifacts import ArtifactStore, FittedModel
+from algorithms.var import fitted_var, var_coefs
+from algorithms.vecm import fitted_vecm
+from models.responses import ForecastResult
+
+
+# h-step forecast of the target in levels from the model a builder recorded
+# in the store. point forecasts run the model with zero shocks; intervals
+# come from `simulations` paths driven by resampled residuals, all advanced
+# together as one (simulations, horizon) array.
+# future_exog holds the predictor levels (horizon, n_series - 1); without
+# it the predictors stay at their last observed value
+def forecast_model(
+  artifacts: ArtifactStore,
+  horizon: int,
+  future_exog: Optional[np.ndarray] = None,
+  simulations: int = 1000,
+  seed: Optional[int] = None,
+  confidence_level: float = 0.95
+) -> ForecastResult:
+  model = artifacts.fitted_model
+  if model is None:
+    raise ValueError("no fitted model to forecast from")
+
+  rng = np.random.default_rng(seed)
+
+  # VAR and VECM forecast every series
+  endogenous = model.kind in ("var", "vecm")
+  if endogenous:
+    exog_assumption = "endogenous"
+  elif future_exog is None:
+    exog_assumption = "last_value"
+  else:
+    exog_assumption = "provided"
+
+  if not endogenous:
+    future_exog = _future_predictors(artifacts, horizon, future_exog)
+
+  if model.kind == "var":
+    point, paths = _forecast_var(artifacts, model, horizon, simulations, rng)
+  elif model.kind == "vecm":
+    point, paths = _forecast_vecm(artifacts, model, horizon, simulations, rng)
+  elif model.kind == "ecm":
+    point, paths = _forecast_ecm(artifacts, model, horizon, future_exog, simulations, rng)
+  else:
+    point, paths = _forecast_regression(artifacts, model, horizon, future_exog, simulations, rng)
+
+  log(f"forecast ({model.kind}): {horizon} steps, {simulations} paths")
+
+  tail = 100 * (1 - confidence_level) / 2
+  lower, upper = np.percentile(paths, [tail, 100 - tail], axis = 0)
+
+  return ForecastResult(
+    horizon = horizon,
+    model_kind = model.kind,
+    exog_assumption = exog_assumption,
+    mean = point.tolist(),
+    lower = lower.tolist(),
+    upper = upper.tolist(),
+    simulations = simulations,
+    confidence_level = confidence_level
+  )
+
+
+# integrate a forecast of the order-d difference of series `index` back to levels
+def integrate_to_levels(artifacts: ArtifactStore, index: int, order: int, paths: np.ndarray) -> np.ndarray:
+  for d in range(order, 0, -1):
+    paths = artifacts.diff(index, d - 1)[-1] + np.cumsum(paths, axis = -1)
+  return paths
+
+
+# ===== HELPER METHODS =====
+
+def _future_predictors(
+  artifacts: ArtifactStore,
+  horizon: int,
+  future_exog: Optional[np.ndarray]
+) -> np.ndarray:
+  if future_exog is None:
+    last = np.array([series[-1] for series in artifacts.series[1:]])
+    return np.tile(last, (horizon, 1))
+
+  future_exog = np.asarray(future_exog, dtype = float)
+  if future_exog.shape != (horizon, len(artifacts) - 1):
+    raise ValueError(f"future predictors must have shape ({horizon}, {len(artifacts) - 1})")
+  return future_exog
+
+
+# OLS and mixed models: [const, x_t, y lags 1..p, x_1 lags 1..p, x_2 lags ...],
+# every column in the differencing order the builder used
+def _forecast_regression(
+  artifacts: ArtifactStore,
+  model: FittedModel,
+  horizon: int,
+  future_exog: np.ndarray,
+  simulations: int,
+  rng: np.random.Generator
+) -> tuple[np.ndarray, np.ndarray]:
+  n_series = len(artifacts)
+  orders = model.spec.get("orders", [0] * n_series)
+  lags = model.lags
+  params = model.params
+
+  # predictor histories and futures in their transformed scale
+  predictors = []
+  for j in range(1, n_series):
+    levels = np.concatenate([artifacts.series[j], future_exog[:, j - 1]])
+    predictors.append(np.diff(levels, n = orders[j]) if orders[j] > 0 else levels)
+  n_hist = [len(artifacts.diff(j, orders[j])) for j in range(1, n_series)]
+
+  # deterministic part of every step: const, current predictors, predictor lags
+  base = np.full(horizon, params[0] if model.names[0] == "const" else 0.0)
+  offset = 1 if model.names[0] == "const" else 0
+  for j, series in enumerate(predictors):
+    base += params[offset + j] * series[n_hist[j]:n_hist[j] + horizon]
+
+  y_lag_params = params[offset + len(predictors):offset + len(predictors) + lags]
+  x_lag_start = offset + len(predictors) + lags
+  for j, series in enumerate(predictors):
+    for lag in range(1, lags + 1):
+      coef = params[x_lag_start + j * lags + lag - 1]
+      base += coef * series[n_hist[j] - lag:n_hist[j] - lag + horizon]
+
+  history = artifacts.diff(0, orders[0])
+
+  def run(shocks: np.ndarray) -> np.ndarray:
+    count = shocks.shape[0]
+    buffer = np.empty((count, lags + horizon))
+    buffer[:, :lags] = history[len(history) - lags:]
+    for step in range(horizon):
+      value = base[step] + shocks[:, step]
+      if lags > 0:
+        value = value + buffer[:, step:step + lags][:, ::-1] @ y_lag_params
+      buffer[:, lags + step] = value
+    return integrate_to_levels(artifacts, 0, orders[0], buffer[:, lags:])
+
+  point = run(np.zeros((1, horizon)))[0]
+  paths = run(_resample(model.resid, rng, (simulations, horizon)))
+  return point, paths
+
+
+# Δy_t = c + gamma * ect_{t-1} + delta' Δx_t with ect_t = y_t - long-run fit
+def _forecast_ecm(
+  artifacts: ArtifactStore,
+  model: FittedModel,
+  horizon: int,
+  future_exog: np.ndarray,
+  simulations: int,
+  rng: np.random.Generator
+) -> tuple[np.ndarray, np.ndarray]:
+  regression = model.spec.get("regression", "c")
+  long_run = artifacts.cointegrating_regression(regression)
+  n = len(artifacts.series[0])
+
+  last_levels = np.array([series[-1] for series in artifacts.series[1:]])
+  dx = np.diff(np.vstack([last_levels, future_exog]), axis = 0)
+
+  deterministic = [np.ones(horizon)]
+  if regression in ("ct", "ctt"):
+    deterministic.append(np.arange(n + 1, n + horizon + 1, dtype = float))
+  long_run_design = np.column_stack(deterministic + [future_exog])
+  equilibrium = long_run_design @ long_run.params
+
+  const, gamma, delta = model.params[0], model.params[1], model.params[2:]
+  short_run = const + dx @ delta
+
+  def run(shocks: np.ndarray) -> np.ndarray:
+    level = np.full(shocks.shape[0], artifacts.series[0][-1])
+    ect = np.full(shocks.shape[0], long_run.resid[-1])
+    out = np.empty(shocks.shape)
+    for step in range(horizon):
+      level = level + short_run[step] + gamma * ect + shocks[:, step]
+      ect = level - equilibrium[step]
+      out[:, step] = level
+    return out
+
+  point = run(np.zeros((1, horizon)))[0]
+  paths = run(_resample(model.resid, rng, (simulations, horizon)))
+  return point, paths
+
+
+# VAR on differences: every series is forecast, residual vectors are
+# resampled jointly to keep their contemporaneous correlation
+def _forecast_var(
+  artifacts: ArtifactStore,
+  model: FittedModel,
+  horizon: int,
+  simulations: int,
+  rng: np.random.Generator
+) -> tuple[np.ndarray, np.ndarray]:
+  estimate = fitted_var(artifacts, model.spec.get("maxlags", 15))
+  coefs = var_coefs(estimate)
+  intercept = estimate.params[0]
+  lags = estimate.lags
+  history = artifacts.diff_matrix()
+
+  def run(shocks: np.ndarray) -> np.ndarray:
+    count, _, neqs = shocks.shape
+    buffer = np.empty((count, lags + horizon, neqs))
+    buffer[:, :lags] = history[len(history) - lags:]
+    for step in range(horizon):
+      value = intercept + shocks[:, step]
+      for lag in range(1, lags + 1):
+        value = value + buffer[:, lags + step - lag] @ coefs[lag - 1].T
+      buffer[:, lags + step] = value
+    return integrate_to_levels(artifacts, 0, 1, buffer[:, lags:, 0])
+
+  neqs = history.shape[1]
+  point = run(np.zeros((1, horizon, neqs)))[0]
+  draws = rng.integers(0, estimate.resid.shape[0], size = (simulations, horizon))
+  paths = run(estimate.resid[draws])
+  return point, paths
+
+
+# VECM: dx_t = c + alpha beta' x~_{t-1} + sum_l gamma_l dx_{t-l} on every
+# series, x~ following the levels less the test's deterministic trend;
+# residual vectors resampled jointly
+def _forecast_vecm(
+  artifacts: ArtifactStore,
+  model: FittedModel,
+  horizon: int,
+  simulations: int,
+  rng: np.random.Generator
+) -> tuple[np.ndarray, np.ndarray]:
+  vecm = fitted_vecm(artifacts, model.spec.get("regression", "c"), model.spec.get("rank", 1))
+  lags = vecm.k_ar_diff
+  levels = artifacts.level_matrix()
+  history = artifacts.diff_matrix()
+  n_obs = levels.shape[0]
+
+  time = np.arange(n_obs - 1, n_obs - 1 + horizon, dtype = float)
+  deterministic = np.vander(time, vecm.det_order + 1) @ vecm.trend
+  loading = vecm.alpha @ vecm.beta.T
+
+  def run(shocks: np.ndarray) -> np.ndarray:
+    count, _, neqs = shocks.shape
+    buffer = np.empty((count, lags + horizon, neqs))
+    buffer[:, :lags] = history[len(history) - lags:]
+    level = np.tile(levels[-1], (count, 1))
+    out = np.empty((count, horizon))
+    for step in range(horizon):
+      value = vecm.const + (level - deterministic[step]) @ loading.T + shocks[:, step]
+      for lag in range(1, lags + 1):
+        value = value + buffer[:, lags + step - lag] @ vecm.gamma[lag - 1].T
+      buffer[:, lags + step] = value
+      level = level + value
+      out[:, step] = level[:, 0]
+    return out
+
+  neqs = history.shape[1]
+  point = run(np.zeros((1, horizon, neqs)))[0]
+  draws = rng.integers(0, vecm.resid.shape[0], size = (simulations, horizon))
+  paths = run(vecm.resid[draws])
+  return point, paths
+
+
+def _resample(resid: np.ndarray, rng: np.random.Generator, shape: tuple[int, int]) -> np.ndarray:
+  centered = resid - resid.mean()
+  return centered[rng.integers(0, len(resid), size = shape)]
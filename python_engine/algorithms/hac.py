@@ -0,0 +1,160 @@
+import math
+from typing import Optional
+import numpy as np
+from models.responses import HacKernel, HacBandwidth
+
+# andrews (1991) optimal bandwidth constants and characteristic exponents q
+KERNEL_CONSTANTS = {
+  HacKernel.BARTLETT: (1.1447, 1),
+  HacKernel.PARZEN: (2.6614, 2),
+  HacKernel.QUADRATIC_SPECTRAL: (1.3221, 2)
+}
+# newey & west (1994) pre-bandwidth exponents, lags = floor(4 (n / 100)^e)
+PRE_BANDWIDTH_EXPONENTS = {
+  HacKernel.BARTLETT: 2.0 / 9.0,
+  HacKernel.PARZEN: 4.0 / 25.0,
+  HacKernel.QUADRATIC_SPECTRAL: 2.0 / 25.0
+}
+
+
+# heteroskedasticity and autocorrelation consistent covariance of OLS
+# estimates, (X'X)^-1 S (X'X)^-1 with S the kernel-weighted long-run
+# covariance of the scores x_t e_t. leading axes of X (..., n, k) and
+# resid (..., n) are independent regressions, each with its own bandwidth.
+# returns the covariances and the bandwidths used
+def hac_covariance(
+  X: np.ndarray,
+  resid: np.ndarray,
+  kernel: HacKernel = HacKernel.BARTLETT,
+  bandwidth_method: HacBandwidth = HacBandwidth.FIXED,
+  has_constant: bool = True,
+  bandwidth: Optional[np.ndarray] = None,
+  xx_inv: Optional[np.ndarray] = None
+) -> tuple[np.ndarray, np.ndarray]:
+  scores = X * resid[..., None]
+  if bandwidth is None:
+    bandwidth = hac_bandwidth(scores, kernel, bandwidth_method, has_constant)
+  if xx_inv is None:
+    xx_inv = np.linalg.inv(np.swapaxes(X, -1, -2) @ X)
+
+  S = long_run_covariance(scores, kernel, bandwidth)
+  return xx_inv @ S @ xx_inv, bandwidth
+
+
+# S = sum_{|j| < n} w(j / b) Gamma_j with Gamma_j = sum_t s_{t+j} s_t'.
+# bartlett and parzen weights vanish beyond b, and over a few lags the
+# direct sum is cheapest; otherwise (quadratic spectral weights every lag)
+# one FFT of the scores: by the convolution theorem the weighted sum of
+# cross-correlations is the cross-spectral gram F^H diag(W) F / N, where W
+# is the transform of the symmetric weight sequence. the padding to
+# N >= 2n keeps the circular correlations free of wraparound
+def long_run_covariance(scores: np.ndarray, kernel: HacKernel, bandwidth: np.ndarray) -> np.ndarray:
+  n = scores.shape[-2]
+  size = 1 << int(np.ceil(np.log2(2 * n)))
+  bandwidth = np.asarray(bandwidth, dtype = float)
+
+  if kernel != HacKernel.QUADRATIC_SPECTRAL:
+    support = min(int(np.ceil(np.max(bandwidth))) - 1, n - 1)
+    if support <= 2 * math.log2(size):
+      return _lag_sum(scores, kernel, bandwidth, support)
+
+  spectrum = np.fft.rfft(scores, size, axis = -2)
+  weights = kernel_weights(kernel, np.arange(n) / bandwidth[..., None])
+  sequence = np.zeros(weights.shape[:-1] + (size,))
+  sequence[..., :n] = weights
+  sequence[..., size - n + 1:] = weights[..., :0:-1]
+
+  # real signals: every rfft bin but DC and nyquist stands for two bins
+  transfer = np.fft.rfft(sequence, axis = -1).real
+  transfer[..., 1:-1] *= 2
+
+  weighted = spectrum * transfer[..., None]
+  gram = np.swapaxes(spectrum.conj(), -1, -2) @ weighted
+  return gram.real / size
+
+
+def kernel_weights(kernel: HacKernel, x: np.ndarray) -> np.ndarray:
+  x = np.abs(x)
+  if kernel == HacKernel.BARTLETT:
+    return np.maximum(1.0 - x, 0.0)
+
+  if kernel == HacKernel.PARZEN:
+    return np.where(
+      x <= 0.5,
+      1.0 - 6.0 * x ** 2 + 6.0 * x ** 3,
+      np.where(x <= 1.0, 2.0 * (1.0 - x) ** 3, 0.0)
+    )
+
+  # quadratic spectral: every lag has weight
+  z = 6.0 * np.pi * x / 5.0
+  with np.errstate(divide = "ignore", invalid = "ignore"):
+    weights = 25.0 / (12.0 * np.pi ** 2 * x ** 2) * (np.sin(z) / z - np.cos(z))
+  return np.where(x == 0, 1.0, weights)
+
+
+# bandwidth b of w(j / b) for every regression. FIXED is the statsmodels
+# default of floor(4 (n / 100)^(2/9)) lags (b = lags + 1 for bartlett
+# weights 1 - j / (lags + 1)); ANDREWS plugs AR(1) fits of every
+# non-constant score column into andrews (1991); NEWEY_WEST is the
+# nonparametric newey & west (1994) rule on the summed scores
+def hac_bandwidth(
+  scores: np.ndarray,
+  kernel: HacKernel,
+  method: HacBandwidth = HacBandwidth.FIXED,
+  has_constant: bool = True
+) -> np.ndarray:
+  n = scores.shape[-2]
+  batch = scores.shape[:-2]
+  if method == HacBandwidth.FIXED:
+    return np.full(batch, math.floor(4 * (n / 100.0) ** (2.0 / 9.0)) + 1.0)
+
+  constant, q = KERNEL_CONSTANTS[kernel]
+  moving = scores
+  if has_constant and scores.shape[-1] > 1:
+    moving = scores[..., 1:]
+
+  if method == HacBandwidth.ANDREWS:
+    alpha = _andrews_alpha(moving, q)
+  else:
+    alpha = _newey_west_alpha(moving.sum(axis = -1), n, q, PRE_BANDWIDTH_EXPONENTS[kernel])
+
+  bandwidth = constant * (alpha * n) ** (1.0 / (2 * q + 1))
+  return np.clip(bandwidth, 1.0, float(n))
+
+
+# ===== HELPER METHODS =====
+
+# alpha(q) from univariate AR(1) approximations of the score columns,
+# equally weighted
+def _andrews_alpha(scores: np.ndarray, q: int) -> np.ndarray:
+  current, previous = scores[..., 1:, :], scores[..., :-1, :]
+  rho = np.sum(current * previous, axis = -2) / np.sum(previous ** 2, axis = -2)
+  sigma2 = np.mean((current - rho[..., None, :] * previous) ** 2, axis = -2)
+
+  denominator = np.sum(sigma2 ** 2 / (1 - rho) ** 4, axis = -1)
+  if q == 1:
+    numerator = np.sum(4 * rho ** 2 * sigma2 ** 2 / ((1 - rho) ** 6 * (1 + rho) ** 2), axis = -1)
+  else:
+    numerator = np.sum(4 * rho ** 2 * sigma2 ** 2 / (1 - rho) ** 8, axis = -1)
+  return numerator / denominator
+
+
+# alpha(q) = (s_q / s_0)^2 with s_q = sum_{|j| <= m} |j|^q sigma_j over the
+# autocovariances of the summed scores up to the pre-bandwidth m
+def _newey_west_alpha(summed: np.ndarray, n: int, q: int, exponent: float) -> np.ndarray:
+  m = math.floor(4 * (n / 100.0) ** exponent)
+  sigma = np.stack([np.sum(summed[..., j:] * summed[..., :n - j], axis = -1) / n for j in range(m + 1)], axis = -1)
+  j = np.arange(1, m + 1)
+  s0 = sigma[..., 0] + 2 * np.sum(sigma[..., 1:], axis = -1)
+  sq = 2 * np.sum(j ** q * sigma[..., 1:], axis = -1)
+  return (sq / s0) ** 2
+
+
+def _lag_sum(scores: np.ndarray, kernel: HacKernel, bandwidth: np.ndarray, support: int) -> np.ndarray:
+  lags = np.arange(1, support + 1)
+  weights = kernel_weights(kernel, lags / bandwidth[..., None])[..., None, None]
+  S = np.swapaxes(scores, -1, -2) @ scores
+  for lag in lags:
+    cross = np.swapaxes(scores[..., lag:, :], -1, -2) @ scores[..., :-lag, :]
+    S += weights[..., lag - 1, :, :] * (cross + np.swapaxes(cross, -1, -2))
+  return S
@@ -0,0 +1,132 @@
+from functools import partial
+from typing import Optional
+import numpy as np
+from algorithms.integration import log
+from algorithms.parallel import run_replications
+from algorithms.design_matrix import lagged_design
+from algorithms.var import var_coefs
+from models.domain import VarEstimate
+from models.responses import ImpulseResponseResult
+
+
+# orthogonalized impulse responses and FEVD of a fitted VAR, with
+# percentile bands from a recursive-design residual bootstrap. every
+# replication of a chunk is simulated, refitted and decomposed as one
+# (replications, ...) array
+def impulse_responses(
+  estimate: VarEstimate,
+  data: np.ndarray,
+  variable_names: list[str],
+  horizon: int = 10,
+  replications: int = 500,
+  seed: Optional[int] = None,
+  workers: Optional[int] = 1,
+  confidence_level: float = 0.95
+) -> ImpulseResponseResult:
+  coefs = var_coefs(estimate)
+  orth = orthogonalized_irf(coefs, estimate.sigma_u, horizon)
+  decomposition = fevd(orth)
+
+  result = ImpulseResponseResult(
+    variable_names = variable_names,
+    horizon = horizon,
+    orthogonalized = orth.tolist(),
+    fevd = decomposition.tolist()
+  )
+
+  if replications <= 0:
+    return result
+
+  log(f"IRF bootstrap: {replications} replications, horizon {horizon}")
+
+  task = partial(
+    _bootstrap_chunk,
+    params = estimate.params,
+    resid = estimate.resid - estimate.resid.mean(axis = 0),
+    initial = np.asarray(data, dtype = float)[:estimate.lags],
+    lags = estimate.lags,
+    horizon = horizon
+  )
+  draws = run_replications(task, replications, seed = seed, workers = workers)
+
+  tail = 100 * (1 - confidence_level) / 2
+  lower, upper = np.percentile(draws, [tail, 100 - tail], axis = 0)
+
+  result.replications = replications
+  result.confidence_level = confidence_level
+  result.irf_lower = lower[0].tolist()
+  result.irf_upper = upper[0].tolist()
+  result.fevd_lower = lower[1].tolist()
+  result.fevd_upper = upper[1].tolist()
+  return result
+
+
+# MA(inf) matrices Phi_0..Phi_horizon for (..., lags, neqs, neqs) coefficients
+def ma_coefficients(coefs: np.ndarray, horizon: int) -> np.ndarray:
+  *batch, lags, neqs, _ = coefs.shape
+  phis = np.zeros((*batch, horizon + 1, neqs, neqs))
+  phis[..., 0, :, :] = np.eye(neqs)
+
+  for h in range(1, horizon + 1):
+    for lag in range(1, min(h, lags) + 1):
+      phis[..., h, :, :] += phis[..., h - lag, :, :] @ coefs[..., lag - 1, :, :]
+
+  return phis
+
+
+# [..., step, response, impulse] responses to one-s.d. orthogonal shocks
+def orthogonalized_irf(coefs: np.ndarray, sigma_u: np.ndarray, horizon: int) -> np.ndarray:
+  chol = np.linalg.cholesky(sigma_u)
+  return ma_coefficients(coefs, horizon) @ chol[..., None, :, :]
+
+
+# share of the h-step forecast error variance of each response due to each
+# impulse; rows sum to one
+def fevd(orth: np.ndarray) -> np.ndarray:
+  contributions = np.cumsum(orth ** 2, axis = -3)
+  return contributions / contributions.sum(axis = -1, keepdims = True)
+
+
+# ===== HELPER METHODS =====
+
+def _bootstrap_chunk(
+  count: int,
+  seed: np.random.SeedSequence,
+  params: np.ndarray,
+  resid: np.ndarray,
+  initial: np.ndarray,
+  lags: int,
+  horizon: int
+) -> np.ndarray:
+  rng = np.random.default_rng(seed)
+  nobs, neqs = resid.shape
+
+  intercept = params[0]
+  lag_params = params[1:]
+
+  # simulate all paths from the observed initial values with resampled residuals
+  paths = np.empty((count, lags + nobs, neqs))
+  paths[:, :lags] = initial
+  shocks = resid[rng.integers(0, nobs, size = (count, nobs))]
+  for t in range(lags, lags + nobs):
+    history = paths[:, t - lags:t][:, ::-1].reshape(count, lags * neqs)
+    paths[:, t] = intercept + history @ lag_params + shocks[:, t - lags]
+
+  # refit every replication with one batched normal-equation solve
+  design = lagged_design(paths, lags)
+  response = paths[:, lags:]
+  gram = np.swapaxes(design, 1, 2) @ design
+  cross = np.swapaxes(design, 1, 2) @ response
+  try:
+    boot_params = np.linalg.solve(gram, cross)
+  except np.linalg.LinAlgError:
+    boot_params = np.linalg.pinv(gram) @ cross
+
+  boot_resid = response - design @ boot_params
+  df_resid = nobs - design.shape[2]
+  sigma = np.swapaxes(boot_resid, 1, 2) @ boot_resid / df_resid
+
+  blocks = boot_params[:, 1:].reshape(count, lags, neqs, neqs)
+  orth = orthogonalized_irf(np.swapaxes(blocks, 2, 3), sigma, horizon)
+
+  return np.stack([orth, fevd(orth)], axis = 1)
@@ -1,28 +1,39 @@
-import sys
+from typing import Optional
 import numpy as np
+from algorithms.artifacts import ArtifactStore
+from algorithms.console import log
 from algorithms.stationarity_tests import adf_test, kpss_test, zivot_andrews_test
-from models.responses import IntegrationOrderResult
+from algorithms.segments import window_adf_test
+from models.responses import IntegrationOrderResult, CriticalValueMethod
 
 MIN_SAMPLE_ZA = 20
 
-def log(msg):
-  print(msg, file=sys.stderr)
-
 def determine_integration_order(
   data: np.ndarray,
   max_order: int = 2,
   kpss_regression: str = "c",
-  za_regression: str = "c"
+  za_regression: str = "c",
+  artifacts: Optional[ArtifactStore] = None,
+  series_index: int = 0,
+  critical_values: CriticalValueMethod = CriticalValueMethod.ASYMPTOTIC
 ) -> IntegrationOrderResult:
-  current_data = data.copy()
+  if artifacts is None:
+    artifacts = ArtifactStore([data])
+    series_index = 0
+
+  current_data = artifacts.diff(series_index, 0)
   za_result = None
 
   for i in range(max_order + 1):
     log(f"----> I({i})")
     log(f"data length: {len(current_data)}")
 
-    adf = adf_test(current_data)
-    kpss = kpss_test(current_data, regression = kpss_regression)
+    if artifacts.is_window:
+      # segments read the full-sample ADF index
+      adf = window_adf_test(artifacts, series_index, i, critical_values)
+    else:
+      adf = adf_test(current_data, critical_values)
+    kpss = kpss_test(current_data, regression = kpss_regression, critical_values = critical_values)
 
     adf_stationary = adf.is_stationary
     kpss_stationary = kpss.is_stationary
@@ -41,7 +52,7 @@ def determine_integration_order(
       log(f"case 2: both non-stationary")
       if i < max_order:
         log(f"take diff I({i}) -> I({i + 1})")
-        current_data = np.diff(current_data)
+        current_data = artifacts.diff(series_index, i + 1)
         continue
       else:
         log(f"reached max I({max_order})")
@@ -60,7 +71,7 @@ def determine_integration_order(
         log(f"ds < {MIN_SAMPLE_ZA}, skip ZA")
         if i < max_order:
           log(f"take diff")
-          current_data = np.diff(current_data)
+          current_data = artifacts.diff(series_index, i + 1)
           continue
         else:
           return IntegrationOrderResult(
@@ -71,7 +82,7 @@ def determine_integration_order(
             za_result = za_result
           )
 
-      za = zivot_andrews_test(current_data, trend=za_regression)
+      za = zivot_andrews_test(current_data, trend=za_regression, critical_values=critical_values)
       za_result = za
 
       if za.is_stationary:
@@ -87,7 +98,7 @@ def determine_integration_order(
       else:
         if i < max_order:
           log(f"ZA: non-stat, take diff")
-          current_data = np.diff(current_data)
+          current_data = artifacts.diff(series_index, i + 1)
           continue
         else:
           return IntegrationOrderResult(
@@ -112,7 +123,7 @@ def determine_integration_order(
           za_result = za_result
         )
 
-      za = zivot_andrews_test(current_data, trend=za_regression)
+      za = zivot_andrews_test(current_data, trend=za_regression, critical_values=critical_values)
       za_result = za
 
       log(f"ZA: break at {za.breakpoint}")
@@ -0,0 +1,320 @@
+from dataclasses import replace
+from functools import lru_cache
+from typing import Optional
+import numpy as np
+from scipy import optimize, stats
+from statsmodels.tsa.coint_tables import c_sja, c_sjt
+from algorithms.console import log
+from models.domain import JohansenEstimate
+
+CRITICAL_LEVELS = np.array([0.90, 0.95, 0.99])
+
+
+def johansen_native(
+  ts_matrix: np.ndarray,
+  det_order: int = 0,
+  k_ar_diff: Optional[int] = None,
+  max_lags: int = 10
+) -> JohansenEstimate:
+  return johansen_batch([ts_matrix], det_order, k_ar_diff, max_lags)[0]
+
+
+# johansen rank test for many (T x neqs) systems at once.
+# k_ar_diff=None selects the lag order by VAR AIC; selection and the
+# reduced-rank regression then share one moment matrix on a common sample
+def johansen_batch(
+  systems: list[np.ndarray],
+  det_order: int = 0,
+  k_ar_diff: Optional[int] = None,
+  max_lags: int = 10
+) -> list[JohansenEstimate]:
+  results: list[JohansenEstimate] = [None] * len(systems)
+
+  groups: dict[tuple[int, int], list[int]] = {}
+  for idx, system in enumerate(systems):
+    groups.setdefault(np.shape(system), []).append(idx)
+
+  for (n_obs, neqs), indices in groups.items():
+    detrended = [_detrend(np.asarray(systems[idx], dtype = float), det_order) for idx in indices]
+    data = np.stack([levels for levels, _ in detrended])
+
+    if k_ar_diff is not None:
+      moments, nobs = _moment_matrices(data, k_ar_diff)
+      chosen = np.full(len(indices), k_ar_diff)
+      lag_tables = [None] * len(indices)
+    elif n_obs <= max_lags + 10 or max_lags > (n_obs - neqs - 1) // (1 + neqs):
+      log("insufficient data for lag selection, using lag=1")
+      moments, nobs = _moment_matrices(data, 1)
+      chosen = np.ones(len(indices), dtype = int)
+      lag_tables = [None] * len(indices)
+    else:
+      moments, nobs = _moment_matrices(data, max_lags)
+      chosen, lag_tables = _select_lags(moments, neqs, max_lags, nobs)
+
+    for k in np.unique(chosen):
+      rows = np.flatnonzero(chosen == k)
+      estimates = _reduced_rank(moments[rows], neqs, int(k), det_order, nobs)
+      for row, estimate in zip(rows, estimates):
+        estimate.lag_aic = lag_tables[row]
+        estimate.trend = detrended[row][1]
+        results[indices[row]] = estimate
+
+  return results
+
+
+# rank-0 trace and max-eigenvalue statistics (m, 2) of stacked (m, T, neqs)
+# systems at a fixed lag order, without the estimates around them; the
+# finite-sample tables simulate these on random walks
+def rank_zero_statistics(data: np.ndarray, det_order: int, k_ar_diff: int) -> np.ndarray:
+  m, n_obs, neqs = data.shape
+  # one polynomial design for every system
+  stacked = np.moveaxis(data, 0, 1).reshape(n_obs, m * neqs)
+  detrended = np.moveaxis(_detrend(stacked, det_order)[0].reshape(n_obs, m, neqs), 1, 0)
+
+  moments, nobs = _moment_matrices(detrended, k_ar_diff)
+  levels = np.arange(1, 1 + neqs)
+  diffs = np.arange(moments.shape[1] - neqs, moments.shape[1])
+  partial = np.arange(1 + neqs, 1 + neqs + neqs * k_ar_diff)
+  if det_order >= 0:
+    partial = np.concatenate([[0], partial])
+
+  targets = np.concatenate([diffs, levels])
+  m_tt = moments[:, targets[:, None], targets[None, :]]
+  if partial.size > 0:
+    m_pp = moments[:, partial[:, None], partial[None, :]]
+    m_pt = moments[:, partial[:, None], targets[None, :]]
+    m_tt = m_tt - np.swapaxes(m_pt, 1, 2) @ np.linalg.solve(m_pp, m_pt)
+
+  s = m_tt / nobs
+  eig, _ = _eigen_decomposition(s[:, :neqs, :neqs], s[:, :neqs, neqs:], s[:, neqs:, neqs:])
+  lr1, lr2 = _rank_statistics(eig, nobs)
+  return np.column_stack([lr1[:, 0], lr2[:, 0]])
+
+
+# gamma approximation of the asymptotic trace / max-eigenvalue distribution,
+# calibrated on the tabulated 90/95/99% quantiles (Doornik, 1998)
+def johansen_pvalues(
+  stats_values: np.ndarray,
+  neqs: int,
+  det_order: int,
+  kind: str = "trace"
+) -> np.ndarray:
+  stats_values = np.asarray(stats_values, dtype = float)
+  pvalues = np.full(stats_values.shape, np.nan)
+
+  for i in range(stats_values.shape[0]):
+    shape, scale = _gamma_surface(neqs - i, det_order, kind)
+    if np.isfinite(shape):
+      pvalues[i] = stats.gamma.sf(stats_values[i], shape, scale = scale)
+
+  return pvalues
+
+
+# the same estimate with its series in the order `columns`: every moment
+# block and the rows of beta are reordered, the rank statistics are unchanged
+def permuted_johansen(estimate: JohansenEstimate, columns: tuple[int, ...]) -> JohansenEstimate:
+  cols = np.asarray(columns)
+  neqs = len(cols)
+  evec = estimate.evec[cols]
+  non_zero = evec.flat[np.flatnonzero(evec.flat)]
+  if non_zero.size > 0:
+    evec = evec * np.sign(non_zero[0])
+
+  moments = None
+  if estimate.moments is not None:
+    blocks = (estimate.moments.shape[0] - 1) // neqs
+    order = np.concatenate([[0], 1 + (neqs * np.arange(blocks)[:, None] + cols).ravel()])
+    moments = estimate.moments[np.ix_(order, order)]
+
+  return replace(
+    estimate,
+    evec = evec,
+    s00 = estimate.s00[np.ix_(cols, cols)],
+    s01 = estimate.s01[np.ix_(cols, cols)],
+    s11 = estimate.s11[np.ix_(cols, cols)],
+    moments = moments,
+    trend = None if estimate.trend is None else estimate.trend[:, cols]
+  )
+
+
+# ===== HELPER METHODS =====
+
+# levels minus their least-squares polynomial trend of the given order,
+# and the trend's coefficients (order + 1, neqs), highest power first
+def _detrend(data: np.ndarray, order: int) -> tuple[np.ndarray, np.ndarray]:
+  if order < 0:
+    return data, np.zeros((0, data.shape[1]))
+  time = np.arange(data.shape[0], dtype = float)
+  design = np.vander(time, order + 1)
+  beta, _, _, _ = np.linalg.lstsq(design, data, rcond = None)
+  return data - design @ beta, beta
+
+
+# columns: [1, x_{t-1}, dx_{t-1}, ..., dx_{t-lags}, dx_t] for t = lags+1..T-1,
+# stacked over the systems of one group
+def _moment_matrices(data: np.ndarray, lags: int) -> tuple[np.ndarray, int]:
+  m, n_obs, neqs = data.shape
+  diff = np.diff(data, axis = 1)
+  nobs = n_obs - 1 - lags
+
+  blocks = [np.ones((m, nobs, 1)), data[:, lags:n_obs - 1]]
+  for lag in range(1, lags + 1):
+    blocks.append(diff[:, lags - lag:lags - lag + nobs])
+  blocks.append(diff[:, lags:])
+
+  design = np.concatenate(blocks, axis = 2)
+  return np.einsum("mti,mtj->mij", design, design), nobs
+
+
+# VAR(p) in levels == dx_t on [1, x_{t-1}, dx_{t-1}, ..., dx_{t-p+1}], so every
+# lag order is a column prefix and one cholesky gives all residual covariances
+def _select_lags(
+  moments: np.ndarray,
+  neqs: int,
+  max_lags: int,
+  nobs: int
+) -> tuple[np.ndarray, list[Optional[dict[int, float]]]]:
+  m = moments.shape[0]
+  chosen = np.ones(m, dtype = int)
+  tables: list[Optional[dict[int, float]]] = [None] * m
+
+  regressors = moments.shape[1] - neqs
+  for row in range(m):
+    try:
+      factor = np.linalg.cholesky(moments[row])
+    except np.linalg.LinAlgError as e:
+      log(f"VAR lag selection error: {e}, using lag = 1")
+      continue
+
+    response = factor[regressors:]
+    yy = moments[row, regressors:, regressors:]
+
+    # VAR(0) regresses the levels x_t = dx_t + x_{t-1} on the constant only
+    levels = np.concatenate([np.arange(1, 1 + neqs), np.arange(regressors, regressors + neqs)])
+    block = moments[row][np.ix_(levels, levels)]
+    xx = block[:neqs, :neqs] + block[neqs:, neqs:] + block[:neqs, neqs:] + block[neqs:, :neqs]
+    x0 = moments[row, 0, 1:1 + neqs] + moments[row, 0, regressors:]
+    level_cov = (xx - np.outer(x0, x0) / moments[row, 0, 0]) / nobs
+
+    table = {}
+    for p in range(max_lags + 1):
+      if p == 0:
+        resid_cov = level_cov
+      else:
+        partial = response[:, :1 + neqs * p]
+        resid_cov = (yy - partial @ partial.T) / nobs
+      _, logdet = np.linalg.slogdet(resid_cov)
+      table[p] = float(logdet + 2.0 * (p * neqs ** 2 + neqs) / nobs)
+
+    optimal = min(table, key = table.get)
+    log(f"VAR lag selection: {optimal} (AIC)")
+    chosen[row] = max(optimal, 1)
+    tables[row] = table
+
+  return chosen, tables
+
+
+def _reduced_rank(
+  moments: np.ndarray,
+  neqs: int,
+  k: int,
+  det_order: int,
+  nobs: int
+) -> list[JohansenEstimate]:
+  levels = np.arange(1, 1 + neqs)
+  diffs = np.arange(moments.shape[1] - neqs, moments.shape[1])
+  partial = np.arange(1 + neqs, 1 + neqs + neqs * k)
+  # the lag-k columns of a moment matrix built for more lags
+  used = np.concatenate([[0], levels, partial, diffs])
+  if det_order >= 0:
+    partial = np.concatenate([[0], partial])
+
+  targets = np.concatenate([diffs, levels])
+  m_tt = moments[:, targets[:, None], targets[None, :]]
+  if partial.size > 0:
+    m_pp = moments[:, partial[:, None], partial[None, :]]
+    m_pt = moments[:, partial[:, None], targets[None, :]]
+    m_tt = m_tt - np.swapaxes(m_pt, 1, 2) @ np.linalg.solve(m_pp, m_pt)
+
+  s = m_tt / nobs
+  s00 = s[:, :neqs, :neqs]
+  s01 = s[:, :neqs, neqs:]
+  s11 = s[:, neqs:, neqs:]
+
+  eig, beta = _eigen_decomposition(s00, s01, s11)
+  lr1, lr2 = _rank_statistics(eig, nobs)
+
+  cvt = np.array([c_sjt(neqs - i, det_order) for i in range(neqs)])
+  cvm = np.array([c_sja(neqs - i, det_order) for i in range(neqs)])
+
+  estimates = []
+  for row in range(moments.shape[0]):
+    evec = beta[row]
+    non_zero = evec.flat[np.flatnonzero(evec.flat)]
+    if non_zero.size > 0:
+      evec = evec * np.sign(non_zero[0])
+
+    log(f"johansen test result: eig = {eig[row]}, trace = {lr1[row]}")
+
+    estimates.append(JohansenEstimate(
+      eig = eig[row],
+      evec = evec,
+      lr1 = lr1[row],
+      lr2 = lr2[row],
+      cvt = cvt,
+      cvm = cvm,
+      trace_pvalues = johansen_pvalues(lr1[row], neqs, det_order, "trace"),
+      max_eig_pvalues = johansen_pvalues(lr2[row], neqs, det_order, "max_eig"),
+      k_ar_diff = k,
+      det_order = det_order,
+      nobs = nobs,
+      s00 = s00[row],
+      s01 = s01[row],
+      s11 = s11[row],
+      moments = moments[row][np.ix_(used, used)]
+    ))
+
+  return estimates
+
+
+# |lambda S11 - S10 S00^-1 S01| = 0 as a symmetric problem via S11 = L L';
+# eigenvalues descending, beta normalized so that beta' S11 beta = I
+def _eigen_decomposition(s00: np.ndarray, s01: np.ndarray, s11: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+  chol = np.linalg.cholesky(s11)
+  inner = np.swapaxes(s01, 1, 2) @ np.linalg.solve(s00, s01)
+  half = np.linalg.solve(chol, inner)
+  sym = np.linalg.solve(chol, np.swapaxes(half, 1, 2))
+  sym = 0.5 * (sym + np.swapaxes(sym, 1, 2))
+
+  eig, vec = np.linalg.eigh(sym)
+  eig = eig[:, ::-1]
+  vec = vec[:, :, ::-1]
+  return eig, np.linalg.solve(np.swapaxes(chol, 1, 2), vec)
+
+
+# trace and max-eigenvalue statistics for every rank hypothesis
+def _rank_statistics(eig: np.ndarray, nobs: int) -> tuple[np.ndarray, np.ndarray]:
+  log_complement = np.log(1.0 - np.clip(eig, None, 1.0 - 1e-15))
+  lr1 = -nobs * np.cumsum(log_complement[:, ::-1], axis = 1)[:, ::-1]
+  lr2 = -nobs * log_complement
+  return lr1, lr2
+
+
+@lru_cache(maxsize = None)
+def _gamma_surface(dim: int, det_order: int, kind: str) -> tuple[float, float]:
+  table = c_sjt if kind == "trace" else c_sja
+  quantiles = np.asarray(table(dim, det_order), dtype = float)
+  if not np.all(np.isfinite(quantiles)):
+    return np.nan, np.nan
+
+  def residuals(params):
+    shape, scale = np.exp(params)
+    return stats.gamma.ppf(CRITICAL_LEVELS, shape, scale = scale) / quantiles - 1.0
+
+  # method-of-moments start from the 90-99% spread
+  mean = quantiles[0]
+  spread = (quantiles[2] - quantiles[0]) / 2.0
+  start = np.log([max(mean ** 2 / spread ** 2, 0.1), max(spread ** 2 / mean, 0.1)])
+  fit = optimize.least_squares(residuals, start)
+  shape, scale = np.exp(fit.x)
+  return float(shape), float(scale)
@@ -1,14 +1,27 @@
+from typing import Optional
 import numpy as np
 from algorithms.integration import log
-from models.responses import RegressionResult, DurbinWatsonResult, CoefficientInfo, SeriesOrder
+from algorithms.artifacts import ArtifactStore
+from algorithms.ols_chain import fit_ols_chain, fitted_from_linear
+from algorithms.segments import SegmentIndex
+from algorithms.regularization import penalized_lag_regression
+from models.responses import RegressionResult, DurbinWatsonResult, CoefficientInfo, SeriesOrder, LagSelection, HacKernel, HacBandwidth
+
+MAX_LAGS = 5
 
 
 def build_mixed_regression(
   transformed_series: list[np.ndarray],
   series_orders: list[SeriesOrder],
-  variable_names: list[str] = None
+  variable_names: list[str] = None,
+  artifacts: Optional[ArtifactStore] = None,
+  lag_selection: LagSelection = LagSelection.AIC,
+  l1_ratio: float = 0.5,
+  cv_folds: int = 5,
+  hac_kernel: HacKernel = HacKernel.BARTLETT,
+  hac_bandwidth: HacBandwidth = HacBandwidth.FIXED,
+  window: Optional[tuple[SegmentIndex, int]] = None
 ) -> RegressionResult:
-  from statsmodels.regression.linear_model import OLS
   from statsmodels.stats.stattools import durbin_watson
 
   log("building regression on mixed data")
@@ -60,9 +73,15 @@ def build_mixed_regression(
     X_columns.append(aligned_series[i])
     i += 1
 
-  X = np.column_stack(X_columns)
-
-  result = _fit_mixed_simple(y, X)
+  # plain, lagged and Newey-West fits from one design
+  chain = fit_ols_chain(
+    y, X_columns,
+    max_lags = MAX_LAGS,
+    hac_kernel = hac_kernel,
+    hac_bandwidth = hac_bandwidth,
+    window = window
+  )
+  result = chain.base
   log(f"mixed regression (simple): R^2 = {result.rsquared:.4f}")
 
   dw_stat = durbin_watson(result.resid)
@@ -76,10 +95,34 @@ def build_mixed_regression(
 
   log(f"Durbin-Watson: {dw_stat:.4f}")
 
-  if has_autocorr:
+  # orders above 2 are fitted at levels, see the analyzer
+  spec = {"orders": [so.order if so.order <= 2 else 0 for so in series_orders]}
+
+  if has_autocorr and lag_selection != LagSelection.AIC and len(y) > MAX_LAGS + 10:
+    log(f"[WARNING] autocorrelation detected, fitting {lag_selection.value} over {MAX_LAGS} lags")
+    penalized = penalized_lag_regression(
+      y, X_columns, MAX_LAGS,
+      names = _build_names_with_lags(target_display, display_names, MAX_LAGS),
+      method = lag_selection,
+      l1_ratio = l1_ratio,
+      cv_folds = cv_folds,
+      kind = "mixed_penalized",
+      artifacts = artifacts,
+      spec = spec
+    )
+    if not penalized.durbin_watson.has_autocorrelation:
+      return penalized
+
+    log("[WARNING] autocorrelation still present, applying Newey-West")
+    result = chain.newey_west
+    uses_nw = True
+    dw_stat = durbin_watson(result.resid)
+    has_autocorr = dw_stat < 1.5 or dw_stat > 2.5
+
+  elif has_autocorr:
     log("[WARNING] autocorrelation detected, selecting optimal lags via AIC")
-    optimal_lags = _select_optimal_lags_for_mixed(y, X, max_lags=5)
-    result = _fit_mixed_with_lags(y, X, optimal_lags)
+    optimal_lags = chain.lags
+    result = chain.lagged if chain.lagged is not None else chain.base
     has_lags = True
 
     dw_stat = durbin_watson(result.resid)
@@ -91,7 +134,7 @@ def build_mixed_regression(
 
     if has_autocorr:
       log("[WARNING] autocorrelation still present, applying Newey-West")
-      result = _fit_mixed_newey_west(y, X)
+      result = chain.newey_west
       has_lags = False
       uses_nw = True
       dw_stat = durbin_watson(result.resid)
@@ -107,6 +150,14 @@ def build_mixed_regression(
   else:
     names = ["const"] + display_names
 
+  if artifacts is not None:
+    kind = "mixed"
+    if has_lags:
+      kind = "mixed_lags"
+    elif uses_nw:
+      kind = "mixed_newey_west"
+    artifacts.record_fit(fitted_from_linear(result, kind, names, spec = spec))
+
   coeffs = []
   for i in range(len(result.params)):
     name = names[i] if i < len(names) else f"coef_{i}"
@@ -131,7 +182,8 @@ def build_mixed_regression(
     ),
     n_obs = int(result.nobs),
     has_lags = has_lags,
-    uses_newey_west = uses_nw
+    uses_newey_west = uses_nw,
+    hac = result.hac if uses_nw else None
   )
 
 
@@ -145,90 +197,3 @@ def _build_names_with_lags(target_name, predictor_names, max_lags):
     for lag in range(1, max_lags + 1):
       names.append(f"lag{lag}_{name}")
   return names
-
-
-def _fit_mixed_simple(y, X):
-  from statsmodels.regression.linear_model import OLS
-  n = len(y)
-  constant = np.ones(n)
-  X_with_const = np.column_stack([constant, X])
-  model = OLS(y, X_with_const)
-  return model.fit()
-
-
-def _select_optimal_lags_for_mixed(y, X, max_lags):
-  import statsmodels.api as sm
-  from statsmodels.regression.linear_model import OLS
-
-  best_aic = float('inf')
-  best_lags = 1
-
-  for lags in range(1, max_lags + 1):
-    n = len(y)
-    if n <= lags + 10:
-      continue
-    try:
-      all_variables = []
-      for col_idx in range(X.shape[1]):
-        all_variables.append(X[:, col_idx])
-      for lag in range(1, lags + 1):
-        all_variables.append(np.roll(y, lag))
-      for col_idx in range(X.shape[1]):
-        for lag in range(1, lags + 1):
-          all_variables.append(np.roll(X[:, col_idx], lag))
-
-      y_clean = y[lags:]
-      X_clean_list = [var[lags:] for var in all_variables]
-      X_combined = sm.add_constant(np.column_stack(X_clean_list))
-
-      result = OLS(y_clean, X_combined).fit()
-      n_obs = result.nobs
-      k = len(result.params)
-      aic = n_obs * np.log(result.ssr / n_obs) + 2 * k
-
-      if aic < best_aic:
-        best_aic = aic
-        best_lags = lags
-    except Exception:
-      continue
-
-  log(f"optimal lags for mixed: {best_lags} (AIC={best_aic:.2f})")
-  return best_lags
-
-
-def _fit_mixed_with_lags(y, X, max_lags):
-  import statsmodels.api as sm
-  from statsmodels.regression.linear_model import OLS
-
-  n = len(y)
-  if n <= max_lags + 10:
-    log(f"[WARNING] insufficient data for {max_lags} lags, using simple OLS")
-    return _fit_mixed_simple(y, X)
-
-  all_variables = []
-  for col_idx in range(X.shape[1]):
-    all_variables.append(X[:, col_idx])
-  for lag in range(1, max_lags + 1):
-    all_variables.append(np.roll(y, lag))
-  for col_idx in range(X.shape[1]):
-    for lag in range(1, max_lags + 1):
-      all_variables.append(np.roll(X[:, col_idx], lag))
-
-  y_clean = y[max_lags:]
-  X_clean_list = [var[max_lags:] for var in all_variables]
-  X_combined = sm.add_constant(np.column_stack(X_clean_list))
-
-  result = OLS(y_clean, X_combined).fit()
-  log(f"mixed with lags ({max_lags}): R^2 = {result.rsquared:.4f}")
-  return result
-
-
-def _fit_mixed_newey_west(y, X):
-  import statsmodels.api as sm
-  from statsmodels.regression.linear_model import OLS
-
-  n = len(y)
-  X_with_const = np.column_stack([np.ones(n), X])
-  result = OLS(y, X_with_const).fit(cov_type="HAC", cov_kwds={"maxlags": None})
-  log(f"mixed Newey-West: R^2 = {result.rsquared:.4f}")
-  return result
\ No newline at end of file
@@ -0,0 +1,130 @@
+import math
+from typing import Optional
+import numpy as np
+from algorithms.integration import log
+from algorithms.artifacts import FittedModel
+from algorithms.stability import RecursiveLeastSquares
+from models.domain import CandidateFit
+from models.responses import CandidateModel, ModelComparison, ModelSpecification
+
+HOLDOUT_FRACTION = 0.2
+MIN_HOLDOUT = 5
+
+
+# side-by-side scores of fitted specifications from the target equations
+# their builders recorded, without refitting any builder. every sample
+# ends at the last observation, and a one-step-ahead error of a
+# differenced target equals the error in levels, so the holdout (the
+# same final time points for every candidate) is on a common scale. the
+# gaussian likelihood of y_t given the past is the same in levels and
+# differences, and the criteria are per observation, since the
+# candidates lose different numbers of rows to lags and differencing.
+# ECM and VECM error-correction terms keep their full-sample long-run
+# estimates
+def compare_candidates(
+  fits: list[CandidateFit],
+  selected: Optional[ModelSpecification] = None,
+  failures: Optional[dict[ModelSpecification, str]] = None
+) -> ModelComparison:
+  failures = failures or {}
+  min_obs = min((len(fit.model.y) for fit in fits), default = 0)
+  holdout = max(MIN_HOLDOUT, int(HOLDOUT_FRACTION * min_obs))
+
+  candidates = [_score(fit, holdout, fit.specification == selected) for fit in fits]
+  _rank(candidates, "aic", "aic_rank")
+  _rank(candidates, "bic", "bic_rank")
+  _rank(candidates, "holdout_rmse", "holdout_rank")
+
+  candidates.sort(key = lambda c: (
+    c.holdout_rank if c.holdout_rank is not None else math.inf,
+    c.aic_rank if c.aic_rank is not None else math.inf
+  ))
+  for specification, message in failures.items():
+    candidates.append(CandidateModel(
+      specification = specification,
+      selected = specification == selected,
+      error_message = message
+    ))
+
+  comparison = ModelComparison(
+    holdout_size = holdout,
+    best_by_aic = _best(candidates, "aic_rank"),
+    best_by_bic = _best(candidates, "bic_rank"),
+    best_by_holdout = _best(candidates, "holdout_rank"),
+    candidates = candidates
+  )
+  log(
+    f"model comparison: {len(fits)} specifications, best by aic "
+    f"{_value(comparison.best_by_aic)}, by holdout {_value(comparison.best_by_holdout)}"
+  )
+  return comparison
+
+
+# expanding-window one-step-ahead errors over the last `holdout` rows:
+# least squares on the rows before, then one recursive update per row
+def holdout_errors(y: np.ndarray, X: np.ndarray, holdout: int) -> Optional[np.ndarray]:
+  n, k = X.shape
+  start = n - holdout
+  if start <= k:
+    return None
+
+  try:
+    rls = RecursiveLeastSquares(X[:start], y[:start])
+  except np.linalg.LinAlgError:
+    return None
+
+  errors = np.empty(holdout)
+  for t in range(start, n):
+    errors[t - start] = y[t] - X[t] @ rls.params
+    rls.update(X[t], y[t])
+  return errors
+
+
+# ===== HELPER METHODS =====
+
+def _score(fit: CandidateFit, holdout: int, selected: bool) -> CandidateModel:
+  model: FittedModel = fit.model
+  # penalized fits are scored on their selected columns
+  active = np.flatnonzero(model.params != 0)
+  n = len(model.resid)
+  k = len(active)
+
+  ssr = float(model.resid @ model.resid)
+  llf = -0.5 * n * (math.log(2 * math.pi) + math.log(ssr / n) + 1)
+
+  errors = holdout_errors(model.y, model.X[:, active], holdout)
+  rmse = mae = None
+  if errors is not None:
+    rmse = float(np.sqrt(np.mean(errors ** 2)))
+    mae = float(np.mean(np.abs(errors)))
+
+  return CandidateModel(
+    specification = fit.specification,
+    selected = selected,
+    model_kind = model.kind,
+    n_obs = n,
+    n_params = k,
+    log_likelihood = llf,
+    aic = (-2 * llf + 2 * k) / n,
+    bic = (-2 * llf + k * math.log(n)) / n,
+    holdout_rmse = rmse,
+    holdout_mae = mae,
+    regression = fit.regression
+  )
+
+
+def _rank(candidates: list[CandidateModel], metric: str, rank_field: str):
+  scored = [c for c in candidates if getattr(c, metric) is not None]
+  for rank, candidate in enumerate(sorted(scored, key = lambda c: getattr(c, metric)), start = 1):
+    setattr(candidate, rank_field, rank)
+
+
+def _best(candidates: list[CandidateModel], rank_field: str) -> Optional[ModelSpecification]:
+  for candidate in candidates:
+    if getattr(candidate, rank_field) == 1:
+      return candidate.specification
+  return None
+
+
+def _value(specification: Optional[ModelSpecification]) -> str:
+  return specification.value if specification is not None else "none"
@@ -0,0 +1,307 @@
+from dataclasses import dataclass, field
+from typing import Optional
+import numpy as np
+from scipy import stats
+from scipy.linalg import solve_triangular
+from algorithms.integration import log
+from algorithms.artifacts import FittedModel
+from algorithms.design_matrix import lagged_design
+from algorithms.segments import SegmentIndex
+from algorithms.hac import hac_covariance
+from models.responses import HacKernel, HacBandwidth, HacInfo
+
+# minimum rows left over the regressors for a lag order to be considered,
+# same margin as the statsmodels-based search it replaces
+LAG_SAMPLE_MARGIN = 10
+# residual degrees of freedom a lag order must leave; fewer fit exactly
+MIN_LAG_DF = 2
+
+
+# OLS estimate in the statsmodels RegressionResults vocabulary, so the
+# result builders read it the same way. t and p use the t distribution
+# for the classical covariance and the normal for HAC, as statsmodels does
+@dataclass
+class LinearFit:
+  y: np.ndarray
+  X: np.ndarray
+  params: np.ndarray
+  bse: np.ndarray
+  tvalues: np.ndarray
+  pvalues: np.ndarray
+  resid: np.ndarray
+  rsquared: float
+  rsquared_adj: float
+  fvalue: float
+  f_pvalue: float
+  nobs: int
+  ssr: float
+  xx_inv: np.ndarray
+  lags: int = 0
+  cov_type: str = "nonrobust"
+  hac: Optional[HacInfo] = None
+
+
+# the three estimates the builders choose between: plain OLS, OLS with
+# the AIC lag order (None when the sample is too short for it) and plain
+# OLS with Newey-West covariance
+@dataclass
+class OlsChain:
+  base: LinearFit
+  newey_west: LinearFit
+  lags: int
+  lagged: Optional[LinearFit] = None
+  lag_aic: dict[int, float] = field(default_factory = dict)
+
+
+# every variant of the fallback chain from one lagged design and one
+# cross-product matrix. the design holds the regressors followed by lags
+# 1..max of the target and of each regressor, on every row with the lags
+# before the sample zeroed; the plain model is its leading block, and each
+# candidate lag order p is the block [regressors, y lags 1..p, x lags 1..p]
+# over rows p..n. the candidates' moments are the full cross-products less
+# the outer products of their first p rows, so the AIC search needs no
+# refit. a sample that is rows [offset, offset + n) of a longer one can
+# pass window = (index, offset), the segment index of the longer sample's
+# lag design: candidate p keeps its lags inside the window, so its moments
+# are read from the index instead. the plain and chosen lag models are
+# solved by QR, and Newey-West is a second sandwich on the plain residuals
+def fit_ols_chain(
+  y: np.ndarray,
+  X_list: list[np.ndarray],
+  add_constant: bool = True,
+  max_lags: int = 5,
+  lags: Optional[int] = None,
+  hac_kernel: HacKernel = HacKernel.BARTLETT,
+  hac_bandwidth: HacBandwidth = HacBandwidth.FIXED,
+  window: Optional[tuple[SegmentIndex, int]] = None
+) -> OlsChain:
+  n = len(y)
+  k_x = len(X_list)
+  # orders past the sample margin are never searched, so the design stops there
+  depth = min(max_lags, max(n - LAG_SAMPLE_MARGIN - 1, 0)) if lags is None and window is None else 0
+
+  design = lag_design(y, X_list, depth, add_constant, trim = False)
+  base = linear_fit(y, design[:, :int(add_constant) + k_x], add_constant)
+  newey_west = hac_fit(base, add_constant, kernel = hac_kernel, bandwidth_method = hac_bandwidth)
+
+  lag_aic = {}
+  if lags is None:
+    lag_aic = _lag_aic(y, design, k_x, max_lags, add_constant, window)
+    lags = min(lag_aic, key = lag_aic.get) if lag_aic else 1
+    best = lag_aic.get(lags, float("inf"))
+    log(f"optimal lags: {lags} (AIC={best:.2f})")
+
+  lagged = None
+  width = int(add_constant) + k_x + lags * (k_x + 1)
+  if n > lags + LAG_SAMPLE_MARGIN and n - lags - width >= MIN_LAG_DF:
+    design = lag_design(y, X_list, lags, add_constant)
+    lagged = linear_fit(y[lags:], design, add_constant, lags = lags)
+  else:
+    log(f"warning: insufficient data for {lags} lags (n={n})")
+
+  return OlsChain(
+    base = base,
+    newey_west = newey_west,
+    lags = lags,
+    lagged = lagged,
+    lag_aic = lag_aic
+  )
+
+
+# [const, x_t, y lags 1..p, x_1 lags 1..p, x_2 lags 1..p, ...] from row p
+# on, or on every row with trim=False
+def lag_design(
+  y: np.ndarray,
+  X_list: list[np.ndarray],
+  lags: int,
+  add_constant: bool = True,
+  trim: bool = True
+) -> np.ndarray:
+  return lagged_design([y] + list(X_list), lags, current = X_list, constant = add_constant, by_lag = False, trim = trim)
+
+
+def linear_fit(y: np.ndarray, X: np.ndarray, has_constant: bool = True, lags: int = 0) -> LinearFit:
+  n, k = X.shape
+  Q, R = np.linalg.qr(X)
+  diagonal = np.abs(np.diag(R))
+  rank = int(np.sum(diagonal > diagonal.max() * max(n, k) * np.finfo(float).eps))
+
+  if rank == k:
+    params = solve_triangular(R, Q.T @ y)
+    R_inv = solve_triangular(R, np.eye(k))
+    xx_inv = R_inv @ R_inv.T
+  else:
+    # rank deficient: minimum-norm solution, as statsmodels' pinv
+    pinv = np.linalg.pinv(X)
+    params = pinv @ y
+    xx_inv = pinv @ pinv.T
+    rank = int(np.linalg.matrix_rank(X))
+
+  resid = y - X @ params
+  ssr = float(resid @ resid)
+  df_resid = n - rank
+  k_constant = int(has_constant)
+  df_model = rank - k_constant
+
+  tss = float(np.sum((y - y.mean()) ** 2)) if has_constant else float(y @ y)
+  rsquared = 1 - ssr / tss
+  # an exact fit has no residual variance: its inference is undefined (nan),
+  # as statsmodels reports it
+  if df_resid > 0:
+    rsquared_adj = 1 - (n - k_constant) / df_resid * (1 - rsquared)
+    fvalue = ((tss - ssr) / df_model) / (ssr / df_resid) if df_model > 0 else np.nan
+    bse = np.sqrt(np.diag(xx_inv) * ssr / df_resid)
+  else:
+    rsquared_adj = fvalue = np.nan
+    bse = np.full(len(params), np.nan)
+  with np.errstate(divide = "ignore", invalid = "ignore"):
+    tvalues = params / bse
+
+  return LinearFit(
+    y = y,
+    X = X,
+    params = params,
+    bse = bse,
+    tvalues = tvalues,
+    pvalues = 2 * stats.t.sf(np.abs(tvalues), df_resid),
+    resid = resid,
+    rsquared = rsquared,
+    rsquared_adj = rsquared_adj,
+    fvalue = fvalue,
+    f_pvalue = float(stats.f.sf(fvalue, df_model, df_resid)),
+    nobs = n,
+    ssr = ssr,
+    xx_inv = xx_inv,
+    lags = lags
+  )
+
+
+# HAC covariance of a fitted model, no small-sample correction, normal
+# p-values and a Wald F test of every non-constant coefficient. the
+# defaults, bartlett weights over floor(4 (n / 100)^(2/9)) lags, are the
+# statsmodels Newey-West defaults; maxlags fixes the bartlett lag count
+def hac_fit(
+  fit: LinearFit,
+  has_constant: bool = True,
+  maxlags: Optional[int] = None,
+  kernel: HacKernel = HacKernel.BARTLETT,
+  bandwidth_method: HacBandwidth = HacBandwidth.FIXED
+) -> LinearFit:
+  n, k = fit.X.shape
+  bandwidth = None if maxlags is None else np.array(maxlags + 1.0)
+  cov, bandwidth = hac_covariance(
+    fit.X, fit.resid,
+    kernel = kernel,
+    bandwidth_method = bandwidth_method,
+    has_constant = has_constant,
+    bandwidth = bandwidth,
+    xx_inv = fit.xx_inv
+  )
+
+  bse = np.sqrt(np.diag(cov))
+  tvalues = fit.params / bse
+
+  restricted = list(range(1, k)) if has_constant else list(range(k))
+  b = fit.params[restricted]
+  q = len(restricted)
+  fvalue = float(b @ np.linalg.solve(cov[np.ix_(restricted, restricted)], b)) / q
+  df_resid = n - int(np.linalg.matrix_rank(fit.X))
+
+  return LinearFit(
+    y = fit.y,
+    X = fit.X,
+    params = fit.params,
+    bse = bse,
+    tvalues = tvalues,
+    pvalues = 2 * stats.norm.sf(np.abs(tvalues)),
+    resid = fit.resid,
+    rsquared = fit.rsquared,
+    rsquared_adj = fit.rsquared_adj,
+    fvalue = fvalue,
+    f_pvalue = float(stats.f.sf(fvalue, q, df_resid)),
+    nobs = fit.nobs,
+    ssr = fit.ssr,
+    xx_inv = fit.xx_inv,
+    lags = fit.lags,
+    cov_type = "HAC",
+    hac = HacInfo(
+      kernel = kernel,
+      bandwidth_method = bandwidth_method,
+      bandwidth = float(bandwidth)
+    )
+  )
+
+
+def fitted_from_linear(fit: LinearFit, kind: str, names: list[str], spec: Optional[dict] = None) -> FittedModel:
+  return FittedModel(
+    kind = kind,
+    y = fit.y,
+    X = fit.X,
+    names = names,
+    params = fit.params,
+    resid = fit.resid,
+    lags = fit.lags,
+    spec = spec or {}
+  )
+
+
+# ===== HELPER METHODS =====
+
+def _lag_columns(k_x: int, lags: int, depth: int, add_constant: bool) -> list[int]:
+  start = int(add_constant)
+  columns = list(range(start + k_x))
+  y_lags = start + k_x
+  columns.extend(range(y_lags, y_lags + lags))
+  for j in range(k_x):
+    x_lags = y_lags + depth * (j + 1)
+    columns.extend(range(x_lags, x_lags + lags))
+  return columns
+
+
+# AIC = n log(SSR / n) + 2k of every candidate order from the moments of
+# [design, y]; rows before the order are removed by subtracting their
+# outer products, or read from the window of the longer sample's index
+def _lag_aic(
+  y: np.ndarray,
+  design: np.ndarray,
+  k_x: int,
+  max_lags: int,
+  add_constant: bool,
+  window: Optional[tuple[SegmentIndex, int]] = None
+) -> dict[int, float]:
+  n = len(y)
+  if window is None:
+    Z = np.column_stack([design, y])
+    moments = Z.T @ Z
+    width = design.shape[1]
+  else:
+    index, offset = window
+    width = index.width - 1
+  depth = (width - int(add_constant) - k_x) // (k_x + 1)
+
+  aic = {}
+  for lags in range(1, min(max_lags, depth) + 1):
+    if n <= lags + LAG_SAMPLE_MARGIN:
+      continue
+    columns = _lag_columns(k_x, lags, depth, add_constant)
+    if n - lags - len(columns) < MIN_LAG_DF:
+      continue
+    if window is None:
+      head = Z[:lags]
+      window_moments = moments - head.T @ head
+    else:
+      window_moments = index.moments(offset + lags, offset + n)
+    xx = window_moments[np.ix_(columns, columns)]
+    xy = window_moments[columns, -1]
+    try:
+      params = np.linalg.solve(xx, xy)
+    except np.linalg.LinAlgError:
+      continue
+
+    nobs = n - lags
+    ssr = float(window_moments[-1, -1] - params @ xy)
+    if ssr <= 0:
+      continue
+    aic[lags] = nobs * np.log(ssr / nobs) + 2 * len(columns)
+
+  return aic
@@ -0,0 +1,39 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional
+import numpy as np
+
+DEFAULT_CHUNK_SIZE = 100
+
+
+def resolve_workers(workers: Optional[int]) -> int:
+  if workers is None or workers <= 0:
+    return os.cpu_count() or 1
+  return workers
+
+
+# runs task(count, seed_sequence) over fixed-size chunks of n_total
+# replications and concatenates the returned arrays in chunk order.
+# chunk sizes and child seeds depend only on (n_total, chunk_size, seed),
+# so results are identical for any number of workers
+def run_replications(
+  task: Callable[[int, np.random.SeedSequence], np.ndarray],
+  n_total: int,
+  seed: Optional[int] = None,
+  workers: Optional[int] = 1,
+  chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> np.ndarray:
+  counts = [chunk_size] * (n_total // chunk_size)
+  if n_total % chunk_size:
+    counts.append(n_total % chunk_size)
+
+  seeds = np.random.SeedSequence(seed).spawn(len(counts))
+  workers = min(resolve_workers(workers), len(counts))
+
+  if workers <= 1:
+    parts = [task(count, child) for count, child in zip(counts, seeds)]
+  else:
+    with ProcessPoolExecutor(max_workers = workers) as pool:
+      parts = list(pool.map(task, counts, seeds))
+
+  return np.concatenate(parts, axis = 0)
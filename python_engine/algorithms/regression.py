@@ -1,10 +1,15 @@
-import sys
+from typing import Optional
 import numpy as np
-import statsmodels.api as sm
 from statsmodels.stats.stattools import durbin_watson
 from algorithms.integration import log
-from models.responses import RegressionResult, DurbinWatsonResult, CoefficientInfo
-from statsmodels.regression.linear_model import RegressionResultsWrapper
+from algorithms.artifacts import ArtifactStore
+from algorithms.design_matrix import lagged_design
+from algorithms.ols_chain import LinearFit, fit_ols_chain, linear_fit, fitted_from_linear
+from algorithms.segments import SegmentIndex
+from algorithms.regularization import penalized_lag_regression
+from models.responses import RegressionResult, DurbinWatsonResult, CoefficientInfo, LagSelection, HacKernel, HacBandwidth
+
+DEFAULT_LAGS = 2
 
 
 def ols_regression(
@@ -13,7 +18,14 @@ def ols_regression(
     add_constant: bool = True,
     auto_select_lags: bool = True,
     max_lags_search: int = 5,
-    variable_names: list[str] = None
+    variable_names: list[str] = None,
+    artifacts: Optional[ArtifactStore] = None,
+    lag_selection: LagSelection = LagSelection.AIC,
+    l1_ratio: float = 0.5,
+    cv_folds: int = 5,
+    hac_kernel: HacKernel = HacKernel.BARTLETT,
+    hac_bandwidth: HacBandwidth = HacBandwidth.FIXED,
+    window: Optional[tuple[SegmentIndex, int]] = None
 ) -> RegressionResult:
 
   if variable_names is None:
@@ -23,221 +35,134 @@ def ols_regression(
     target_name = variable_names[0]
     predictor_names = variable_names[1:]
 
-  result = _fit_ols(y, X_list, add_constant, predictor_names)
+  # plain, lagged and Newey-West fits from one design; the chain below
+  # only decides between them
+  chain = fit_ols_chain(
+    y, X_list, add_constant,
+    max_lags = max_lags_search,
+    lags = None if auto_select_lags else DEFAULT_LAGS,
+    hac_kernel = hac_kernel,
+    hac_bandwidth = hac_bandwidth,
+    window = window
+  )
+  if not auto_select_lags:
+    log(f"using default {DEFAULT_LAGS} lags")
+
+  result = _fit_ols(chain.base, add_constant, predictor_names, artifacts)
 
   if result.durbin_watson.has_autocorrelation == False:
     return result
 
-  if auto_select_lags:
-    optimal_lags = _select_optimal_lags(y, X_list, add_constant, max_lags_search)
+  if lag_selection != LagSelection.AIC and add_constant and len(y) > max_lags_search + 10:
+    # every lag up to max_lags_search, shrunk instead of searched
+    result_with_lags = penalized_lag_regression(
+      y, X_list, max_lags_search,
+      names = _build_names_with_lags(add_constant, target_name, predictor_names, max_lags_search),
+      method = lag_selection,
+      l1_ratio = l1_ratio,
+      cv_folds = cv_folds,
+      kind = "ols_penalized",
+      artifacts = artifacts
+    )
+  elif chain.lagged is not None:
+    result_with_lags = _fit_ols_with_lags(chain.lagged, add_constant, target_name, predictor_names, artifacts)
   else:
-    optimal_lags = 2
-    log(f"using default {optimal_lags} lags")
-
-  result_with_lags = _fit_ols_with_lags(y, X_list, add_constant, optimal_lags, target_name, predictor_names)
+    result_with_lags = result
 
   if result_with_lags.durbin_watson.has_autocorrelation == False:
     return result_with_lags
 
-  result_nw = _fit_ols_newey_west(y, X_list, add_constant, predictor_names)
+  result_nw = _fit_ols_newey_west(chain.newey_west, add_constant, predictor_names, artifacts)
 
   return result_nw
 
 
-# AIC autolag
-def _select_optimal_lags(
-  y: np.ndarray,
-  X_list: list[np.ndarray],
-  add_constant: bool,
-  max_lags: int
-) -> int:
-
-  best_aic = float('inf')
-  best_lags = 1
-
-  for lags in range(1, max_lags + 1):
-    if len(y) <= lags + 10:
-      continue
-
-    try:
-      all_variables = []
-
-      for X in X_list:
-        all_variables.append(X)
-
-      for lag in range(1, lags + 1):
-        y_lag = np.roll(y, lag)
-        all_variables.append(y_lag)
-
-      for X in X_list:
-        for lag in range(1, lags + 1):
-          X_lag = np.roll(X, lag)
-          all_variables.append(X_lag)
-
-      y_clean = y[lags:]
-      X_clean_list = []
-      for var in all_variables:
-        X_clean_list.append(var[lags:])
-
-      X_combined = _prepare_X_matrix(X_clean_list)
-
-      if add_constant:
-        X_combined = sm.add_constant(X_combined)
-
-      model = sm.OLS(y_clean, X_combined)
-      results = model.fit()
-
-      n = results.nobs
-      k = len(results.params)
-      rss = results.ssr
-      aic = n * np.log(rss / n) + 2 * k
-
-      if aic < best_aic:
-        best_aic = aic
-        best_lags = lags
-
-    except Exception as e:
-      continue
-
-  log(f"optimal lags: {best_lags} (AIC={best_aic:.2f})")
-  return best_lags
-
-
-def _fit_ols(
+# plain OLS with a constant: no lag search and no HAC fallback
+def fit_ols(
     y: np.ndarray,
     X_list: list[np.ndarray],
-    add_constant: bool,
     predictor_names: list[str]
 ) -> RegressionResult:
+  design = lagged_design(current = X_list)
+  return _fit_ols(linear_fit(y, design), True, predictor_names)
 
-  X = _prepare_X_matrix(X_list)
-
-  if add_constant:
-    X = sm.add_constant(X)
 
+def _fit_ols(
+    fit: LinearFit,
+    add_constant: bool,
+    predictor_names: list[str],
+    artifacts: Optional[ArtifactStore] = None
+) -> RegressionResult:
   names = _build_names_simple(add_constant, predictor_names)
 
-  model = sm.OLS(y, X)
-  results = model.fit()
-
-  dw_stat = durbin_watson(results.resid)
+  dw_stat = durbin_watson(fit.resid)
   has_autocorr = _check_autocorrelation(dw_stat)
 
-  log(f"ols: r_squared = {results.rsquared:.4f}, dw = {dw_stat:.4f}")
+  log(f"ols: r_squared = {fit.rsquared:.4f}, dw = {dw_stat:.4f}")
 
   return _create_regression_result(
-    results = results,
+    fit = fit,
     names = names,
     dw_stat = dw_stat,
     has_autocorr = has_autocorr,
     has_lags = False,
-    uses_newey_west = False
+    uses_newey_west = False,
+    artifacts = artifacts
   )
 
 
 # ols with lagged Y and X vars
 def _fit_ols_with_lags(
-    y: np.ndarray,
-    X_list: list[np.ndarray],
+    fit: LinearFit,
     add_constant: bool,
-    max_lags: int,
     target_name: str,
-    predictor_names: list[str]
+    predictor_names: list[str],
+    artifacts: Optional[ArtifactStore] = None
 ) -> RegressionResult:
-  n = len(y)
-
-  if n <= max_lags + 10:
-    log(f"warning: insufficient data for {max_lags} lags (n={n}), using simple OLS")
-    return _fit_ols(y, X_list, add_constant, predictor_names)
-
-  all_variables = []
-
-  for X in X_list:
-    all_variables.append(X)
-
-  for lag in range(1, max_lags + 1):
-    y_lag = _create_lag(y, lag)
-    all_variables.append(y_lag)
-
-  for X in X_list:
-    for lag in range(1, max_lags + 1):
-      X_lag = _create_lag(X, lag)
-      all_variables.append(X_lag)
-
-  y_clean = y[max_lags:]
-  X_clean_list = []
-  for var in all_variables:
-    X_clean_list.append(var[max_lags:])
-
-  X_combined = _prepare_X_matrix(X_clean_list)
-
-  if add_constant:
-    X_combined = sm.add_constant(X_combined)
-
-  names = _build_names_with_lags(add_constant, target_name, predictor_names, max_lags)
+  names = _build_names_with_lags(add_constant, target_name, predictor_names, fit.lags)
 
-  model = sm.OLS(y_clean, X_combined)
-  results = model.fit()
-
-  dw_stat = durbin_watson(results.resid)
+  dw_stat = durbin_watson(fit.resid)
   has_autocorr = _check_autocorrelation(dw_stat)
 
-  log(f"ols with lags: r_squared = {results.rsquared:.4f}, dw = {dw_stat:.4f}")
+  log(f"ols with lags: r_squared = {fit.rsquared:.4f}, dw = {dw_stat:.4f}")
 
   return _create_regression_result(
-    results = results,
+    fit = fit,
     names = names,
     dw_stat = dw_stat,
     has_autocorr = has_autocorr,
     has_lags = True,
-    uses_newey_west = False
+    uses_newey_west = False,
+    artifacts = artifacts
   )
 
 
 def _fit_ols_newey_west(
-    y: np.ndarray,
-    X_list: list[np.ndarray],
+    fit: LinearFit,
     add_constant: bool,
-    predictor_names: list[str]
+    predictor_names: list[str],
+    artifacts: Optional[ArtifactStore] = None
 ) -> RegressionResult:
-  X = _prepare_X_matrix(X_list)
-
-  if add_constant:
-    X = sm.add_constant(X)
-
   names = _build_names_simple(add_constant, predictor_names)
 
-  model = sm.OLS(y, X)
-  results = model.fit(cov_type = "HAC", cov_kwds = {"maxlags": None})
-
-  dw_stat = durbin_watson(results.resid)
+  dw_stat = durbin_watson(fit.resid)
   has_autocorr = _check_autocorrelation(dw_stat)
 
-  log(f"ols newey-west: r_squared = {results.rsquared:.4f}, dw = {dw_stat:.4f}")
+  log(f"ols newey-west: r_squared = {fit.rsquared:.4f}, dw = {dw_stat:.4f}")
 
   return _create_regression_result(
-    results = results,
+    fit = fit,
     names = names,
     dw_stat = dw_stat,
     has_autocorr = has_autocorr,
     has_lags = False,
-    uses_newey_west = True
+    uses_newey_west = True,
+    artifacts = artifacts
   )
 
 
 # ===== HELPER METHODS =====
 
-def _prepare_X_matrix(X_list: list[np.ndarray]) -> np.ndarray:
-  if len(X_list) == 1:
-    return X_list[0].reshape(-1, 1)
-  else:
-    return np.column_stack(X_list)
-
-
-def _create_lag(data: np.ndarray, lag: int) -> np.ndarray:
-  return np.roll(data, lag)
-
-
 def _check_autocorrelation(dw_stat: float) -> bool:
   if dw_stat < 1.5:
     return True
@@ -279,37 +204,47 @@ def _build_names_with_lags(
 
 
 def _create_regression_result(
-    results: RegressionResultsWrapper,
+    fit: LinearFit,
     names: list[str],
     dw_stat: float,
     has_autocorr: bool,
     has_lags: bool,
-    uses_newey_west: bool
+    uses_newey_west: bool,
+    artifacts: Optional[ArtifactStore] = None
 ) -> RegressionResult:
 
+  if artifacts is not None:
+    kind = "ols"
+    if has_lags:
+      kind = "ols_lags"
+    elif uses_newey_west:
+      kind = "ols_newey_west"
+    artifacts.record_fit(fitted_from_linear(fit, kind, names))
+
   coeffs = []
-  for i in range(len(results.params)):
+  for i in range(len(fit.params)):
     name = names[i] if i < len(names) else f"coef_{i}"
     coeffs.append(CoefficientInfo(
       name = name,
-      value = float(results.params[i]),
-      std_error = float(results.bse[i]),
-      t_value = float(results.tvalues[i]),
-      p_value = float(results.pvalues[i]),
-      is_significant = float(results.pvalues[i]) < 0.05
+      value = float(fit.params[i]),
+      std_error = float(fit.bse[i]),
+      t_value = float(fit.tvalues[i]),
+      p_value = float(fit.pvalues[i]),
+      is_significant = float(fit.pvalues[i]) < 0.05
     ))
 
   return RegressionResult(
     coefficients = coeffs,
-    r_squared = float(results.rsquared),
-    adj_r_squared = float(results.rsquared_adj),
-    f_statistic = float(results.fvalue),
-    f_pvalue = float(results.f_pvalue),
+    r_squared = float(fit.rsquared),
+    adj_r_squared = float(fit.rsquared_adj),
+    f_statistic = float(fit.fvalue),
+    f_pvalue = float(fit.f_pvalue),
     durbin_watson = DurbinWatsonResult(
       statistic = float(dw_stat),
       has_autocorrelation = has_autocorr
     ),
-    n_obs = int(results.nobs),
+    n_obs = int(fit.nobs),
     has_lags = has_lags,
-    uses_newey_west = uses_newey_west
+    uses_newey_west = uses_newey_west,
+    hac = fit.hac
   )
\ No newline at end of file
@@ -0,0 +1,316 @@
+import math
+from typing import Optional
+import numpy as np
+from scipy import stats
+from statsmodels.stats.stattools import durbin_watson
+from algorithms.integration import log
+from algorithms.artifacts import ArtifactStore, FittedModel
+from algorithms.design_matrix import lagged_design
+from models.domain import PenalizedFit
+from models.responses import (
+  RegressionResult,
+  DurbinWatsonResult,
+  CoefficientInfo,
+  LagSelection,
+  RegularizationInfo
+)
+
+N_ALPHAS = 100
+ALPHA_MIN_RATIO = 1e-3
+CD_TOLERANCE = 1e-7
+CD_MAX_SWEEPS = 1000
+
+
+# penalized alternative to the AIC lag search: every lag of the target
+# and the predictors up to max_lags enters the design and an elastic net
+# picks the penalty by forward-chaining cross-validation. the objective is
+#   (1 / 2n) |y - b0 - X b|^2 + alpha (l1_ratio |b|_1 + (1 - l1_ratio) / 2 |b|^2)
+# on standardized columns. standard errors use the ridge approximation on
+# the nonzero coefficients, cov = s^2 H^-1 X'X H^-1 with H = X'X + n alpha (1 - l1_ratio) D^2
+def penalized_lag_regression(
+  y: np.ndarray,
+  X_list: list[np.ndarray],
+  max_lags: int,
+  names: list[str],
+  method: LagSelection,
+  l1_ratio: float = 0.5,
+  cv_folds: int = 5,
+  kind: str = "ols_penalized",
+  artifacts: Optional[ArtifactStore] = None,
+  spec: Optional[dict] = None
+) -> RegressionResult:
+  design = lagged_design([y] + list(X_list), max_lags, current = X_list, by_lag = False)
+  y_clean = y[max_lags:]
+  X = design[:, 1:]
+  n, p = X.shape
+  l1_ratio = penalty_l1_ratio(method, l1_ratio)
+
+  fit = elastic_net_cv(X, y_clean, l1_ratio, n_folds = cv_folds, gap = max_lags)
+  fitted = fit.intercept + X @ fit.coef
+  resid = y_clean - fitted
+
+  ssr = float(resid @ resid)
+  sst = float(np.sum((y_clean - y_clean.mean()) ** 2))
+  active = np.flatnonzero(fit.coef)
+
+  # ridge approximation on the active columns, original scale
+  Xc = X[:, active] - fit.x_mean[active]
+  xx = Xc.T @ Xc
+  H = xx + n * fit.alpha * (1 - l1_ratio) * np.diag(fit.x_scale[active] ** 2)
+  H_inv = np.linalg.pinv(H)
+  df = float(np.trace(H_inv @ xx)) if len(active) > 0 else 0.0
+  df_resid = n - 1 - df
+  sigma2 = ssr / df_resid
+  cov = sigma2 * H_inv @ xx @ H_inv
+
+  std_errors = np.zeros(p)
+  std_errors[active] = np.sqrt(np.maximum(np.diag(cov), 0.0))
+  x_mean = fit.x_mean[active]
+  intercept_se = math.sqrt(sigma2 / n + float(x_mean @ cov @ x_mean))
+
+  values = np.concatenate([[fit.intercept], fit.coef])
+  std_errors = np.concatenate([[intercept_se], std_errors])
+  coeffs = []
+  for i in range(len(values)):
+    name = names[i] if i < len(names) else f"coef_{i}"
+    if std_errors[i] > 0:
+      t_value = values[i] / std_errors[i]
+      p_value = 2 * stats.t.sf(abs(t_value), df_resid)
+    else:
+      t_value = 0.0
+      p_value = 1.0
+    coeffs.append(CoefficientInfo(
+      name = name,
+      value = float(values[i]),
+      std_error = float(std_errors[i]),
+      t_value = float(t_value),
+      p_value = float(p_value),
+      is_significant = float(p_value) < 0.05
+    ))
+
+  if df > 0:
+    f_statistic = ((sst - ssr) / df) / (ssr / df_resid)
+    f_pvalue = float(stats.f.sf(f_statistic, df, df_resid))
+  else:
+    f_statistic = 0.0
+    f_pvalue = 1.0
+
+  dw_stat = durbin_watson(resid)
+  has_autocorr = dw_stat < 1.5 or dw_stat > 2.5
+  r_squared = 1 - ssr / sst
+
+  log(
+    f"{method.value}: alpha = {fit.alpha:.4g}, {len(active)} of {p} lagged columns kept, "
+    f"r_squared = {r_squared:.4f}, dw = {dw_stat:.4f}"
+  )
+
+  if artifacts is not None:
+    artifacts.record_fit(FittedModel(
+      kind = kind,
+      y = y_clean,
+      X = design,
+      names = names,
+      params = values,
+      resid = resid,
+      lags = max_lags,
+      spec = spec or {}
+    ))
+
+  return RegressionResult(
+    coefficients = coeffs,
+    r_squared = float(r_squared),
+    adj_r_squared = float(1 - (ssr / df_resid) / (sst / (n - 1))),
+    f_statistic = float(f_statistic),
+    f_pvalue = f_pvalue,
+    durbin_watson = DurbinWatsonResult(
+      statistic = float(dw_stat),
+      has_autocorrelation = has_autocorr
+    ),
+    n_obs = n,
+    has_lags = True,
+    uses_newey_west = False,
+    regularization = RegularizationInfo(
+      method = method,
+      alpha = fit.alpha,
+      l1_ratio = l1_ratio,
+      max_lags = max_lags,
+      n_candidates = p,
+      n_nonzero = len(active),
+      effective_df = df,
+      cv_folds = cv_folds,
+      alphas = fit.alphas.tolist(),
+      cv_mse = fit.cv_mse.tolist()
+    )
+  )
+
+
+def penalty_l1_ratio(method: LagSelection, l1_ratio: float) -> float:
+  if method == LagSelection.RIDGE:
+    return 0.0
+  if method == LagSelection.LASSO:
+    return 1.0
+  return l1_ratio
+
+
+# penalty selected by forward-chaining cross-validation over a log grid
+# from the smallest alpha that zeroes every coefficient, then refitted
+# on the full sample along the same warm-started path
+def elastic_net_cv(
+  X: np.ndarray,
+  y: np.ndarray,
+  l1_ratio: float,
+  n_folds: int = 5,
+  gap: int = 0,
+  n_alphas: int = N_ALPHAS
+) -> PenalizedFit:
+  _, xty, x_mean, x_scale, _ = _standardize(X, y)
+  alphas = alpha_grid(xty, l1_ratio, n_alphas)
+
+  errors = np.empty((n_folds, n_alphas))
+  for fold, (train_end, test_start, test_end) in enumerate(time_series_folds(len(y), n_folds, gap)):
+    intercepts, coefs = elastic_net_path(X[:train_end], y[:train_end], alphas, l1_ratio)
+    predicted = intercepts[:, None] + coefs @ X[test_start:test_end].T
+    errors[fold] = np.mean((y[test_start:test_end] - predicted) ** 2, axis = 1)
+
+  cv_mse = errors.mean(axis = 0)
+  best = int(np.argmin(cv_mse))
+
+  intercepts, coefs = elastic_net_path(X, y, alphas[:best + 1], l1_ratio)
+
+  return PenalizedFit(
+    alpha = float(alphas[best]),
+    l1_ratio = l1_ratio,
+    intercept = float(intercepts[-1]),
+    coef = coefs[-1],
+    alphas = alphas,
+    cv_mse = cv_mse,
+    x_mean = x_mean,
+    x_scale = x_scale
+  )
+
+
+# (train_end, test_start, test_end) for n_folds consecutive validation
+# blocks at the end of the sample. each block is scored on a fit to the
+# rows before it, less `gap` rows so that lagged columns of the block
+# do not reach into the training responses
+def time_series_folds(n: int, n_folds: int, gap: int = 0) -> list[tuple[int, int, int]]:
+  min_train = n // (n_folds + 1)
+  test_size = (n - min_train - gap) // n_folds
+  if test_size < 1:
+    raise ValueError(f"{n} rows are too few for {n_folds} time series folds")
+
+  folds = []
+  for fold in range(n_folds):
+    test_start = n - (n_folds - fold) * test_size
+    folds.append((test_start - gap, test_start, test_start + test_size))
+  return folds
+
+
+def alpha_grid(xty: np.ndarray, l1_ratio: float, n_alphas: int = N_ALPHAS) -> np.ndarray:
+  # ridge never zeroes a coefficient: start from the glmnet floor of the
+  # l1 weight and run the grid three decades further, close to OLS
+  if l1_ratio == 0:
+    alpha_max = float(np.max(np.abs(xty))) / 1e-3
+    min_ratio = ALPHA_MIN_RATIO ** 2
+  else:
+    alpha_max = float(np.max(np.abs(xty))) / max(l1_ratio, 1e-3)
+    min_ratio = ALPHA_MIN_RATIO
+  return alpha_max * np.logspace(0, math.log10(min_ratio), n_alphas)
+
+
+# intercepts (n_alphas,) and coefficients (n_alphas, p) on the original
+# scale. ridge is solved in closed form from one eigendecomposition; any
+# l1 weight uses coordinate descent warm-started from the previous alpha
+def elastic_net_path(
+  X: np.ndarray,
+  y: np.ndarray,
+  alphas: np.ndarray,
+  l1_ratio: float,
+  tol: float = CD_TOLERANCE
+) -> tuple[np.ndarray, np.ndarray]:
+  gram, xty, x_mean, x_scale, y_mean = _standardize(X, y)
+
+  if l1_ratio == 0:
+    eigenvalues, vectors = np.linalg.eigh(gram)
+    rotated = vectors.T @ xty
+    path = (rotated / (eigenvalues + alphas[:, None])) @ vectors.T
+  else:
+    threshold = tol * max(float(np.var(y)), np.finfo(float).tiny)
+    beta = np.zeros(len(xty))
+    path = np.empty((len(alphas), len(xty)))
+    for i, alpha in enumerate(alphas):
+      coordinate_descent(gram, xty, alpha, l1_ratio, beta, threshold)
+      path[i] = beta
+
+  coefs = path / x_scale
+  intercepts = y_mean - coefs @ x_mean
+  return intercepts, coefs
+
+
+# covariance-update coordinate descent on the standardized problem,
+# updating beta in place. sweeps alternate between every coordinate and
+# the current nonzero set until no coordinate of a full sweep moves by a
+# squared step above tol (glmnet's rule, with tol scaled by var(y))
+def coordinate_descent(
+  gram: np.ndarray,
+  xty: np.ndarray,
+  alpha: float,
+  l1_ratio: float,
+  beta: np.ndarray,
+  tol: float = CD_TOLERANCE,
+  max_sweeps: int = CD_MAX_SWEEPS
+) -> int:
+  l1 = alpha * l1_ratio
+  diagonal = np.diag(gram).tolist()
+  denominators = [d + alpha * (1 - l1_ratio) for d in diagonal]
+  # gram is symmetric: contiguous rows stand in for its columns
+  rows = list(gram)
+  # xty - gram @ beta, kept current as coordinates move
+  gradient = xty - gram @ beta
+
+  def sweep(coordinates) -> float:
+    largest = 0.0
+    for j in coordinates:
+      if denominators[j] <= 0:
+        continue
+      old = float(beta[j])
+      z = float(gradient[j]) + diagonal[j] * old
+      new = math.copysign(max(abs(z) - l1, 0.0), z) / denominators[j]
+      if new != old:
+        gradient[:] -= rows[j] * (new - old)
+        beta[j] = new
+        largest = max(largest, (new - old) ** 2)
+    return largest
+
+  sweeps = 0
+  everything = range(len(beta))
+  while sweeps < max_sweeps:
+    sweeps = sweeps + 1
+    if sweep(everything) < tol:
+      break
+    active = np.flatnonzero(beta)
+    while sweeps < max_sweeps:
+      sweeps = sweeps + 1
+      if sweep(active) < tol:
+        break
+
+  if sweeps >= max_sweeps:
+    log(f"[WARNING] coordinate descent stopped after {max_sweeps} sweeps at alpha = {alpha:.4g}")
+  return sweeps
+
+
+# ===== HELPER METHODS =====
+
+# cross-products of the columns standardized to mean 0 and variance 1
+# and of the centered response, both divided by n
+def _standardize(X: np.ndarray, y: np.ndarray):
+  n = len(y)
+  x_mean = X.mean(axis = 0)
+  x_scale = X.std(axis = 0)
+  x_scale[x_scale == 0] = 1.0
+  Z = (X - x_mean) / x_scale
+  y_mean = float(y.mean())
+
+  gram = Z.T @ Z / n
+  xty = Z.T @ (y - y_mean) / n
+  return gram, xty, x_mean, x_scale, y_mean
@@ -0,0 +1,185 @@
+import math
+from dataclasses import dataclass
+from typing import Optional
+import numpy as np
+from algorithms.artifacts import ArtifactStore
+from algorithms.design_matrix import lagged_design
+from algorithms.stationarity_tests import adf_test
+from algorithms.critical_values import finite_sample_lookup
+from algorithms.pvalues import mackinnon_pvalues, mackinnon_critical_values
+from models.responses import AdfTestResult, AdfCriticalValues, CriticalValueMethod
+
+# ADF design columns: [Δu_t, const, u_{t-1}, Δu_{t-1}, ..., Δu_{t-P}]
+ADF_TARGET = 0
+ADF_CONST = 1
+ADF_LEVEL = 2
+
+
+@dataclass
+class SegmentFit:
+  params: np.ndarray
+  ssr: float
+  nobs: int
+  xx_inv: np.ndarray
+
+
+# cumulative sums and cross-products of the columns of Z over the full
+# sample: the moments of any row window [start, end) are one subtraction,
+# so a window regression costs O(k^2) to assemble plus a k x k solve
+class SegmentIndex:
+
+  def __init__(self, Z: np.ndarray):
+    Z = np.asarray(Z, dtype = float)
+    self.n, self.width = Z.shape
+    self.cross = np.zeros((self.n + 1, self.width, self.width))
+    np.cumsum(Z[:, :, None] * Z[:, None, :], axis = 0, out = self.cross[1:])
+
+  def moments(self, start: int, end: int) -> np.ndarray:
+    return self.cross[end] - self.cross[start]
+
+  def ols(self, start: int, end: int, y_col: int, x_cols: list[int]) -> SegmentFit:
+    moments = self.moments(start, end)
+    xx_inv = np.linalg.inv(moments[np.ix_(x_cols, x_cols)])
+    xy = moments[x_cols, y_col]
+    params = xx_inv @ xy
+    return SegmentFit(
+      params = params,
+      ssr = max(float(moments[y_col, y_col] - xy @ params), 0.0),
+      nobs = end - start,
+      xx_inv = xx_inv
+    )
+
+  # SSR of the windows [start, end) for many ends at once
+  def window_ssr(self, start: int, ends: np.ndarray, y_col: int, x_cols: list[int]) -> np.ndarray:
+    moments = self.cross[ends] - self.cross[start]
+    xx = moments[:, x_cols][:, :, x_cols]
+    xy = moments[:, x_cols, y_col]
+    params = np.linalg.solve(xx, xy[..., None])[..., 0]
+    values = moments[:, y_col, y_col] - np.einsum("ij,ij->i", xy, params)
+    return np.maximum(values, 0.0)
+
+
+# default ADF lag bound of statsmodels (schwert) for a series of length n
+def adf_maxlag(n: int, ntrend: int = 1) -> int:
+  maxlag = int(math.ceil(12.0 * (n / 100.0) ** 0.25))
+  return min(n // 2 - ntrend - 1, maxlag)
+
+
+# full-sample ADF design of u, row r for t = r + 1; lags that reach before
+# the sample are zero and never enter a window regression. columns other
+# than the constant are centered, which leaves the level t statistic and
+# every SSR unchanged
+def adf_design(u: np.ndarray, maxlag: int) -> np.ndarray:
+  du = np.diff(u)
+  rows = len(du)
+  Z = np.zeros((rows, 3 + maxlag))
+  Z[:, ADF_TARGET] = du
+  Z[:, ADF_CONST] = 1.0
+  Z[:, ADF_LEVEL] = u[:-1]
+  for lag in range(1, maxlag + 1):
+    Z[lag:, ADF_LEVEL + lag] = du[:-lag]
+
+  columns = np.arange(Z.shape[1]) != ADF_CONST
+  Z[:, columns] = Z[:, columns] - Z[:, columns].mean(axis = 0)
+  return Z
+
+
+# ADF (constant, AIC lag selection) of u[a:a + length] from the index of
+# the full series u; reproduces statsmodels adfuller on the segment
+def adf_on_window(
+  index: SegmentIndex,
+  a: int,
+  length: int,
+  critical_values: CriticalValueMethod = CriticalValueMethod.ASYMPTOTIC
+) -> AdfTestResult:
+  maxlag = adf_maxlag(length)
+  if maxlag < 0:
+    raise ValueError("sample size is too short to use selected regression component")
+
+  # lag search on the common sample of the longest lag
+  end = a + length - 1
+  best = None
+  for lag in range(maxlag + 1):
+    x_cols = [ADF_CONST, ADF_LEVEL] + [ADF_LEVEL + j for j in range(1, lag + 1)]
+    fit = index.ols(a + maxlag, end, ADF_TARGET, x_cols)
+    aic = fit.nobs * (math.log(2 * math.pi) + math.log(fit.ssr / fit.nobs) + 1) + 2 * len(x_cols)
+    if best is None or aic < best[0]:
+      best = (aic, lag)
+  used_lag = best[1]
+
+  x_cols = [ADF_CONST, ADF_LEVEL] + [ADF_LEVEL + j for j in range(1, used_lag + 1)]
+  fit = index.ols(a + used_lag, end, ADF_TARGET, x_cols)
+  sigma2 = fit.ssr / (fit.nobs - len(x_cols))
+  stat = float(fit.params[1] / math.sqrt(sigma2 * fit.xx_inv[1, 1]))
+
+  p_value = float(mackinnon_pvalues(stat, "c"))
+  critical = mackinnon_critical_values("c", nobs = fit.nobs)
+  if critical_values == CriticalValueMethod.FINITE_SAMPLE:
+    finite = finite_sample_lookup("adf", "c", length, stat, used_lag)
+    if finite is not None:
+      p_value, critical = finite
+  return AdfTestResult(
+    test_statistic = stat,
+    p_value = p_value,
+    used_lag = used_lag,
+    n_obs = fit.nobs,
+    critical_values = AdfCriticalValues(
+      one_percent = float(critical[0]),
+      five_percent = float(critical[1]),
+      ten_percent = float(critical[2])
+    ),
+    is_stationary = p_value < 0.05
+  )
+
+
+# ADF of the order-d difference of series `index` of a window store,
+# answered from the root store's index of that difference. flat windows
+# keep adf_test's constant-series handling
+def window_adf_test(
+  artifacts: ArtifactStore,
+  series_index: int,
+  order: int,
+  critical_values: CriticalValueMethod = CriticalValueMethod.ASYMPTOTIC
+) -> AdfTestResult:
+  data = artifacts.diff(series_index, order)
+  if np.ptp(data) < 1e-10:
+    return adf_test(data, critical_values)
+
+  root, offset = artifacts.root()
+  series_index = artifacts.root_index(series_index)
+  u = root.diff(series_index, order)
+  index = root.memo(
+    ("adf_index", series_index, order),
+    lambda: SegmentIndex(adf_design(u, max(adf_maxlag(len(u)), 0)))
+  )
+  # order-d differences of the window start at the same offset
+  return adf_on_window(index, offset, len(data), critical_values)
+
+
+# segment index of the lag design [const, x_t, y lags, x lags, y] of the
+# regression of series 0 on 1..k, built on the root store's copies of the
+# series, each taken at the difference order in `orders` and all aligned
+# on their common tail. the same regression on a window store is rows
+# [offset, offset + n) of it, so its AIC lag search reads candidate
+# moments from one index per request. None for full-sample stores,
+# whose own design is no larger
+def window_lag_index(
+  artifacts: ArtifactStore,
+  orders: list[int],
+  max_lags: int,
+  add_constant: bool = True
+) -> Optional[tuple[SegmentIndex, int]]:
+  if not artifacts.is_window:
+    return None
+  root, offset = artifacts.root()
+  columns = tuple(artifacts.root_index(i) for i in range(len(orders)))
+
+  def build() -> SegmentIndex:
+    series = [root.diff(i, order) for i, order in zip(columns, orders)]
+    length = min(len(s) for s in series)
+    series = [s[-length:] for s in series]
+    design = lagged_design(series, max_lags, current = series[1:], constant = add_constant, by_lag = False, trim = False)
+    return SegmentIndex(np.column_stack([design, series[0]]))
+
+  index = root.memo(("lag_index", columns, tuple(orders), max_lags, add_constant), build)
+  return index, offset
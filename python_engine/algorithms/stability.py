@@ -0,0 +1,163 @@
+import math
+from typing import Optional
+import numpy as np
+from algorithms.integration import log
+from algorithms.artifacts import FittedModel
+from models.domain import MonitorStep
+from models.responses import StabilityResult
+
+# brown, durbin & evans (1975) CUSUM boundary constants
+CUSUM_CRITICAL = {0.01: 1.143, 0.05: 0.948, 0.10: 0.850}
+# edgerton & wells (1994) approximation of the CUSUM of squares critical
+# value, c0 = a / sqrt(n) + b / n + c / n^1.5 with n = (T - k) / 2 - 1
+CUSUM_SQUARES_SCALARS = {
+  0.01: (1.6276236, -0.6703724, -1.2365861),
+  0.05: (1.3581015, -0.6701218, -0.8858694),
+  0.10: (1.2238734, -0.6700069, -0.7351697)
+}
+
+
+# recursive least squares: each update is a rank-one (sherman-morrison)
+# step on P = (X'X)^-1, O(k^2) per observation
+class RecursiveLeastSquares:
+
+  def __init__(self, X: np.ndarray, y: np.ndarray):
+    self.P = np.linalg.inv(X.T @ X)
+    self.params = self.P @ (X.T @ y)
+    self.nobs = len(y)
+
+  # standardized one-step-ahead prediction error of the new observation,
+  # then absorb it
+  def update(self, x: np.ndarray, y: float) -> float:
+    Px = self.P @ x
+    scale = 1.0 + x @ Px
+    error = y - x @ self.params
+    self.params = self.params + Px * (error / scale)
+    self.P = self.P - np.outer(Px, Px) / scale
+    self.nobs = self.nobs + 1
+    return error / math.sqrt(scale)
+
+
+# recursive residuals of y on X; the recursion starts from the first
+# full-rank block of rows, so the residuals cover y[start:]
+def recursive_residuals(y: np.ndarray, X: np.ndarray) -> tuple[np.ndarray, int, RecursiveLeastSquares]:
+  n, k = X.shape
+  start = k
+  while start < n and np.linalg.matrix_rank(X[:start]) < k:
+    start = start + 1
+  if n - start < 2:
+    raise ValueError(f"not enough observations for recursive residuals (n={n}, k={k})")
+
+  rls = RecursiveLeastSquares(X[:start], y[:start])
+  residuals = np.empty(n - start)
+  for t in range(start, n):
+    residuals[t - start] = rls.update(X[t], y[t])
+
+  return residuals, start, rls
+
+
+# half-width of the CUSUM band at recursive step r = 1..; the lines run
+# from ±a sqrt(T - k) to ±3a sqrt(T - k) over the sample and extend
+# linearly past it
+def cusum_bound(step: np.ndarray, n_recursive: int, significance: float = 0.05) -> np.ndarray:
+  a = CUSUM_CRITICAL[significance]
+  root = math.sqrt(n_recursive)
+  return a * root + 2 * a * step / root
+
+
+def cusum_squares_critical(n_recursive: int, significance: float = 0.05) -> float:
+  a, b, c = CUSUM_SQUARES_SCALARS[significance]
+  n = 0.5 * n_recursive - 1
+  return a / n ** 0.5 + b / n + c / n ** 1.5
+
+
+# brown-durbin-evans CUSUM and CUSUM of squares tests over the sample a
+# builder fitted; paths are kept only on request
+def stability_tests(
+  model: FittedModel,
+  significance: float = 0.05,
+  keep_paths: bool = False
+) -> StabilityResult:
+  residuals, start, _ = recursive_residuals(model.y, model.X)
+  n_recursive = len(residuals)
+  step = np.arange(1, n_recursive + 1)
+
+  cusum = np.cumsum(residuals) / np.std(residuals, ddof = 1)
+  squares = np.cumsum(residuals ** 2)
+  cusum_squares = squares / squares[-1]
+
+  c0 = cusum_squares_critical(n_recursive, significance)
+  cusum_out = np.abs(cusum) > cusum_bound(step, n_recursive, significance)
+  squares_out = np.abs(cusum_squares - step / n_recursive) > c0
+
+  first_cusum = _first_crossing(cusum_out, start)
+  first_squares = _first_crossing(squares_out, start)
+  log(f"stability ({model.kind}): cusum crossing {first_cusum}, cusum of squares crossing {first_squares}")
+
+  return StabilityResult(
+    significance = significance,
+    n_recursive = n_recursive,
+    start_index = start,
+    cusum_critical = CUSUM_CRITICAL[significance],
+    cusum_squares_critical = c0,
+    cusum_stable = first_cusum is None,
+    cusum_squares_stable = first_squares is None,
+    first_cusum_crossing = first_cusum,
+    first_cusum_squares_crossing = first_squares,
+    cusum = cusum.tolist() if keep_paths else None,
+    cusum_squares = cusum_squares.tolist() if keep_paths else None
+  )
+
+
+# streaming monitor: continues the recursion past the fitted sample, one
+# O(k^2) update per new (x, y). the CUSUM uses the in-sample residual
+# scale and boundary lines extended beyond the sample; the CUSUM of
+# squares keeps its in-sample normalization, so under stability it keeps
+# tracking the line step / (T - k)
+class StabilityMonitor:
+
+  def __init__(self, model: FittedModel, significance: float = 0.05):
+    residuals, start, rls = recursive_residuals(model.y, model.X)
+    self.significance = significance
+    self.n_recursive = len(residuals)
+    self.index = len(model.y) - 1
+    self.sigma = float(np.std(residuals, ddof = 1))
+    self.cusum = float(np.sum(residuals)) / self.sigma
+    self.squares_total = float(residuals @ residuals)
+    self.squares = self.squares_total
+    self.step = self.n_recursive
+    self.cusum_squares_critical = cusum_squares_critical(self.n_recursive, significance)
+    self._rls = rls
+
+  @property
+  def params(self) -> np.ndarray:
+    return self._rls.params
+
+  def update(self, x: np.ndarray, y: float) -> MonitorStep:
+    residual = self._rls.update(np.asarray(x, dtype = float), float(y))
+    self.index = self.index + 1
+    self.step = self.step + 1
+    self.cusum = self.cusum + residual / self.sigma
+    self.squares = self.squares + residual ** 2
+
+    cusum_squares = self.squares / self.squares_total
+    bound = float(cusum_bound(np.array(self.step), self.n_recursive, self.significance))
+    drift = cusum_squares - self.step / self.n_recursive
+
+    return MonitorStep(
+      index = self.index,
+      recursive_residual = float(residual),
+      cusum = float(self.cusum),
+      cusum_squares = float(cusum_squares),
+      cusum_crossed = bool(abs(self.cusum) > bound),
+      cusum_squares_crossed = bool(abs(drift) > self.cusum_squares_critical)
+    )
+
+
+# ===== HELPER METHODS =====
+
+def _first_crossing(crossed: np.ndarray, start: int) -> Optional[int]:
+  hits = np.flatnonzero(crossed)
+  if len(hits) == 0:
+    return None
+  return int(hits[0]) + start
@@ -1,11 +1,21 @@
-import sys
 import numpy as np
 from statsmodels.tsa.stattools import (
   adfuller,
   kpss,
   zivot_andrews
 )
+from algorithms.console import log
+from algorithms.critical_values import finite_sample_lookup
+from algorithms.pvalues import (
+  mackinnon_pvalues,
+  mackinnon_critical_values,
+  kpss_pvalues,
+  kpss_critical_values,
+  za_pvalues,
+  za_critical_values
+)
 from models.responses import (
+  CriticalValueMethod,
   AdfTestResult,
   AdfCriticalValues,
   KpssCriticalValues,
@@ -13,14 +23,14 @@ from models.responses import (
   ZivotAndrewsResult
 )
 
-def log(msg):
-  print(msg, file=sys.stderr)
-
 def _is_constant(data: np.ndarray, tolerance: float = 1e-10) -> bool:
   """Check if series is constant (no variation)"""
   return np.std(data) < tolerance or np.ptp(data) < tolerance 
 
-def adf_test(data: np.ndarray) -> AdfTestResult:
+def adf_test(
+  data: np.ndarray,
+  critical_values: CriticalValueMethod = CriticalValueMethod.ASYMPTOTIC
+) -> AdfTestResult:
   if _is_constant(data):
     log("series is constant, treating as I(0) stationary")
     return AdfTestResult(
@@ -37,19 +47,24 @@ def adf_test(data: np.ndarray) -> AdfTestResult:
     )
   
   result = adfuller(data, autolag='AIC')
-  log(f"adf: stat={result[0]:.3f}, p={result[1]:.4f}")
-  critical = AdfCriticalValues(
-    one_percent = float(result[4]['1%']),
-    five_percent = float(result[4]['5%']),
-    ten_percent = float(result[4]['10%'])
-  )
+  p_value = float(mackinnon_pvalues(result[0], "c"))
+  critical = mackinnon_critical_values("c", nobs = result[3])
+  if critical_values == CriticalValueMethod.FINITE_SAMPLE:
+    finite = finite_sample_lookup("adf", "c", len(data), result[0], int(result[2]))
+    if finite is not None:
+      p_value, critical = finite
+  log(f"adf: stat={result[0]:.3f}, p={p_value:.4f}")
   return AdfTestResult(
     test_statistic = float(result[0]),
-    p_value = float(result[1]),
+    p_value = p_value,
     used_lag = int(result[2]),
     n_obs = int(result[3]),
-    critical_values = critical,
-    is_stationary = result[1] < 0.05
+    critical_values = AdfCriticalValues(
+      one_percent = float(critical[0]),
+      five_percent = float(critical[1]),
+      ten_percent = float(critical[2])
+    ),
+    is_stationary = p_value < 0.05
   )
 
 """
@@ -67,7 +82,11 @@ def adf_test(data: np.ndarray) -> AdfTestResult:
 ⠸⢯⡿⠾⠃⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠘⠫⠋⠀
 communists will be happy - KPSS will help to find out the truth
 """
-def kpss_test(data: np.ndarray, regression: str = "c") -> KpssTestResult:
+def kpss_test(
+  data: np.ndarray,
+  regression: str = "c",
+  critical_values: CriticalValueMethod = CriticalValueMethod.ASYMPTOTIC
+) -> KpssTestResult:
   if _is_constant(data):
     log("series is constant, treating as I(0) stationary")
     return KpssTestResult(
@@ -84,24 +103,34 @@ def kpss_test(data: np.ndarray, regression: str = "c") -> KpssTestResult:
     ) 
 
   result = kpss(data, nlags = "auto", regression = regression)
-  is_stationary = result[1] > 0.05
-  log(f"kpss: stat={result[0]:.3f}, p={result[1]:.4f}")
+  p_value = float(kpss_pvalues(result[0], regression))
+  critical = kpss_critical_values(regression)
+  if critical_values == CriticalValueMethod.FINITE_SAMPLE:
+    finite = finite_sample_lookup("kpss", regression, len(data), result[0], int(result[2]), (0.01, 0.025, 0.05, 0.10))
+    if finite is not None:
+      p_value, critical = finite
+  is_stationary = p_value > 0.05
+  log(f"kpss: stat={result[0]:.3f}, p={p_value:.4f}")
   critical = KpssCriticalValues(
-    one_percent = result[3]["1%"],
-    two_and_half_percent = result[3]["2.5%"],
-    five_percent = result[3]["5%"],
-    ten_percent = result[3]["10%"],
+    one_percent = float(critical[0]),
+    two_and_half_percent = float(critical[1]),
+    five_percent = float(critical[2]),
+    ten_percent = float(critical[3]),
   )
   return KpssTestResult(
     kpss_stat = float(result[0]),
-    p_value = float(result[1]),
+    p_value = p_value,
     lags = int(result[2]),
     crit = critical,
     is_stationary = is_stationary
   )
 
 # not less than 20 elements in ds
-def zivot_andrews_test(data: np.ndarray, trend: str = 'c') -> ZivotAndrewsResult:
+def zivot_andrews_test(
+  data: np.ndarray,
+  trend: str = 'c',
+  critical_values: CriticalValueMethod = CriticalValueMethod.ASYMPTOTIC
+) -> ZivotAndrewsResult:
   if _is_constant(data):
     log("series is constant, ZA test skipped")
     return ZivotAndrewsResult(
@@ -118,19 +147,25 @@ def zivot_andrews_test(data: np.ndarray, trend: str = 'c') -> ZivotAndrewsResult
     )
 
   result = zivot_andrews(data, trim=0.15, maxlag=None, regression=trend)
-  log(f"ZA: stat={result[0]:.3f}, p={result[1]:.4f}, break={result[4]}")
+  p_value = float(za_pvalues(result[0], trend))
+  critical = za_critical_values(trend)
+  if critical_values == CriticalValueMethod.FINITE_SAMPLE:
+    finite = finite_sample_lookup("za", trend, len(data), result[0], int(result[3]))
+    if finite is not None:
+      p_value, critical = finite
+  log(f"ZA: stat={result[0]:.3f}, p={p_value:.4f}, break={result[4]}")
   
   critical = AdfCriticalValues(
-    one_percent=float(result[2]["1%"]),   
-    five_percent=float(result[2]["5%"]), 
-    ten_percent=float(result[2]["10%"])  
+    one_percent=float(critical[0]),   
+    five_percent=float(critical[1]), 
+    ten_percent=float(critical[2])  
   )
   
   return ZivotAndrewsResult(
     test_statistic=float(result[0]),
-    p_value=float(result[1]),
+    p_value=p_value,
     used_lag=int(result[3]),             
     breakpoint=int(result[4]),
     critical_values=critical,
-    is_stationary=result[1] < 0.05
+    is_stationary=p_value < 0.05
   )
\ No newline at end of file
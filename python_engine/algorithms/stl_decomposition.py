@@ -1,70 +1,429 @@
+from functools import lru_cache
+from typing import NamedTuple, Optional
 import numpy as np
+from scipy import sparse
 from algorithms.integration import log
 from models.responses import StlResult
-from statsmodels.tsa.seasonal import STL
+
+STL_SEASONAL = 13
+STL_INNER_ITER = 5 # statsmodels default for non-robust fits
+
+
+class StlKernel(NamedTuple):
+  n: int
+  period: int
+  seasonal_smoother: sparse.csr_matrix # (n + 2 * period) x n, cycle-subseries loess
+  low_pass_filter: sparse.csr_matrix # n x (n + 2 * period), ma(p) -> ma(p) -> ma(3)
+  low_pass_smoother: sparse.csr_matrix # n x n
+  trend_smoother: sparse.csr_matrix # n x n
+
 
 def detect_trend_and_seasonality(
   data: np.ndarray,
-  period: int = 52
+  period: Optional[int] = None,
+  expected_period: Optional[int] = None,
+  retain_components: bool = False
 ) -> StlResult:
-  n = len(data)
+  return detect_trend_and_seasonality_batch(
+    [data],
+    period = period,
+    expected_period = expected_period,
+    retain_components = retain_components
+  )[0]
+
+
+# period=None detects the seasonal period of every series from its periodogram;
+# series without a confirmed period get a trend-only decomposition.
+# components are only kept on the results when retain_components is set
+def detect_trend_and_seasonality_batch(
+  series_list: list[np.ndarray],
+  period: Optional[int] = None,
+  expected_period: Optional[int] = None,
+  retain_components: bool = False
+) -> list[StlResult]:
+  results: list[StlResult] = [None] * len(series_list)
+
+  by_length: dict[int, list[int]] = {}
+  for idx, series in enumerate(series_list):
+    by_length.setdefault(len(series), []).append(idx)
+
+  # series of equal length and period share one kernel and one block of products
+  groups: dict[tuple[int, int], list[int]] = {}
+  for n, indices in by_length.items():
+    if n < 24:
+      log("insufficient data for STL decomposition (n < 24)")
+      for idx in indices:
+        results[idx] = _empty_stl_result()
+      continue
+
+    if period is not None:
+      periods = np.full(len(indices), _clip_period(period, n))
+    else:
+      block = np.vstack([np.asarray(series_list[idx], dtype = float) for idx in indices])
+      periods = detect_seasonal_periods(
+        block,
+        max_period = n // 2 - 1,
+        expected_period = expected_period
+      )
+
+    for idx, series_period in zip(indices, periods):
+      groups.setdefault((n, int(series_period)), []).append(idx)
+
+  for (n, group_period), indices in groups.items():
+    block = np.vstack([np.asarray(series_list[idx], dtype = float) for idx in indices])
+
+    try:
+      if group_period >= 2:
+        log(f"STL using period: {group_period}")
+        trend, seasonal, resid = batch_stl(block, group_period)
+      else:
+        log("no seasonal period detected: trend-only decomposition")
+        trend, seasonal, resid = _trend_only(block)
+    except Exception as e:
+      log(f"STL decomposition failed: {e}")
+      for idx in indices:
+        results[idx] = _empty_stl_result()
+      continue
+
+    trend_strength = _strength(np.var(trend, axis = 1), np.var(resid, axis = 1))
+    seasonal_strength = _strength(np.var(seasonal, axis = 1), np.var(resid, axis = 1))
+
+    for row, idx in enumerate(indices):
+      has_trend = bool(trend_strength[row] > 0.2)
+      has_seasonality = bool(seasonal_strength[row] > 0.2)
+
+      log(f"STL: trend_strength={trend_strength[row]:.3f}, seasonal_strength={seasonal_strength[row]:.3f}")
+      log(f"STL: has_trend={has_trend}, has_seasonality={has_seasonality}")
+
+      results[idx] = StlResult(
+        has_trend = has_trend,
+        has_seasonality = has_seasonality,
+        trend_strength = float(trend_strength[row]),
+        seasonal_strength = float(seasonal_strength[row]),
+        period = group_period if group_period >= 2 else None
+      )
+
+      if retain_components:
+        results[idx].trend_component = trend[row].copy()
+        results[idx].seasonal_component = seasonal[row].copy()
+        results[idx].residual_component = resid[row].copy()
+
+  return results
+
+
+# periodogram candidates confirmed by a local ACF peak, for a (m x n) block.
+# both come from one zero-padded FFT per series (acf = irfft(|fft|^2)).
+# returns 0 for series without a significant period
+def detect_seasonal_periods(
+  block: np.ndarray,
+  max_period: Optional[int] = None,
+  expected_period: Optional[int] = None,
+  n_candidates: int = 5
+) -> np.ndarray:
+  block = np.atleast_2d(np.asarray(block, dtype = float))
+  m, n = block.shape
+
+  if max_period is None:
+    max_period = n // 2
+  max_period = min(max_period, n // 2)
+
+  periods = np.zeros(m, dtype = int)
+  if max_period < 2:
+    return periods
+
+  time = np.arange(n, dtype = float)
+  design = np.column_stack([np.ones(n), time])
+  beta, _, _, _ = np.linalg.lstsq(design, block.T, rcond = None)
+  detrended = block - (design @ beta).T
+
+  nfft = 1 << int(np.ceil(np.log2(2 * n)))
+  spectrum = np.fft.rfft(detrended, n = nfft, axis = 1)
+  power = spectrum.real ** 2 + spectrum.imag ** 2
+
+  acf = np.fft.irfft(power, n = nfft, axis = 1)[:, :max_period + 2]
+  variance = acf[:, 0].copy()
+  constant = variance <= 1e-12 * max(1.0, float(np.max(np.abs(block))) ** 2)
+  variance[constant] = 1.0
+  acf = acf / variance[:, None]
+
+  # local maxima of the periodogram among admissible periods
+  freq_idx = np.arange(power.shape[1])
+  with np.errstate(divide = "ignore"):
+    freq_periods = nfft / freq_idx
+  admissible = (freq_idx > 0) & (freq_periods >= 2) & (freq_periods <= max_period)
+  peaks = np.zeros_like(power, dtype = bool)
+  peaks[:, 1:-1] = (power[:, 1:-1] >= power[:, :-2]) & (power[:, 1:-1] >= power[:, 2:])
+  masked = np.where(peaks & admissible[None, :], power, -np.inf)
+
+  k = min(n_candidates, masked.shape[1])
+  top = np.argpartition(-masked, k - 1, axis = 1)[:, :k]
+  top_power = np.take_along_axis(masked, top, axis = 1)
+  candidate_periods = nfft / np.maximum(top, 1)
+
+  # refine every candidate to the ACF maximum within +-20% of its period
+  lo = np.clip(np.floor(candidate_periods * 0.8), 2, max_period).astype(int)
+  hi = np.clip(np.ceil(candidate_periods * 1.2), 2, max_period).astype(int)
+  width = int(np.max(hi - lo)) + 1
+  lags = lo[..., None] + np.arange(width)
+  in_window = lags <= hi[..., None]
+  lags = np.minimum(lags, max_period)
+
+  rows = np.arange(m)[:, None, None]
+  window_acf = np.where(in_window, acf[rows, lags], -np.inf)
+  best = np.argmax(window_acf, axis = 2)
+  best_lag = np.take_along_axis(lags, best[..., None], axis = 2)[..., 0]
+
+  rows = np.arange(m)[:, None]
+  score = acf[rows, best_lag]
+  is_local_peak = (score >= acf[rows, best_lag - 1]) & (score >= acf[rows, best_lag + 1])
+
+  # a seasonal peak must also rise above the half-cycle trough, which rejects
+  # the slowly decaying ACF wiggles of persistent non-seasonal series
+  trough = acf[rows, np.maximum(best_lag // 2, 1)]
+
+  threshold = max(0.1, 3.0 / np.sqrt(n))
+  confirmed = np.isfinite(top_power) & is_local_peak & (score > threshold)
+  confirmed &= score - trough > 2 * threshold
+  confirmed &= ~constant[:, None]
+
+  ranking = np.where(confirmed, score, -np.inf)
+  if expected_period is not None:
+    near_expected = confirmed & (np.abs(best_lag - expected_period) <= 0.2 * expected_period)
+    prefer = near_expected.any(axis = 1)
+    ranking = np.where(prefer[:, None] & ~near_expected, -np.inf, ranking)
+
+  choice = np.argmax(ranking, axis = 1)
+  found = np.isfinite(ranking[np.arange(m), choice])
+  periods[found] = best_lag[np.arange(m), choice][found]
+
+  return periods
+
+
+def find_period_via_acf(
+  data: np.ndarray,
+  max_period: Optional[int] = None,
+  expected_period: Optional[int] = None
+) -> int:
+  period = int(detect_seasonal_periods(
+    np.asarray(data, dtype = float)[None, :],
+    max_period = max_period,
+    expected_period = expected_period
+  )[0])
+
+  if period < 2:
+    period = _fallback_period(len(data))
+    log(f"no significant period found, fallback period: {period}")
+  else:
+    log(f"detected period: {period}")
+
+  return period
 
-  if n < 24:
-    log("insufficient data for STL decomposition (n < 24)")
-    return StlResult(
-      has_trend = False,
-      has_seasonality = False,
-      trend_strength = 0.0,
-      seasonal_strength = 0.0
-    )
 
+# non-robust STL (Cleveland et al., 1990) applied to a (m x n) block of series.
+# without robustness weights every STL step is a fixed linear smoother, so the
+# loess neighbourhoods and tricube weights are built once per (n, period, seasonal)
+def batch_stl(
+  block: np.ndarray,
+  period: int,
+  seasonal: int = STL_SEASONAL,
+  inner_iter: int = STL_INNER_ITER
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+  block = np.atleast_2d(np.asarray(block, dtype = float))
+  n = block.shape[1]
+  kernel = stl_kernel(n, period, seasonal)
+
+  y = block.T
+  trend = np.zeros_like(y)
+  season = np.zeros_like(y)
+
+  for _ in range(inner_iter):
+    cycle = kernel.seasonal_smoother @ (y - trend)
+    low_pass = kernel.low_pass_smoother @ (kernel.low_pass_filter @ cycle)
+    season = cycle[period:period + n] - low_pass
+    trend = kernel.trend_smoother @ (y - season)
+
+  resid = y - trend - season
+  return trend.T, season.T, resid.T
+
+
+@lru_cache(maxsize = 32)
+def stl_kernel(n: int, period: int, seasonal: int = STL_SEASONAL) -> StlKernel:
+  if period < 2:
+    raise ValueError("period must be a positive integer >= 2")
+  if seasonal < 3 or seasonal % 2 == 0:
+    raise ValueError("seasonal must be an odd positive integer >= 3")
+
+  trend_len = _trend_length(period, seasonal)
+  low_pass_len = period + 1
+  low_pass_len += (low_pass_len % 2) == 0
+
+  log(f"building STL kernel: n={n}, period={period}, seasonal={seasonal}")
+
+  return StlKernel(
+    n = n,
+    period = period,
+    seasonal_smoother = _cycle_subseries_smoother(n, period, seasonal),
+    low_pass_filter = _low_pass_filter(n, period),
+    low_pass_smoother = _loess_smoother(n, low_pass_len),
+    trend_smoother = _loess_smoother(n, trend_len)
+  )
+
+
+# ===== HELPER METHODS =====
+
+def _empty_stl_result() -> StlResult:
+  return StlResult(
+    has_trend = False,
+    has_seasonality = False,
+    trend_strength = 0.0,
+    seasonal_strength = 0.0
+  )
+
+
+def _fallback_period(n: int) -> int:
+  # yearly cycle of weekly data, then monthly and daily conventions
+  for period in (52, 12, 7):
+    if n >= 2 * period:
+      return period
+  return max(2, n // 3)
+
+
+def _trend_length(period: int, seasonal: int = STL_SEASONAL) -> int:
+  trend_len = int(np.ceil(1.5 * period / (1 - 1.5 / seasonal)))
+  trend_len += (trend_len % 2) == 0
+  return trend_len
+
+
+def _trend_only(block: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+  n = block.shape[1]
+  smoother = _loess_smoother(n, _trend_length(_fallback_period(n)))
+  trend = (smoother @ block.T).T
+  return trend, np.zeros_like(block), block - trend
+
+
+def _clip_period(period: int, n: int) -> int:
   if period < 2:
     period = 2
   if period >= n // 2:
     period = n // 3
+  return period
 
-  log(f"STL using period: {period}")
 
-  try:
-    stl = STL(data, period=period, seasonal=13)
-    result = stl.fit()
+def _strength(component_var: np.ndarray, residual_var: np.ndarray) -> np.ndarray:
+  total = component_var + residual_var
+  strength = np.zeros_like(total)
+  positive = total > 0
+  strength[positive] = component_var[positive] / total[positive]
+  return strength
 
-    trend_var = np.var(result.trend)
-    residual_var = np.var(result.resid)
 
-    if trend_var + residual_var > 0:
-      trend_strength = trend_var / (trend_var + residual_var)
-    else:
-      trend_strength = 0.0
+# tricube loess weights (degree 1) for evaluation points xs over windows
+# [nleft, nright]; all positions are 1-based as in the original fortran.
+# rows that cannot be estimated are returned as None in `valid`
+def _loess_rows(
+  n: int,
+  span: int,
+  xs: np.ndarray,
+  nleft: np.ndarray,
+  width: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+  xs = xs.astype(float)
+  cols = nleft[:, None] + np.arange(width)[None, :]
+  nright = nleft + width - 1
 
-    seasonal_var = np.var(result.seasonal)
+  h = np.maximum(xs - nleft, nright - xs).astype(float)
+  if span > n:
+    h += (span - n) // 2
 
-    if seasonal_var + residual_var > 0:
-      seasonal_strength = seasonal_var / (seasonal_var + residual_var)
+  r = np.abs(cols - xs[:, None])
+  h_col = h[:, None]
+  with np.errstate(divide = "ignore", invalid = "ignore"):
+    w = np.where(r <= 0.001 * h_col, 1.0, (1.0 - (r / h_col) ** 3) ** 3)
+  w = np.where(r <= 0.999 * h_col, w, 0.0)
+
+  total = w.sum(axis = 1)
+  valid = total > 0
+  w[valid] /= total[valid, None]
+
+  center = np.sum(w * cols, axis = 1)
+  spread = np.sum(w * (cols - center[:, None]) ** 2, axis = 1)
+  adjust = valid & (h > 0) & (np.sqrt(spread) > 0.001 * (n - 1.0))
+  slope = np.zeros_like(center)
+  slope[adjust] = (xs[adjust] - center[adjust]) / spread[adjust]
+  w = np.where(adjust[:, None], w * (slope[:, None] * (cols - center[:, None]) + 1.0), w)
+
+  return w, cols - 1, valid
+
+
+def _loess_dense(n: int, span: int) -> np.ndarray:
+  matrix = np.zeros((n, n))
+  if n < 2:
+    matrix[0, 0] = 1.0
+    return matrix
+
+  xs = np.arange(1, n + 1)
+  if span >= n:
+    nleft = np.ones(n, dtype = int)
+    width = n
+  else:
+    nsh = (span + 2) // 2
+    nleft = np.clip(xs - nsh, 0, n - span) + 1
+    width = span
+
+  w, cols, valid = _loess_rows(n, span, xs, nleft, width)
+  rows = np.repeat(np.arange(n)[:, None], width, axis = 1)
+  matrix[rows[valid], cols[valid]] = w[valid]
+  matrix[~valid, ~valid] = 1.0
+  return matrix
+
+
+@lru_cache(maxsize = 32)
+def _loess_smoother(n: int, span: int) -> sparse.csr_matrix:
+  return sparse.csr_matrix(_loess_dense(n, span))
+
+
+# smooths each cycle-subseries and extrapolates one period at both ends
+def _cycle_subseries_smoother(n: int, period: int, span: int) -> sparse.csr_matrix:
+  out = sparse.lil_matrix((n + 2 * period, n))
+
+  for j in range(period):
+    k = (n - (j + 1)) // period + 1
+    sub = np.zeros((k + 2, k))
+    sub[1:k + 1] = _loess_dense(k, span)
+
+    width = min(span, k)
+    w, cols, valid = _loess_rows(k, span, np.array([0]), np.array([1]), width)
+    if valid[0]:
+      sub[0, cols[0]] = w[0]
     else:
-      seasonal_strength = 0.0
-
-    has_trend = bool(trend_strength > 0.2)
-    has_seasonality = bool(seasonal_strength > 0.2)
-
-    log(f"STL: trend_strength={trend_strength:.3f}, seasonal_strength={seasonal_strength:.3f}")
-    log(f"STL: has_trend={has_trend}, has_seasonality={has_seasonality}")
-
-    return StlResult(
-      has_trend = has_trend,
-      has_seasonality = has_seasonality,
-      trend_strength = float(trend_strength),
-      seasonal_strength = float(seasonal_strength),
-      trend_component = result.trend,
-      seasonal_component = result.seasonal,
-      residual_component = result.resid
-    )
-
-  except Exception as e:
-    log(f"STL decomposition failed: {e}")
-    return StlResult(
-      has_trend = False,
-      has_seasonality = False,
-      trend_strength = 0.0,
-      seasonal_strength = 0.0
-    )
+      sub[0] = sub[1]
+
+    nleft = max(1, k - span + 1)
+    w, cols, valid = _loess_rows(k, span, np.array([k + 1]), np.array([nleft]), k - nleft + 1)
+    if valid[0]:
+      sub[k + 1, cols[0]] = w[0]
+    else:
+      sub[k + 1] = sub[k]
+
+    out_rows = np.arange(k + 2) * period + j
+    in_cols = np.arange(k) * period + j
+    out[np.ix_(out_rows, in_cols)] = sub
+
+  return out.tocsr()
+
+
+def _moving_average(n: int, length: int) -> sparse.csr_matrix:
+  rows = n - length + 1
+  return sparse.diags(
+    [np.full(rows, 1.0 / length)] * length,
+    offsets = list(range(length)),
+    shape = (rows, n)
+  ).tocsr()
+
+
+def _low_pass_filter(n: int, period: int) -> sparse.csr_matrix:
+  size = n + 2 * period
+  first = _moving_average(size, period)
+  second = _moving_average(size - period + 1, period)
+  third = _moving_average(size - 2 * period + 2, 3)
+  return (third @ second @ first).tocsr()
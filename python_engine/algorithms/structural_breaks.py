@@ -0,0 +1,111 @@
+import math
+from typing import Optional
+import numpy as np
+from algorithms.integration import log
+from algorithms.segments import SegmentIndex
+from models.responses import BaiPerronResult
+
+DEFAULT_TRIMMING = 0.15
+
+
+# SSR of the regression of y on X over every segment [i, j) with
+# j - i >= min_length, each start solved for all of its ends in one batch
+# from the segment index of [X, y]. entries for shorter segments are inf
+def segment_ssr(y: np.ndarray, X: np.ndarray, min_length: int) -> np.ndarray:
+  n, k = X.shape
+  # centering keeps the cumulative sums well scaled; SSR is unchanged
+  # because every design carries a constant
+  Z = np.column_stack([X, y])
+  Z[:, 1:] = Z[:, 1:] - Z[:, 1:].mean(axis = 0)
+  index = SegmentIndex(Z)
+  x_cols = list(range(k))
+
+  ssr = np.full((n + 1, n + 1), np.inf)
+  for start in range(n - min_length + 1):
+    ends = np.arange(start + min_length, n + 1)
+    ssr[start, start + min_length:] = index.window_ssr(start, ends, k, x_cols)
+
+  return ssr
+
+
+# global SSR minimizers for 0..max_breaks breaks: cost[m][j] is the best
+# SSR of y[:j] split into m + 1 segments, built from cost[m - 1] in one
+# vectorized min over the last break date
+def optimal_partitions(ssr: np.ndarray, max_breaks: int, min_length: int) -> list[tuple[float, list[int]]]:
+  n = ssr.shape[0] - 1
+  cost = ssr[0].copy()
+  choices = []
+  results = [(float(cost[n]), [])]
+
+  for m in range(1, max_breaks + 1):
+    # the last break must leave room for m earlier segments
+    candidates = cost[:, None] + ssr
+    candidates[:(m * min_length)] = np.inf
+    last_break = np.argmin(candidates, axis = 0)
+    cost = candidates[last_break, np.arange(n + 1)]
+    choices.append(last_break)
+
+    if not np.isfinite(cost[n]):
+      break
+
+    breaks = []
+    end = n
+    for level in range(m - 1, -1, -1):
+      end = int(choices[level][end])
+      breaks.append(end)
+    results.append((float(cost[n]), sorted(breaks)))
+
+  return results
+
+
+# Bai-Perron estimation of multiple breaks in all coefficients of y on
+# [const, X]; the number of breaks minimizes BIC and sup-F(m | 0) is
+# reported for every m
+def bai_perron(
+  y: np.ndarray,
+  X: Optional[np.ndarray] = None,
+  max_breaks: int = 5,
+  trimming: float = DEFAULT_TRIMMING,
+  min_segment: int = 0
+) -> BaiPerronResult:
+  y = np.asarray(y, dtype = float)
+  n = len(y)
+  columns = [np.ones(n)]
+  if X is not None:
+    X = np.asarray(X, dtype = float)
+    columns.extend(X.T if X.ndim == 2 else [X])
+  design = np.column_stack(columns)
+  k = design.shape[1]
+
+  min_length = max(int(math.floor(trimming * n)), min_segment, k + 1)
+  max_breaks = min(max_breaks, n // min_length - 1)
+  if max_breaks < 1:
+    raise ValueError(f"series too short for a break with segments of {min_length}")
+
+  ssr = segment_ssr(y, design, min_length)
+  partitions = optimal_partitions(ssr, max_breaks, min_length)
+
+  ssr_values = [value for value, _ in partitions]
+  bic = []
+  for m, value in enumerate(ssr_values):
+    n_params = (m + 1) * k + m
+    bic.append(math.log(value / n) + n_params * math.log(n) / n)
+
+  sup_f = []
+  for m in range(1, len(ssr_values)):
+    dof = n - (m + 1) * k - m
+    sup_f.append(((ssr_values[0] - ssr_values[m]) / (m * k)) / (ssr_values[m] / dof))
+
+  n_breaks = int(np.argmin(bic))
+  breaks = partitions[n_breaks][1]
+  log(f"bai-perron: {n_breaks} breaks {breaks} (segments >= {min_length})")
+
+  return BaiPerronResult(
+    n_breaks = n_breaks,
+    break_indices = breaks,
+    min_segment = min_length,
+    trimming = trimming,
+    ssr = ssr_values,
+    bic = bic,
+    sup_f = sup_f
+  )
@@ -0,0 +1,172 @@
+import math
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import product
+from typing import Optional
+import numpy as np
+from algorithms.integration import log
+from algorithms.parallel import resolve_workers
+from algorithms.regression import fit_ols
+from models.responses import SubsetCriterion, SubsetSpecification, SubsetSearchResult
+
+# the blocks fix the in/out pattern of this many leading predictors
+PREFIX_DEPTH = 4
+
+
+# best predictor subsets of y ~ const + X[:, S] by AIC, BIC or adjusted
+# R^2. every subset SSR is a small solve on the cross-product matrix of
+# [1, X, y], computed once. the search is a depth-first branch and bound:
+# all supersets of the included set reachable from a node have SSR at
+# least that of the node's largest reachable superset and at least the
+# node's size, so the node is cut when that bound cannot reach the top N.
+# the tree splits into blocks by which of the first PREFIX_DEPTH
+# predictors are included, so every block spans the same 2^(p - depth)
+# subsets; blocks are searched in parallel and their exact top-N lists
+# merged
+def best_subsets(
+  y: np.ndarray,
+  X: np.ndarray,
+  predictor_names: list[str],
+  criterion: SubsetCriterion = SubsetCriterion.BIC,
+  top: int = 5,
+  max_size: Optional[int] = None,
+  workers: Optional[int] = 1
+) -> SubsetSearchResult:
+  n, p = X.shape
+  if max_size is None or max_size > p:
+    max_size = p
+  depth = min(PREFIX_DEPTH, p)
+
+  # centered columns keep the cross-products well scaled; with the
+  # constant in every subset the SSRs are unchanged
+  Z = np.column_stack([np.ones(n), X - X.mean(axis = 0), y - y.mean()])
+  gram = Z.T @ Z
+  sst = float(np.sum((y - y.mean()) ** 2))
+
+  search = partial(
+    _search_block,
+    gram = gram,
+    n = n,
+    sst = sst,
+    criterion = criterion,
+    top = top,
+    max_size = max_size,
+    depth = depth
+  )
+
+  # blocks with the best leading subsets first: the top N they fill
+  # prunes the rest of a serial search sooner
+  blocks = sorted(
+    (prefix for prefix in _prefixes(depth) if len(prefix) <= max_size),
+    key = lambda prefix: _criterion(criterion, _subset_ssr(gram, prefix), len(prefix) + 1, n, sst)
+  )
+  workers = min(resolve_workers(workers), len(blocks))
+  if workers <= 1:
+    ranked = []
+    evaluated = 0
+    for prefix in blocks:
+      ranked, count = search(prefix, ranked = ranked)
+      evaluated = evaluated + count
+  else:
+    with ProcessPoolExecutor(max_workers = workers) as pool:
+      parts = list(pool.map(search, blocks))
+    ranked = sorted(entry for part, _ in parts for entry in part)[:top]
+    evaluated = sum(count for _, count in parts)
+
+  log(f"subset search ({criterion.value}): {evaluated} of {2 ** p - 1} subsets evaluated")
+
+  specifications = []
+  for value, subset, ssr in ranked:
+    k = len(subset) + 1
+    names = [predictor_names[i] for i in subset]
+    specifications.append(SubsetSpecification(
+      predictors = names,
+      criterion_value = -value if criterion == SubsetCriterion.ADJ_R2 else value,
+      aic = _criterion(SubsetCriterion.AIC, ssr, k, n, sst),
+      bic = _criterion(SubsetCriterion.BIC, ssr, k, n, sst),
+      adj_r_squared = -_criterion(SubsetCriterion.ADJ_R2, ssr, k, n, sst),
+      regression = fit_ols(y, [X[:, i] for i in subset], names)
+    ))
+
+  return SubsetSearchResult(
+    criterion = criterion,
+    n_candidates = p,
+    max_size = max_size,
+    evaluated = evaluated,
+    specifications = specifications
+  )
+
+
+# ===== HELPER METHODS =====
+
+# statsmodels conventions; adjusted R^2 is negated so that every
+# criterion is minimized and increases with SSR and with size
+def _criterion(criterion: SubsetCriterion, ssr: float, k: int, n: int, sst: float) -> float:
+  if criterion == SubsetCriterion.ADJ_R2:
+    return -(1.0 - (ssr / (n - k)) / (sst / (n - 1)))
+
+  llf = -0.5 * n * (math.log(2 * math.pi) + math.log(ssr / n) + 1)
+  if criterion == SubsetCriterion.AIC:
+    return -2 * llf + 2 * k
+  return -2 * llf + k * math.log(n)
+
+
+def _subset_ssr(gram: np.ndarray, subset: tuple[int, ...]) -> float:
+  cols = [0] + [1 + i for i in subset]
+  xx = gram[np.ix_(cols, cols)]
+  xy = gram[cols, -1]
+  return max(float(gram[-1, -1] - xy @ np.linalg.solve(xx, xy)), 1e-300)
+
+
+# the included predictors of every in/out pattern of the first `depth`
+def _prefixes(depth: int) -> list[tuple[int, ...]]:
+  return [
+    tuple(i for i, included in enumerate(pattern) if included)
+    for pattern in product((False, True), repeat = depth)
+  ]
+
+
+# exact top-N among subsets that include exactly `prefix` of the first
+# `depth` predictors, merged into `ranked` (sorted (value, subset, ssr)
+# entries). the empty subset is the constant-only model and is not ranked
+def _search_block(
+  prefix: tuple[int, ...],
+  gram: np.ndarray,
+  n: int,
+  sst: float,
+  criterion: SubsetCriterion,
+  top: int,
+  max_size: int,
+  depth: int,
+  ranked: Optional[list] = None
+) -> tuple[list, int]:
+  ranked = list(ranked or [])
+  p = gram.shape[0] - 2
+  evaluated = 0
+
+  stack = [(prefix, depth)]
+  while stack:
+    subset, next_index = stack.pop()
+    if subset:
+      ssr = _subset_ssr(gram, subset)
+      evaluated = evaluated + 1
+
+      value = _criterion(criterion, ssr, len(subset) + 1, n, sst)
+      if len(ranked) < top or (value, subset) < ranked[-1][:2]:
+        ranked.append((value, subset, ssr))
+        ranked.sort()
+        del ranked[top:]
+
+    if len(subset) >= max_size or next_index >= p:
+      continue
+
+    # every descendant adds at least one predictor from next_index on
+    largest = subset + tuple(range(next_index, p))
+    bound = _criterion(criterion, _subset_ssr(gram, largest), len(subset) + 2, n, sst)
+    if len(ranked) == top and bound > ranked[-1][0]:
+      continue
+
+    for candidate in range(p - 1, next_index - 1, -1):
+      stack.append((subset + (candidate,), candidate + 1))
+
+  return ranked, evaluated
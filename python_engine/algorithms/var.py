@@ -1,15 +1,20 @@
+from dataclasses import replace
+from typing import Optional
 import numpy as np
 from scipy import stats
 from algorithms.integration import log
+from algorithms.artifacts import ArtifactStore, FittedModel
+from algorithms.design_matrix import lagged_design
 from models.responses import RegressionResult, DurbinWatsonResult, CoefficientInfo
+from models.domain import VarEstimate
 
 
 def build_var_on_differences(
   series_list: list[np.ndarray],
   maxlags: int = 15,
-  variable_names: list[str] = None
+  variable_names: list[str] = None,
+  artifacts: Optional[ArtifactStore] = None
 ) -> RegressionResult:
-  from statsmodels.tsa.api import VAR
   from statsmodels.stats.stattools import durbin_watson
 
   log("building VAR model on differences")
@@ -19,31 +24,18 @@ def build_var_on_differences(
   else:
     all_names = variable_names
 
-  diff_data = []
-  for series in series_list:
-    diff_series = np.diff(series)
-    diff_data.append(diff_series)
+  if artifacts is None:
+    artifacts = ArtifactStore(series_list)
 
-  data_matrix = np.column_stack(diff_data)
-
-  model = VAR(data_matrix)
-
-  optimal_lag = 1
-  try:
-    lag_order = model.select_order(maxlags=maxlags)
-    optimal_lag = lag_order.aic
-    log(f"VAR: selected lag = {optimal_lag} (AIC)")
-  except Exception as e:
-    log(f"VAR: lag selection failed ({e}), using lag=1")
-
-  result = model.fit(maxlags=optimal_lag)
+  estimate = fitted_var(artifacts, maxlags)
+  optimal_lag = estimate.lags
   log(f"VAR fitted: {len(series_list)} equations, lag={optimal_lag}")
 
-  y_equation = result.params[0, :]
-  y_stderr = result.stderr[0, :]
-  y_tvalues = result.tvalues[0, :]
-  y_pvalues = result.pvalues[0, :]
-  y_resid = result.resid[:, 0]
+  y_equation = estimate.params[:, 0]
+  y_stderr = estimate.stderr[:, 0]
+  y_tvalues = estimate.tvalues[:, 0]
+  y_pvalues = estimate.pvalues[:, 0]
+  y_resid = estimate.resid[:, 0]
 
   dw_stat = durbin_watson(y_resid)
   has_autocorr = False
@@ -56,6 +48,18 @@ def build_var_on_differences(
     for vname in all_names:
       names.append(f"lag{lag}_Δ{vname}")
 
+  diff_matrix = artifacts.diff_matrix()
+  artifacts.record_fit(FittedModel(
+    kind = "var",
+    y = diff_matrix[optimal_lag:, 0],
+    X = lagged_design(diff_matrix, optimal_lag),
+    names = names,
+    params = estimate.params[:, 0],
+    resid = estimate.resid[:, 0],
+    lags = optimal_lag,
+    spec = {"maxlags": maxlags}
+  ))
+
   coeffs = []
   for i in range(len(y_equation)):
     name = names[i] if i < len(names) else f"coef_{i}"
@@ -70,7 +74,7 @@ def build_var_on_differences(
 
   # R² for target equation
   ss_res = np.sum(y_resid ** 2)
-  y_diff = diff_data[0][optimal_lag:]
+  y_diff = artifacts.diff_matrix()[optimal_lag:, 0]
   ss_tot = np.sum((y_diff - np.mean(y_diff)) ** 2)
 
   if ss_tot > 0:
@@ -108,4 +112,131 @@ def build_var_on_differences(
     ),
     n_obs = n,
     has_lags = True
-  )
\ No newline at end of file
+  )
+
+
+
+# VAR on the first differences of every series in the store, fitted once
+# per request: a permuted store reorders its parent's fit
+def fitted_var(artifacts: ArtifactStore, maxlags: int = 15) -> VarEstimate:
+  return artifacts.shared(
+    ("var", maxlags),
+    lambda store: estimate_var(store.diff_matrix(), maxlags = maxlags),
+    permuted_var
+  )
+
+
+# VAR(p) with constant for every equation at once. with lags=None the order
+# is chosen by AIC: all orders 0..maxlags share the sample that drops the
+# first maxlags rows, so each order is a column prefix of one stacked
+# design and a single cholesky yields every residual covariance
+def estimate_var(
+  data: np.ndarray,
+  maxlags: int = 15,
+  lags: Optional[int] = None
+) -> VarEstimate:
+  data = np.asarray(data, dtype = float)
+  lag_aic = None
+
+  if lags is None:
+    n_obs, neqs = data.shape
+    max_estimable = (n_obs - neqs - 1) // (1 + neqs)
+    if maxlags > max_estimable:
+      log(f"VAR: lag selection failed (maxlags {maxlags} > {max_estimable}), using lag=1")
+      lags = 1
+    else:
+      lag_aic = select_var_order(data, maxlags)
+      if lag_aic is None:
+        lags = 1
+      else:
+        lags = min(lag_aic, key = lag_aic.get)
+        log(f"VAR: selected lag = {lags} (AIC)")
+
+  return _fit_var(data, lags, lag_aic)
+
+
+def select_var_order(data: np.ndarray, maxlags: int) -> Optional[dict[int, float]]:
+  n_obs, neqs = data.shape
+  design = lagged_design(data, maxlags)
+  response = data[maxlags:]
+  nobs = n_obs - maxlags
+
+  stacked = np.column_stack([design, response])
+  try:
+    factor = np.linalg.cholesky(stacked.T @ stacked)
+  except np.linalg.LinAlgError as e:
+    log(f"VAR: lag selection failed ({e}), using lag=1")
+    return None
+
+  regressors = design.shape[1]
+  tail = factor[regressors:]
+  yy = response.T @ response
+
+  table = {}
+  for p in range(maxlags + 1):
+    partial = tail[:, :1 + neqs * p]
+    resid_cov = (yy - partial @ partial.T) / nobs
+    _, logdet = np.linalg.slogdet(resid_cov)
+    table[p] = float(logdet + 2.0 * (p * neqs ** 2 + neqs) / nobs)
+
+  return table
+
+
+# lag matrices A_1..A_p as (lags, neqs, neqs) with y_t = c + sum A_l y_{t-l}
+def var_coefs(estimate: VarEstimate) -> np.ndarray:
+  neqs = estimate.params.shape[1]
+  blocks = estimate.params[1:].reshape(estimate.lags, neqs, neqs)
+  return np.swapaxes(blocks, 1, 2)
+
+
+# the same VAR with its series in the order `columns`
+def permuted_var(estimate: VarEstimate, columns: tuple[int, ...]) -> VarEstimate:
+  cols = np.asarray(columns)
+  # [const, lag1 block, lag2 block, ...], each block in series order
+  lag_rows = len(cols) * np.arange(estimate.lags)[:, None] + cols
+  rows = np.concatenate([[0], 1 + lag_rows.ravel()])
+  return replace(
+    estimate,
+    params = estimate.params[np.ix_(rows, cols)],
+    stderr = estimate.stderr[np.ix_(rows, cols)],
+    tvalues = estimate.tvalues[np.ix_(rows, cols)],
+    pvalues = estimate.pvalues[np.ix_(rows, cols)],
+    resid = estimate.resid[:, cols],
+    sigma_u = estimate.sigma_u[np.ix_(cols, cols)],
+    zz_inv = estimate.zz_inv[np.ix_(rows, rows)]
+  )
+
+
+def _fit_var(
+  data: np.ndarray,
+  lags: int,
+  lag_aic: Optional[dict[int, float]]
+) -> VarEstimate:
+  n_obs, neqs = data.shape
+  design = lagged_design(data, lags)
+  response = data[lags:]
+  nobs = n_obs - lags
+
+  params, _, _, _ = np.linalg.lstsq(design, response, rcond = 1e-15)
+  resid = response - design @ params
+
+  df_resid = nobs - design.shape[1]
+  sigma_u = resid.T @ resid / df_resid
+  zz_inv = np.linalg.inv(design.T @ design)
+
+  stderr = np.sqrt(np.outer(np.diag(zz_inv), np.diag(sigma_u)))
+  tvalues = params / stderr
+  pvalues = 2 * stats.norm.sf(np.abs(tvalues))
+
+  return VarEstimate(
+    lags = lags,
+    params = params,
+    stderr = stderr,
+    tvalues = tvalues,
+    pvalues = pvalues,
+    resid = resid,
+    sigma_u = sigma_u,
+    zz_inv = zz_inv,
+    nobs = nobs,
+    lag_aic = lag_aic
+  )
@@ -0,0 +1,220 @@
+from typing import Optional
+import numpy as np
+from scipy import stats
+from algorithms.integration import log
+from algorithms.artifacts import ArtifactStore, FittedModel
+from algorithms.cointegration_tests import johansen_test
+from algorithms.design_matrix import lagged_design
+from models.domain import JohansenEstimate, VecmEstimate
+from models.responses import RegressionResult, DurbinWatsonResult, CoefficientInfo, VecmInfo
+
+
+# VECM dx_t = c + alpha beta' x~_{t-1} + sum_l gamma_l dx_{t-l} + u_t of every
+# series in the store, from the johansen estimate the cointegration test
+# already computed; x~ are the levels less the test's deterministic trend
+def fitted_vecm(artifacts: ArtifactStore, regression: str = "c", rank: int = 1) -> VecmEstimate:
+  return artifacts.memo(
+    ("vecm", regression, rank),
+    lambda: estimate_vecm(
+      johansen_test(list(artifacts.series), regression = regression, artifacts = artifacts),
+      artifacts.level_matrix(),
+      rank
+    )
+  )
+
+
+# maximum likelihood VECM of a given cointegration rank. beta are the
+# leading johansen eigenvectors, normalized so their first rank rows are
+# the identity; given beta, alpha, gamma and the constant are least
+# squares, which the moment matrix of the test answers without touching
+# the data: the design [1, x~_{t-1} beta, dx lags] is a column map of the
+# test's [1, x~_{t-1}, dx lags]. a linear detrend shifts every difference
+# by the trend slope b, moved into the constant as (I - sum gamma_l) b so
+# the equations hold for the differences of the raw levels
+def estimate_vecm(estimate: JohansenEstimate, levels: np.ndarray, rank: int) -> VecmEstimate:
+  neqs = levels.shape[1]
+  k = estimate.k_ar_diff
+  det_order = estimate.det_order
+  nobs = estimate.nobs
+  # rank neqs makes every level stationary: a VAR in levels, not a VECM
+  if not 1 <= rank < neqs:
+    raise ValueError(f"cointegration rank must be in [1, {neqs - 1}], got {rank}")
+
+  beta = estimate.evec[:, :rank]
+  beta = beta @ np.linalg.inv(beta[:rank])
+
+  # test columns [1, x~, lags] -> design columns [1, ect, lags]; the
+  # test's moments always hold the constant column
+  has_constant = det_order >= 0
+  n_lags = neqs * k
+  mapping = np.zeros((1 + neqs + n_lags, 1 + rank + n_lags))
+  mapping[0, 0] = 1.0
+  mapping[1:1 + neqs, 1:1 + rank] = beta
+  mapping[1 + neqs:, 1 + rank:] = np.eye(n_lags)
+  keep = slice(1 - int(has_constant), None)
+  mapping = mapping[keep, keep]
+  regressors = estimate.moments[:-neqs, :-neqs][keep, keep]
+  cross = estimate.moments[:-neqs, -neqs:][keep]
+
+  gram = mapping.T @ regressors @ mapping
+  gram_inv = np.linalg.inv(gram)
+  params = gram_inv @ (mapping.T @ cross)
+
+  offset = int(has_constant)
+  gamma = np.swapaxes(params[offset + rank:].reshape(k, neqs, neqs), 1, 2)
+  if det_order == 1:
+    # rows of the design are affine in the raw differences: dx~ = dx - b
+    slope = estimate.trend[0]
+    shift = np.zeros(len(params))
+    shift[offset + rank:] = np.tile(slope, k)
+    params[0] = params[0] + slope - shift @ params
+    reparam = np.eye(len(params))
+    reparam[0] -= shift
+    gram_inv = reparam @ gram_inv @ reparam.T
+
+  # residuals on the raw differences over the test's sample
+  design = vecm_design(levels, beta, estimate.trend, det_order, k, nobs)
+  resid = np.diff(levels, axis = 0)[-nobs:] - design @ params
+
+  # maximum likelihood covariance and normal p-values, as statsmodels' VECM
+  sigma_u = resid.T @ resid / nobs
+  stderr = np.sqrt(np.outer(np.diag(gram_inv), np.diag(sigma_u)))
+  tvalues = params / stderr
+  pvalues = 2 * stats.norm.sf(np.abs(tvalues))
+
+  return VecmEstimate(
+    rank = rank,
+    k_ar_diff = k,
+    det_order = det_order,
+    params = params,
+    stderr = stderr,
+    tvalues = tvalues,
+    pvalues = pvalues,
+    alpha = params[offset:offset + rank].T,
+    beta = beta,
+    gamma = gamma,
+    const = params[0] if has_constant else np.zeros(neqs),
+    trend = estimate.trend,
+    resid = resid,
+    sigma_u = sigma_u,
+    nobs = nobs
+  )
+
+
+# [const, x~_{t-1} beta, dx_{t-1}, ..., dx_{t-k}] over the last nobs
+# differences of the raw levels
+def vecm_design(
+  levels: np.ndarray,
+  beta: np.ndarray,
+  trend: np.ndarray,
+  det_order: int,
+  k_ar_diff: int,
+  nobs: int
+) -> np.ndarray:
+  deterministic = np.vander(np.arange(levels.shape[0], dtype = float), det_order + 1) @ trend
+  return lagged_design(
+    np.diff(levels, axis = 0), k_ar_diff,
+    current = (levels - deterministic)[:-1] @ beta,
+    constant = det_order >= 0
+  )[-nobs:]
+
+
+def build_vecm_model(
+  series_list: list[np.ndarray],
+  regression: str = "c",
+  rank: int = 1,
+  variable_names: list[str] = None,
+  artifacts: Optional[ArtifactStore] = None
+) -> RegressionResult:
+  from statsmodels.stats.stattools import durbin_watson
+
+  log(f"building vecm model, rank {rank}")
+
+  if variable_names is None:
+    all_names = [f"var{i}" for i in range(len(series_list))]
+  else:
+    all_names = variable_names
+
+  if artifacts is None:
+    artifacts = ArtifactStore(series_list)
+
+  vecm = fitted_vecm(artifacts, regression, rank)
+  k = vecm.k_ar_diff
+  log(f"VECM fitted: {len(series_list)} equations, rank={rank}, lagged differences={k}")
+
+  target_alpha = vecm.alpha[0]
+  if np.all(target_alpha >= 0):
+    log("[WARNING] no error correction term pulls the target back (all alpha >= 0)")
+
+  # names: const, ECT1..ECTr, lag1_Δvar0, lag1_Δvar1, ..., lag2_Δvar0, ...
+  names = ["const"] if vecm.det_order >= 0 else []
+  names.extend(f"ECT{i + 1}" for i in range(rank))
+  for lag in range(1, k + 1):
+    for vname in all_names:
+      names.append(f"lag{lag}_Δ{vname}")
+
+  X = vecm_design(artifacts.level_matrix(), vecm.beta, vecm.trend, vecm.det_order, k, vecm.nobs)
+  y = artifacts.diff(0)[-vecm.nobs:]
+  y_resid = vecm.resid[:, 0]
+
+  artifacts.record_fit(FittedModel(
+    kind = "vecm",
+    y = y,
+    X = X,
+    names = names,
+    params = vecm.params[:, 0],
+    resid = y_resid,
+    lags = k,
+    spec = {"regression": regression, "rank": rank}
+  ))
+
+  coeffs = []
+  for i in range(len(names)):
+    coeffs.append(CoefficientInfo(
+      name = names[i],
+      value = float(vecm.params[i, 0]),
+      std_error = float(vecm.stderr[i, 0]),
+      t_value = float(vecm.tvalues[i, 0]),
+      p_value = float(vecm.pvalues[i, 0]),
+      is_significant = float(vecm.pvalues[i, 0]) < 0.05
+    ))
+
+  dw_stat = durbin_watson(y_resid)
+  has_autocorr = dw_stat < 1.5 or dw_stat > 2.5
+
+  # target equation fit; the F test excludes the constant
+  n = len(y)
+  k_params = len(names)
+  k_slopes = k_params - int(vecm.det_order >= 0)
+  ss_res = float(y_resid @ y_resid)
+  ss_tot = float(np.sum((y - np.mean(y)) ** 2))
+  r_squared = 1.0 - ss_res / ss_tot if ss_tot > 0 else 0.0
+  dof = n - k_params
+  adj_r_squared = 1.0 - (1.0 - r_squared) * (n - 1) / dof if dof > 0 else r_squared
+
+  f_stat = 0.0
+  f_pvalue = 1.0
+  if k_slopes > 0 and dof > 0 and r_squared < 1.0:
+    f_stat = (r_squared / k_slopes) / ((1.0 - r_squared) / dof)
+    f_pvalue = float(stats.f.sf(f_stat, k_slopes, dof))
+
+  return RegressionResult(
+    coefficients = coeffs,
+    r_squared = float(r_squared),
+    adj_r_squared = float(adj_r_squared),
+    f_statistic = float(f_stat),
+    f_pvalue = f_pvalue,
+    durbin_watson = DurbinWatsonResult(
+      statistic = float(dw_stat),
+      has_autocorrelation = has_autocorr
+    ),
+    n_obs = n,
+    has_lags = k > 0,
+    vecm = VecmInfo(
+      rank = rank,
+      lag_order = k,
+      beta = vecm.beta.tolist(),
+      alpha = vecm.alpha.tolist(),
+      series_names = list(all_names)
+    )
+  )
@@ -3,16 +3,30 @@ import sys
 import math
 from enum import Enum
 import numpy as np
-from dataclasses import asdict
+from dataclasses import asdict, replace
 from typing import Optional
-from statsmodels.tsa.vector_ar.vecm import JohansenTestResult
 from algorithms.integration import determine_integration_order, log
 from algorithms.cointegration_tests import aeg_test, johansen_test
-from algorithms.stl_decomposition import detect_trend_and_seasonality
+from algorithms.critical_values import johansen_finite_sample
+from algorithms.artifacts import ArtifactStore, permuted_list
+from algorithms.segments import window_lag_index
+from algorithms.stl_decomposition import detect_trend_and_seasonality_batch
 from algorithms.ecm import build_ecm_model
-from algorithms.var import build_var_on_differences
-from algorithms.mixed_regression import build_mixed_regression
+from algorithms.vecm import build_vecm_model
+from algorithms.var import build_var_on_differences, fitted_var
+from algorithms.impulse_response import impulse_responses
+from algorithms.causality import causality_matrix
+from algorithms.bootstrap import block_bootstrap_ci
+from algorithms.forecast import forecast_model
+from algorithms.structural_breaks import bai_perron
+from algorithms.stability import stability_tests
+from algorithms.diagnostics import residual_diagnostics
+from algorithms.subset_selection import best_subsets
+from algorithms.model_comparison import compare_candidates
+from algorithms.backtest import backtest_model
+from algorithms.mixed_regression import build_mixed_regression, MAX_LAGS as MIXED_MAX_LAGS
 from algorithms.regression import ols_regression
+from api.output_policy import retains_arrays, build_stl_components
 from models.responses import (
   SeriesOrder,
   AnalysisResult,
@@ -28,14 +42,43 @@ from models.responses import (
   AegTestResult,
   StlResult,
   TransformationType,
-  TransformationInfo
+  TransformationInfo,
+  OutputPolicy,
+  ImpulseResponseResult,
+  CausalityResult,
+  RegressionResult,
+  BootstrapMethod,
+  BootstrapInfo,
+  ForecastResult,
+  BreakMethod,
+  MultiTargetResult,
+  SubsetCriterion,
+  SubsetSearchResult,
+  LagSelection,
+  ModelSpecification,
+  ModelComparison,
+  BacktestMethod,
+  BacktestResult,
+  HacKernel,
+  HacBandwidth,
+  CriticalValueMethod
 )
 from models.domain import (
   PreparedData,
   PeriodAnalysis,
-  PeriodData
+  PeriodData,
+  AnalysisOptions,
+  JohansenEstimate,
+  CandidateFit
 )
 
+BOOTSTRAP_CONFIDENCE = 0.95
+FORECAST_CONFIDENCE = 0.95
+STABILITY_SIGNIFICANCE = 0.05
+DIAGNOSTICS_SIGNIFICANCE = 0.05
+# periods are reanalyzed, same floor as the input series
+MIN_PERIOD_SIZE = 20
+
 
 def analyze_time_series(input_json: str) -> str:
   try:
@@ -132,36 +175,30 @@ def analyze_time_series(input_json: str) -> str:
     target_index = _auto_detect_target(variable_names)
     log(f"auto-detected target: {variable_names[target_index]}")
 
-  target_variable = variable_names[target_index]
+  targets = input_data.get("targets")
+  if targets is not None:
+    if targets == "all":
+      targets = list(range(len(series_list)))
+    if not _valid_targets(targets, len(series_list)):
+      error = {
+        "error": "INVALID_TARGETS",
+        "message": f"'targets' must be \"all\" or a list of distinct indices between 0 and {len(series_list) - 1}"
+      }
+      return json.dumps(error)
+    # any series can be a predictor of some target
+    predictor_names = sorted({name for t in targets for i, name in enumerate(variable_names) if i != t})
+  else:
+    predictor_names = [name for i, name in enumerate(variable_names) if i != target_index]
 
-  if target_index != 0:
-    _swap_series(series_list, variable_names, 0, target_index)
+  options = _parse_options(input_data, predictor_names)
+  if isinstance(options, dict):
+    return json.dumps(options)
 
   try:
-    series_orders = _analyze_series_orders(series_list)
-
-    model_type = _decide_model_type(series_orders)
-    log(f"model type: {model_type.value}")
-
-    prepared_data = _prepare_data(series_list, series_orders, model_type)
-
-    transformations = None
-    if model_type == ModelType.MIXED:
-      transformations = _create_transformation_info(series_orders, variable_names)
-
-    model_results = _build_model(prepared_data, variable_names)
-
-    result = AnalysisResult(
-      series_count = len(series_list),
-      variable_names = variable_names,
-      target_variable = target_variable,
-      series_orders = series_orders,
-      model_type = model_type.value,
-      model_results = model_results,
-      has_structural_break = prepared_data.has_structural_break,
-      structural_breaks = prepared_data.structural_breaks,
-      transformations = transformations
-    )
+    if targets is not None:
+      result = _analyze_targets(series_list, variable_names, targets, options)
+    else:
+      result = _analyze_target(series_list, variable_names, target_index, options)
 
     result_dict = _clean_nans(asdict(result))
     return json.dumps(result_dict, default = str)
@@ -178,6 +215,311 @@ def analyze_time_series(input_json: str) -> str:
     return json.dumps(error)
 
 
+# full pipeline for one target; series orders from an earlier pass (in
+# the input order) skip STL and the unit root cascade, and a store over
+# the swapped series shares that pass's artifacts
+def _analyze_target(
+  series_list: list[np.ndarray],
+  variable_names: list[str],
+  target_index: int,
+  options: AnalysisOptions,
+  series_orders: Optional[list[SeriesOrder]] = None,
+  artifacts: Optional[ArtifactStore] = None
+) -> AnalysisResult:
+  series_list = list(series_list)
+  variable_names = list(variable_names)
+  target_variable = variable_names[target_index]
+
+  if target_index != 0:
+    _swap_series(series_list, variable_names, 0, target_index)
+
+  if artifacts is None:
+    artifacts = ArtifactStore(series_list)
+  if series_orders is None:
+    series_orders = _analyze_series_orders(series_list, options, artifacts)
+  else:
+    series_orders = list(series_orders)
+    series_orders[0], series_orders[target_index] = series_orders[target_index], series_orders[0]
+
+  model_type = _decide_model_type(series_orders)
+  log(f"model type: {model_type.value}")
+
+  prepared_data = _prepare_data(series_list, series_orders, model_type, artifacts, options)
+
+  transformations = None
+  if model_type == ModelType.MIXED:
+    transformations = _create_transformation_info(series_orders, variable_names)
+
+  model_results = _build_model(prepared_data, variable_names, options)
+
+  if options.causality and model_results is not None:
+    model_results.causality = _build_causality(artifacts, series_orders, variable_names)
+
+  if options.compare_models and model_results is not None:
+    model_results.comparison = _build_comparison(prepared_data, model_results, variable_names, options)
+
+  # forecasts and backtests run on the most recent regime
+  final_artifacts = artifacts
+  if prepared_data.has_structural_break:
+    final_artifacts = prepared_data.periods_data[-1].artifacts
+
+  if options.backtest != BacktestMethod.NONE and model_results is not None:
+    model_results.backtest = _build_backtest(final_artifacts, options)
+
+  if options.forecast_horizon > 0 and model_results is not None:
+    model_results.forecast = _build_forecast(final_artifacts, variable_names, options)
+
+  return AnalysisResult(
+    series_count = len(series_list),
+    variable_names = variable_names,
+    target_variable = target_variable,
+    series_orders = series_orders,
+    model_type = model_type.value,
+    model_results = model_results,
+    has_structural_break = prepared_data.has_structural_break,
+    structural_breaks = prepared_data.structural_breaks,
+    bai_perron = prepared_data.bai_perron,
+    transformations = transformations
+  )
+
+
+# series orders and the causality matrix do not depend on the target, so
+# they are computed once and every target only builds its model. each
+# target works on a permuted view of one store: differences, segment
+# indexes, period orders and the johansen / VAR fits are computed once
+def _analyze_targets(
+  series_list: list[np.ndarray],
+  variable_names: list[str],
+  targets: list[int],
+  options: AnalysisOptions
+) -> MultiTargetResult:
+  artifacts = ArtifactStore(series_list)
+  series_orders = _analyze_series_orders(series_list, options, artifacts)
+
+  causality = None
+  if options.causality:
+    causality = _build_causality(artifacts, series_orders, variable_names)
+  target_options = replace(options, causality = False)
+
+  results = []
+  for target_index in targets:
+    log(f"\n=== target: {variable_names[target_index]} ===")
+    columns = list(range(len(series_list)))
+    columns[0], columns[target_index] = columns[target_index], columns[0]
+    result = _analyze_target(
+      series_list, variable_names, target_index, target_options, series_orders,
+      artifacts = artifacts.permuted(columns)
+    )
+    if result.model_results is not None:
+      result.model_results.causality = causality
+    results.append(result)
+
+  return MultiTargetResult(
+    series_count = len(series_list),
+    variable_names = variable_names,
+    series_orders = series_orders,
+    targets = [variable_names[t] for t in targets],
+    results = results
+  )
+
+
+def _valid_targets(targets, series_count: int) -> bool:
+  if not isinstance(targets, list) or len(targets) == 0:
+    return False
+  for t in targets:
+    if not isinstance(t, int) or isinstance(t, bool) or t < 0 or t >= series_count:
+      return False
+  return len(set(targets)) == len(targets)
+
+
+def _parse_options(input_data: dict, predictor_names: list[str]):
+  options = AnalysisOptions()
+
+  policy = input_data.get("output_policy")
+  if policy is not None:
+    allowed = [p.value for p in OutputPolicy]
+    if policy not in allowed:
+      return {
+        "error": "INVALID_OUTPUT_POLICY",
+        "message": f"'output_policy' must be one of {allowed}"
+      }
+    options.output_policy = OutputPolicy(policy)
+
+  bootstrap_ci = input_data.get("bootstrap_ci")
+  if bootstrap_ci is not None:
+    allowed = [m.value for m in BootstrapMethod]
+    if bootstrap_ci not in allowed:
+      return {
+        "error": "INVALID_BOOTSTRAP_CI",
+        "message": f"'bootstrap_ci' must be one of {allowed}"
+      }
+    options.bootstrap_ci = BootstrapMethod(bootstrap_ci)
+
+  causality = input_data.get("causality")
+  if causality is not None:
+    if not isinstance(causality, bool):
+      return {
+        "error": "INVALID_CAUSALITY",
+        "message": "'causality' must be a boolean"
+      }
+    options.causality = causality
+
+  subset_search = input_data.get("subset_search")
+  if subset_search is not None:
+    allowed = [c.value for c in SubsetCriterion]
+    if subset_search not in allowed:
+      return {
+        "error": "INVALID_SUBSET_SEARCH",
+        "message": f"'subset_search' must be one of {allowed}"
+      }
+    options.subset_search = SubsetCriterion(subset_search)
+
+  diagnostics = input_data.get("diagnostics")
+  if diagnostics is not None:
+    if not isinstance(diagnostics, bool):
+      return {
+        "error": "INVALID_DIAGNOSTICS",
+        "message": "'diagnostics' must be a boolean"
+      }
+    options.diagnostics = diagnostics
+
+  compare_models = input_data.get("compare_models")
+  if compare_models is not None:
+    if not isinstance(compare_models, bool):
+      return {
+        "error": "INVALID_COMPARE_MODELS",
+        "message": "'compare_models' must be a boolean"
+      }
+    options.compare_models = compare_models
+
+  stability = input_data.get("stability")
+  if stability is not None:
+    if not isinstance(stability, bool):
+      return {
+        "error": "INVALID_STABILITY",
+        "message": "'stability' must be a boolean"
+      }
+    options.stability = stability
+
+  lag_selection = input_data.get("lag_selection")
+  if lag_selection is not None:
+    allowed = [m.value for m in LagSelection]
+    if lag_selection not in allowed:
+      return {
+        "error": "INVALID_LAG_SELECTION",
+        "message": f"'lag_selection' must be one of {allowed}"
+      }
+    options.lag_selection = LagSelection(lag_selection)
+
+  l1_ratio = input_data.get("l1_ratio")
+  if l1_ratio is not None:
+    if not isinstance(l1_ratio, (int, float)) or isinstance(l1_ratio, bool) or not 0 < l1_ratio <= 1:
+      return {
+        "error": "INVALID_L1_RATIO",
+        "message": "'l1_ratio' must be a number in (0, 1]"
+      }
+    options.l1_ratio = float(l1_ratio)
+
+  hac_kernel = input_data.get("hac_kernel")
+  if hac_kernel is not None:
+    allowed = [m.value for m in HacKernel]
+    if hac_kernel not in allowed:
+      return {
+        "error": "INVALID_HAC_KERNEL",
+        "message": f"'hac_kernel' must be one of {allowed}"
+      }
+    options.hac_kernel = HacKernel(hac_kernel)
+
+  hac_bandwidth = input_data.get("hac_bandwidth")
+  if hac_bandwidth is not None:
+    allowed = [m.value for m in HacBandwidth]
+    if hac_bandwidth not in allowed:
+      return {
+        "error": "INVALID_HAC_BANDWIDTH",
+        "message": f"'hac_bandwidth' must be one of {allowed}"
+      }
+    options.hac_bandwidth = HacBandwidth(hac_bandwidth)
+
+  critical_values = input_data.get("critical_values")
+  if critical_values is not None:
+    allowed = [m.value for m in CriticalValueMethod]
+    if critical_values not in allowed:
+      return {
+        "error": "INVALID_CRITICAL_VALUES",
+        "message": f"'critical_values' must be one of {allowed}"
+      }
+    options.critical_values = CriticalValueMethod(critical_values)
+
+  backtest = input_data.get("backtest")
+  if backtest is not None:
+    allowed = [m.value for m in BacktestMethod]
+    if backtest not in allowed:
+      return {
+        "error": "INVALID_BACKTEST",
+        "message": f"'backtest' must be one of {allowed}"
+      }
+    options.backtest = BacktestMethod(backtest)
+
+  break_method = input_data.get("break_method")
+  if break_method is not None:
+    allowed = [m.value for m in BreakMethod]
+    if break_method not in allowed:
+      return {
+        "error": "INVALID_BREAK_METHOD",
+        "message": f"'break_method' must be one of {allowed}"
+      }
+    options.break_method = BreakMethod(break_method)
+
+  int_options = [
+    ("output_max_points", 2, "INVALID_OUTPUT_MAX_POINTS"),
+    ("irf_horizon", 1, "INVALID_IRF_HORIZON"),
+    ("irf_replications", 0, "INVALID_IRF_REPLICATIONS"),
+    ("workers", 0, "INVALID_WORKERS"),
+    ("seed", 0, "INVALID_SEED"),
+    ("bootstrap_replications", 1, "INVALID_BOOTSTRAP_REPLICATIONS"),
+    ("bootstrap_block_length", 1, "INVALID_BOOTSTRAP_BLOCK_LENGTH"),
+    ("forecast_horizon", 0, "INVALID_FORECAST_HORIZON"),
+    ("forecast_simulations", 1, "INVALID_FORECAST_SIMULATIONS"),
+    ("max_breaks", 1, "INVALID_MAX_BREAKS"),
+    ("subset_top", 1, "INVALID_SUBSET_TOP"),
+    ("subset_max_size", 1, "INVALID_SUBSET_MAX_SIZE"),
+    ("cv_folds", 2, "INVALID_CV_FOLDS"),
+    ("backtest_horizon", 1, "INVALID_BACKTEST_HORIZON"),
+    ("backtest_folds", 1, "INVALID_BACKTEST_FOLDS")
+  ]
+
+  for key, minimum, error_code in int_options:
+    value = input_data.get(key)
+    if value is None:
+      continue
+    if not isinstance(value, int) or isinstance(value, bool) or value < minimum:
+      return {
+        "error": error_code,
+        "message": f"'{key}' must be an integer >= {minimum}"
+      }
+    setattr(options, key, value)
+
+  forecast_exog = input_data.get("forecast_exog")
+  if forecast_exog is not None:
+    error = {
+      "error": "INVALID_FORECAST_EXOG",
+      "message": (
+        f"'forecast_exog' must map every predictor {predictor_names} "
+        f"to at least {options.forecast_horizon} future values"
+      )
+    }
+    if not isinstance(forecast_exog, dict) or not set(predictor_names) <= set(forecast_exog):
+      return error
+    for values in forecast_exog.values():
+      if not isinstance(values, list) or len(values) < options.forecast_horizon:
+        return error
+      if not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+        return error
+    options.forecast_exog = forecast_exog
+
+  return options
+
+
 def _auto_detect_target(names: list[str]) -> int:
   health_keywords = [
     "disease", "illness", "mortality", "death", "infection",
@@ -209,16 +551,24 @@ def _swap_series(
   names[idx1], names[idx2] = names[idx2], names[idx1]
 
 
-def _analyze_series_orders(series_list: list[np.ndarray]) -> list[SeriesOrder]:
+def _analyze_series_orders(
+  series_list: list[np.ndarray],
+  options: AnalysisOptions,
+  artifacts: ArtifactStore
+) -> list[SeriesOrder]:
   series_orders = []
+  stl_results: list[StlResult] = detect_trend_and_seasonality_batch(
+    series_list,
+    retain_components = retains_arrays(options.output_policy)
+  )
   i = 0
 
   for series in series_list:
     log(f"\nseries {i + 1}")
+    stl_result: StlResult = stl_results[i]
+    series_index = i
     i = i + 1
 
-    stl_result: StlResult = detect_trend_and_seasonality(series)
-
     if stl_result.has_trend:
       log("stl detected trend: using 'ct' regression")
       kpss_regression = "ct"
@@ -231,7 +581,10 @@ def _analyze_series_orders(series_list: list[np.ndarray]) -> list[SeriesOrder]:
     order_result: IntegrationOrderResult = determine_integration_order(
       data = series,
       kpss_regression = kpss_regression,
-      za_regression = za_regression
+      za_regression = za_regression,
+      artifacts = artifacts,
+      series_index = series_index,
+      critical_values = options.critical_values
     )
 
     series_orders.append(
@@ -245,7 +598,13 @@ def _analyze_series_orders(series_list: list[np.ndarray]) -> list[SeriesOrder]:
         has_trend = stl_result.has_trend,
         has_seasonality = stl_result.has_seasonality,
         trend_strength = stl_result.trend_strength,
-        seasonal_strength = stl_result.seasonal_strength
+        seasonal_strength = stl_result.seasonal_strength,
+        seasonal_period = stl_result.period,
+        stl_components = build_stl_components(
+          stl_result,
+          options.output_policy,
+          options.output_max_points
+        )
       )
     )
 
@@ -281,14 +640,20 @@ def _decide_model_type(series_orders: list[SeriesOrder]) -> ModelType:
 def _prepare_data(
     series_list: list[np.ndarray],
     series_orders: list[SeriesOrder],
-    model_type: ModelType
+    model_type: ModelType,
+    artifacts: ArtifactStore,
+    options: AnalysisOptions
 ) -> PreparedData:
   prepared = PreparedData(
     original_series = series_list,
     series_orders = series_orders,
-    model_type = model_type
+    model_type = model_type,
+    artifacts = artifacts
   )
 
+  if options.break_method == BreakMethod.BAI_PERRON:
+    return _prepare_bai_perron(prepared, series_orders, artifacts, options)
+
   all_breaks = []
   series_idx = 0
   for so in series_orders:
@@ -327,14 +692,54 @@ def _prepare_data(
   prepared.has_structural_break = True
   prepared.structural_breaks = all_breaks
 
-  prepared.periods_data = _split_into_periods(series_list, unique_breakpoints)
+  prepared.periods_data = _split_into_periods(series_list, unique_breakpoints, artifacts)
 
   return prepared
 
 
+# breaks in the target regression with every series at its integration
+# order, aligned on the most differenced one like the mixed model
+def _prepare_bai_perron(
+    prepared: PreparedData,
+    series_orders: list[SeriesOrder],
+    artifacts: ArtifactStore,
+    options: AnalysisOptions
+) -> PreparedData:
+  transformed = [artifacts.diff(i, so.order) for i, so in enumerate(series_orders)]
+  length = min(len(series) for series in transformed)
+  offset = len(artifacts.series[0]) - length
+
+  y = transformed[0][-length:]
+  X = None
+  if len(transformed) > 1:
+    X = np.column_stack([series[-length:] for series in transformed[1:]])
+
+  try:
+    result = bai_perron(y, X, max_breaks = options.max_breaks, min_segment = MIN_PERIOD_SIZE)
+  except Exception as e:
+    log(f"[ERROR] bai-perron estimation failed: {e}")
+    return prepared
+
+  prepared.bai_perron = result
+  if result.n_breaks == 0:
+    return prepared
+
+  breakpoints = [offset + idx for idx in result.break_indices]
+  log(f"bai-perron breakpoints: {breakpoints}")
+
+  prepared.has_structural_break = True
+  prepared.structural_breaks = [StructuralBreak(index = idx, series_index = 0) for idx in breakpoints]
+  prepared.periods_data = _split_into_periods(prepared.original_series, breakpoints, artifacts)
+
+  return prepared
+
+
+# period stores are windows of the full-sample store, so segment
+# statistics come from its indexes instead of being refit from scratch
 def _split_into_periods(
     series_list: list[np.ndarray],
-    breakpoints: list[int]
+    breakpoints: list[int],
+    artifacts: ArtifactStore
 ) -> list[PeriodData]:
   periods = []
   n_data = len(series_list[0])
@@ -359,7 +764,8 @@ def _split_into_periods(
       start_index = start,
       end_index = end,
       series_data = period_series,
-      data_size = end - start
+      data_size = end - start,
+      artifacts = artifacts.window(start, end)
     )
 
     periods.append(period)
@@ -373,11 +779,17 @@ def _split_into_periods(
 
 def _analyze_period(
     period_data: PeriodData,
-    period_type: PeriodType
+    period_type: PeriodType,
+    options: AnalysisOptions
 ) -> PeriodAnalysis:
   log(f"analyzing period {period_data.period_number}")
 
-  period_orders = _analyze_series_orders(period_data.series_data)
+  # orders of a period are the same for every target of a request
+  period_orders = period_data.artifacts.shared(
+    "series_orders",
+    lambda store: _analyze_series_orders(store.series, options, store),
+    permuted_list
+  )
   period_model_type = _decide_model_type(period_orders)
 
   log(f"period {period_data.period_number} model type: {period_model_type.value}")
@@ -391,14 +803,22 @@ def _analyze_period(
   )
 
 
-def _build_model(prepared_data: PreparedData, variable_names: list[str]) -> Optional[ModelResults]:
+def _build_model(
+  prepared_data: PreparedData,
+  variable_names: list[str],
+  options: AnalysisOptions
+) -> Optional[ModelResults]:
   if prepared_data.has_structural_break:
-    return _build_model_with_breaks(prepared_data, variable_names)
+    return _build_model_with_breaks(prepared_data, variable_names, options)
 
-  return _build_single_model(prepared_data, variable_names)
+  return _build_single_model(prepared_data, variable_names, options)
 
 
-def _build_model_with_breaks(prepared_data: PreparedData, variable_names: list[str]) -> ModelResults:
+def _build_model_with_breaks(
+  prepared_data: PreparedData,
+  variable_names: list[str],
+  options: AnalysisOptions
+) -> ModelResults:
   num_periods = len(prepared_data.periods_data)
   log(f"building separate models for {num_periods} periods")
 
@@ -416,14 +836,15 @@ def _build_model_with_breaks(prepared_data: PreparedData, variable_names: list[s
     else:
       period_type = PeriodType.CUSTOM
 
-    period_analysis = _analyze_period(period_data, period_type)
+    period_analysis = _analyze_period(period_data, period_type, options)
 
     period_prepared = PreparedData(
       original_series = period_data.series_data,
       series_orders = period_analysis.series_orders,
-      model_type = period_analysis.model_type
+      model_type = period_analysis.model_type,
+      artifacts = period_data.artifacts
     )
-    period_model = _build_single_model(period_prepared, variable_names)
+    period_model = _build_single_model(period_prepared, variable_names, options)
 
     period_result = PeriodModelResult(
       period_type = period_analysis.period_type,
@@ -435,6 +856,7 @@ def _build_model_with_breaks(prepared_data: PreparedData, variable_names: list[s
       series_orders = period_analysis.series_orders,
       cointegration = period_model.cointegration if period_model else None,
       regression = period_model.regression if period_model else None,
+      impulse_responses = period_model.impulse_responses if period_model else None,
       error_message = period_model.error_message if period_model else None
     )
 
@@ -456,10 +878,17 @@ def _build_model_with_breaks(prepared_data: PreparedData, variable_names: list[s
   )
 
 
-def _build_single_model(prepared_data: PreparedData, variable_names: list[str]) -> Optional[ModelResults]:
+def _build_single_model(
+  prepared_data: PreparedData,
+  variable_names: list[str],
+  options: AnalysisOptions
+) -> Optional[ModelResults]:
   series_list = prepared_data.original_series
   series_orders = prepared_data.series_orders
   model_type = prepared_data.model_type
+  artifacts = prepared_data.artifacts
+  if artifacts is None:
+    artifacts = ArtifactStore(series_list)
 
   if len(series_list) < 2:
     log("[ERROR] regression requires at least 2 variables (1 dependent + 1 independent)")
@@ -485,10 +914,23 @@ def _build_single_model(prepared_data: PreparedData, variable_names: list[str])
         add_constant = True,
         auto_select_lags = True,
         max_lags_search = 5,
-        variable_names = variable_names
+        variable_names = variable_names,
+        artifacts = artifacts,
+        lag_selection = options.lag_selection,
+        l1_ratio = options.l1_ratio,
+        cv_folds = options.cv_folds,
+        hac_kernel = options.hac_kernel,
+        hac_bandwidth = options.hac_bandwidth,
+        window = window_lag_index(artifacts, [0] * len(series_list), 5)
       )
+      _attach_bootstrap(regression_result, artifacts, options)
+      _attach_stability(regression_result, artifacts, options)
+      _attach_diagnostics(regression_result, artifacts, options)
 
-      return ModelResults(regression = regression_result)
+      return ModelResults(
+        regression = regression_result,
+        subset_search = _build_subset_search(y, X_list, variable_names[1:], options)
+      )
       
     except Exception as e:
       log(f"[ERROR] OLS regression failed: {e}")
@@ -499,21 +941,10 @@ def _build_single_model(prepared_data: PreparedData, variable_names: list[str])
   elif model_type == ModelType.FULL_NON_STATIONARY:
     log("full non-stationary: testing cointegration")
 
-    has_any_trend = False
-    for so in series_orders:
-      if so.has_trend:
-        has_any_trend = True
-        break
-
-    if has_any_trend:
-      log("trend detected in series: using 'ct' for cointegration")
-      coint_regression = "ct"
-    else:
-      log("no trend: using 'c' for cointegration")
-      coint_regression = "c"
+    coint_regression = _cointegration_regression(series_orders)
 
     try:
-      coint_result = _check_cointegration(series_list, coint_regression)
+      coint_result = _check_cointegration(series_list, coint_regression, artifacts, options.critical_values)
     except Exception as e:
       log(f"[ERROR] cointegration test failed: {e}")
       return ModelResults(
@@ -521,23 +952,22 @@ def _build_single_model(prepared_data: PreparedData, variable_names: list[str])
       )
 
     if coint_result.is_cointegrated:
-      log("cointegration found: building ECM")
-      
       try:
-        regression_result = build_ecm_model(
-          series_list, coint_regression,
-          variable_names = variable_names
-        )
+        regression_result = _build_error_correction(series_list, coint_regression, coint_result, variable_names, artifacts)
+        _attach_bootstrap(regression_result, artifacts, options)
+        _attach_stability(regression_result, artifacts, options)
+        _attach_diagnostics(regression_result, artifacts, options)
 
         return ModelResults(
           cointegration = coint_result,
           regression = regression_result
         )
       except Exception as e:
-        log(f"[ERROR] ECM model failed: {e}")
+        model_name = "VECM" if _uses_vecm(coint_result, len(series_list)) else "ECM"
+        log(f"[ERROR] {model_name} model failed: {e}")
         return ModelResults(
           cointegration = coint_result,
-          error_message = f"ECM model failed: {str(e)}"
+          error_message = f"{model_name} model failed: {str(e)}"
         )
     else:
       log("no cointegration: building VAR on differences")
@@ -545,12 +975,16 @@ def _build_single_model(prepared_data: PreparedData, variable_names: list[str])
       try:
         regression_result = build_var_on_differences(
           series_list,
-          variable_names = variable_names
+          variable_names = variable_names,
+          artifacts = artifacts
         )
+        _attach_stability(regression_result, artifacts, options)
+        _attach_diagnostics(regression_result, artifacts, options)
 
         return ModelResults(
           cointegration = coint_result,
-          regression = regression_result
+          regression = regression_result,
+          impulse_responses = _build_impulse_responses(artifacts, variable_names, options)
         )
       except Exception as e:
         log(f"[ERROR] VAR model failed: {e}")
@@ -562,38 +996,42 @@ def _build_single_model(prepared_data: PreparedData, variable_names: list[str])
   elif model_type == ModelType.MIXED:
     log("mixed integration orders: transforming series")
 
-    transformed_series = []
-
-    for i in range(len(series_list)):
-      series = series_list[i]
-      order = series_orders[i].order
-
-      if order == 0:
-        log(f"series {i}: I(0) → remains at levels")
-        transformed_series.append(series)
-
-      elif order == 1:
-        log(f"series {i}: I(1) → first difference")
-        diff1 = np.diff(series)
-        transformed_series.append(diff1)
-
-      elif order == 2:
-        log(f"series {i}: I(2) → second difference")
-        diff1 = np.diff(series)
-        diff2 = np.diff(diff1)
-        transformed_series.append(diff2)
-
-      else:
-        log(f"[WARNING] series {i}: unsupported order {order}, using levels")
-        transformed_series.append(series)
+    transformed_series = _transform_series(series_list, series_orders, artifacts)
 
     try:
       regression_result = build_mixed_regression(
         transformed_series, series_orders,
-        variable_names = variable_names
+        variable_names = variable_names,
+        artifacts = artifacts,
+        lag_selection = options.lag_selection,
+        l1_ratio = options.l1_ratio,
+        cv_folds = options.cv_folds,
+        hac_kernel = options.hac_kernel,
+        hac_bandwidth = options.hac_bandwidth,
+        window = window_lag_index(artifacts, _regression_orders(series_orders), MIXED_MAX_LAGS)
+      )
+      _attach_bootstrap(regression_result, artifacts, options)
+      _attach_stability(regression_result, artifacts, options)
+      _attach_diagnostics(regression_result, artifacts, options)
+
+      # the mixed model aligns the transformed series on their common tail
+      length = min(len(series) for series in transformed_series)
+      prefixes = {0: "", 1: "Δ", 2: "Δ²"}
+      subset_names = [
+        prefixes.get(so.order, "") + name
+        for so, name in zip(series_orders[1:], variable_names[1:])
+      ]
+      subset_search = _build_subset_search(
+        transformed_series[0][-length:],
+        [series[-length:] for series in transformed_series[1:]],
+        subset_names,
+        options
       )
 
-      return ModelResults(regression = regression_result)
+      return ModelResults(
+        regression = regression_result,
+        subset_search = subset_search
+      )
       
     except Exception as e:
       log(f"[ERROR] Mixed regression failed: {e}")
@@ -602,14 +1040,443 @@ def _build_single_model(prepared_data: PreparedData, variable_names: list[str])
       )
 
 
+def _cointegration_regression(series_orders: list[SeriesOrder]) -> str:
+  has_any_trend = False
+  for so in series_orders:
+    if so.has_trend:
+      has_any_trend = True
+      break
+
+  if has_any_trend:
+    log("trend detected in series: using 'ct' for cointegration")
+    return "ct"
+
+  log("no trend: using 'c' for cointegration")
+  return "c"
+
+
+# every series differenced to its integration order, for the mixed model
+def _transform_series(
+  series_list: list[np.ndarray],
+  series_orders: list[SeriesOrder],
+  artifacts: ArtifactStore
+) -> list[np.ndarray]:
+  transformed_series = []
+
+  for i in range(len(series_list)):
+    series = series_list[i]
+    order = series_orders[i].order
+
+    if order == 0:
+      log(f"series {i}: I(0) → remains at levels")
+      transformed_series.append(series)
+
+    elif order == 1:
+      log(f"series {i}: I(1) → first difference")
+      transformed_series.append(artifacts.diff(i, 1))
+
+    elif order == 2:
+      log(f"series {i}: I(2) → second difference")
+      transformed_series.append(artifacts.diff(i, 2))
+
+    else:
+      log(f"[WARNING] series {i}: unsupported order {order}, using levels")
+      transformed_series.append(series)
+
+  return transformed_series
+
+
+# difference order each series enters the mixed regression at, as
+# _transform_series applies them: orders above 2 stay at levels
+def _regression_orders(series_orders: list[SeriesOrder]) -> list[int]:
+  return [so.order if so.order <= 2 else 0 for so in series_orders]
+
+
+def _attach_bootstrap(
+  regression_result: RegressionResult,
+  artifacts: ArtifactStore,
+  options: AnalysisOptions
+):
+  if options.bootstrap_ci == BootstrapMethod.NONE or artifacts.fitted_model is None:
+    return
+
+  # the bootstrap refits by OLS, which would not match penalized estimates
+  if regression_result.regularization is not None:
+    log("bootstrap skipped: penalized fit")
+    return
+
+  try:
+    lower, upper, block_length = block_bootstrap_ci(
+      artifacts.fitted_model,
+      method = options.bootstrap_ci,
+      replications = options.bootstrap_replications,
+      block_length = options.bootstrap_block_length,
+      confidence_level = BOOTSTRAP_CONFIDENCE,
+      seed = options.seed,
+      workers = options.workers
+    )
+  except Exception as e:
+    log(f"[ERROR] bootstrap failed: {e}")
+    return
+
+  for coeff, ci_lower, ci_upper in zip(regression_result.coefficients, lower, upper):
+    coeff.ci_lower = float(ci_lower)
+    coeff.ci_upper = float(ci_upper)
+
+  regression_result.bootstrap = BootstrapInfo(
+    method = options.bootstrap_ci,
+    replications = options.bootstrap_replications,
+    block_length = block_length,
+    confidence_level = BOOTSTRAP_CONFIDENCE
+  )
+
+
+def _attach_stability(
+  regression_result: RegressionResult,
+  artifacts: ArtifactStore,
+  options: AnalysisOptions
+):
+  if not options.stability or artifacts.fitted_model is None:
+    return
+
+  try:
+    regression_result.stability = stability_tests(
+      artifacts.fitted_model,
+      significance = STABILITY_SIGNIFICANCE,
+      keep_paths = retains_arrays(options.output_policy)
+    )
+  except Exception as e:
+    log(f"[ERROR] stability tests failed: {e}")
+
+
+def _attach_diagnostics(
+  regression_result: RegressionResult,
+  artifacts: ArtifactStore,
+  options: AnalysisOptions
+):
+  if not options.diagnostics or artifacts.fitted_model is None:
+    return
+
+  try:
+    regression_result.diagnostics = residual_diagnostics(
+      artifacts.fitted_model,
+      significance = DIAGNOSTICS_SIGNIFICANCE,
+      keep_influence = retains_arrays(options.output_policy)
+    )
+  except Exception as e:
+    log(f"[ERROR] residual diagnostics failed: {e}")
+
+
+def _build_subset_search(
+  y: np.ndarray,
+  X_list: list[np.ndarray],
+  predictor_names: list[str],
+  options: AnalysisOptions
+) -> Optional[SubsetSearchResult]:
+  if options.subset_search == SubsetCriterion.NONE:
+    return None
+
+  try:
+    return best_subsets(
+      y,
+      np.column_stack(X_list),
+      predictor_names,
+      criterion = options.subset_search,
+      top = options.subset_top,
+      max_size = options.subset_max_size,
+      workers = options.workers
+    )
+  except Exception as e:
+    log(f"[ERROR] subset search failed: {e}")
+    return None
+
+
+# every applicable specification next to the one the decision tree chose.
+# the chosen fit is reused as is; the others share the request's artifacts
+# (differences, the cointegrating regression, the VAR) and skip the
+# bootstrap, stability and diagnostics stages. the store keeps the chosen
+# fit for the stages after this one
+def _build_comparison(
+  prepared_data: PreparedData,
+  model_results: ModelResults,
+  variable_names: list[str],
+  options: AnalysisOptions
+) -> Optional[ModelComparison]:
+  series_list = prepared_data.original_series
+  series_orders = prepared_data.series_orders
+  artifacts = prepared_data.artifacts
+  chosen_fit = artifacts.fitted_model
+
+  # with breaks the chosen models are per period and not comparable
+  selected = None
+  if not prepared_data.has_structural_break and model_results.regression is not None and chosen_fit is not None:
+    selected = _selected_specification(prepared_data.model_type, model_results.cointegration)
+
+  fits = []
+  failures = {}
+  for specification in _candidate_specifications(series_orders):
+    if specification == selected:
+      fits.append(CandidateFit(
+        specification = specification,
+        regression = model_results.regression,
+        model = chosen_fit
+      ))
+      continue
+
+    log(f"\ncomparison: fitting {specification.value}")
+    try:
+      regression = _fit_specification(specification, series_list, series_orders, variable_names, artifacts, options)
+      fits.append(CandidateFit(
+        specification = specification,
+        regression = regression,
+        model = artifacts.fitted_model
+      ))
+    except Exception as e:
+      log(f"[ERROR] {specification.value} failed: {e}")
+      failures[specification] = str(e)
+
+  artifacts.record_fit(chosen_fit)
+
+  try:
+    return compare_candidates(fits, selected, failures)
+  except Exception as e:
+    log(f"[ERROR] model comparison failed: {e}")
+    return None
+
+
+def _selected_specification(
+  model_type: ModelType,
+  cointegration: Optional[CointegrationResult]
+) -> ModelSpecification:
+  if model_type == ModelType.FULL_STATIONARY:
+    return ModelSpecification.OLS_LEVELS
+  if model_type == ModelType.MIXED:
+    return ModelSpecification.MIXED_DIFFERENCES
+  if cointegration is not None and cointegration.is_cointegrated:
+    if _uses_vecm(cointegration, cointegration.n_series):
+      return ModelSpecification.VECM
+    return ModelSpecification.ECM
+  return ModelSpecification.VAR_DIFFERENCES
+
+
+# levels always; differencing once some series is integrated; ECM, VECM
+# (three or more series) and VAR on first differences when the highest
+# order is exactly 1
+def _candidate_specifications(series_orders: list[SeriesOrder]) -> list[ModelSpecification]:
+  max_order = max(so.order for so in series_orders)
+  specifications = [ModelSpecification.OLS_LEVELS]
+  if max_order > 0:
+    specifications.append(ModelSpecification.MIXED_DIFFERENCES)
+  # the cointegration models need I(1) series: without any there is no
+  # long-run relation to correct, and I(2) is out of their scope
+  if max_order == 1:
+    specifications.append(ModelSpecification.ECM)
+    if len(series_orders) > 2:
+      specifications.append(ModelSpecification.VECM)
+    specifications.append(ModelSpecification.VAR_DIFFERENCES)
+  return specifications
+
+
+def _fit_specification(
+  specification: ModelSpecification,
+  series_list: list[np.ndarray],
+  series_orders: list[SeriesOrder],
+  variable_names: list[str],
+  artifacts: ArtifactStore,
+  options: AnalysisOptions
+) -> RegressionResult:
+  if specification == ModelSpecification.OLS_LEVELS:
+    return ols_regression(
+      y = series_list[0],
+      X_list = list(series_list[1:]),
+      add_constant = True,
+      auto_select_lags = True,
+      max_lags_search = 5,
+      variable_names = variable_names,
+      artifacts = artifacts,
+      lag_selection = options.lag_selection,
+      l1_ratio = options.l1_ratio,
+      cv_folds = options.cv_folds,
+      hac_kernel = options.hac_kernel,
+      hac_bandwidth = options.hac_bandwidth,
+      window = window_lag_index(artifacts, [0] * len(series_list), 5)
+    )
+
+  if specification == ModelSpecification.MIXED_DIFFERENCES:
+    return build_mixed_regression(
+      _transform_series(series_list, series_orders, artifacts), series_orders,
+      variable_names = variable_names,
+      artifacts = artifacts,
+      lag_selection = options.lag_selection,
+      l1_ratio = options.l1_ratio,
+      cv_folds = options.cv_folds,
+      hac_kernel = options.hac_kernel,
+      hac_bandwidth = options.hac_bandwidth,
+      window = window_lag_index(artifacts, _regression_orders(series_orders), MIXED_MAX_LAGS)
+    )
+
+  if specification == ModelSpecification.ECM:
+    return build_ecm_model(
+      series_list, _cointegration_regression(series_orders),
+      variable_names = variable_names,
+      artifacts = artifacts
+    )
+
+  if specification == ModelSpecification.VECM:
+    coint_regression = _cointegration_regression(series_orders)
+    coint_result = _check_cointegration(series_list, coint_regression, artifacts, options.critical_values)
+    if not coint_result.n_cointegration_relations:
+      raise ValueError("johansen test finds no cointegrating relation")
+    if coint_result.n_cointegration_relations >= len(series_list):
+      log(f"[WARNING] johansen rank {coint_result.n_cointegration_relations} equals the number of series, inconsistent with I(1) levels")
+      raise ValueError("johansen test finds full rank, inconsistent with I(1) levels")
+    return build_vecm_model(
+      series_list, coint_regression,
+      rank = coint_result.n_cointegration_relations,
+      variable_names = variable_names,
+      artifacts = artifacts
+    )
+
+  return build_var_on_differences(
+    series_list,
+    variable_names = variable_names,
+    artifacts = artifacts
+  )
+
+
+def _build_impulse_responses(
+  artifacts: ArtifactStore,
+  variable_names: list[str],
+  options: AnalysisOptions
+) -> Optional[ImpulseResponseResult]:
+  try:
+    return impulse_responses(
+      fitted_var(artifacts),
+      artifacts.diff_matrix(),
+      [f"Δ{name}" for name in variable_names],
+      horizon = options.irf_horizon,
+      replications = options.irf_replications,
+      seed = options.seed,
+      workers = options.workers
+    )
+  except Exception as e:
+    log(f"[ERROR] impulse responses failed: {e}")
+    return None
+
+
+def _build_causality(
+  artifacts: ArtifactStore,
+  series_orders: list[SeriesOrder],
+  variable_names: list[str]
+) -> Optional[CausalityResult]:
+  max_order = max(so.order for so in series_orders)
+
+  try:
+    return causality_matrix(artifacts, variable_names, max_order = max_order)
+  except Exception as e:
+    log(f"[ERROR] causality tests failed: {e}")
+    return None
+
+
+def _build_backtest(
+  artifacts: ArtifactStore,
+  options: AnalysisOptions
+) -> Optional[BacktestResult]:
+  if artifacts is None or artifacts.fitted_model is None:
+    return None
+
+  try:
+    return backtest_model(
+      artifacts,
+      method = options.backtest,
+      horizon = options.backtest_horizon,
+      folds = options.backtest_folds,
+      workers = options.workers
+    )
+  except Exception as e:
+    log(f"[ERROR] backtest failed: {e}")
+    return None
+
+
+def _build_forecast(
+  artifacts: ArtifactStore,
+  variable_names: list[str],
+  options: AnalysisOptions
+) -> Optional[ForecastResult]:
+  if artifacts is None or artifacts.fitted_model is None:
+    return None
+
+  horizon = options.forecast_horizon
+  future_exog = None
+  if options.forecast_exog is not None:
+    future_exog = np.column_stack([
+      options.forecast_exog[name][:horizon] for name in variable_names[1:]
+    ])
+
+  try:
+    return forecast_model(
+      artifacts,
+      horizon,
+      future_exog = future_exog,
+      simulations = options.forecast_simulations,
+      seed = options.seed,
+      confidence_level = FORECAST_CONFIDENCE
+    )
+  except Exception as e:
+    log(f"[ERROR] forecast failed: {e}")
+    return None
+
+
+# johansen's rank and eigenvectors feed a full VECM; two series get the
+# engle-granger single-equation ECM
+def _build_error_correction(
+  series_list: list[np.ndarray],
+  coint_regression: str,
+  coint_result: CointegrationResult,
+  variable_names: list[str],
+  artifacts: ArtifactStore
+) -> RegressionResult:
+  rank = coint_result.n_cointegration_relations
+  if _uses_vecm(coint_result, len(series_list)):
+    log(f"cointegration found: building VECM of rank {rank}")
+    return build_vecm_model(
+      series_list, coint_regression,
+      rank = rank,
+      variable_names = variable_names,
+      artifacts = artifacts
+    )
+
+  if coint_result.test_type == CointegrationTestType.JOHANSEN:
+    log(f"[WARNING] johansen rank {rank} equals the number of series, inconsistent with I(1) levels: building ECM")
+  log("cointegration found: building ECM")
+  return build_ecm_model(
+    series_list, coint_regression,
+    variable_names = variable_names,
+    artifacts = artifacts
+  )
+
+
+# a johansen rank r < k gives a VECM of k series. full rank says every
+# level is stationary, which contradicts the I(1) orders the model was
+# chosen on; rank 0 is still rejected, so the engle-granger ECM keeps
+# one relation instead
+def _uses_vecm(coint_result: CointegrationResult, n_series: int) -> bool:
+  return (
+    coint_result.test_type == CointegrationTestType.JOHANSEN
+    and coint_result.n_cointegration_relations < n_series
+  )
+
+
 def _check_cointegration(
     series_list: list[np.ndarray],
-    regression: str
+    regression: str,
+    artifacts: ArtifactStore,
+    critical_values: CriticalValueMethod = CriticalValueMethod.ASYMPTOTIC
 ) -> CointegrationResult:
   n_series = len(series_list)
 
   if n_series == 2:
-    aeg_result: AegTestResult = aeg_test(series_list, regression = regression)
+    aeg_result: AegTestResult = aeg_test(series_list, regression = regression, artifacts = artifacts)
     is_cointegrated = aeg_result.p_value < 0.05
 
     log(f"AEG: p = {aeg_result.p_value:.4f}, coint = {is_cointegrated}")
@@ -621,12 +1488,21 @@ def _check_cointegration(
       aeg_result = aeg_result
     )
   else:
-    johansen_result: JohansenTestResult = johansen_test(series_list, regression = regression)
+    johansen_result: JohansenEstimate = johansen_test(
+      series_list,
+      regression = regression,
+      artifacts = artifacts
+    )
+    if critical_values == CriticalValueMethod.FINITE_SAMPLE:
+      johansen_result = johansen_finite_sample(johansen_result, len(series_list[0]))
 
-    num_coint = 0
+    # sequential trace procedure: the rank is the first r whose null
+    # "rank <= r" survives at 5%, later rejections do not count
+    num_coint = len(johansen_result.lr1)
     for i in range(len(johansen_result.lr1)):
-      if johansen_result.lr1[i] > johansen_result.cvt[i, 1]:
-        num_coint = num_coint + 1
+      if not johansen_result.lr1[i] > johansen_result.cvt[i, 1]:
+        num_coint = i
+        break
 
     is_cointegrated = num_coint > 0
 
@@ -638,6 +1514,10 @@ def _check_cointegration(
       is_cointegrated = is_cointegrated,
       johansen_eigenvalues = johansen_result.eig.tolist(),
       johansen_trace_stats = johansen_result.lr1.tolist(),
+      johansen_max_eig_stats = johansen_result.lr2.tolist(),
+      johansen_trace_pvalues = johansen_result.trace_pvalues.tolist(),
+      johansen_max_eig_pvalues = johansen_result.max_eig_pvalues.tolist(),
+      johansen_lag_order = johansen_result.k_ar_diff,
       n_cointegration_relations = num_coint
     )
 
@@ -0,0 +1,109 @@
+import base64
+from typing import Optional
+import numpy as np
+from models.responses import (
+  OutputPolicy,
+  EncodedArray,
+  ComponentSummary,
+  ComponentOutput,
+  StlComponents,
+  StlResult
+)
+
+
+def retains_arrays(policy: OutputPolicy) -> bool:
+  return policy != OutputPolicy.NONE
+
+
+def encode_array(
+  values: np.ndarray,
+  dtype: str = "<f8",
+  indices: Optional[np.ndarray] = None
+) -> EncodedArray:
+  buffer = np.ascontiguousarray(values, dtype = dtype)
+  encoded_indices = None
+  if indices is not None:
+    encoded_indices = _b64(np.ascontiguousarray(indices, dtype = "<u4"))
+
+  return EncodedArray(
+    encoding = "base64",
+    dtype = buffer.dtype.str,
+    length = int(buffer.shape[0]),
+    data = _b64(buffer),
+    indices = encoded_indices
+  )
+
+
+def decode_array(encoded: EncodedArray) -> tuple[np.ndarray, Optional[np.ndarray]]:
+  values = np.frombuffer(base64.b64decode(encoded.data), dtype = encoded.dtype)
+  indices = None
+  if encoded.indices is not None:
+    indices = np.frombuffer(base64.b64decode(encoded.indices), dtype = "<u4")
+  return values, indices
+
+
+def summarize_array(values: np.ndarray) -> ComponentSummary:
+  return ComponentSummary(
+    mean = float(np.mean(values)),
+    std = float(np.std(values)),
+    min = float(np.min(values)),
+    max = float(np.max(values))
+  )
+
+
+# keeps the min and the max of every bucket, in time order, so peaks
+# survive in plots
+def downsample_indices(values: np.ndarray, max_points: int) -> np.ndarray:
+  n = len(values)
+  if n <= max_points:
+    return np.arange(n)
+
+  n_buckets = max(1, max_points // 2)
+  bucket = (np.arange(n) * n_buckets) // n
+  order = np.lexsort((values, bucket))
+
+  sizes = np.bincount(bucket, minlength = n_buckets)
+  ends = np.cumsum(sizes)
+  starts = ends - sizes
+  keep = np.concatenate([order[starts], order[ends - 1]])
+
+  return np.unique(keep)
+
+
+def build_component_output(
+  values: np.ndarray,
+  policy: OutputPolicy,
+  max_points: int
+) -> Optional[ComponentOutput]:
+  if policy == OutputPolicy.NONE or values is None:
+    return None
+
+  output = ComponentOutput(summary = summarize_array(values))
+
+  if policy == OutputPolicy.FULL:
+    output.values = encode_array(values)
+  elif policy == OutputPolicy.DOWNSAMPLED:
+    indices = downsample_indices(values, max_points)
+    output.values = encode_array(values[indices], dtype = "<f4", indices = indices)
+
+  return output
+
+
+def build_stl_components(
+  stl_result: StlResult,
+  policy: OutputPolicy,
+  max_points: int
+) -> Optional[StlComponents]:
+  if policy == OutputPolicy.NONE or stl_result.trend_component is None:
+    return None
+
+  return StlComponents(
+    policy = policy,
+    trend = build_component_output(stl_result.trend_component, policy, max_points),
+    seasonal = build_component_output(stl_result.seasonal_component, policy, max_points),
+    residual = build_component_output(stl_result.residual_component, policy, max_points)
+  )
+
+
+def _b64(buffer: np.ndarray) -> str:
+  return base64.b64encode(buffer.tobytes()).decode("ascii")
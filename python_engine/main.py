@@ -1,5 +1,6 @@
 import sys
 import json
+import multiprocessing
 from api.analyzer import analyze_time_series
 from models.responses import ErrorResponse
 from dataclasses import asdict
@@ -28,4 +29,6 @@ def main():
     sys.exit(1)
 
 if __name__ == "__main__":
+  # bootstrap stages may start a process pool inside the frozen binary
+  multiprocessing.freeze_support()
   main()
\ No newline at end of file
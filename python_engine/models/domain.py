@@ -2,7 +2,8 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Optional
 import numpy as np
-from models.responses import SeriesOrder, ModelType, PeriodType, StructuralBreak
+from models.responses import SeriesOrder, ModelType, PeriodType, StructuralBreak, OutputPolicy, BootstrapMethod, BreakMethod, BaiPerronResult, SubsetCriterion, LagSelection, ModelSpecification, BacktestMethod, HacKernel, HacBandwidth, CriticalValueMethod, RegressionResult
+from algorithms.artifacts import ArtifactStore, FittedModel
 
 @dataclass
 class PeriodData:
@@ -11,6 +12,7 @@ class PeriodData:
   end_index: int
   series_data: list[np.ndarray]
   data_size: int
+  artifacts: Optional[ArtifactStore] = None
 
 @dataclass
 class PreparedData:
@@ -20,6 +22,8 @@ class PreparedData:
   has_structural_break: bool = False
   structural_breaks: Optional[list[StructuralBreak]] = None
   periods_data: Optional[list[PeriodData]] = None
+  artifacts: Optional[ArtifactStore] = None
+  bai_perron: Optional[BaiPerronResult] = None
 
 @dataclass
 class PeriodAnalysis:
@@ -28,3 +32,113 @@ class PeriodAnalysis:
   series_orders: list[SeriesOrder]
   model_type: ModelType
   data_size: int
+
+@dataclass
+class AnalysisOptions:
+  output_policy: OutputPolicy = OutputPolicy.NONE
+  output_max_points: int = 512
+  irf_horizon: int = 10
+  irf_replications: int = 500
+  workers: int = 1 # process pool size for bootstrap work, 0 = all cores
+  seed: int = 0
+  causality: bool = True
+  bootstrap_ci: BootstrapMethod = BootstrapMethod.NONE
+  bootstrap_replications: int = 999
+  bootstrap_block_length: Optional[int] = None # None: ceil(n^(1/3))
+  forecast_horizon: int = 0 # 0 disables forecasting
+  forecast_simulations: int = 1000
+  forecast_exog: Optional[dict[str, list[float]]] = None # future predictor levels by name
+  break_method: BreakMethod = BreakMethod.ZIVOT_ANDREWS
+  max_breaks: int = 5
+  stability: bool = True
+  diagnostics: bool = True
+  subset_search: SubsetCriterion = SubsetCriterion.NONE
+  subset_top: int = 5
+  subset_max_size: Optional[int] = None # None: all predictors
+  lag_selection: LagSelection = LagSelection.AIC
+  l1_ratio: float = 0.5 # elastic net only
+  cv_folds: int = 5
+  hac_kernel: HacKernel = HacKernel.BARTLETT
+  hac_bandwidth: HacBandwidth = HacBandwidth.FIXED
+  critical_values: CriticalValueMethod = CriticalValueMethod.ASYMPTOTIC
+  compare_models: bool = False
+  backtest: BacktestMethod = BacktestMethod.NONE
+  backtest_horizon: int = 1
+  backtest_folds: int = 5
+
+@dataclass
+class JohansenEstimate:
+  eig: np.ndarray # eigenvalues, descending
+  evec: np.ndarray # beta, columns normalized so that beta' S11 beta = I
+  lr1: np.ndarray # trace statistics
+  lr2: np.ndarray # max-eigenvalue statistics
+  cvt: np.ndarray # (neqs, 3) trace critical values: 90%, 95%, 99%
+  cvm: np.ndarray # (neqs, 3) max-eigenvalue critical values
+  trace_pvalues: np.ndarray
+  max_eig_pvalues: np.ndarray
+  k_ar_diff: int
+  det_order: int
+  nobs: int
+  s00: np.ndarray
+  s01: np.ndarray
+  s11: np.ndarray
+  lag_aic: Optional[dict[int, float]] = None # lag order -> AIC, when selected
+  moments: Optional[np.ndarray] = None # cross products of [1, x_{t-1}, dx_{t-1..k}, dx_t], detrended
+  trend: Optional[np.ndarray] = None # (det_order + 1, neqs) detrending polynomial, highest power first
+
+@dataclass
+class VarEstimate:
+  lags: int
+  params: np.ndarray # (1 + neqs * lags, neqs): rows [const, lag1 block, lag2 block, ...]
+  stderr: np.ndarray
+  tvalues: np.ndarray
+  pvalues: np.ndarray
+  resid: np.ndarray # (nobs, neqs)
+  sigma_u: np.ndarray # residual covariance, df-adjusted
+  zz_inv: np.ndarray # (Z'Z)^-1 of the fitted design
+  nobs: int
+  lag_aic: Optional[dict[int, float]] = None # lag order -> AIC on the common sample
+
+@dataclass
+class VecmEstimate:
+  rank: int
+  k_ar_diff: int
+  det_order: int
+  params: np.ndarray # (regressors, neqs): rows [const, ect_1..rank, lag1 block, lag2 block, ...]
+  stderr: np.ndarray
+  tvalues: np.ndarray
+  pvalues: np.ndarray
+  alpha: np.ndarray # (neqs, rank) adjustment coefficients
+  beta: np.ndarray # (neqs, rank) cointegrating vectors, leading rank x rank block = I
+  gamma: np.ndarray # (k_ar_diff, neqs, neqs) short-run matrices, gamma[l - 1] @ dx_{t-l}
+  const: np.ndarray # (neqs,) intercepts of the differences, zero without a constant
+  trend: np.ndarray # detrending polynomial of the levels inside the error correction terms
+  resid: np.ndarray # (nobs, neqs)
+  sigma_u: np.ndarray # residual covariance, maximum likelihood
+  nobs: int
+
+@dataclass
+class PenalizedFit:
+  alpha: float
+  l1_ratio: float
+  intercept: float
+  coef: np.ndarray # original scale
+  alphas: np.ndarray # path, descending
+  cv_mse: np.ndarray
+  x_mean: np.ndarray
+  x_scale: np.ndarray
+
+@dataclass
+class MonitorStep:
+  index: int # row in the fitted sample's numbering, continued past its end
+  recursive_residual: float
+  cusum: float
+  cusum_squares: float
+  cusum_crossed: bool
+  cusum_squares_crossed: bool
+
+@dataclass
+class CandidateFit:
+  specification: ModelSpecification
+  regression: RegressionResult
+  model: FittedModel # target equation as its builder recorded it
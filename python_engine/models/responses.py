@@ -9,6 +9,7 @@ class StlResult:
   has_seasonality: bool
   trend_strength: float
   seasonal_strength: float
+  period: Optional[int] = None
   trend_component: Optional[np.ndarray] = None
   seasonal_component: Optional[np.ndarray] = None
   residual_component: Optional[np.ndarray] = None
@@ -67,6 +68,10 @@ class ZivotAndrewsResult:
   critical_values: AdfCriticalValues
   is_stationary: bool
 
+class CriticalValueMethod(Enum):
+  ASYMPTOTIC = "asymptotic" # mackinnon / kpss / zivot-andrews / johansen tables
+  FINITE_SAMPLE = "finite_sample" # simulated for the sample size and lags, cached on disk
+
 class ModelType(Enum):
   FULL_STATIONARY = "full_stationary"
   FULL_NON_STATIONARY = "full_non_stationary"
@@ -84,6 +89,8 @@ class SeriesOrder:
   has_seasonality: bool = False
   trend_strength: float = 0.0
   seasonal_strength: float = 0.0
+  seasonal_period: Optional[int] = None
+  stl_components: Optional[StlComponents] = None
 
 @dataclass
 class AegCritValues:
@@ -109,6 +116,10 @@ class CointegrationResult:
   aeg_result: Optional[AegTestResult] = None
   johansen_eigenvalues: Optional[list[float]] = None
   johansen_trace_stats: Optional[list[float]] = None
+  johansen_max_eig_stats: Optional[list[float]] = None
+  johansen_trace_pvalues: Optional[list[float]] = None
+  johansen_max_eig_pvalues: Optional[list[float]] = None
+  johansen_lag_order: Optional[int] = None
   n_cointegration_relations: Optional[int] = None
 
 @dataclass
@@ -116,6 +127,20 @@ class DurbinWatsonResult:
   statistic: float
   has_autocorrelation: bool
 
+@dataclass
+class StabilityResult:
+  significance: float
+  n_recursive: int # recursive residuals, T - k
+  start_index: int # first observation with a recursive residual
+  cusum_critical: float # band: ±a (sqrt(T - k) + 2 r / sqrt(T - k))
+  cusum_squares_critical: float # band: r / (T - k) ± c0
+  cusum_stable: bool
+  cusum_squares_stable: bool
+  first_cusum_crossing: Optional[int] = None # row of the regression sample
+  first_cusum_squares_crossing: Optional[int] = None
+  cusum: Optional[list[float]] = None # paths, with an array output policy
+  cusum_squares: Optional[list[float]] = None
+
 @dataclass
 class RegressionResult:
   coefficients: list[CoefficientInfo]
@@ -127,6 +152,96 @@ class RegressionResult:
   n_obs: int
   has_lags: bool = False
   uses_newey_west: bool = False
+  bootstrap: Optional[BootstrapInfo] = None
+  stability: Optional[StabilityResult] = None
+  regularization: Optional[RegularizationInfo] = None
+  diagnostics: Optional[DiagnosticsResult] = None
+  hac: Optional[HacInfo] = None # newey-west fits only
+  vecm: Optional[VecmInfo] = None
+
+@dataclass
+class DiagnosticTest:
+  name: str # "breusch_godfrey" | "ljung_box" | "breusch_pagan" | "white" | "jarque_bera"
+  statistic: float # chi2
+  p_value: float
+  df: int
+  rejects: bool # at the result's significance
+  lag: Optional[int] = None # order for breusch-godfrey, lags for ljung-box
+
+@dataclass
+class VarianceInflation:
+  name: str
+  vif: float
+
+@dataclass
+class DiagnosticsResult:
+  significance: float
+  breusch_godfrey: list[DiagnosticTest] # one per order
+  ljung_box: list[DiagnosticTest] # one per lag count
+  breusch_pagan: DiagnosticTest # koenker's studentized form
+  jarque_bera: DiagnosticTest
+  white: Optional[DiagnosticTest] # None when there are too many cross-products
+  vif: list[VarianceInflation] # non-constant columns of the design
+  max_leverage: float
+  max_cooks_distance: float
+  high_leverage: list[int] # rows with leverage above 2k / n
+  influential: list[int] # rows with cook's distance above 4 / n
+  autocorrelated: bool # any breusch-godfrey rejection
+  heteroskedastic: bool
+  non_normal: bool
+  leverage: Optional[list[float]] = None # per row, with an array output policy
+  cooks_distance: Optional[list[float]] = None
+
+@dataclass
+class ImpulseResponseResult:
+  variable_names: list[str]
+  horizon: int
+  orthogonalized: list[list[list[float]]] # [step][response][impulse]
+  fevd: list[list[list[float]]] # [step][response][impulse], rows sum to 1
+  replications: int = 0
+  confidence_level: Optional[float] = None
+  irf_lower: Optional[list[list[list[float]]]] = None
+  irf_upper: Optional[list[list[list[float]]]] = None
+  fevd_lower: Optional[list[list[list[float]]]] = None
+  fevd_upper: Optional[list[list[list[float]]]] = None
+
+@dataclass
+class ForecastResult:
+  horizon: int
+  model_kind: str # FittedModel.kind the forecast was produced from
+  exog_assumption: str # "provided" | "last_value" | "endogenous"
+  mean: list[float] # target in levels
+  lower: list[float]
+  upper: list[float]
+  simulations: int
+  confidence_level: float
+
+@dataclass
+class CausalityTest:
+  cause: str
+  effect: str
+  statistic: float # F for granger, chi2 wald for toda-yamamoto
+  p_value: float
+  df: list[int]
+  is_significant: bool
+
+@dataclass
+class BlockCausalityTest:
+  causes: list[str]
+  effect: str
+  statistic: float
+  p_value: float
+  df: list[int]
+  is_significant: bool
+
+@dataclass
+class CausalityResult:
+  method: str # "granger" | "toda_yamamoto"
+  lag_order: int
+  augmentation: int # extra unrestricted lags (max integration order)
+  n_obs: int
+  pairwise: list[CausalityTest]
+  block: list[BlockCausalityTest]
 
 class PeriodType(Enum):
   BEFORE_BREAK = "before_break"
@@ -144,6 +259,7 @@ class PeriodModelResult:
   end_index: Optional[int] = None
   cointegration: Optional[CointegrationResult] = None
   regression: Optional[RegressionResult] = None
+  impulse_responses: Optional[ImpulseResponseResult] = None
   error_message: Optional[str] = None
 
 @dataclass
@@ -151,6 +267,16 @@ class StructuralBreak:
   index: int
   series_index: int
 
+@dataclass
+class BaiPerronResult:
+  n_breaks: int # selected by BIC
+  break_indices: list[int] # first index of each new regime
+  min_segment: int
+  trimming: float
+  ssr: list[float] # optimal SSR for 0..max breaks
+  bic: list[float]
+  sup_f: list[float] # sup-F(m | 0) for m = 1..max breaks
+
 @dataclass
 class PeriodInfo:
   period_number: int
@@ -162,6 +288,12 @@ class PeriodInfo:
 class ModelResults:
   cointegration: Optional[CointegrationResult] = None
   regression: Optional[RegressionResult] = None
+  impulse_responses: Optional[ImpulseResponseResult] = None
+  causality: Optional[CausalityResult] = None
+  forecast: Optional[ForecastResult] = None
+  subset_search: Optional[SubsetSearchResult] = None
+  comparison: Optional[ModelComparison] = None
+  backtest: Optional[BacktestResult] = None
   error_message: Optional[str ] = None
   has_structural_break: bool = False
   # for several structural breaks
@@ -179,8 +311,17 @@ class AnalysisResult:
   model_results: Optional[ModelResults] = None
   has_structural_break: bool = False
   structural_breaks: Optional[list[StructuralBreak]] = None
+  bai_perron: Optional[BaiPerronResult] = None
   transformations: Optional[list[TransformationInfo]] = None
 
+@dataclass
+class MultiTargetResult:
+  series_count: int
+  variable_names: list[str] # input order
+  series_orders: list[SeriesOrder] # input order, shared by every target
+  targets: list[str]
+  results: list[AnalysisResult] # one per target, in the order requested
+
 class TransformationType(Enum):
   NONE = "none"
   FIRST_DIFFERENCE = "first_difference"
@@ -201,3 +342,188 @@ class CoefficientInfo:
   t_value: float
   p_value: float
   is_significant: bool
+  ci_lower: Optional[float] = None # bootstrap percentile interval
+  ci_upper: Optional[float] = None
+
+class BootstrapMethod(Enum):
+  NONE = "none"
+  MOVING = "moving"
+  STATIONARY = "stationary"
+
+@dataclass
+class BootstrapInfo:
+  method: BootstrapMethod
+  replications: int
+  block_length: int
+  confidence_level: float
+
+
+class SubsetCriterion(Enum):
+  NONE = "none"
+  AIC = "aic"
+  BIC = "bic"
+  ADJ_R2 = "adj_r2"
+
+@dataclass
+class SubsetSpecification:
+  predictors: list[str]
+  criterion_value: float
+  aic: float
+  bic: float
+  adj_r_squared: float
+  regression: RegressionResult
+
+@dataclass
+class SubsetSearchResult:
+  criterion: SubsetCriterion
+  n_candidates: int
+  max_size: int
+  evaluated: int # subsets fitted, out of 2^n_candidates - 1
+  specifications: list[SubsetSpecification] # best first
+
+
+class LagSelection(Enum):
+  AIC = "aic" # lag order by AIC, then OLS
+  RIDGE = "ridge"
+  LASSO = "lasso"
+  ELASTIC_NET = "elastic_net"
+
+@dataclass
+class RegularizationInfo:
+  method: LagSelection
+  alpha: float # selected penalty weight, on standardized predictors
+  l1_ratio: float # 0 = ridge, 1 = lasso
+  max_lags: int
+  n_candidates: int # lagged design columns, without the constant
+  n_nonzero: int
+  effective_df: float # trace of the ridge-approximation hat matrix
+  cv_folds: int
+  alphas: list[float] # path, descending
+  cv_mse: list[float] # forward-chaining validation MSE along the path
+
+
+class HacKernel(Enum):
+  BARTLETT = "bartlett"
+  PARZEN = "parzen"
+  QUADRATIC_SPECTRAL = "quadratic_spectral"
+
+class HacBandwidth(Enum):
+  FIXED = "fixed" # floor(4 (n / 100)^(2/9)) lags, the statsmodels default
+  ANDREWS = "andrews" # AR(1) plug-in, andrews (1991)
+  NEWEY_WEST = "newey_west" # nonparametric, newey & west (1994)
+
+@dataclass
+class HacInfo:
+  kernel: HacKernel
+  bandwidth_method: HacBandwidth
+  bandwidth: float # kernel weights w(j / bandwidth); bartlett lags = bandwidth - 1
+
+
+@dataclass
+class VecmInfo:
+  rank: int
+  lag_order: int # lagged differences
+  beta: list[list[float]] # (n_series, rank) cointegrating vectors, normalized on the first rank series
+  alpha: list[list[float]] # (n_series, rank) adjustment coefficients
+  series_names: list[str]
+
+
+class ModelSpecification(Enum):
+  OLS_LEVELS = "ols_levels"
+  MIXED_DIFFERENCES = "mixed_differences" # each series differenced to its integration order
+  ECM = "ecm"
+  VECM = "vecm" # johansen, three or more series
+  VAR_DIFFERENCES = "var_differences"
+
+@dataclass
+class CandidateModel:
+  specification: ModelSpecification
+  selected: bool # the specification the decision tree chose
+  model_kind: Optional[str] = None # kind of the recorded fit, e.g. "ols_lags"
+  n_obs: Optional[int] = None
+  n_params: Optional[int] = None
+  log_likelihood: Optional[float] = None # gaussian, target equation
+  aic: Optional[float] = None # per observation
+  bic: Optional[float] = None # per observation
+  holdout_rmse: Optional[float] = None # one-step-ahead, expanding window
+  holdout_mae: Optional[float] = None
+  aic_rank: Optional[int] = None # 1 = best
+  bic_rank: Optional[int] = None
+  holdout_rank: Optional[int] = None
+  regression: Optional[RegressionResult] = None
+  error_message: Optional[str] = None
+
+@dataclass
+class ModelComparison:
+  holdout_size: int # final observations every candidate is scored on
+  best_by_aic: Optional[ModelSpecification]
+  best_by_bic: Optional[ModelSpecification]
+  best_by_holdout: Optional[ModelSpecification]
+  candidates: list[CandidateModel] # by holdout error, then aic; failures last
+
+
+class BacktestMethod(Enum):
+  NONE = "none"
+  EXPANDING = "expanding"
+  SLIDING = "sliding" # fixed-length window
+
+@dataclass
+class BacktestFold:
+  origin: int # index of the first forecast observation
+  train_start: int
+  train_size: int
+  rmse: float
+  mae: float
+  mase: float
+  errors: list[float] # actual - forecast of the target level, steps 1..horizon
+
+@dataclass
+class BacktestResult:
+  method: BacktestMethod
+  model_kind: str
+  horizon: int
+  exog_assumption: str # "realized" | "endogenous" (VAR, VECM)
+  rmse: float # pooled over folds and steps
+  mae: float
+  mase: float # mean over folds
+  rmse_by_step: list[float]
+  folds: list[BacktestFold]
+
+
+class BreakMethod(Enum):
+  ZIVOT_ANDREWS = "zivot_andrews" # one break per series from the unit root tests
+  BAI_PERRON = "bai_perron" # multiple breaks in the target regression
+
+
+class OutputPolicy(Enum):
+  NONE = "none"
+  SUMMARY = "summary"
+  FULL = "full"
+  DOWNSAMPLED = "downsampled"
+
+@dataclass
+class EncodedArray:
+  encoding: str # "base64" of the raw little-endian buffer
+  dtype: str # numpy dtype string, e.g. "<f8"
+  length: int
+  data: str
+  indices: Optional[str] = None # base64 "<u4" positions of downsampled points
+
+@dataclass
+class ComponentSummary:
+  mean: float
+  std: float
+  min: float
+  max: float
+
+@dataclass
+class ComponentOutput:
+  summary: ComponentSummary
+  values: Optional[EncodedArray] = None
+
+@dataclass
+class StlComponents:
+  policy: OutputPolicy
+  trend: ComponentOutput
+  seasonal: ComponentOutput
+  residual: ComponentOutput
@@ -0,0 +1,136 @@
+import sys
+import numpy as np
+import pytest
+from statsmodels.regression.linear_model import OLS
+from statsmodels.tsa.stattools import coint
+from algorithms.artifacts import ArtifactStore
+from algorithms.cointegration_tests import aeg_test, johansen_test
+from algorithms.ecm import build_ecm_model
+from algorithms.integration import determine_integration_order
+from algorithms.var import fitted_var
+
+
+def log_test(msg):
+    print(f"[TEST] {msg}", file=sys.stderr)
+
+
+def _cointegrated_pair(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    x = np.cumsum(rng.normal(size=n))
+    y = 0.5 * x + rng.normal(size=n)
+    return y, x
+
+
+class TestArtifactStore:
+
+    def test_diff_pyramid_builds_on_lower_orders(self):
+        series = np.cumsum(np.cumsum(np.random.default_rng(0).normal(size=100)))
+        store = ArtifactStore([series])
+
+        second = store.diff(0, 2)
+        first = store.diff(0, 1)
+
+        np.testing.assert_allclose(second, np.diff(series, n=2))
+        np.testing.assert_allclose(first, np.diff(series))
+        assert store.misses == 2
+        assert store.hits == 1
+
+    def test_diff_matrix_columns(self):
+        y, x = _cointegrated_pair()
+        store = ArtifactStore([y, x])
+
+        matrix = store.diff_matrix()
+
+        assert matrix.shape == (199, 2)
+        np.testing.assert_allclose(matrix[:, 1], np.diff(x))
+        assert store.diff_matrix() is matrix
+
+    @pytest.mark.parametrize("regression", ["c", "ct"])
+    def test_aeg_matches_statsmodels(self, regression):
+        y, x = _cointegrated_pair(seed=1)
+
+        result = aeg_test([y, x], regression=regression)
+        coint_t, pvalue, crit = coint(y, x, trend=regression)
+
+        assert result.coint_t == pytest.approx(coint_t, rel=1e-10)
+        assert result.p_value == pytest.approx(pvalue, rel=1e-8, abs=1e-300)
+        assert result.crit_values.five_percent == pytest.approx(crit[1])
+
+    def test_ecm_reuses_cointegrating_regression(self):
+        y, x = _cointegrated_pair(seed=2)
+        store = ArtifactStore([y, x])
+
+        aeg_test([y, x], regression="c", artifacts=store)
+        hits_before = store.hits
+        shared = build_ecm_model([y, x], "c", artifacts=store)
+        standalone = build_ecm_model([y, x], "c")
+
+        assert store.hits > hits_before
+        assert shared.coefficients[1].value == pytest.approx(standalone.coefficients[1].value)
+
+    def test_cointegrating_residuals_match_ols(self):
+        y, x = _cointegrated_pair(seed=3)
+        store = ArtifactStore([y, x])
+
+        fit = store.cointegrating_regression("ct")
+        expected = OLS(y, np.column_stack([np.ones(len(y)), np.arange(len(y)), x])).fit()
+
+        np.testing.assert_allclose(fit.resid, expected.resid, atol=1e-10)
+        assert fit.rsquared == pytest.approx(expected.rsquared)
+
+    def test_integration_order_fills_store(self):
+        y, x = _cointegrated_pair(seed=4)
+        store = ArtifactStore([y, x])
+
+        result = determine_integration_order(x, artifacts=store, series_index=1)
+        log_test(f"order: {result.order}")
+
+        assert result.order == 1
+        assert store.has(("diff", 1, 1))
+        assert store.diff(1, 1) is store.diff(1, 1)
+
+
+class TestPermutedStore:
+
+    def _levels(self, n=200, seed=5):
+        rng = np.random.default_rng(seed)
+        common = np.cumsum(rng.normal(size=n))
+        return [common + rng.normal(size=n), 0.5 * common + rng.normal(size=n), np.cumsum(rng.normal(size=n))]
+
+    def test_differences_come_from_parent(self):
+        series = self._levels()
+        store = ArtifactStore(series)
+        view = store.permuted([2, 1, 0])
+
+        assert view.diff(0, 1) is store.diff(2, 1)
+        assert view.root_index(0) == 2
+        assert view.window(50, 150).root_index(2) == 0
+        assert view.window(50, 150).root() == (store, 50)
+        assert not view.is_window
+        assert view.window(50, 150).is_window
+
+    @pytest.mark.parametrize("columns", [[1, 0, 2], [2, 1, 0]])
+    def test_system_fits_match_refit(self, columns):
+        series = self._levels()
+        store = ArtifactStore(series)
+        view = store.permuted(columns)
+        fresh = ArtifactStore([series[c] for c in columns])
+
+        johansen = johansen_test(list(view.series), artifacts=view)
+        var = fitted_var(view)
+        expected_johansen = johansen_test(list(fresh.series), artifacts=fresh)
+        expected_var = fitted_var(fresh)
+
+        assert store.has(("johansen", 0, None, 10)) and store.has(("var", 15))
+        np.testing.assert_allclose(johansen.lr1, expected_johansen.lr1, rtol=1e-10)
+        # eigenvector columns are defined up to sign
+        np.testing.assert_allclose(np.abs(johansen.evec), np.abs(expected_johansen.evec), rtol=1e-8, atol=1e-10)
+        np.testing.assert_allclose(johansen.moments, expected_johansen.moments, rtol=1e-10)
+        np.testing.assert_allclose(johansen.s01, expected_johansen.s01, rtol=1e-10)
+        np.testing.assert_allclose(var.params, expected_var.params, rtol=1e-8, atol=1e-12)
+        np.testing.assert_allclose(var.zz_inv, expected_var.zz_inv, rtol=1e-8, atol=1e-12)
+        np.testing.assert_allclose(var.sigma_u, expected_var.sigma_u, rtol=1e-10)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
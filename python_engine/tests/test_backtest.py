@@ -0,0 +1,140 @@
+import sys
+import json
+import numpy as np
+import pytest
+from statsmodels.tsa.api import VAR
+from api.analyzer import analyze_time_series
+from algorithms.artifacts import ArtifactStore
+from algorithms.backtest import backtest_model, dynamic_system, _window_moments
+from algorithms.ecm import build_ecm_model
+from algorithms.regression import ols_regression
+from algorithms.var import build_var_on_differences
+from models.responses import BacktestMethod
+
+
+def log_test(msg):
+    print(f"[TEST] {msg}", file=sys.stderr)
+
+
+def _var_levels(n=160, seed=3):
+    rng = np.random.default_rng(seed)
+    d = np.zeros((n, 2))
+    for t in range(2, n):
+        d[t] = 0.1 + np.array([[0.4, 0.2], [0.1, 0.3]]) @ d[t - 1] - 0.2 * d[t - 2] + rng.normal(size=2)
+    return np.cumsum(d, axis=0)
+
+
+class TestBacktestModel:
+
+    @pytest.mark.parametrize("method", [BacktestMethod.EXPANDING, BacktestMethod.SLIDING])
+    def test_var_matches_statsmodels_refits(self, method):
+        levels = _var_levels()
+        store = ArtifactStore(list(levels.T))
+        build_var_on_differences(list(levels.T), artifacts=store)
+        lags = store.fitted_model.lags
+        diffs = store.diff_matrix()
+
+        result = backtest_model(store, method, horizon=4, folds=3)
+
+        for fold in result.folds:
+            # difference row t - 1 is level t; the fit needs `lags` presample rows
+            train = diffs[fold.train_start - 1 - lags:fold.origin - 1]
+            forecast = VAR(train).fit(lags, trend="c").forecast(train[-lags:], 4)
+            expected = levels[fold.origin:fold.origin + 4, 0] - (levels[fold.origin - 1, 0] + np.cumsum(forecast[:, 0]))
+            np.testing.assert_allclose(fold.errors, expected, atol=1e-8)
+        assert result.exog_assumption == "endogenous"
+
+    def test_lagged_ols_feeds_its_own_predictions(self):
+        rng = np.random.default_rng(4)
+        n = 160
+        x = rng.normal(size=n)
+        y = np.zeros(n)
+        for t in range(1, n):
+            y[t] = 1 + 0.6 * y[t - 1] + 0.5 * x[t] + rng.normal()
+        store = ArtifactStore([y, x])
+        ols_regression(y, [x], artifacts=store)
+        model = store.fitted_model
+        offset = n - len(model.y)
+
+        result = backtest_model(store, horizon=3, folds=4)
+
+        assert model.kind == "ols_lags"
+        for fold in result.folds:
+            params = np.linalg.lstsq(model.X[:fold.origin - offset], model.y[:fold.origin - offset], rcond=None)[0]
+            path = list(y[:fold.origin])
+            for t in range(fold.origin, fold.origin + 3):
+                lagged = [path[t - lag] for lag in range(1, model.lags + 1)] + [x[t - lag] for lag in range(1, model.lags + 1)]
+                path.append(np.dot([1, x[t]] + lagged, params))
+            np.testing.assert_allclose(fold.errors, y[fold.origin:fold.origin + 3] - path[fold.origin:], atol=1e-8)
+
+    def test_ecm_error_correction_follows_predicted_levels(self):
+        rng = np.random.default_rng(5)
+        n = 200
+        x = np.cumsum(rng.normal(size=n))
+        y = 2 + 0.8 * x + rng.normal(size=n)
+        store = ArtifactStore([y, x])
+        build_ecm_model([y, x], "c", artifacts=store)
+        equilibrium = y - store.cointegrating_regression("c").resid
+
+        result = backtest_model(store, horizon=3, folds=4)
+        log_test(f"ecm backtest rmse {result.rmse:.3f}, mase {result.mase:.3f}")
+
+        model = store.fitted_model
+        for fold in result.folds:
+            rows = fold.origin - 1
+            params = np.linalg.lstsq(model.X[:rows], model.y[:rows], rcond=None)[0]
+            level = y[fold.origin - 1]
+            predicted = []
+            for t in range(fold.origin, fold.origin + 3):
+                level = level + params @ [1, level - equilibrium[t - 1], x[t] - x[t - 1]]
+                predicted.append(level)
+            np.testing.assert_allclose(fold.errors, y[fold.origin:fold.origin + 3] - predicted, atol=1e-8)
+
+    def test_sliding_moments_match_direct_windows(self):
+        levels = _var_levels(seed=6)
+        store = ArtifactStore(list(levels.T))
+        build_var_on_differences(list(levels.T), artifacts=store)
+        system = dynamic_system(store.fitted_model, store)
+        origins = [100, 110, 120]
+        starts = [0, 10, 20]
+
+        moments = _window_moments(system, origins, starts)
+
+        for (gram, cross), start, origin in zip(moments, starts, origins):
+            X, Y = system.X[start:origin], system.Y[start:origin]
+            np.testing.assert_allclose(gram, X.T @ X, rtol=1e-10)
+            np.testing.assert_allclose(cross, X.T @ Y, rtol=1e-10, atol=1e-10)
+
+
+class TestBacktestOption:
+
+    def _payload(self, **options):
+        rng = np.random.default_rng(7)
+        x = np.cumsum(rng.normal(size=150))
+        series = [2 + 0.8 * x + rng.normal(size=150), x]
+        data = [{"name": f"s{i}", "data": s.tolist()} for i, s in enumerate(series)]
+        return json.dumps(dict({"series": data, "target_index": 0}, **options))
+
+    def test_attached_and_identical_in_parallel(self):
+        serial = json.loads(analyze_time_series(self._payload(backtest="expanding", backtest_horizon=2, backtest_folds=4)))
+        parallel = json.loads(analyze_time_series(self._payload(backtest="expanding", backtest_horizon=2, backtest_folds=4, workers=2)))
+        backtest = serial["model_results"]["backtest"]
+
+        assert len(backtest["folds"]) == 4
+        assert len(backtest["rmse_by_step"]) == 2
+        assert backtest["folds"][-1]["origin"] == 148
+        assert backtest == parallel["model_results"]["backtest"]
+
+    def test_off_by_default(self):
+        result = json.loads(analyze_time_series(self._payload()))
+
+        assert result["model_results"]["backtest"] is None
+
+    def test_rejects_unknown_method(self):
+        result = json.loads(analyze_time_series(self._payload(backtest="rolling")))
+
+        assert result["error"] == "INVALID_BACKTEST"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
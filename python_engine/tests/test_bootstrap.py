@@ -0,0 +1,93 @@
+import sys
+import json
+import numpy as np
+import pytest
+from api.analyzer import analyze_time_series
+from algorithms.artifacts import ArtifactStore
+from algorithms.bootstrap import block_bootstrap_ci, block_indices
+from algorithms.regression import ols_regression
+from models.responses import BootstrapMethod
+
+
+def log_test(msg):
+    print(f"[TEST] {msg}", file=sys.stderr)
+
+
+def _regression_data(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.normal(size=n)
+    noise = np.zeros(n)
+    for t in range(1, n):
+        noise[t] = 0.3 * noise[t - 1] + rng.normal()
+    return 1.0 + 2.0 * x + noise, x
+
+
+class TestBlockBootstrap:
+
+    @pytest.mark.parametrize("method", [BootstrapMethod.MOVING, BootstrapMethod.STATIONARY])
+    def test_indices_form_contiguous_blocks(self, method):
+        rng = np.random.default_rng(0)
+
+        indices = block_indices(rng, 50, 100, method, 8)
+        steps = np.diff(indices, axis=1)
+
+        assert indices.shape == (50, 100)
+        assert indices.min() >= 0 and indices.max() < 100
+        # most consecutive draws continue the current block
+        assert np.mean((steps == 1) | (steps == -99)) > 0.8
+
+    def test_records_fit_and_covers_estimate(self):
+        y, x = _regression_data()
+        store = ArtifactStore([y, x])
+
+        result = ols_regression(y, [x], variable_names=["y", "x"], artifacts=store)
+        model = store.fitted_model
+        lower, upper, block_length = block_bootstrap_ci(model, replications=500, seed=1)
+        log_test(f"{model.kind}: slope CI [{lower[1]:.3f}, {upper[1]:.3f}]")
+
+        assert model.names[:2] == ["const", "x"]
+        assert block_length == 7
+        for i, coeff in enumerate(result.coefficients):
+            assert lower[i] < coeff.value < upper[i]
+        assert lower[1] < 2.0 < upper[1]
+
+    def test_parallel_matches_serial(self):
+        y, x = _regression_data(seed=2)
+        store = ArtifactStore([y, x])
+        ols_regression(y, [x], artifacts=store)
+
+        serial = block_bootstrap_ci(store.fitted_model, replications=300, seed=5, workers=1)
+        pooled = block_bootstrap_ci(store.fitted_model, replications=300, seed=5, workers=2)
+
+        np.testing.assert_array_equal(serial[0], pooled[0])
+        np.testing.assert_array_equal(serial[1], pooled[1])
+
+    def test_request_option_attaches_intervals(self):
+        y, x = _regression_data(seed=3)
+        payload = {
+            "series": [{"name": "cases", "data": y.tolist()}, {"name": "temp", "data": x.tolist()}],
+            "bootstrap_ci": "stationary",
+            "bootstrap_replications": 200
+        }
+
+        result = json.loads(analyze_time_series(json.dumps(payload)))
+        regression = result["model_results"]["regression"]
+
+        assert regression["bootstrap"]["method"] == "stationary"
+        assert regression["bootstrap"]["replications"] == 200
+        for coeff in regression["coefficients"]:
+            assert coeff["ci_lower"] < coeff["value"] < coeff["ci_upper"]
+
+    def test_default_has_no_intervals(self):
+        y, x = _regression_data(seed=3)
+        payload = {"series": [{"name": "cases", "data": y.tolist()}, {"name": "temp", "data": x.tolist()}]}
+
+        result = json.loads(analyze_time_series(json.dumps(payload)))
+        regression = result["model_results"]["regression"]
+
+        assert regression["bootstrap"] is None
+        assert regression["coefficients"][0]["ci_lower"] is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,97 @@
+import sys
+import json
+import numpy as np
+import pytest
+from statsmodels.tsa.api import VAR
+from api.analyzer import analyze_time_series
+from algorithms.artifacts import ArtifactStore
+from algorithms.causality import causality_matrix
+from algorithms.design_matrix import lagged_design
+
+NAMES = ["a", "b", "c"]
+
+
+def log_test(msg):
+    print(f"[TEST] {msg}", file=sys.stderr)
+
+
+def _system(n=300, seed=0):
+    """a drives b, c is independent"""
+    rng = np.random.default_rng(seed)
+    shocks = rng.normal(size=(n, 3))
+    data = np.zeros((n, 3))
+    for t in range(1, n):
+        data[t] = 0.5 * data[t - 1] + shocks[t]
+        data[t, 1] += 0.4 * data[t - 1, 0]
+    return data
+
+
+class TestCausality:
+
+    def test_wald_matches_statsmodels(self):
+        data = _system()
+
+        result = causality_matrix(ArtifactStore(list(data.T)), NAMES)
+        fitted = VAR(data).fit(result.lag_order)
+
+        assert result.method == "granger"
+        for test in result.pairwise:
+            cause, effect = NAMES.index(test.cause), NAMES.index(test.effect)
+            expected = fitted.test_causality(effect, [cause], kind="f")
+            assert test.statistic == pytest.approx(expected.test_statistic, rel=1e-10)
+            assert test.p_value == pytest.approx(expected.pvalue, rel=1e-8)
+            assert test.df == list(expected.df)
+
+        for test in result.block:
+            effect = NAMES.index(test.effect)
+            causes = [i for i in range(3) if i != effect]
+            expected = fitted.test_causality(effect, causes, kind="f")
+            assert test.statistic == pytest.approx(expected.test_statistic, rel=1e-10)
+            assert test.p_value == pytest.approx(expected.pvalue, rel=1e-8)
+            assert test.df == list(expected.df)
+
+    def test_detects_true_direction(self):
+        result = causality_matrix(ArtifactStore(list(_system(seed=1).T)), NAMES)
+        significant = {(t.cause, t.effect) for t in result.pairwise if t.p_value < 0.001}
+        log_test(f"significant pairs: {significant}")
+
+        assert ("a", "b") in significant
+        assert ("b", "a") not in significant
+
+    def test_toda_yamamoto_matches_restricted_regression(self):
+        levels = np.cumsum(_system(seed=2), axis=0)
+
+        result = causality_matrix(ArtifactStore(list(levels.T)), NAMES, max_order=1)
+        p = result.lag_order
+        total = p + 1
+
+        design = lagged_design(levels, total)
+        y = levels[total:, 1]
+        tested = [1 + 3 * lag for lag in range(p)]  # first p lags of "a"
+        restricted = [c for c in range(design.shape[1]) if c not in tested]
+
+        ssr_u = np.sum((y - design @ np.linalg.lstsq(design, y, rcond=None)[0]) ** 2)
+        z_r = design[:, restricted]
+        ssr_r = np.sum((y - z_r @ np.linalg.lstsq(z_r, y, rcond=None)[0]) ** 2)
+        expected = (ssr_r - ssr_u) / (ssr_u / (design.shape[0] - design.shape[1]))
+
+        test = next(t for t in result.pairwise if t.cause == "a" and t.effect == "b")
+        assert result.method == "toda_yamamoto"
+        assert test.df == [p]
+        assert test.statistic == pytest.approx(expected, rel=1e-8)
+
+    def test_analysis_includes_causality(self):
+        data = _system(n=200, seed=3)
+        series = [{"name": name, "data": data[:, i].tolist()} for i, name in enumerate(NAMES)]
+
+        enabled = json.loads(analyze_time_series(json.dumps({"series": series})))
+        disabled = json.loads(analyze_time_series(json.dumps({"series": series, "causality": False})))
+
+        causality = enabled["model_results"]["causality"]
+        assert len(causality["pairwise"]) == 6
+        assert len(causality["block"]) == 3
+        assert disabled["model_results"]["causality"] is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,185 @@
+import sys
+import os
+import json
+import warnings
+import numpy as np
+import pytest
+from statsmodels.tsa.stattools import adfuller, kpss, zivot_andrews
+import algorithms.critical_values as critical_values
+from api.analyzer import analyze_time_series
+from algorithms.critical_values import (
+    adf_statistics,
+    kpss_statistics,
+    za_statistics,
+    critical_value_table,
+    finite_sample_pvalue,
+    finite_sample_critical_values,
+    simulate_statistics,
+    SIZE_GRID
+)
+from algorithms.johansen import johansen_native, rank_zero_statistics
+
+
+def log_test(msg):
+    print(f"[TEST] {msg}", file=sys.stderr)
+
+
+@pytest.fixture
+def table_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv(critical_values.CACHE_ENV, str(tmp_path))
+    for test in critical_values.REPLICATIONS:
+        monkeypatch.setitem(critical_values.REPLICATIONS, test, 400)
+    critical_values._table.cache_clear()
+    yield tmp_path
+    critical_values._table.cache_clear()
+
+
+def _walks(m=3, n=120, seed=3):
+    rng = np.random.default_rng(seed)
+    return np.cumsum(rng.normal(size=(m, n)), axis=1)
+
+
+class TestSimulatedStatistics:
+
+    @pytest.mark.parametrize("variant", ["n", "c", "ct"])
+    @pytest.mark.parametrize("lags", [0, 3])
+    def test_adf_matches_adfuller(self, variant, lags):
+        series = _walks()
+        expected = [adfuller(s, maxlag=lags, autolag=None, regression=variant, result_object=False)[0] for s in series]
+        np.testing.assert_allclose(adf_statistics(series, variant, lags), expected, rtol=1e-10)
+
+    @pytest.mark.parametrize("variant", ["c", "ct"])
+    def test_kpss_matches_statsmodels(self, variant):
+        series = _walks()
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            expected = [kpss(s, regression=variant, nlags=4)[0] for s in series]
+        np.testing.assert_allclose(kpss_statistics(series, variant, 4), expected, rtol=1e-10)
+
+    @pytest.mark.parametrize("variant", ["c", "t", "ct"])
+    def test_za_matches_zivot_andrews(self, variant):
+        series = _walks()
+        expected = [zivot_andrews(s, maxlag=2, autolag=None, regression=variant)[0] for s in series]
+        ours = za_statistics(series, variant, 2)
+        log_test(f"za {variant}: {ours}")
+        np.testing.assert_allclose(ours, expected, rtol=1e-10)
+
+    @pytest.mark.parametrize("det_order", [-1, 0, 1])
+    def test_johansen_rank_zero_matches_native(self, det_order):
+        rng = np.random.default_rng(4)
+        systems = np.cumsum(rng.normal(size=(2, 100, 3)), axis=1)
+
+        ours = rank_zero_statistics(systems, det_order, 2)
+
+        for system, row in zip(systems, ours):
+            estimate = johansen_native(system, det_order, 2)
+            np.testing.assert_allclose(row, [estimate.lr1[0], estimate.lr2[0]], rtol=1e-10)
+
+    def test_simulation_is_seeded(self):
+        first = simulate_statistics("adf", "c", 50, 1, replications=300, workers=1)
+        second = simulate_statistics("adf", "c", 50, 1, replications=300, workers=1)
+
+        assert first.shape == (300, 1)
+        np.testing.assert_array_equal(first, second)
+
+    def test_rejects_unidentified_key(self):
+        with pytest.raises(ValueError):
+            simulate_statistics("adf", "c", 25, 12, replications=10, workers=1)
+        with pytest.raises(ValueError):
+            simulate_statistics("kpss", "t", 100, replications=10, workers=1)
+
+
+class TestTableCache:
+
+    def test_second_lookup_reads_disk(self, table_dir, monkeypatch):
+        table = critical_value_table("kpss", "c", 100, 2, workers=1)
+        files = os.listdir(table_dir)
+        assert files == ["v1_kpss_c_n100_p2_d1.npz"]
+
+        critical_values._table.cache_clear()
+        monkeypatch.setattr(critical_values, "simulate_statistics", lambda *a, **k: pytest.fail("re-simulated"))
+        np.testing.assert_array_equal(critical_value_table("kpss", "c", 100, 2), table)
+
+    def test_unreadable_table_is_rebuilt(self, table_dir):
+        (table_dir / "v1_adf_c_n50_p0_d1.npz").write_bytes(b"partial")
+
+        table = critical_value_table("adf", "c", 50, workers=1)
+
+        assert table.shape == (1, len(critical_values.PROBABILITIES))
+        assert np.all(np.diff(table[0]) >= 0)
+
+
+class TestInterpolation:
+
+    def test_pvalues_follow_the_tail(self, table_dir):
+        stats = np.linspace(-5.0, 1.0, 25)
+        adf = finite_sample_pvalue("adf", "c", 100, stats)
+        kpss_p = finite_sample_pvalue("kpss", "c", 100, np.linspace(0.0, 2.0, 25))
+
+        assert np.all(np.diff(adf) >= 0)
+        assert np.all(np.diff(kpss_p) <= 0)
+        assert adf[0] == 0.0 and kpss_p[0] == 1.0
+
+    def test_critical_value_has_its_level(self, table_dir):
+        # at a grid size the two lookups invert each other
+        critical = finite_sample_critical_values("adf", "c", 100, 1)
+
+        pvalues = finite_sample_pvalue("adf", "c", 100, critical, 1)
+
+        np.testing.assert_allclose(pvalues, [0.01, 0.05, 0.10], atol=1e-3)
+
+    def test_sizes_between_the_grid_mix_in_inverse_n(self, table_dir):
+        lower = finite_sample_critical_values("adf", "c", 100)
+        upper = finite_sample_critical_values("adf", "c", 150)
+
+        between = finite_sample_critical_values("adf", "c", 120)
+
+        weight = (1 / 100 - 1 / 120) / (1 / 100 - 1 / 150)
+        np.testing.assert_allclose(between, (1 - weight) * lower + weight * upper)
+        # beyond the grid the nearest table is used as is
+        np.testing.assert_array_equal(
+            finite_sample_critical_values("adf", "c", 5000),
+            finite_sample_critical_values("adf", "c", SIZE_GRID[-1])
+        )
+
+    def test_infeasible_sizes_are_skipped(self, table_dir):
+        # 8 lags leave too few rows at n = 25: the smallest table is n = 50
+        np.testing.assert_array_equal(
+            finite_sample_critical_values("adf", "c", 30, 8),
+            finite_sample_critical_values("adf", "c", 50, 8)
+        )
+
+
+class TestCriticalValueOption:
+
+    def _payload(self, **options):
+        rng = np.random.default_rng(0)
+        common = np.cumsum(rng.normal(size=120))
+        levels = [common + 0.5 * rng.normal(size=120) for _ in range(3)]
+        series = [{"name": f"s{i}", "data": levels[i].tolist()} for i in range(3)]
+        return json.dumps(dict({"series": series, "target_index": 0, "causality": False}, **options))
+
+    def test_finite_sample_replaces_tables(self, table_dir):
+        asymptotic = json.loads(analyze_time_series(self._payload()))
+        finite = json.loads(analyze_time_series(self._payload(critical_values="finite_sample")))
+
+        adf = asymptotic["series_orders"][0]["adf"]
+        finite_adf = finite["series_orders"][0]["adf"]
+        assert finite_adf["test_statistic"] == adf["test_statistic"]
+        assert finite_adf["critical_values"] != adf["critical_values"]
+
+        coint = asymptotic["model_results"]["cointegration"]
+        finite_coint = finite["model_results"]["cointegration"]
+        log_test(f"trace p-values: {coint['johansen_trace_pvalues']} -> {finite_coint['johansen_trace_pvalues']}")
+        assert finite_coint["johansen_trace_stats"] == coint["johansen_trace_stats"]
+        assert finite_coint["johansen_trace_pvalues"] != coint["johansen_trace_pvalues"]
+        assert any(name.startswith("v1_johansen_") for name in os.listdir(table_dir))
+
+    def test_rejects_unknown_method(self):
+        result = json.loads(analyze_time_series(self._payload(critical_values="bootstrap")))
+
+        assert result["error"] == "INVALID_CRITICAL_VALUES"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
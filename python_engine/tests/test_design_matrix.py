@@ -0,0 +1,72 @@
+import sys
+import numpy as np
+import pytest
+from algorithms.design_matrix import lagged_design
+
+
+def log_test(msg):
+    print(f"[TEST] {msg}", file=sys.stderr)
+
+
+def _shifted(series, lag):
+    column = np.zeros(len(series))
+    column[lag:] = series[:len(series) - lag]
+    return column
+
+
+class TestLaggedDesign:
+
+    def test_lag_major_matches_var_layout(self):
+        data = np.random.default_rng(0).normal(size=(40, 3))
+
+        design = lagged_design(data, 2)
+
+        expected = np.column_stack([np.ones(38), data[1:39], data[0:38]])
+        np.testing.assert_array_equal(design, expected)
+        assert design.flags.f_contiguous
+
+    def test_series_major_matches_lagged_ols_columns(self):
+        y = np.arange(10.0)
+        x = 100 + np.arange(10.0)
+
+        design = lagged_design([y, x], 2, current=[x], constant=False, by_lag=False)
+
+        assert design.shape == (8, 5)
+        np.testing.assert_array_equal(design[0], [102.0, 1.0, 0.0, 101.0, 100.0])
+
+    def test_untrimmed_rows_zero_fill_missing_lags(self):
+        rng = np.random.default_rng(1)
+        y, x = rng.normal(size=30), rng.normal(size=30)
+
+        design = lagged_design([y, x], 3, current=[x], by_lag=False, trim=False)
+
+        columns = [np.ones(30), x] + [_shifted(s, lag) for s in (y, x) for lag in (1, 2, 3)]
+        np.testing.assert_array_equal(design, np.column_stack(columns))
+        assert design.flags.f_contiguous
+
+    def test_batched_slices_are_fortran_ordered(self):
+        paths = np.random.default_rng(2).normal(size=(5, 50, 2))
+
+        design = lagged_design(paths, 3)
+        log_test(f"batched design {design.shape}, strides {design.strides}")
+
+        assert design.shape == (5, 47, 1 + 2 * 3)
+        for path, block in zip(paths, design):
+            np.testing.assert_array_equal(block, lagged_design(path, 3))
+            assert block.flags.f_contiguous
+
+    def test_no_lags_stacks_current_columns(self):
+        rng = np.random.default_rng(3)
+        a, B = rng.normal(size=20), rng.normal(size=(20, 2))
+
+        design = lagged_design(current=[a, B])
+
+        np.testing.assert_array_equal(design, np.column_stack([np.ones(20), a, B]))
+
+    def test_rejects_samples_shorter_than_lags(self):
+        with pytest.raises(ValueError):
+            lagged_design(np.zeros((3, 2)), 3)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
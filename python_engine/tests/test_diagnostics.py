@@ -0,0 +1,103 @@
+import sys
+import json
+import numpy as np
+import pytest
+import statsmodels.api as sm
+from statsmodels.stats.diagnostic import acorr_breusch_godfrey, acorr_ljungbox, het_breuschpagan, het_white
+from statsmodels.stats.stattools import jarque_bera
+from statsmodels.stats.outliers_influence import OLSInfluence, variance_inflation_factor
+from api.analyzer import analyze_time_series
+from algorithms.artifacts import fitted_from_results
+from algorithms.diagnostics import residual_diagnostics
+
+
+def log_test(msg):
+    print(f"[TEST] {msg}", file=sys.stderr)
+
+
+def _fit(n=200, rho=0.4, seed=0):
+    rng = np.random.default_rng(seed)
+    X = sm.add_constant(rng.normal(size=(n, 3)))
+    X[:, 2] += 0.8 * X[:, 1]
+    e = np.zeros(n)
+    for t in range(1, n):
+        e[t] = rho * e[t - 1] + rng.normal() * (1 + 0.5 * abs(X[t, 1]))
+    y = X @ [1.0, 2.0, -1.0, 0.5] + e
+    return sm.OLS(y, X).fit()
+
+
+class TestResidualDiagnostics:
+
+    def test_matches_statsmodels(self):
+        results = _fit()
+        model = fitted_from_results(results, "ols", ["const", "a", "b", "c"])
+
+        diagnostics = residual_diagnostics(model, keep_influence=True)
+
+        for test in diagnostics.breusch_godfrey:
+            expected = acorr_breusch_godfrey(results, nlags=test.lag, result_object=False)
+            assert test.statistic == pytest.approx(expected[0], rel=1e-9)
+            assert test.p_value == pytest.approx(expected[1], rel=1e-9)
+
+        expected = acorr_ljungbox(results.resid, lags=[5, 10])
+        for test in diagnostics.ljung_box:
+            assert test.statistic == pytest.approx(expected.loc[test.lag, "lb_stat"], rel=1e-9)
+
+        assert diagnostics.breusch_pagan.statistic == pytest.approx(het_breuschpagan(results.resid, model.X)[0], rel=1e-9)
+        assert diagnostics.white.statistic == pytest.approx(het_white(results.resid, model.X)[0], rel=1e-9)
+        assert diagnostics.jarque_bera.statistic == pytest.approx(jarque_bera(results.resid)[0], rel=1e-9)
+
+        vifs = [variance_inflation_factor(model.X, j) for j in range(1, 4)]
+        assert [v.name for v in diagnostics.vif] == ["a", "b", "c"]
+        assert [v.vif for v in diagnostics.vif] == pytest.approx(vifs, rel=1e-9)
+
+        influence = OLSInfluence(results)
+        np.testing.assert_allclose(diagnostics.leverage, influence.hat_matrix_diag, atol=1e-12)
+        np.testing.assert_allclose(diagnostics.cooks_distance, influence.cooks_distance[0], atol=1e-12)
+
+    def test_flags_autocorrelation_only_when_present(self):
+        names = ["const", "a", "b", "c"]
+
+        serial = residual_diagnostics(fitted_from_results(_fit(rho=0.6, seed=1), "ols", names))
+        white_noise = residual_diagnostics(fitted_from_results(_fit(rho=0.0, seed=1), "ols", names))
+        log_test(f"bg(1) p: {serial.breusch_godfrey[0].p_value:.2e} vs {white_noise.breusch_godfrey[0].p_value:.3f}")
+
+        assert serial.autocorrelated
+        assert not white_noise.autocorrelated
+        assert serial.leverage is None
+
+    def test_skips_white_for_wide_designs(self):
+        rng = np.random.default_rng(2)
+        X = sm.add_constant(rng.normal(size=(60, 12)))
+        results = sm.OLS(rng.normal(size=60), X).fit()
+
+        diagnostics = residual_diagnostics(fitted_from_results(results, "ols", [f"x{i}" for i in range(13)]))
+
+        assert diagnostics.white is None
+        assert diagnostics.breusch_pagan.df == 12
+
+
+class TestDiagnosticsOption:
+
+    def _series(self):
+        results = _fit(seed=3)
+        X = results.model.exog
+        return [{"name": "cases", "data": results.model.endog.tolist()}] + [
+            {"name": f"x{j}", "data": X[:, j].tolist()} for j in range(1, 4)
+        ]
+
+    def test_attached_to_regression(self):
+        result = json.loads(analyze_time_series(json.dumps({"series": self._series(), "output_policy": "full"})))
+        diagnostics = result["model_results"]["regression"]["diagnostics"]
+
+        assert [t["lag"] for t in diagnostics["breusch_godfrey"]] == [1, 2, 4]
+        assert len(diagnostics["leverage"]) == result["model_results"]["regression"]["n_obs"]
+
+    def test_can_be_disabled(self):
+        result = json.loads(analyze_time_series(json.dumps({"series": self._series(), "diagnostics": False})))
+
+        assert result["model_results"]["regression"]["diagnostics"] is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
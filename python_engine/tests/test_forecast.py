@@ -0,0 +1,132 @@
+import sys
+import json
+import numpy as np
+import pytest
+from statsmodels.tsa.api import VAR
+from api.analyzer import analyze_time_series
+from algorithms.artifacts import ArtifactStore
+from algorithms.ecm import build_ecm_model
+from algorithms.forecast import forecast_model
+from algorithms.regression import ols_regression
+from algorithms.var import build_var_on_differences
+
+
+def log_test(msg):
+    print(f"[TEST] {msg}", file=sys.stderr)
+
+
+def _ar_with_predictor(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.normal(size=n)
+    y = np.zeros(n)
+    for t in range(1, n):
+        y[t] = 0.6 * y[t - 1] + x[t] + rng.normal()
+    return y, x
+
+
+class TestForecast:
+
+    def test_ols_point_follows_model_recursion(self):
+        y, x = _ar_with_predictor()
+        store = ArtifactStore([y, x])
+        ols_regression(y, [x], artifacts=store)
+        future_x = np.array([[0.5], [-1.0], [0.0], [2.0]])
+
+        result = forecast_model(store, 4, future_exog=future_x, simulations=500, seed=1)
+        model = store.fitted_model
+
+        # [const, x_t, y lags 1..p, x lags 1..p]
+        assert model.kind == "ols_lags"
+        p = model.lags
+        c, b_x = model.params[:2]
+        b_y, b_xl = model.params[2:2 + p], model.params[2 + p:]
+        ys, xs = list(y), list(x) + list(future_x[:, 0])
+        for t in range(len(y), len(y) + 4):
+            value = c + b_x * xs[t]
+            for lag in range(1, p + 1):
+                value += b_y[lag - 1] * ys[t - lag] + b_xl[lag - 1] * xs[t - lag]
+            ys.append(value)
+
+        np.testing.assert_allclose(result.mean, ys[len(y):], rtol=1e-12)
+        assert result.exog_assumption == "provided"
+
+    def test_var_matches_statsmodels(self):
+        rng = np.random.default_rng(1)
+        diffs = np.zeros((300, 2))
+        for t in range(1, 300):
+            diffs[t] = np.array([[0.5, 0.2], [0.1, 0.4]]) @ diffs[t - 1] + rng.normal(size=2)
+        levels = np.cumsum(diffs, axis=0)
+        store = ArtifactStore(list(levels.T))
+        build_var_on_differences(list(levels.T), variable_names=["a", "b"], artifacts=store)
+
+        result = forecast_model(store, 6, simulations=500, seed=1)
+        lags = store.fitted_model.lags
+        expected = VAR(np.diff(levels, axis=0)).fit(lags).forecast(np.diff(levels, axis=0)[-lags:], 6)
+
+        assert lags >= 1
+        np.testing.assert_allclose(result.mean, levels[-1, 0] + np.cumsum(expected[:, 0]), rtol=1e-10)
+        assert result.exog_assumption == "endogenous"
+
+    def test_ecm_reverts_to_long_run_equilibrium(self):
+        rng = np.random.default_rng(2)
+        x = np.cumsum(rng.normal(size=300))
+        y = 2.0 + 0.5 * x + rng.normal(size=300)
+        store = ArtifactStore([y, x])
+        build_ecm_model([y, x], "c", variable_names=["y", "x"], artifacts=store)
+
+        result = forecast_model(store, 30, simulations=500, seed=1)
+        long_run = store.cointegrating_regression("c")
+        const, gamma = store.fitted_model.params[:2]
+        # the short-run constant settles the error at -const / gamma
+        equilibrium = long_run.params[0] + long_run.params[1] * x[-1] - const / gamma
+        log_test(f"ecm forecast end {result.mean[-1]:.4f}, equilibrium {equilibrium:.4f}")
+
+        assert result.mean[-1] == pytest.approx(equilibrium, abs=1e-3)
+        assert result.exog_assumption == "last_value"
+
+    def test_intervals_cover_point_and_widen(self):
+        rng = np.random.default_rng(3)
+        levels = np.cumsum(rng.normal(size=(200, 2)), axis=0)
+        store = ArtifactStore(list(levels.T))
+        build_var_on_differences(list(levels.T), artifacts=store)
+
+        result = forecast_model(store, 10, simulations=2000, seed=4)
+        width = np.array(result.upper) - np.array(result.lower)
+
+        assert all(lo < m < hi for lo, m, hi in zip(result.lower, result.mean, result.upper))
+        assert width[-1] > 2 * width[0]
+
+    def test_request_option_attaches_forecast(self):
+        y, x = _ar_with_predictor(seed=3)
+        series = [{"name": "cases", "data": y.tolist()}, {"name": "temp", "data": x.tolist()}]
+        payload = {
+            "series": series,
+            "forecast_horizon": 3,
+            "forecast_simulations": 200,
+            "forecast_exog": {"temp": [0.1, 0.2, 0.3]}
+        }
+
+        result = json.loads(analyze_time_series(json.dumps(payload)))
+        default = json.loads(analyze_time_series(json.dumps({"series": series})))
+        forecast = result["model_results"]["forecast"]
+
+        assert len(forecast["mean"]) == 3
+        assert forecast["simulations"] == 200
+        assert forecast["exog_assumption"] == "provided"
+        assert default["model_results"]["forecast"] is None
+
+    def test_rejects_incomplete_future_predictors(self):
+        y, x = _ar_with_predictor()
+        payload = {
+            "series": [{"name": "cases", "data": y.tolist()}, {"name": "temp", "data": x.tolist()}],
+            "forecast_horizon": 3,
+            "forecast_exog": {"temp": [0.1]}
+        }
+
+        result = json.loads(analyze_time_series(json.dumps(payload)))
+
+        assert result["error"] == "INVALID_FORECAST_EXOG"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
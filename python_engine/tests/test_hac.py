@@ -0,0 +1,158 @@
+import sys
+import json
+import math
+import numpy as np
+import pytest
+import statsmodels.api as sm
+from api.analyzer import analyze_time_series
+from algorithms.hac import hac_covariance, hac_bandwidth, kernel_weights, long_run_covariance
+from algorithms.ols_chain import fit_ols_chain, linear_fit, hac_fit
+from algorithms.regression import _fit_ols_newey_west
+from models.responses import HacKernel, HacBandwidth
+
+
+def log_test(msg):
+    print(f"[TEST] {msg}", file=sys.stderr)
+
+
+def _regression(n=200, rho=0.6, seed=5, batch=()):
+    rng = np.random.default_rng(seed)
+    x = rng.normal(size=batch + (n, 2))
+    e = rng.normal(size=batch + (n,))
+    for t in range(1, n):
+        e[..., t] += rho * e[..., t - 1]
+    X = np.concatenate([np.ones(batch + (n, 1)), x], axis=-1)
+    y = X @ np.array([1.0, 0.5, -0.3]) + e
+    return y, X
+
+
+def _direct_long_run(scores, kernel, bandwidth):
+    n = len(scores)
+    S = scores.T @ scores
+    for j in range(1, n):
+        weight = kernel_weights(kernel, np.array(j / bandwidth))
+        cross = scores[j:].T @ scores[:-j]
+        S += weight * (cross + cross.T)
+    return S
+
+
+class TestLongRunCovariance:
+
+    @pytest.mark.parametrize("kernel", list(HacKernel))
+    def test_fft_matches_lag_loop(self, kernel):
+        rng = np.random.default_rng(1)
+        scores = rng.normal(size=(150, 3))
+        scores[1:] += 0.5 * scores[:-1]
+
+        # short bartlett / parzen supports take the lag sum, the rest the FFT
+        for bandwidth in [1.0, 4.0, 11.5, 60.0]:
+            fast = long_run_covariance(scores, kernel, np.array(bandwidth))
+            direct = _direct_long_run(scores, kernel, bandwidth)
+            log_test(f"{kernel.value}, b={bandwidth}: max diff {np.max(np.abs(fast - direct)):.2e}")
+            np.testing.assert_allclose(fast, direct, rtol=1e-10, atol=1e-10)
+
+    def test_batch_matches_single_regressions(self):
+        y, X = _regression(batch=(4,))
+        beta = np.linalg.solve(np.swapaxes(X, -1, -2) @ X, np.swapaxes(X, -1, -2) @ y[..., None])
+        resid = y - (X @ beta)[..., 0]
+
+        cov, bandwidth = hac_covariance(X, resid, HacKernel.PARZEN, HacBandwidth.ANDREWS)
+
+        assert bandwidth.shape == (4,)
+        for i in range(4):
+            single_cov, single_bandwidth = hac_covariance(X[i], resid[i], HacKernel.PARZEN, HacBandwidth.ANDREWS)
+            assert single_bandwidth == pytest.approx(bandwidth[i])
+            np.testing.assert_allclose(cov[i], single_cov, rtol=1e-10)
+
+
+class TestHacFit:
+
+    def test_default_matches_statsmodels_newey_west(self):
+        y, X = _regression()
+        fit = hac_fit(linear_fit(y, X))
+        reference = sm.OLS(y, X).fit(cov_type="HAC", cov_kwds={"maxlags": int(np.floor(4 * 2 ** (2 / 9)))})
+
+        np.testing.assert_allclose(fit.bse, reference.bse, rtol=1e-10)
+        assert fit.hac.kernel == HacKernel.BARTLETT
+        assert fit.hac.bandwidth == math.floor(4 * 2 ** (2 / 9)) + 1
+
+    def test_maxlags_fixes_bartlett_lags(self):
+        y, X = _regression()
+        fit = hac_fit(linear_fit(y, X), maxlags=7)
+        reference = sm.OLS(y, X).fit(cov_type="HAC", cov_kwds={"maxlags": 7})
+
+        np.testing.assert_allclose(fit.bse, reference.bse, rtol=1e-10)
+        assert fit.hac.bandwidth == 8.0
+
+
+class TestBandwidth:
+
+    def test_andrews_bartlett_single_column(self):
+        rng = np.random.default_rng(2)
+        n = 300
+        s = rng.normal(size=n)
+        for t in range(1, n):
+            s[t] += 0.7 * s[t - 1]
+        scores = np.column_stack([np.ones(n), s])
+
+        bandwidth = hac_bandwidth(scores, HacKernel.BARTLETT, HacBandwidth.ANDREWS)
+
+        # the constant column is skipped; sigma^2 cancels for one column
+        rho = np.sum(s[1:] * s[:-1]) / np.sum(s[:-1] ** 2)
+        alpha = 4 * rho ** 2 / ((1 - rho) ** 2 * (1 + rho) ** 2)
+        expected = 1.1447 * (alpha * n) ** (1 / 3)
+        log_test(f"andrews bartlett bandwidth: {float(bandwidth):.3f}")
+        assert float(bandwidth) == pytest.approx(expected, rel=1e-12)
+
+    def test_newey_west_quadratic_spectral(self):
+        y, X = _regression(n=250)
+        fit = linear_fit(y, X)
+        scores = X * fit.resid[:, None]
+        n = len(y)
+
+        bandwidth = hac_bandwidth(scores, HacKernel.QUADRATIC_SPECTRAL, HacBandwidth.NEWEY_WEST)
+
+        summed = scores[:, 1:].sum(axis=1)
+        m = math.floor(4 * (n / 100) ** (2 / 25))
+        sigma = [summed[j:] @ summed[:n - j] / n for j in range(m + 1)]
+        s0 = sigma[0] + 2 * sum(sigma[1:])
+        s2 = 2 * sum(j ** 2 * sigma[j] for j in range(1, m + 1))
+        expected = 1.3221 * ((s2 / s0) ** 2 * n) ** (1 / 5)
+        assert float(bandwidth) == pytest.approx(expected, rel=1e-12)
+
+    def test_clipped_to_sample(self):
+        scores = np.ones((50, 2))
+        scores[:, 1] = np.arange(50.0)
+
+        bandwidth = hac_bandwidth(scores, HacKernel.BARTLETT, HacBandwidth.ANDREWS)
+
+        assert 1.0 <= float(bandwidth) <= 50.0
+
+
+class TestHacOptions:
+
+    def test_chain_reports_kernel_and_bandwidth(self):
+        y, X = _regression()
+        chain = fit_ols_chain(y, [X[:, 1], X[:, 2]], hac_kernel=HacKernel.QUADRATIC_SPECTRAL, hac_bandwidth=HacBandwidth.ANDREWS)
+
+        result = _fit_ols_newey_west(chain.newey_west, True, ["X1", "X2"])
+
+        assert result.uses_newey_west
+        assert result.hac.kernel == HacKernel.QUADRATIC_SPECTRAL
+        assert result.hac.bandwidth_method == HacBandwidth.ANDREWS
+        assert chain.base.hac is None
+
+    def test_rejects_unknown_kernel(self):
+        rng = np.random.default_rng(3)
+        series = [{"name": f"s{i}", "data": rng.normal(size=80).tolist()} for i in range(2)]
+        payload = {"series": series, "target_index": 0}
+
+        kernel = json.loads(analyze_time_series(json.dumps(dict(payload, hac_kernel="tukey"))))
+        bandwidth = json.loads(analyze_time_series(json.dumps(dict(payload, hac_bandwidth="auto"))))
+
+        assert kernel["error"] == "INVALID_HAC_KERNEL"
+        assert bandwidth["error"] == "INVALID_HAC_BANDWIDTH"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,94 @@
+import sys
+import json
+import numpy as np
+import pytest
+from statsmodels.tsa.api import VAR
+from api.analyzer import analyze_time_series
+from algorithms.var import estimate_var
+from algorithms.impulse_response import impulse_responses
+
+
+def log_test(msg):
+    print(f"[TEST] {msg}", file=sys.stderr)
+
+
+def _var2(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    mixing = np.array([[1.0, 0.0, 0.0], [0.5, 1.0, 0.0], [0.2, 0.3, 1.0]])
+    shocks = rng.normal(size=(n, 3)) @ mixing
+    data = np.zeros((n, 3))
+    for t in range(2, n):
+        data[t] = 0.4 * data[t - 1] - 0.2 * data[t - 2] + shocks[t]
+    return data
+
+
+class TestImpulseResponse:
+
+    def test_point_estimates_match_statsmodels(self):
+        data = _var2()
+        estimate = estimate_var(data, lags=2)
+
+        result = impulse_responses(estimate, data, ["a", "b", "c"], horizon=10, replications=0)
+        expected = VAR(data).fit(2)
+
+        np.testing.assert_allclose(result.orthogonalized, expected.irf(10).orth_irfs, atol=1e-12)
+        fevd = np.transpose(expected.fevd(11).decomp, (1, 0, 2))
+        np.testing.assert_allclose(result.fevd, fevd, atol=1e-12)
+        assert result.irf_lower is None
+
+    def test_bands_cover_point_estimate(self):
+        data = _var2(seed=1)
+        estimate = estimate_var(data, lags=2)
+
+        result = impulse_responses(estimate, data, ["a", "b", "c"], horizon=8, replications=300, seed=3)
+
+        point = np.array(result.orthogonalized)
+        lower = np.array(result.irf_lower)
+        upper = np.array(result.irf_upper)
+        log_test(f"impact band for a: [{lower[0, 0, 0]:.3f}, {upper[0, 0, 0]:.3f}]")
+
+        assert lower.shape == (9, 3, 3)
+        assert np.mean((lower <= point) & (point <= upper)) > 0.9
+        np.testing.assert_allclose(np.array(result.fevd_lower).sum(axis=-1) <= 1 + 1e-12, True)
+
+    def test_parallel_matches_serial(self):
+        data = _var2(seed=2)
+        estimate = estimate_var(data, lags=2)
+
+        serial = impulse_responses(estimate, data, ["a", "b", "c"], replications=250, seed=7, workers=1)
+        pooled = impulse_responses(estimate, data, ["a", "b", "c"], replications=250, seed=7, workers=2)
+
+        np.testing.assert_array_equal(serial.irf_lower, pooled.irf_lower)
+        np.testing.assert_array_equal(serial.fevd_upper, pooled.fevd_upper)
+
+    def test_var_path_returns_impulse_responses(self):
+        rng = np.random.default_rng(1)
+        walks = np.cumsum(rng.normal(size=(200, 3)), axis=0)
+        payload = {
+            "series": [{"name": f"s{i}", "data": walks[:, i].tolist()} for i in range(3)],
+            "irf_horizon": 6,
+            "irf_replications": 100
+        }
+
+        result = json.loads(analyze_time_series(json.dumps(payload)))
+        model_results = result["model_results"]
+        assert model_results["cointegration"]["is_cointegrated"] is False
+
+        irf = model_results["impulse_responses"]
+        assert irf["horizon"] == 6
+        assert len(irf["orthogonalized"]) == 7
+        assert irf["replications"] == 100
+
+    def test_invalid_replications(self):
+        payload = {
+            "series": [{"name": "a", "data": list(range(30))}, {"name": "b", "data": list(range(30))}],
+            "irf_replications": -1
+        }
+
+        result = json.loads(analyze_time_series(json.dumps(payload)))
+
+        assert result["error"] == "INVALID_IRF_REPLICATIONS"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
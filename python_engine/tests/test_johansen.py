@@ -0,0 +1,82 @@
+import sys
+import numpy as np
+import pytest
+from statsmodels.tsa.vector_ar.vecm import coint_johansen
+from statsmodels.tsa.vector_ar.var_model import VAR
+from algorithms.johansen import johansen_native, johansen_batch, johansen_pvalues
+
+
+def log_test(msg):
+    print(f"[TEST] {msg}", file=sys.stderr)
+
+
+def _system(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    x = np.cumsum(rng.normal(size=n))
+    y = x + rng.normal(size=n)
+    z = np.cumsum(rng.normal(size=n))
+    return np.column_stack([x, y, z])
+
+
+class TestJohansenNative:
+    """Native Johansen engine must reproduce statsmodels coint_johansen"""
+
+    @pytest.mark.parametrize("det_order", [-1, 0, 1])
+    @pytest.mark.parametrize("k_ar_diff", [1, 3])
+    def test_matches_statsmodels(self, det_order, k_ar_diff):
+        data = _system()
+
+        result = johansen_native(data, det_order=det_order, k_ar_diff=k_ar_diff)
+        expected = coint_johansen(data, det_order, k_ar_diff)
+
+        np.testing.assert_allclose(result.eig, expected.eig, atol=1e-10)
+        np.testing.assert_allclose(result.lr1, expected.lr1, rtol=1e-9)
+        np.testing.assert_allclose(result.lr2, expected.lr2, rtol=1e-9)
+        np.testing.assert_allclose(result.cvt, expected.cvt)
+        np.testing.assert_allclose(np.abs(result.evec), np.abs(expected.evec), rtol=1e-7)
+
+        log_test(f"det={det_order}, k={k_ar_diff}: trace {result.lr1}")
+
+    def test_lag_table_matches_var_select_order(self):
+        data = _system(seed=3)
+
+        result = johansen_native(data, det_order=0, max_lags=10)
+        # lag selection runs on the common sample that drops the first observation
+        expected = VAR(data[1:]).select_order(10)
+
+        aic = np.array([result.lag_aic[p] for p in range(11)])
+        np.testing.assert_allclose(aic, expected.ics["aic"], atol=1e-10)
+        assert result.k_ar_diff == max(expected.aic, 1)
+
+    def test_batch_matches_single(self):
+        systems = [_system(seed=s) for s in range(4)] + [_system(n=200, seed=9)]
+
+        batch = johansen_batch(systems, det_order=0)
+
+        for system, result in zip(systems, batch):
+            single = johansen_native(system, det_order=0)
+            assert result.k_ar_diff == single.k_ar_diff
+            np.testing.assert_allclose(result.lr1, single.lr1)
+
+    def test_short_series_uses_lag_one(self):
+        result = johansen_native(_system(n=30), det_order=0, max_lags=10)
+
+        assert result.k_ar_diff == 1
+        assert result.lag_aic is None
+
+    def test_pvalues_at_critical_values(self):
+        data = _system()
+        result = johansen_native(data, det_order=0, k_ar_diff=2)
+
+        trace = johansen_pvalues(result.cvt[:, 1], 3, 0, "trace")
+        max_eig = johansen_pvalues(result.cvm[:, 2], 3, 0, "max_eig")
+        log_test(f"p-values at 95% trace cv: {trace}")
+
+        np.testing.assert_allclose(trace, 0.05, atol=0.005)
+        np.testing.assert_allclose(max_eig, 0.01, atol=0.002)
+        assert result.trace_pvalues[0] < 0.05
+        assert result.trace_pvalues[-1] > 0.05
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
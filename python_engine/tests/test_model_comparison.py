@@ -0,0 +1,114 @@
+import sys
+import json
+import numpy as np
+import pytest
+import statsmodels.api as sm
+from api.analyzer import analyze_time_series
+from algorithms.artifacts import fitted_from_results
+from algorithms.model_comparison import compare_candidates, holdout_errors
+from models.domain import CandidateFit
+from models.responses import ModelSpecification
+
+
+def log_test(msg):
+    print(f"[TEST] {msg}", file=sys.stderr)
+
+
+def _candidate(specification, X, y):
+    results = sm.OLS(y, X).fit()
+    model = fitted_from_results(results, "ols", [f"c{j}" for j in range(X.shape[1])])
+    return CandidateFit(specification=specification, regression=None, model=model)
+
+
+def _payload(series, **options):
+    data = [{"name": f"s{i}", "data": s.tolist()} for i, s in enumerate(series)]
+    return json.dumps(dict({"series": data, "target_index": 0}, **options))
+
+
+class TestCompareCandidates:
+
+    def test_holdout_errors_match_expanding_refits(self):
+        rng = np.random.default_rng(0)
+        X = sm.add_constant(rng.normal(size=(60, 2)))
+        y = X @ [1.0, 2.0, -1.0] + rng.normal(size=60)
+
+        errors = holdout_errors(y, X, 10)
+
+        expected = [y[t] - X[t] @ np.linalg.lstsq(X[:t], y[:t], rcond=None)[0] for t in range(50, 60)]
+        np.testing.assert_allclose(errors, expected, rtol=1e-9)
+
+    def test_ranks_true_model_first(self):
+        rng = np.random.default_rng(1)
+        x = rng.normal(size=(120, 2))
+        y = 1 + 2 * x[:, 0] + rng.normal(size=120)
+        true = _candidate(ModelSpecification.OLS_LEVELS, sm.add_constant(x[:, :1]), y)
+        wrong = _candidate(ModelSpecification.ECM, sm.add_constant(x[:, 1:]), y)
+
+        comparison = compare_candidates([wrong, true], selected=ModelSpecification.ECM)
+        log_test(f"holdout rmse: {[round(c.holdout_rmse, 3) for c in comparison.candidates]}")
+
+        best = comparison.candidates[0]
+        assert best.specification == ModelSpecification.OLS_LEVELS
+        assert comparison.best_by_aic == comparison.best_by_holdout == ModelSpecification.OLS_LEVELS
+        assert best.aic == pytest.approx(sm.OLS(y, sm.add_constant(x[:, :1])).fit().aic / 120)
+        assert comparison.candidates[1].selected
+        assert comparison.holdout_size == 24
+
+    def test_failures_are_listed_last(self):
+        rng = np.random.default_rng(2)
+        X = sm.add_constant(rng.normal(size=(40, 1)))
+        fit = _candidate(ModelSpecification.OLS_LEVELS, X, rng.normal(size=40))
+
+        comparison = compare_candidates([fit], failures={ModelSpecification.VAR_DIFFERENCES: "singular"})
+
+        assert comparison.candidates[-1].error_message == "singular"
+        assert comparison.candidates[-1].aic_rank is None
+
+
+class TestComparisonOption:
+
+    def _cointegrated(self, n=200, seed=0):
+        rng = np.random.default_rng(seed)
+        x = np.cumsum(rng.normal(size=n))
+        return [2 + 0.8 * x + rng.normal(size=n), x]
+
+    def test_fits_every_specification_and_keeps_chosen_model(self):
+        series = self._cointegrated()
+
+        plain = json.loads(analyze_time_series(_payload(series, forecast_horizon=3)))
+        result = json.loads(analyze_time_series(_payload(series, forecast_horizon=3, compare_models=True)))
+        comparison = result["model_results"]["comparison"]
+
+        specifications = {c["specification"] for c in comparison["candidates"]}
+        assert specifications == {"ols_levels", "mixed_differences", "ecm", "var_differences"}
+        selected = [c for c in comparison["candidates"] if c["selected"]]
+        assert [c["specification"] for c in selected] == ["ecm"]
+        assert selected[0]["regression"] == result["model_results"]["regression"]
+        assert result["model_results"]["regression"] == plain["model_results"]["regression"]
+        assert result["model_results"]["forecast"] == plain["model_results"]["forecast"]
+
+    def test_stationary_data_offers_no_cointegration_models(self):
+        rng = np.random.default_rng(1)
+        x = rng.normal(size=200)
+        series = [1.0 + 0.5 * x + rng.normal(size=200), x]
+
+        result = json.loads(analyze_time_series(_payload(series, compare_models=True)))
+        comparison = result["model_results"]["comparison"]
+
+        assert [so["order"] for so in result["series_orders"]] == [0, 0]
+        # all I(0): no long-run relation for an ECM, VECM or VAR on differences
+        assert [c["specification"] for c in comparison["candidates"]] == ["ols_levels"]
+
+    def test_off_by_default(self):
+        result = json.loads(analyze_time_series(_payload(self._cointegrated())))
+
+        assert result["model_results"]["comparison"] is None
+
+    def test_rejects_non_boolean(self):
+        result = json.loads(analyze_time_series(_payload(self._cointegrated(), compare_models="yes")))
+
+        assert result["error"] == "INVALID_COMPARE_MODELS"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
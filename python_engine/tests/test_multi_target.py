@@ -0,0 +1,104 @@
+import sys
+import json
+import numpy as np
+import pytest
+import api.analyzer as analyzer
+from api.analyzer import analyze_time_series
+
+
+def log_test(msg):
+    print(f"[TEST] {msg}", file=sys.stderr)
+
+
+def _series(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    temp = rng.normal(size=n)
+    humidity = rng.normal(size=n)
+    cases = 1.0 + 0.8 * temp + rng.normal(size=n)
+    admissions = 2.0 - 0.5 * humidity + rng.normal(size=n)
+    return [
+        {"name": "cases", "data": cases.tolist()},
+        {"name": "admissions", "data": admissions.tolist()},
+        {"name": "temp", "data": temp.tolist()},
+        {"name": "humidity", "data": humidity.tolist()}
+    ]
+
+
+class TestMultiTarget:
+
+    def test_orders_computed_once(self, monkeypatch):
+        calls = []
+        original = analyzer._analyze_series_orders
+
+        def counting(*args, **kwargs):
+            calls.append(len(args[0]))
+            return original(*args, **kwargs)
+
+        monkeypatch.setattr(analyzer, "_analyze_series_orders", counting)
+        result = json.loads(analyze_time_series(json.dumps({"series": _series(), "targets": "all"})))
+
+        assert calls == [4]
+        assert result["targets"] == ["cases", "admissions", "temp", "humidity"]
+        assert len(result["results"]) == 4
+
+    def test_period_orders_computed_once(self, monkeypatch):
+        calls = []
+        original = analyzer._analyze_series_orders
+
+        def counting(*args, **kwargs):
+            calls.append(len(args[0][0]))
+            return original(*args, **kwargs)
+
+        # a level shift halfway through the target
+        rng = np.random.default_rng(0)
+        x1 = rng.normal(10, 2, 240)
+        x2 = rng.normal(5, 1, 240)
+        e = np.zeros(240)
+        for t in range(1, 240):
+            e[t] = 0.7 * e[t - 1] + rng.normal()
+        y = 1 + 0.8 * x1 + x2 + e
+        y[120:] += 6
+        series = [{"name": name, "data": data.tolist()} for name, data in [("y", y), ("a", x1), ("b", x2)]]
+
+        monkeypatch.setattr(analyzer, "_analyze_series_orders", counting)
+        result = json.loads(analyze_time_series(json.dumps({"series": series, "targets": "all"})))
+        periods = result["results"][0]["model_results"]["periods"]
+        log_test(f"cascade sample sizes: {calls}")
+
+        # the full sample once, then each period once for all three targets
+        assert len(periods) == 2
+        assert calls == [240] + [p["data_size"] for p in periods]
+        for r in result["results"]:
+            assert r["has_structural_break"]
+
+    def test_matches_single_target_runs(self):
+        series = _series(seed=1)
+        multi = json.loads(analyze_time_series(json.dumps({"series": series, "targets": [1, 0]})))
+
+        for result, target_index in zip(multi["results"], [1, 0]):
+            single = json.loads(analyze_time_series(json.dumps({"series": series, "target_index": target_index})))
+            log_test(f"{result['target_variable']}: {result['model_type']}")
+
+            assert result["target_variable"] == single["target_variable"]
+            assert result["variable_names"] == single["variable_names"]
+            assert result["model_type"] == single["model_type"]
+            ours = [c["value"] for c in result["model_results"]["regression"]["coefficients"]]
+            theirs = [c["value"] for c in single["model_results"]["regression"]["coefficients"]]
+            assert ours == pytest.approx(theirs, rel=1e-12)
+
+    def test_shares_causality_matrix(self):
+        multi = json.loads(analyze_time_series(json.dumps({"series": _series(seed=2), "targets": [0, 1]})))
+
+        first, second = (r["model_results"]["causality"] for r in multi["results"])
+        assert first == second
+        assert len(first["pairwise"]) == 12
+
+    @pytest.mark.parametrize("targets", [[], [0, 0], [7], "some", [True]])
+    def test_rejects_invalid_targets(self, targets):
+        result = json.loads(analyze_time_series(json.dumps({"series": _series(), "targets": targets})))
+
+        assert result["error"] == "INVALID_TARGETS"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,112 @@
+import sys
+import json
+import numpy as np
+import pytest
+import statsmodels.api as sm
+from algorithms.artifacts import ArtifactStore
+from algorithms.ols_chain import fit_ols_chain, lag_design
+from algorithms.regression import ols_regression
+from api.analyzer import analyze_time_series
+
+
+def log_test(msg):
+    print(f"[TEST] {msg}", file=sys.stderr)
+
+
+def _data(n=150, k=3, rho=0.6, seed=0):
+    rng = np.random.default_rng(seed)
+    X_list = [rng.normal(10, 2, size=n) for _ in range(k)]
+    e = np.zeros(n)
+    for t in range(1, n):
+        e[t] = rho * e[t - 1] + rng.normal()
+    y = 1.0 + sum(X_list[:2]) + e
+    return y, X_list
+
+
+def _assert_matches(fit, results):
+    np.testing.assert_allclose(fit.params, results.params, rtol=1e-10)
+    np.testing.assert_allclose(fit.bse, results.bse, rtol=1e-10)
+    np.testing.assert_allclose(fit.pvalues, results.pvalues, rtol=1e-8, atol=1e-300)
+    assert fit.rsquared == pytest.approx(results.rsquared, rel=1e-12)
+    assert fit.rsquared_adj == pytest.approx(results.rsquared_adj, rel=1e-12)
+    assert fit.fvalue == pytest.approx(results.fvalue, rel=1e-9)
+    assert fit.nobs == results.nobs
+
+
+class TestOlsChain:
+
+    @pytest.mark.parametrize("add_constant", [True, False])
+    def test_variants_match_statsmodels(self, add_constant):
+        y, X_list = _data()
+        X = np.column_stack(X_list)
+        if add_constant:
+            X = sm.add_constant(X)
+
+        chain = fit_ols_chain(y, X_list, add_constant, max_lags=5)
+
+        _assert_matches(chain.base, sm.OLS(y, X).fit())
+        _assert_matches(chain.newey_west, sm.OLS(y, X).fit(cov_type="HAC", cov_kwds={"maxlags": None}))
+
+        lags = chain.lags
+        design = lag_design(y, X_list, lags, add_constant)
+        _assert_matches(chain.lagged, sm.OLS(y[lags:], design).fit())
+
+    def test_lag_aic_matches_separate_fits(self):
+        y, X_list = _data(rho=0.9, seed=1)
+
+        chain = fit_ols_chain(y, X_list, max_lags=5)
+
+        for lags, aic in chain.lag_aic.items():
+            design = lag_design(y, X_list, lags)
+            results = sm.OLS(y[lags:], design).fit()
+            expected = results.nobs * np.log(results.ssr / results.nobs) + 2 * len(results.params)
+            assert aic == pytest.approx(expected, rel=1e-9)
+        assert chain.lags == min(chain.lag_aic, key=chain.lag_aic.get)
+
+    def test_fixed_lags_skip_search(self):
+        y, X_list = _data(seed=2)
+
+        chain = fit_ols_chain(y, X_list, lags=2)
+
+        assert chain.lag_aic == {}
+        assert chain.lagged.lags == 2
+        assert chain.lagged.X.shape == (148, 1 + 3 + 2 + 3 * 2)
+
+    def test_short_sample_falls_back_to_newey_west(self):
+        y, X_list = _data(n=11, k=1, rho=0.95, seed=7)
+        store = ArtifactStore([y] + X_list)
+
+        chain = fit_ols_chain(y, X_list)
+        result = ols_regression(y, X_list, artifacts=store)
+        log_test(f"dw {result.durbin_watson.statistic:.3f}, newey-west {result.uses_newey_west}")
+
+        assert chain.lagged is None
+        assert result.uses_newey_west
+        assert store.fitted_model.kind == "ols_newey_west"
+        np.testing.assert_allclose([c.std_error for c in result.coefficients], chain.newey_west.bse)
+
+    @pytest.mark.parametrize("n", range(12, 24))
+    def test_short_samples_skip_exact_fit_lag_orders(self, n):
+        y, X_list = _data(n=n, k=2, rho=0.8, seed=n)
+
+        chain = fit_ols_chain(y, X_list)
+        result = ols_regression(y, X_list)
+
+        # every candidate leaves residual degrees of freedom to estimate the scale
+        for lags in chain.lag_aic:
+            assert n - lags - (1 + 2 + 3 * lags) >= 2
+        assert all(np.isfinite(c.std_error) for c in result.coefficients)
+
+    @pytest.mark.parametrize("n, seed", [(20, 3), (21, 0), (22, 3), (23, 0)])
+    def test_short_series_analysis_keeps_mixed_regression(self, n, seed):
+        y, X_list = _data(n=n, k=2, rho=0.8, seed=seed)
+        series = [{"name": name, "data": s.tolist()} for name, s in zip(["y", "x1", "x2"], [y] + X_list)]
+
+        output = analyze_time_series(json.dumps({"series": series, "target_index": 0, "causality": False}))
+
+        assert "error" not in json.loads(output)
+        assert "Mixed regression failed" not in output
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
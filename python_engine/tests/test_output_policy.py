@@ -0,0 +1,118 @@
+import sys
+import json
+import base64
+import numpy as np
+import pytest
+from api.analyzer import analyze_time_series
+from api.output_policy import (
+    encode_array,
+    decode_array,
+    downsample_indices,
+    build_component_output
+)
+from models.responses import OutputPolicy, EncodedArray
+
+
+def log_test(msg):
+    print(f"[TEST] {msg}", file=sys.stderr)
+
+
+def _decode(encoded: dict):
+    values = np.frombuffer(base64.b64decode(encoded["data"]), dtype=encoded["dtype"])
+    indices = None
+    if encoded["indices"] is not None:
+        indices = np.frombuffer(base64.b64decode(encoded["indices"]), dtype="<u4")
+    return values, indices
+
+
+def _request(policy=None, max_points=None):
+    rng = np.random.default_rng(42)
+    n = 200
+    time = np.arange(n)
+    x = 5 * np.sin(2 * np.pi * time / 12) + rng.normal(0, 1, n)
+    y = 2 * x + rng.normal(0, 1, n)
+
+    payload = {
+        "series": [
+            {"name": "cases", "data": y.tolist()},
+            {"name": "temperature", "data": x.tolist()}
+        ]
+    }
+    if policy is not None:
+        payload["output_policy"] = policy
+    if max_points is not None:
+        payload["output_max_points"] = max_points
+    return payload
+
+
+class TestOutputPolicy:
+
+    def test_encode_roundtrip(self):
+        values = np.random.default_rng(0).normal(size=100)
+
+        encoded = encode_array(values)
+        decoded, indices = decode_array(encoded)
+
+        assert isinstance(encoded, EncodedArray)
+        assert encoded.length == 100
+        assert indices is None
+        np.testing.assert_array_equal(decoded, values)
+
+    def test_downsample_keeps_extremes(self):
+        values = np.random.default_rng(1).normal(size=5000)
+        values[1234] = 50.0
+        values[4321] = -50.0
+
+        indices = downsample_indices(values, 200)
+
+        assert len(indices) <= 200
+        assert np.all(np.diff(indices) > 0)
+        assert 1234 in indices
+        assert 4321 in indices
+
+    def test_summary_policy_has_no_values(self):
+        output = build_component_output(np.arange(10.0), OutputPolicy.SUMMARY, 512)
+
+        assert output.values is None
+        assert output.summary.max == 9.0
+        assert output.summary.mean == pytest.approx(4.5)
+
+    def test_default_policy_returns_no_components(self):
+        result = json.loads(analyze_time_series(json.dumps(_request())))
+
+        for series_order in result["series_orders"]:
+            assert series_order["stl_components"] is None
+
+    def test_full_policy_returns_components(self):
+        result = json.loads(analyze_time_series(json.dumps(_request("full"))))
+
+        components = result["series_orders"][1]["stl_components"]
+        assert components["policy"] == "full"
+
+        trend, _ = _decode(components["trend"]["values"])
+        seasonal, _ = _decode(components["seasonal"]["values"])
+        residual, _ = _decode(components["residual"]["values"])
+
+        assert len(trend) == 200
+        log_test(f"trend summary: {components['trend']['summary']}")
+        assert components["trend"]["summary"]["mean"] == pytest.approx(np.mean(trend))
+        assert np.var(seasonal) > np.var(residual)
+
+    def test_downsampled_policy(self):
+        result = json.loads(analyze_time_series(json.dumps(_request("downsampled", 50))))
+
+        trend = result["series_orders"][0]["stl_components"]["trend"]["values"]
+        values, indices = _decode(trend)
+
+        assert trend["dtype"] == "<f4"
+        assert len(values) == len(indices)
+        assert len(values) <= 50
+
+    def test_invalid_policy(self):
+        result = json.loads(analyze_time_series(json.dumps(_request("everything"))))
+
+        assert result["error"] == "INVALID_OUTPUT_POLICY"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,111 @@
+import sys
+import warnings
+import numpy as np
+import pytest
+from statsmodels.tsa.adfvalues import mackinnonp, mackinnoncrit
+from statsmodels.tsa.stattools import adfuller, kpss, zivot_andrews
+from algorithms.pvalues import (
+    mackinnon_pvalues,
+    mackinnon_critical_values,
+    kpss_pvalues,
+    kpss_critical_values,
+    za_pvalues,
+    za_critical_values
+)
+from algorithms.stationarity_tests import adf_test, kpss_test, zivot_andrews_test
+
+
+def log_test(msg):
+    print(f"[TEST] {msg}", file=sys.stderr)
+
+
+STATISTICS = np.concatenate([np.linspace(-20.0, 4.0, 2001), [-np.inf]])
+
+
+class TestMacKinnon:
+
+    @pytest.mark.parametrize("regression", ["n", "c", "ct", "ctt"])
+    def test_pvalues_match_mackinnonp(self, regression):
+        for n_series in range(1, 7):
+            expected = [mackinnonp(s, regression=regression, N=n_series) for s in STATISTICS]
+            np.testing.assert_array_equal(mackinnon_pvalues(STATISTICS, regression, n_series), expected)
+
+    @pytest.mark.parametrize("regression", ["c", "ct", "ctt"])
+    def test_critical_values_match_mackinnoncrit(self, regression):
+        nobs = np.array([12, 57, 300, np.inf])
+
+        critical = mackinnon_critical_values(regression, np.arange(1, 13)[:, None], nobs)
+
+        assert critical.shape == (12, 4, 3)
+        for n_series in range(1, 13):
+            for j, n in enumerate(nobs):
+                np.testing.assert_array_equal(critical[n_series - 1, j], mackinnoncrit(n_series, regression, n))
+
+    def test_broadcasts_statistics_against_series(self):
+        stats = np.array([[-3.0, -4.0, -5.0]])
+        n_series = np.array([[1], [2]])
+
+        pvalues = mackinnon_pvalues(stats, "c", n_series)
+
+        assert pvalues.shape == (2, 3)
+        # more series under the null: the same statistic is less extreme
+        assert np.all(pvalues[1] > pvalues[0])
+
+    def test_rejects_unknown_tables(self):
+        with pytest.raises(ValueError):
+            mackinnon_pvalues(-3.0, "t")
+        with pytest.raises(ValueError):
+            mackinnon_pvalues(-3.0, "c", n_series=7)
+        with pytest.raises(ValueError):
+            mackinnon_critical_values("n", n_series=2)
+
+
+class TestKpssAndZivotAndrews:
+
+    @pytest.mark.parametrize("regression", ["c", "ct"])
+    def test_kpss_matches_statsmodels(self, regression):
+        rng = np.random.default_rng(1)
+        series = [np.cumsum(rng.normal(size=150)) * scale for scale in (0.02, 0.1, 1.0)]
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            results = [kpss(s, regression=regression, nlags="auto") for s in series]
+
+        pvalues = kpss_pvalues([r[0] for r in results], regression)
+
+        np.testing.assert_array_equal(pvalues, [r[1] for r in results])
+        np.testing.assert_array_equal(kpss_critical_values(regression), [results[0][3][k] for k in ("1%", "2.5%", "5%", "10%")])
+
+    @pytest.mark.parametrize("regression", ["c", "t", "ct"])
+    def test_za_matches_statsmodels(self, regression):
+        rng = np.random.default_rng(2)
+        x = np.cumsum(rng.normal(size=120))
+        stat, pvalue, critical, _, _ = zivot_andrews(x, regression=regression)
+
+        assert za_pvalues([stat], regression)[0] == pvalue
+        np.testing.assert_array_equal(za_critical_values(regression), [critical[k] for k in ("1%", "5%", "10%")])
+        # one call for a whole grid of statistics
+        grid = za_pvalues(np.linspace(-7.0, -2.0, 200), regression)
+        assert np.all(np.diff(grid) >= 0)
+
+
+class TestWrappedTests:
+
+    def test_results_keep_statsmodels_values(self):
+        rng = np.random.default_rng(3)
+        x = np.cumsum(rng.normal(size=200))
+
+        adf = adf_test(x)
+        reference = adfuller(x, autolag="AIC", result_object=False)
+        assert adf.p_value == reference[1]
+        assert adf.critical_values.five_percent == reference[4]["5%"]
+
+        za = zivot_andrews_test(x, trend="ct")
+        assert za.p_value == zivot_andrews(x, trim=0.15, regression="ct")[1]
+
+        result = kpss_test(x, regression="ct")
+        log_test(f"adf p={adf.p_value:.4f}, za p={za.p_value:.4f}, kpss p={result.p_value:.4f}")
+        assert result.crit.five_percent == 0.146
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,162 @@
+import sys
+import json
+import numpy as np
+import pytest
+import statsmodels.api as sm
+from api.analyzer import analyze_time_series
+from algorithms.artifacts import ArtifactStore
+from algorithms.regularization import (
+    elastic_net_path,
+    penalized_lag_regression,
+    time_series_folds
+)
+from models.responses import LagSelection
+
+
+def log_test(msg):
+    print(f"[TEST] {msg}", file=sys.stderr)
+
+
+def _ar_errors(n, rho, rng):
+    e = np.zeros(n)
+    for t in range(1, n):
+        e[t] = rho * e[t - 1] + rng.normal()
+    return e
+
+
+def _lagged_data(n=400, k=6, seed=0):
+    rng = np.random.default_rng(seed)
+    X_list = [rng.normal(size=n) for _ in range(k)]
+    y = 1.0 + X_list[0] - 0.5 * X_list[1] + _ar_errors(n, 0.7, rng)
+    return y, X_list
+
+
+class TestElasticNetPath:
+
+    @pytest.mark.parametrize("l1_ratio", [1.0, 0.5, 0.0])
+    def test_matches_statsmodels(self, l1_ratio):
+        rng = np.random.default_rng(0)
+        X = rng.normal(size=(300, 8)) * rng.uniform(0.5, 3.0, size=8)
+        y = 2.0 + X[:, 0] - 0.5 * X[:, 3] + rng.normal(size=300)
+        alphas = np.array([0.3, 0.1, 0.02])
+
+        intercepts, coefs = elastic_net_path(X, y, alphas, l1_ratio, tol=1e-14)
+        Z = (X - X.mean(axis=0)) / X.std(axis=0)
+
+        def objective(b, alpha):
+            penalty = l1_ratio * np.abs(b).sum() + (1 - l1_ratio) / 2 * (b @ b)
+            return 0.5 * np.mean((y - y.mean() - Z @ b) ** 2) + alpha * penalty
+
+        for alpha, intercept, coef in zip(alphas, intercepts, coefs):
+            expected = sm.OLS(y - y.mean(), Z).fit_regularized(
+                method="elastic_net", alpha=alpha, L1_wt=l1_ratio
+            ).params
+            ours = coef * X.std(axis=0)
+
+            # statsmodels snaps tiny coefficients to zero, so compare objectives too
+            np.testing.assert_allclose(ours, expected, atol=1e-3)
+            assert objective(ours, alpha) <= objective(expected, alpha) + 1e-12
+            assert intercept == pytest.approx(y.mean() - coef @ X.mean(axis=0))
+
+    def test_lasso_path_starts_empty_and_grows(self):
+        rng = np.random.default_rng(1)
+        X = rng.normal(size=(200, 10))
+        y = X[:, 2] + rng.normal(size=200)
+        alphas = np.logspace(0, -3, 30)
+
+        _, coefs = elastic_net_path(X, y, alphas, 1.0)
+        nonzero = np.count_nonzero(coefs, axis=1)
+        log_test(f"nonzero along the path: {nonzero.tolist()}")
+
+        assert nonzero[0] <= 1
+        assert nonzero[-1] == 10
+
+
+class TestTimeSeriesFolds:
+
+    def test_forward_chaining_with_gap(self):
+        folds = time_series_folds(120, 4, gap=3)
+
+        assert folds[-1][2] == 120
+        for train_end, test_start, test_end in folds:
+            assert test_start - train_end == 3
+            assert test_end > test_start
+        for previous, current in zip(folds, folds[1:]):
+            assert current[1] == previous[2]
+
+    def test_rejects_short_samples(self):
+        with pytest.raises(ValueError):
+            time_series_folds(5, 5, gap=2)
+
+
+class TestPenalizedLagRegression:
+
+    def test_lasso_keeps_relevant_columns(self):
+        y, X_list = _lagged_data()
+        names = ["const"] + [f"c{i}" for i in range(6 + 5 + 6 * 5)]
+        store = ArtifactStore([y] + X_list)
+
+        result = penalized_lag_regression(y, X_list, 5, names, LagSelection.LASSO, artifacts=store)
+        info = result.regularization
+        values = {c.name: c.value for c in result.coefficients}
+        log_test(f"alpha {info.alpha:.4g}, {info.n_nonzero} of {info.n_candidates} kept")
+
+        assert info.n_candidates == 41
+        assert info.n_nonzero < info.n_candidates
+        # shrunk towards zero, but the two true predictors lead the contemporaneous block
+        assert 0.6 < values["c0"] <= 1.1
+        assert -0.6 <= values["c1"] < -0.2
+        assert all(abs(values[f"c{i}"]) < abs(values["c1"]) for i in range(2, 6))
+        assert store.fitted_model.kind == "ols_penalized"
+        np.testing.assert_allclose(store.fitted_model.X @ store.fitted_model.params + store.fitted_model.resid, store.fitted_model.y)
+
+    def test_ridge_keeps_every_column(self):
+        y, X_list = _lagged_data(seed=2)
+        names = ["const"] + [f"c{i}" for i in range(41)]
+
+        result = penalized_lag_regression(y, X_list, 5, names, LagSelection.RIDGE)
+
+        assert result.regularization.l1_ratio == 0.0
+        assert result.regularization.n_nonzero == 41
+        assert 0 < result.regularization.effective_df < 41
+        assert all(c.std_error > 0 for c in result.coefficients)
+
+
+class TestLagSelectionOption:
+
+    def test_request_uses_penalized_lags(self):
+        y, X_list = _lagged_data(n=300, k=3, seed=3)
+        series = [{"name": "cases", "data": y.tolist()}]
+        series += [{"name": f"x{i}", "data": X.tolist()} for i, X in enumerate(X_list)]
+
+        result = json.loads(analyze_time_series(json.dumps({
+            "series": series,
+            "lag_selection": "elastic_net",
+            "l1_ratio": 0.7,
+            "cv_folds": 4
+        })))
+        regression = result["model_results"]["regression"]
+
+        assert regression["has_lags"]
+        assert regression["regularization"]["method"] == "elastic_net"
+        assert regression["regularization"]["l1_ratio"] == 0.7
+        assert regression["regularization"]["cv_folds"] == 4
+        assert regression["coefficients"][0]["name"] == "const"
+
+    @pytest.mark.parametrize("options, error", [
+        ({"lag_selection": "lars"}, "INVALID_LAG_SELECTION"),
+        ({"l1_ratio": 0}, "INVALID_L1_RATIO"),
+        ({"l1_ratio": 1.5}, "INVALID_L1_RATIO"),
+        ({"cv_folds": 1}, "INVALID_CV_FOLDS")
+    ])
+    def test_rejects_invalid_options(self, options, error):
+        y, X_list = _lagged_data(n=100, k=2)
+        series = [{"name": "cases", "data": y.tolist()}, {"name": "x0", "data": X_list[0].tolist()}]
+
+        result = json.loads(analyze_time_series(json.dumps({"series": series, **options})))
+
+        assert result["error"] == error
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
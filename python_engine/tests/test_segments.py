@@ -0,0 +1,107 @@
+import sys
+import numpy as np
+import pytest
+from statsmodels.tsa.stattools import adfuller
+from algorithms.artifacts import ArtifactStore
+from algorithms.integration import determine_integration_order
+from algorithms.ols_chain import fit_ols_chain
+from algorithms.segments import SegmentIndex, window_adf_test, window_lag_index
+
+
+def log_test(msg):
+    print(f"[TEST] {msg}", file=sys.stderr)
+
+
+class TestSegmentIndex:
+
+    def test_window_ols_matches_lstsq(self):
+        rng = np.random.default_rng(0)
+        Z = np.column_stack([rng.normal(size=200), np.ones(200), rng.normal(size=(200, 2))])
+        index = SegmentIndex(Z)
+
+        for start, end in [(0, 200), (17, 93), (150, 200)]:
+            fit = index.ols(start, end, 0, [1, 2, 3])
+            X, y = Z[start:end, 1:], Z[start:end, 0]
+            beta = np.linalg.lstsq(X, y, rcond=None)[0]
+
+            np.testing.assert_allclose(fit.params, beta, rtol=1e-9)
+            assert fit.ssr == pytest.approx(np.sum((y - X @ beta) ** 2), rel=1e-9)
+            assert fit.nobs == end - start
+
+        ends = np.array([60, 120, 200])
+        batch = index.window_ssr(10, ends, 0, [1, 2, 3])
+        np.testing.assert_allclose(batch, [index.ols(10, e, 0, [1, 2, 3]).ssr for e in ends])
+
+    def test_windows_share_root_offsets(self):
+        store = ArtifactStore([np.arange(100.0)])
+
+        period = store.window(40, 90)
+        nested = period.window(5, 20)
+
+        assert nested.root() == (store, 45)
+        np.testing.assert_array_equal(nested.series[0], np.arange(45.0, 60.0))
+
+    @pytest.mark.parametrize("order", [0, 1, 2])
+    def test_window_adf_matches_adfuller(self, order):
+        rng = np.random.default_rng(order)
+        store = ArtifactStore([np.cumsum(rng.normal(size=400)) + 500.0])
+
+        for start, end in [(0, 400), (120, 400), (50, 210)]:
+            window = store.window(start, end)
+            result = window_adf_test(window, 0, order)
+            expected = adfuller(window.diff(0, order), autolag="AIC", result_object=False)
+
+            assert result.test_statistic == pytest.approx(expected[0], rel=1e-8)
+            assert result.p_value == pytest.approx(expected[1], rel=1e-8)
+            assert result.used_lag == expected[2]
+            assert result.n_obs == expected[3]
+
+        # one index per (series, order), shared by every window
+        assert store.has(("adf_index", 0, order))
+
+    def test_period_integration_order_uses_index(self):
+        rng = np.random.default_rng(5)
+        store = ArtifactStore([np.cumsum(rng.normal(size=300))])
+        period = store.window(100, 300)
+
+        result = determine_integration_order(period.series[0], artifacts=period)
+        direct = determine_integration_order(period.series[0].copy())
+
+        assert result.order == direct.order
+        assert result.adf_result.test_statistic == pytest.approx(direct.adf_result.test_statistic, rel=1e-8)
+        assert store.has(("adf_index", 0, 0))
+
+    @pytest.mark.parametrize("orders", [[0, 0, 0], [1, 0, 2]])
+    def test_window_lag_search_matches_own_design(self, orders):
+        rng = np.random.default_rng(6)
+        n = 260
+        x = [np.cumsum(rng.normal(size=n)) for _ in range(2)]
+        e = np.zeros(n)
+        for t in range(1, n):
+            e[t] = 0.7 * e[t - 1] + rng.normal()
+        store = ArtifactStore([1.0 + x[0] - 0.5 * x[1] + e] + x)
+
+        for start, end in [(0, 260), (40, 140), (140, 260)]:
+            period = store.window(start, end)
+            series = [period.diff(i, order) for i, order in enumerate(orders)]
+            length = min(len(s) for s in series)
+            y, *X_list = [s[-length:] for s in series]
+
+            window = window_lag_index(period, orders, 5)
+            chain = fit_ols_chain(y, X_list, max_lags=5, window=window)
+            direct = fit_ols_chain(y, X_list, max_lags=5)
+
+            log_test(f"[{start}:{end}] lags {chain.lags}, aic {chain.lag_aic}")
+            assert chain.lags == direct.lags
+            assert chain.lag_aic.keys() == direct.lag_aic.keys()
+            for lags, aic in direct.lag_aic.items():
+                assert chain.lag_aic[lags] == pytest.approx(aic, rel=1e-9)
+
+        # one index per transformation, shared by every period; the full
+        # sample fits from its own design
+        assert store.has(("lag_index", (0, 1, 2), tuple(orders), 5, True))
+        assert window_lag_index(store, orders, 5) is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
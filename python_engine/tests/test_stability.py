@@ -0,0 +1,111 @@
+import sys
+import json
+import numpy as np
+import pytest
+from statsmodels.regression.recursive_ls import RecursiveLS
+from api.analyzer import analyze_time_series
+from algorithms.artifacts import FittedModel
+from algorithms.stability import (
+    StabilityMonitor,
+    cusum_bound,
+    cusum_squares_critical,
+    recursive_residuals,
+    stability_tests
+)
+
+
+def log_test(msg):
+    print(f"[TEST] {msg}", file=sys.stderr)
+
+
+def _model(n=200, shift_at=None, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.normal(size=n)
+    slope = np.ones(n)
+    if shift_at is not None:
+        slope[shift_at:] = 3.0
+    y = 1.0 + slope * x + rng.normal(size=n)
+    X = np.column_stack([np.ones(n), x])
+    return FittedModel(kind="ols", y=y, X=X, names=["const", "x"], params=None, resid=None)
+
+
+class TestStability:
+
+    def test_matches_statsmodels_recursive_ls(self):
+        model = _model()
+
+        residuals, start, rls = recursive_residuals(model.y, model.X)
+        fitted = RecursiveLS(model.y, model.X).fit()
+        result = stability_tests(model, keep_paths=True)
+
+        assert start == 2
+        np.testing.assert_allclose(residuals, fitted.resid_recursive[2:], rtol=1e-8)
+        np.testing.assert_allclose(result.cusum, fitted.cusum, rtol=1e-8)
+        np.testing.assert_allclose(result.cusum_squares, fitted.cusum_squares, rtol=1e-8)
+        np.testing.assert_allclose(rls.params, np.linalg.lstsq(model.X, model.y, rcond=None)[0])
+
+    def test_bounds_match_statsmodels(self):
+        model = _model()
+        fitted = RecursiveLS(model.y, model.X).fit()
+
+        _, cusum_upper = fitted._cusum_significance_bounds(0.05)
+        _, squares_upper = fitted._cusum_squares_significance_bounds(0.05)
+
+        np.testing.assert_allclose(cusum_bound(np.array([0, 198]), 198), cusum_upper)
+        assert cusum_squares_critical(198) == pytest.approx(squares_upper[0])
+
+    def test_flags_unstable_relationship(self):
+        stable = stability_tests(_model(seed=1))
+        broken = stability_tests(_model(shift_at=120, seed=1))
+        log_test(f"cusum of squares crossing at {broken.first_cusum_squares_crossing}")
+
+        assert stable.cusum_stable and stable.cusum_squares_stable
+        assert not broken.cusum_squares_stable
+        assert stable.cusum is None
+
+    def test_monitor_continues_batch_recursion(self):
+        full = _model(n=200, seed=2)
+        head = FittedModel(kind="ols", y=full.y[:150], X=full.X[:150], names=full.names, params=None, resid=None)
+
+        monitor = StabilityMonitor(head)
+        steps = [monitor.update(full.X[t], full.y[t]) for t in range(150, 200)]
+        residuals, start, _ = recursive_residuals(full.y, full.X)
+
+        np.testing.assert_allclose([s.recursive_residual for s in steps], residuals[150 - start:], rtol=1e-8)
+        np.testing.assert_allclose(monitor.params, np.linalg.lstsq(full.X, full.y, rcond=None)[0])
+        assert steps[-1].index == 199
+        assert not any(s.cusum_crossed for s in steps)
+
+    def test_monitor_flags_break_after_sample(self):
+        full = _model(n=300, shift_at=200, seed=3)
+        head = FittedModel(kind="ols", y=full.y[:200], X=full.X[:200], names=full.names, params=None, resid=None)
+
+        monitor = StabilityMonitor(head)
+        flagged = None
+        for t in range(200, 300):
+            step = monitor.update(full.X[t], full.y[t])
+            if step.cusum_crossed or step.cusum_squares_crossed:
+                flagged = step.index
+                break
+        log_test(f"break at 200 flagged at {flagged}")
+
+        assert flagged is not None and flagged >= 200
+
+    def test_analysis_attaches_stability(self):
+        model = _model(n=150, seed=4)
+        series = [
+            {"name": "cases", "data": model.y.tolist()},
+            {"name": "temp", "data": model.X[:, 1].tolist()}
+        ]
+
+        enabled = json.loads(analyze_time_series(json.dumps({"series": series})))
+        disabled = json.loads(analyze_time_series(json.dumps({"series": series, "stability": False})))
+
+        stability = enabled["model_results"]["regression"]["stability"]
+        assert stability["significance"] == 0.05
+        assert stability["cusum"] is None
+        assert disabled["model_results"]["regression"]["stability"] is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,104 @@
+import sys
+import numpy as np
+import pytest
+from statsmodels.tsa.seasonal import STL
+from algorithms.stl_decomposition import (
+    batch_stl,
+    stl_kernel,
+    detect_trend_and_seasonality,
+    detect_trend_and_seasonality_batch
+)
+
+
+def log_test(msg):
+    print(f"[TEST] {msg}", file=sys.stderr)
+
+
+def _seasonal_block(n, period, count, seed=0):
+    rng = np.random.default_rng(seed)
+    time = np.arange(n)
+    rows = []
+    for _ in range(count):
+        rows.append(0.05 * time + 10 * np.sin(2 * np.pi * time / period) + rng.normal(0, 1, n))
+    return np.vstack(rows)
+
+
+class TestBatchSTL:
+    """Batch STL engine must reproduce statsmodels STL exactly"""
+
+    @pytest.mark.parametrize("n,period", [(560, 52), (200, 52), (61, 12), (25, 8)])
+    def test_components_match_statsmodels(self, n, period):
+        block = _seasonal_block(n, period, count=3)
+
+        trend, seasonal, resid = batch_stl(block, period)
+
+        for row in range(block.shape[0]):
+            expected = STL(block[row], period=period, seasonal=13).fit()
+            np.testing.assert_allclose(trend[row], expected.trend, atol=1e-9)
+            np.testing.assert_allclose(seasonal[row], expected.seasonal, atol=1e-9)
+            np.testing.assert_allclose(resid[row], expected.resid, atol=1e-9)
+
+        log_test(f"n={n}, period={period}: components match")
+
+    def test_kernel_is_cached_per_key(self):
+        stl_kernel.cache_clear()
+
+        block = _seasonal_block(120, 12, count=2)
+        batch_stl(block, 12)
+        batch_stl(block[:1], 12)
+        batch_stl(block[:, :100], 12)
+
+        info = stl_kernel.cache_info()
+        log_test(f"kernel cache: {info}")
+
+        assert info.hits == 1
+        assert info.misses == 2
+
+    def test_batch_matches_single_series(self):
+        block = _seasonal_block(200, 52, count=4, seed=1)
+        series_list = [row for row in block] + [block[0][:150]]
+
+        batch = detect_trend_and_seasonality_batch(series_list)
+
+        for series, result in zip(series_list, batch):
+            single = detect_trend_and_seasonality(series)
+            assert result.has_trend == single.has_trend
+            assert result.trend_strength == pytest.approx(single.trend_strength)
+            assert result.seasonal_strength == pytest.approx(single.seasonal_strength)
+
+    def test_strengths_match_statsmodels(self):
+        block = _seasonal_block(300, 52, count=1, seed=2)
+
+        result = detect_trend_and_seasonality(block[0], period=52)
+        expected = STL(block[0], period=52, seasonal=13).fit()
+
+        resid_var = np.var(expected.resid)
+        trend_strength = np.var(expected.trend) / (np.var(expected.trend) + resid_var)
+        seasonal_strength = np.var(expected.seasonal) / (np.var(expected.seasonal) + resid_var)
+
+        assert result.trend_strength == pytest.approx(trend_strength, abs=1e-10)
+        assert result.seasonal_strength == pytest.approx(seasonal_strength, abs=1e-10)
+
+    def test_short_series_in_batch(self):
+        results = detect_trend_and_seasonality_batch(
+            [np.arange(10.0), np.random.randn(100)],
+            retain_components=True
+        )
+
+        assert results[0].has_trend is False
+        assert results[0].trend_component is None
+        assert results[1].trend_component is not None
+
+    def test_components_dropped_unless_retained(self):
+        block = _seasonal_block(120, 12, count=2)
+
+        dropped = detect_trend_and_seasonality_batch(list(block), period=12)
+        kept = detect_trend_and_seasonality_batch(list(block), period=12, retain_components=True)
+
+        assert all(r.trend_component is None for r in dropped)
+        assert all(r.residual_component is not None for r in kept)
+        assert dropped[0].trend_strength == kept[0].trend_strength
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -5,6 +5,8 @@ import pytest
 from pathlib import Path
 from algorithms.stl_decomposition import (
     detect_trend_and_seasonality,
+    detect_trend_and_seasonality_batch,
+    detect_seasonal_periods,
     find_period_via_acf,
     _fallback_period
 )
@@ -265,5 +267,61 @@ class TestSTLDecomposition:
         log_test("✅ Test 8 PASSED\n")
 
 
+class TestPeriodDetection:
+    """Tests for batched FFT periodogram + ACF period detection"""
+
+    def test_batch_detects_each_series_period(self):
+        rng = np.random.default_rng(7)
+        time = np.arange(400)
+        block = np.vstack([
+            5 * np.sin(2 * np.pi * time / 7) + rng.normal(0, 1, 400),
+            5 * np.sin(2 * np.pi * time / 12) + rng.normal(0, 1, 400),
+            5 * np.sin(2 * np.pi * time / 52) + 0.02 * time + rng.normal(0, 1, 400),
+        ])
+
+        periods = detect_seasonal_periods(block)
+        log_test(f"Detected periods: {periods}")
+
+        assert periods[0] == 7
+        assert periods[1] == 12
+        assert abs(periods[2] - 52) <= 2
+
+    def test_no_period_in_white_noise(self):
+        rng = np.random.default_rng(3)
+        noise = rng.normal(0, 1, (50, 300))
+
+        periods = detect_seasonal_periods(noise)
+
+        assert np.all(periods == 0), f"Spurious periods: {periods[periods > 0]}"
+
+    def test_constant_series_has_no_period(self):
+        periods = detect_seasonal_periods(np.ones((2, 100)))
+        assert np.all(periods == 0)
+
+    def test_detected_period_drives_stl(self):
+        rng = np.random.default_rng(11)
+        time = np.arange(240)
+        monthly = 4 * np.sin(2 * np.pi * time / 12) + rng.normal(0, 0.5, 240)
+        noise = rng.normal(0, 1, 240)
+
+        results = detect_trend_and_seasonality_batch([monthly, noise])
+
+        log_test(f"Monthly: period={results[0].period}, seasonal={results[0].seasonal_strength:.3f}")
+        log_test(f"Noise: period={results[1].period}, seasonal={results[1].seasonal_strength:.3f}")
+
+        assert results[0].period == 12
+        assert results[0].has_seasonality
+        assert results[1].period is None
+        assert results[1].seasonal_strength == 0.0
+        assert results[1].has_seasonality is False
+
+    def test_explicit_period_skips_detection(self):
+        data = np.random.default_rng(5).normal(0, 1, 200)
+
+        result = detect_trend_and_seasonality(data, period=52)
+
+        assert result.period == 52
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v", "-s"])
@@ -3,7 +3,9 @@ import sys
 import json
 import numpy as np
 import pytest
+from itertools import combinations
 from api.analyzer import analyze_time_series
+from algorithms.structural_breaks import bai_perron, segment_ssr, optimal_partitions
 
 
 def log_test(msg):
@@ -280,3 +282,75 @@ class TestStructuralBreaks:
 
         log_test("✅ All data structures are valid")
         log_test("✅ Test 5 PASSED\n")
+
+
+def _regime_data(n=300, breaks=(100, 200), seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.normal(size=n)
+    regime = np.searchsorted(breaks, np.arange(n), side="right")
+    intercepts = np.array([1.0, 3.0, 0.5, 2.0])[regime]
+    slopes = np.array([1.0, -1.0, 2.0, 0.0])[regime]
+    return intercepts + slopes * x + rng.normal(scale=0.5, size=n), x
+
+
+class TestBaiPerron:
+
+    def test_segment_ssr_matches_lstsq(self):
+        y, x = _regime_data(n=120)
+        X = np.column_stack([np.ones(120), x])
+
+        ssr = segment_ssr(y, X, 10)
+
+        for start, end in [(0, 120), (13, 57), (100, 120)]:
+            beta = np.linalg.lstsq(X[start:end], y[start:end], rcond=None)[0]
+            expected = np.sum((y[start:end] - X[start:end] @ beta) ** 2)
+            assert ssr[start, end] == pytest.approx(expected, rel=1e-8)
+        assert np.isinf(ssr[0, 9])
+
+    def test_partitions_match_exhaustive_search(self):
+        y, x = _regime_data(n=80, breaks=(30,), seed=1)
+        X = np.column_stack([np.ones(80), x])
+        ssr = segment_ssr(y, X, 10)
+
+        partitions = optimal_partitions(ssr, 3, 10)
+
+        for m in (1, 2, 3):
+            best = None
+            for dates in combinations(range(10, 71), m):
+                bounds = (0,) + dates + (80,)
+                if min(np.diff(bounds)) < 10:
+                    continue
+                total = sum(ssr[a, b] for a, b in zip(bounds[:-1], bounds[1:]))
+                if best is None or total < best[0]:
+                    best = (total, list(dates))
+            assert partitions[m][0] == pytest.approx(best[0])
+            assert partitions[m][1] == best[1]
+
+    def test_recovers_breaks_and_selects_count(self):
+        y, x = _regime_data()
+
+        result = bai_perron(y, x)
+        log_test(f"breaks {result.break_indices}, sup-F {[round(f, 1) for f in result.sup_f]}")
+
+        assert result.n_breaks == 2
+        assert all(abs(found - true) <= 3 for found, true in zip(result.break_indices, [100, 200]))
+        assert len(result.bic) == len(result.ssr) == len(result.sup_f) + 1
+
+    def test_no_breaks_in_stable_regression(self):
+        y, x = _regime_data(breaks=(), seed=2)
+
+        assert bai_perron(y, x).n_breaks == 0
+
+    def test_request_option_splits_periods(self):
+        y, x = _regime_data(breaks=(150,), seed=3)
+        payload = {
+            "series": [{"name": "cases", "data": y.tolist()}, {"name": "temp", "data": x.tolist()}],
+            "break_method": "bai_perron"
+        }
+
+        result = json.loads(analyze_time_series(json.dumps(payload)))
+
+        assert result["bai_perron"]["n_breaks"] == 1
+        assert result["has_structural_break"] is True
+        assert abs(result["structural_breaks"][0]["index"] - 150) <= 3
+        assert len(result["model_results"]["period_results"]) == 2
@@ -0,0 +1,122 @@
+import sys
+import json
+from itertools import combinations
+import numpy as np
+import pytest
+import statsmodels.api as sm
+from api.analyzer import analyze_time_series
+import algorithms.subset_selection as subset_selection
+from algorithms.subset_selection import best_subsets
+from models.responses import SubsetCriterion
+
+NAMES = [f"x{i}" for i in range(10)]
+
+
+def log_test(msg):
+    print(f"[TEST] {msg}", file=sys.stderr)
+
+
+def _data(n=250, p=10, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, p))
+    y = 1.0 + X[:, 0] - 0.5 * X[:, 3] + rng.normal(size=n)
+    if p > 7:
+        y += 0.3 * X[:, 7]
+    return y, X
+
+
+def _exhaustive(y, X, criterion, top):
+    scored = []
+    for size in range(1, X.shape[1] + 1):
+        for subset in combinations(range(X.shape[1]), size):
+            fit = sm.OLS(y, sm.add_constant(X[:, subset])).fit()
+            value = {"aic": fit.aic, "bic": fit.bic, "adj_r2": -fit.rsquared_adj}[criterion.value]
+            scored.append((value, subset))
+    return [list(subset) for _, subset in sorted(scored)[:top]]
+
+
+class TestBestSubsets:
+
+    @pytest.mark.parametrize("criterion", [SubsetCriterion.AIC, SubsetCriterion.BIC, SubsetCriterion.ADJ_R2])
+    def test_matches_exhaustive_search(self, criterion):
+        y, X = _data()
+
+        result = best_subsets(y, X, NAMES, criterion=criterion, top=5)
+        found = [[NAMES.index(name) for name in spec.predictors] for spec in result.specifications]
+        log_test(f"{criterion.value}: {result.evaluated} of {2 ** 10 - 1} subsets evaluated")
+
+        assert found == _exhaustive(y, X, criterion, 5)
+        assert result.evaluated < 2 ** 10 - 1
+
+    def test_reports_statsmodels_fit_statistics(self):
+        y, X = _data(seed=1)
+
+        best = best_subsets(y, X, NAMES, criterion=SubsetCriterion.BIC, top=1).specifications[0]
+        columns = [NAMES.index(name) for name in best.predictors]
+        fit = sm.OLS(y, sm.add_constant(X[:, columns])).fit()
+
+        assert best.criterion_value == pytest.approx(fit.bic)
+        assert best.aic == pytest.approx(fit.aic)
+        assert best.adj_r_squared == pytest.approx(fit.rsquared_adj)
+        assert best.regression.r_squared == pytest.approx(fit.rsquared)
+
+    def test_respects_max_size(self):
+        y, X = _data(seed=2)
+
+        result = best_subsets(y, X, NAMES, criterion=SubsetCriterion.ADJ_R2, top=3, max_size=2)
+
+        assert all(len(spec.predictors) <= 2 for spec in result.specifications)
+
+    def test_parallel_matches_serial(self):
+        y, X = _data(seed=3)
+
+        serial = best_subsets(y, X, NAMES, top=4, workers=1)
+        pooled = best_subsets(y, X, NAMES, top=4, workers=2)
+
+        assert [s.predictors for s in serial.specifications] == [s.predictors for s in pooled.specifications]
+
+    def test_blocks_span_equal_subtrees(self):
+        y, X = _data(p=9, seed=5)
+        Z = np.column_stack([np.ones(len(y)), X - X.mean(axis=0), y - y.mean()])
+        depth = subset_selection.PREFIX_DEPTH
+
+        counts = {}
+        for prefix in subset_selection._prefixes(depth):
+            # a top list that never fills disables the cut
+            _, counts[prefix] = subset_selection._search_block(
+                prefix, Z.T @ Z, len(y), 1.0, SubsetCriterion.BIC, top=2 ** 9, max_size=9, depth=depth
+            )
+
+        assert len(counts) == 2 ** depth
+        # the constant-only model is the one subset not searched
+        assert counts.pop(()) == 2 ** (9 - depth) - 1
+        assert set(counts.values()) == {2 ** (9 - depth)}
+
+    def test_fewer_predictors_than_prefix_depth(self):
+        y, X = _data(seed=6)
+        X = X[:, :3]
+
+        result = best_subsets(y, X, NAMES[:3], criterion=SubsetCriterion.AIC, top=7)
+        found = [[NAMES.index(name) for name in spec.predictors] for spec in result.specifications]
+
+        assert found == _exhaustive(y, X, SubsetCriterion.AIC, 7)
+
+    def test_request_option_attaches_search(self):
+        y, X = _data(n=150, p=4, seed=4)
+        series = [{"name": "cases", "data": y.tolist()}]
+        series += [{"name": f"x{i}", "data": X[:, i].tolist()} for i in range(4)]
+
+        result = json.loads(analyze_time_series(json.dumps({
+            "series": series,
+            "subset_search": "bic",
+            "subset_top": 3
+        })))
+        search = result["model_results"]["subset_search"]
+
+        assert search["criterion"] == "bic"
+        assert len(search["specifications"]) == 3
+        assert "x0" in search["specifications"][0]["predictors"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,69 @@
+import sys
+import numpy as np
+import pytest
+from statsmodels.tsa.api import VAR
+from algorithms.artifacts import ArtifactStore
+from algorithms.var import estimate_var, var_coefs, build_var_on_differences
+
+
+def log_test(msg):
+    print(f"[TEST] {msg}", file=sys.stderr)
+
+
+def _var2(n=300, neqs=3, seed=0):
+    rng = np.random.default_rng(seed)
+    shocks = rng.normal(size=(n, neqs))
+    data = np.zeros((n, neqs))
+    for t in range(2, n):
+        data[t] = 0.4 * data[t - 1] - 0.2 * data[t - 2] + shocks[t]
+    return data
+
+
+class TestNativeVar:
+    """Native VAR engine must reproduce statsmodels VAR"""
+
+    @pytest.mark.parametrize("n,neqs", [(300, 3), (120, 2), (560, 4)])
+    def test_lag_table_matches_select_order(self, n, neqs):
+        data = _var2(n, neqs)
+
+        estimate = estimate_var(data, maxlags=15)
+        expected = VAR(data).select_order(maxlags=15)
+
+        aic = np.array([estimate.lag_aic[p] for p in range(16)])
+        np.testing.assert_allclose(aic, expected.ics["aic"], atol=1e-10)
+        assert estimate.lags == expected.aic
+
+    def test_fit_matches_statsmodels(self):
+        data = _var2(seed=1)
+
+        estimate = estimate_var(data, lags=3)
+        expected = VAR(data).fit(maxlags=3)
+
+        np.testing.assert_allclose(estimate.params, expected.params, atol=1e-12)
+        np.testing.assert_allclose(estimate.stderr, expected.stderr, atol=1e-12)
+        np.testing.assert_allclose(estimate.pvalues, expected.pvalues, atol=1e-12)
+        np.testing.assert_allclose(estimate.sigma_u, expected.sigma_u, atol=1e-12)
+        np.testing.assert_allclose(var_coefs(estimate), expected.coefs, atol=1e-12)
+
+    def test_too_many_lags_falls_back_to_one(self):
+        data = _var2(n=60)
+
+        estimate = estimate_var(data, maxlags=15)
+
+        assert estimate.lags == 1
+        assert estimate.lag_aic is None
+
+    def test_builder_caches_estimate(self):
+        levels = np.cumsum(_var2(n=200, neqs=2, seed=2), axis=0)
+        store = ArtifactStore(list(levels.T))
+
+        first = build_var_on_differences(list(levels.T), artifacts=store)
+        second = build_var_on_differences(list(levels.T), artifacts=store)
+        log_test(f"VAR target R^2: {first.r_squared:.4f}")
+
+        assert store.has(("var", 15))
+        assert first.coefficients[1].value == second.coefficients[1].value
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
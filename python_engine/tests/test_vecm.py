@@ -0,0 +1,187 @@
+import sys
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from dataclasses import replace
+from pathlib import Path
+from statsmodels.tsa.vector_ar.vecm import VECM
+import api.analyzer as analyzer
+from api.analyzer import analyze_time_series
+from algorithms.artifacts import ArtifactStore
+from algorithms.backtest import backtest_model
+from algorithms.cointegration_tests import johansen_test
+from algorithms.forecast import forecast_model
+from algorithms.vecm import fitted_vecm, build_vecm_model, vecm_design
+from models.responses import BacktestMethod
+
+ECM_CASE_PATH = Path(__file__).parent.parent / "datasets" / "case2a_NGA_ECM.csv"
+
+
+def log_test(msg):
+    print(f"[TEST] {msg}", file=sys.stderr)
+
+
+# s0 - 2 s1 + 2 s2 is stationary
+def _cointegrated(seed=0, n=200):
+    rng = np.random.default_rng(seed)
+    common = np.cumsum(rng.normal(size=n))
+    other = np.cumsum(rng.normal(size=n))
+    e = 0.7 * rng.normal(size=(n, 3))
+    return np.column_stack([common + e[:, 0], 0.5 * common + other + e[:, 1], other + e[:, 2]])
+
+
+class TestVecmEstimate:
+
+    @pytest.mark.parametrize("regression, deterministic", [("c", "co"), ("nc", "n")])
+    @pytest.mark.parametrize("rank", [1, 2])
+    def test_matches_statsmodels(self, regression, deterministic, rank):
+        levels = _cointegrated()
+        store = ArtifactStore(list(levels.T))
+
+        vecm = fitted_vecm(store, regression, rank)
+        k = vecm.k_ar_diff
+        reference = VECM(levels[-(vecm.nobs + k + 1):], k_ar_diff=k, coint_rank=rank, deterministic=deterministic).fit()
+
+        offset = 1 if deterministic == "co" else 0
+        log_test(f"{regression}, rank {rank}: alpha diff {np.max(np.abs(vecm.alpha - reference.alpha)):.2e}")
+        np.testing.assert_allclose(vecm.beta, reference.beta, atol=1e-10)
+        np.testing.assert_allclose(vecm.alpha, reference.alpha, atol=1e-10)
+        np.testing.assert_allclose(vecm.gamma[0], reference.gamma[:, :3], atol=1e-10)
+        np.testing.assert_allclose(vecm.resid, reference.resid, atol=1e-10)
+        np.testing.assert_allclose(vecm.stderr[offset:offset + rank].T, reference.stderr_alpha, rtol=1e-8)
+
+    def test_alpha_is_johansen_s01_beta(self):
+        levels = _cointegrated(seed=7)
+        store = ArtifactStore(list(levels.T))
+        estimate = johansen_test(list(levels.T), regression="c", artifacts=store)
+
+        vecm = fitted_vecm(store, "c", 2)
+
+        beta = vecm.beta
+        expected = estimate.s01 @ beta @ np.linalg.inv(beta.T @ estimate.s11 @ beta)
+        np.testing.assert_allclose(vecm.alpha, expected, atol=1e-10)
+
+    def test_trend_moves_into_constant(self):
+        levels = _cointegrated() + np.outer(np.arange(200.0), [0.05, 0.02, -0.03])
+        store = ArtifactStore(list(levels.T))
+
+        vecm = fitted_vecm(store, "ct", 1)
+
+        # least squares on the raw differences, given beta
+        design = vecm_design(levels, vecm.beta, vecm.trend, vecm.det_order, vecm.k_ar_diff, vecm.nobs)
+        params, _, _, _ = np.linalg.lstsq(design, np.diff(levels, axis=0)[-vecm.nobs:], rcond=None)
+        np.testing.assert_allclose(vecm.params, params, atol=1e-10)
+        ols_cov = np.linalg.inv(design.T @ design)
+        np.testing.assert_allclose(vecm.stderr[:, 0], np.sqrt(np.diag(ols_cov) * vecm.sigma_u[0, 0]), rtol=1e-8)
+
+    def test_rejects_full_rank(self):
+        store = ArtifactStore(list(_cointegrated().T))
+
+        # rank 3 of 3 series is a VAR in levels
+        with pytest.raises(ValueError):
+            fitted_vecm(store, "c", 3)
+
+
+class TestVecmForecast:
+
+    def test_point_forecast_matches_statsmodels(self):
+        levels = _cointegrated()
+        store = ArtifactStore(list(levels.T))
+        build_vecm_model(list(levels.T), "c", rank=1, artifacts=store)
+        vecm = fitted_vecm(store, "c", 1)
+        k = vecm.k_ar_diff
+
+        result = forecast_model(store, horizon=6, simulations=50, seed=1)
+        reference = VECM(levels[-(vecm.nobs + k + 1):], k_ar_diff=k, coint_rank=1, deterministic="co").fit()
+
+        assert result.exog_assumption == "endogenous"
+        np.testing.assert_allclose(result.mean, reference.predict(steps=6)[:, 0], rtol=1e-9)
+
+    def test_backtest_matches_level_recursion(self):
+        levels = _cointegrated(seed=7)
+        store = ArtifactStore(list(levels.T))
+        build_vecm_model(list(levels.T), "c", rank=2, artifacts=store)
+        model = store.fitted_model
+        vecm = fitted_vecm(store, "c", 2)
+        k = vecm.k_ar_diff
+        diffs = np.diff(levels, axis=0)[-vecm.nobs:]
+        offset = len(levels) - vecm.nobs
+        deterministic = levels.mean(axis=0)
+
+        result = backtest_model(store, BacktestMethod.EXPANDING, horizon=3, folds=2)
+
+        for fold in result.folds:
+            origin = fold.origin - offset
+            params, _, _, _ = np.linalg.lstsq(model.X[:origin], diffs[:origin], rcond=None)
+            level = levels[fold.origin - 1].copy()
+            history = list(np.diff(levels, axis=0)[fold.origin - 1 - k:fold.origin - 1])
+            forecast = []
+            for step in range(3):
+                row = np.concatenate([[1.0], (level - deterministic) @ vecm.beta] + history[::-1][:k])
+                change = row @ params
+                level = level + change
+                history.append(change)
+                forecast.append(level[0])
+            np.testing.assert_allclose(fold.errors, levels[fold.origin:fold.origin + 3, 0] - forecast, atol=1e-8)
+
+
+class TestVecmSelection:
+
+    def _payload(self, seed, **options):
+        levels = _cointegrated(seed)
+        series = [{"name": f"s{i}", "data": levels[:, i].tolist()} for i in range(3)]
+        return json.dumps(dict({"series": series, "target_index": 0}, **options))
+
+    def test_johansen_rank_selects_vecm(self):
+        result = json.loads(analyze_time_series(self._payload(7)))
+        model_results = result["model_results"]
+        regression = model_results["regression"]
+
+        # trace rejects rank 0, accepts rank <= 1 and rejects rank <= 2 again;
+        # the sequential procedure stops at the one stationary combination
+        assert model_results["cointegration"]["n_cointegration_relations"] == 1
+        assert regression["vecm"]["rank"] == 1
+        assert [c["name"] for c in regression["coefficients"][:3]] == ["const", "ECT1", "lag1_Δs0"]
+
+    def test_rank_stops_at_first_accepted_hypothesis(self, monkeypatch):
+        levels = _cointegrated(7)
+        store = ArtifactStore(list(levels.T))
+        estimate = johansen_test(list(levels.T), artifacts=store)
+
+        # rank 0 rejected, rank <= 1 accepted, rank <= 2 rejected
+        lr1 = estimate.cvt[:, 1] + np.array([1.0, -1.0, 1.0])
+        monkeypatch.setattr(analyzer, "johansen_test", lambda *args, **kwargs: replace(estimate, lr1=lr1))
+        result = analyzer._check_cointegration(list(levels.T), "c", store)
+
+        assert result.is_cointegrated
+        assert result.n_cointegration_relations == 1
+
+    def test_compared_as_its_own_specification(self):
+        result = json.loads(analyze_time_series(self._payload(0, compare_models=True)))
+        candidates = {c["specification"]: c for c in result["model_results"]["comparison"]["candidates"]}
+
+        assert candidates["vecm"]["selected"]
+        assert candidates["vecm"]["model_kind"] == "vecm"
+        assert candidates["ecm"]["model_kind"] == "ecm"
+
+    def test_full_rank_falls_back_to_ecm(self):
+        df = pd.read_csv(ECM_CASE_PATH)
+        series = [{"name": name, "data": df[name].tolist()} for name in df.columns[-3:]]
+
+        result = json.loads(analyze_time_series(json.dumps({"series": series, "target_index": 0, "compare_models": True})))
+        model_results = result["model_results"]
+        candidates = {c["specification"]: c for c in model_results["comparison"]["candidates"]}
+        log_test(f"vecm candidate: {candidates['vecm']['error_message']}")
+
+        # every series is I(1) but johansen rejects every rank below 3
+        assert [so["order"] for so in result["series_orders"]] == [1, 1, 1]
+        assert model_results["cointegration"]["n_cointegration_relations"] == 3
+        assert model_results["regression"]["vecm"] is None
+        assert model_results["regression"]["coefficients"][1]["name"] == "ECT"
+        assert candidates["ecm"]["selected"]
+        assert candidates["vecm"]["model_kind"] is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])